@@ -0,0 +1,391 @@
+"""Headless batch processing of job emails into summaries and Asana tasks.
+
+Example::
+
+    python batch.py ~/Mail/backlog --report backlog.jsonl --concurrency 4
+
+Every processed email is appended to the JSONL report.  Re-running the same
+command skips emails whose tasks were already created and reuses summaries
+that were generated before an interruption, so no email is paid for twice.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Optional
+
+from vendor_setup import ensure_vendor_path
+
+ensure_vendor_path()
+
+import functions.asana_api
+import functions.asana_metadata
+import functions.app_config
+import functions.database
+import functions.gpt
+import functions.metrics
+import functions.structured_summary
+from functions.asana_settings import AsanaSettings
+from functions.email_sources import EmailItem, iter_emails
+from services.openai_service import OpenAIService
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REPORT_NAME = "batch_report.jsonl"
+
+
+class BatchReport:
+    """Append-only JSONL report that doubles as the resume checkpoint."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load_previous(self) -> dict[str, dict]:
+        """Return the latest record per ``item_id`` from an earlier run."""
+
+        records: dict[str, dict] = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from an interrupted run; ignore it.
+                    continue
+                item_id = record.get("item_id")
+                if isinstance(item_id, str):
+                    records[item_id] = record
+        return records
+
+    def append(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+                file.flush()
+
+
+def _task_name_for(item: EmailItem) -> str:
+    if item.subject:
+        return item.subject
+    if item.sender:
+        return f"Email from {item.sender}"
+    return item.item_id
+
+
+def _process_item(
+    item: EmailItem,
+    previous: Optional[dict],
+    *,
+    args: argparse.Namespace,
+    config: functions.app_config.ConfigSnapshot,
+    asana_settings: AsanaSettings,
+    openai_service: OpenAIService,
+    packed: Optional[functions.structured_summary.BatchSummary] = None,
+) -> dict:
+    started = time.monotonic()
+    record = {
+        "item_id": item.item_id,
+        "source": item.source,
+        "message_id": item.message_id,
+        "subject": item.subject,
+        "task_name": _task_name_for(item),
+    }
+
+    def _finish(status: str, **fields) -> dict:
+        record.update(fields)
+        record["status"] = status
+        record["elapsed_seconds"] = round(time.monotonic() - started, 3)
+        record["timestamp"] = datetime.datetime.now().isoformat()
+        return record
+
+    if item.error:
+        return _finish("failed", stage="read", error=item.error)
+    if not item.body.strip():
+        return _finish("skipped", stage="read", error="Email has no body text.")
+
+    summary = previous.get("summary") if previous else None
+    structured = None
+    if isinstance(summary, str) and summary.strip():
+        record["summary_reused"] = True
+        if isinstance(previous.get("structured"), dict):
+            structured = functions.structured_summary.StructuredSummary.from_payload(previous["structured"])
+    elif packed is not None:
+        # Summarised (and saved to history) by _process_group.
+        if packed.error:
+            return _finish("failed", stage="openai", error=packed.error)
+        summary, structured = packed.summary, packed.structured
+        record["summary_packed"] = packed.packed
+    else:
+        try:
+            reply = functions.structured_summary.generate_summary(
+                openai_service,
+                args.model,
+                item.body,
+                include_tasks=args.tasks,
+                include_fixes=args.fixes,
+                structured=config.structured_summaries,
+            )
+        except Exception as exc:
+            return _finish("failed", stage="openai", error=str(exc))
+        summary, structured = reply.markdown, reply.structured
+        try:
+            functions.database.save_to_history("summarize", "batch", reply.prompt, summary)
+        except Exception as exc:
+            print(f"WARN: Failed to save history for {item.item_id}: {exc}")
+    record["summary"] = summary
+    if structured is not None:
+        record["structured"] = structured.to_payload()
+
+    if args.dry_run:
+        return _finish("summarized", stage="openai")
+
+    try:
+        task_request = functions.asana_api.create_asana_task_request(
+            functions.asana_api.AsanaTaskInputs(
+                summary_markdown=summary,
+                original_email=item.body,
+                task_name=record["task_name"],
+                assignee_name=args.assignee or asana_settings.default_assignee,
+                priority=(
+                    args.priority
+                    or asana_settings.match_priority(structured.priority if structured else None)
+                    or asana_settings.default_priority
+                ),
+                due_on=args.due_on or "",
+                structured=structured,
+            ),
+            asana_settings,
+        )
+        result = functions.asana_api.perform_asana_task_creation(
+            config.get("asana_token"),
+            task_request,
+            host=config.get("asana_api_base_url") or None,
+        )
+    except Exception as exc:
+        # Keep the summary so a resumed run only retries the Asana step.
+        return _finish("summarized", stage="asana", error=str(exc))
+
+    failed = "; ".join(f"{failure.name}: {failure.error}" for failure in result.failed)
+    return _finish(
+        "created",
+        stage="asana",
+        task_gid=result.task_gid,
+        subtasks=result.created,
+        error=f"Sub-tasks not created: {failed}" if failed else "",
+    )
+
+
+def _needs_summary(item: EmailItem, previous: Optional[dict]) -> bool:
+    if item.error or not item.body.strip():
+        return False
+    summary = previous.get("summary") if previous else None
+    return not (isinstance(summary, str) and summary.strip())
+
+
+def _process_group(
+    group: list[tuple[EmailItem, Optional[dict]]],
+    *,
+    args: argparse.Namespace,
+    config: functions.app_config.ConfigSnapshot,
+    asana_settings: AsanaSettings,
+    openai_service: OpenAIService,
+) -> list[dict]:
+    """Summarise a group of emails in one packed request, then finish each."""
+
+    pending = [index for index, (item, previous) in enumerate(group) if _needs_summary(item, previous)]
+    try:
+        summaries = functions.structured_summary.summarize_emails(
+            openai_service,
+            args.model,
+            [group[index][0].body for index in pending],
+            include_tasks=args.tasks,
+            include_fixes=args.fixes,
+            structured=config.structured_summaries,
+            max_emails=len(group),
+        )
+    except Exception as exc:
+        # Fail this group's items rather than the whole run.
+        print(f"ERR: Packed summary of {len(pending)} emails failed: {exc}")
+        summaries = [functions.structured_summary.BatchSummary(error=str(exc)) for _index in pending]
+    packed = dict(zip(pending, summaries))
+    return [
+        _process_item(
+            item,
+            previous,
+            args=args,
+            config=config,
+            asana_settings=asana_settings,
+            openai_service=openai_service,
+            packed=packed.get(index),
+        )
+        for index, (item, previous) in enumerate(group)
+    ]
+
+
+def _is_finished(previous: Optional[dict], dry_run: bool) -> bool:
+    if not previous:
+        return False
+    status = previous.get("status")
+    if status in {"created", "skipped"}:
+        return True
+    return dry_run and status == "summarized" and not previous.get("error")
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Process every email under ``args.source`` and return an exit code."""
+
+    config = functions.app_config.load_config(args.config)
+    args.model = args.model or config.get("default_model") or "gpt-5"
+    openai_service = OpenAIService(
+        config.get("openai_api_key"), base_url=config.get("openai_base_url") or None
+    )
+
+    functions.database.init_history_db()
+    asana_settings = config.asana
+    if not args.dry_run and asana_settings.project_ids:
+        # Resolve assignee and priority labels to gids once, not per task.
+        metadata = functions.asana_metadata.load_metadata(
+            config.get("asana_token"),
+            asana_settings.project_ids[0],
+            host=config.get("asana_api_base_url") or None,
+        )
+        if metadata is not None:
+            asana_settings = AsanaSettings.from_config(metadata.apply_to_config(config.values))
+    report = BatchReport(args.report)
+    previous_records = report.load_previous()
+    if previous_records:
+        print(f"INFO: Resuming with {len(previous_records)} items from {args.report}")
+
+    concurrency = max(1, args.concurrency)
+    counts: dict[str, int] = {}
+    processed = 0
+    submitted = 0
+    in_flight: set[Future] = set()
+    group: list[tuple[EmailItem, Optional[dict]]] = []
+    group_chars = 0
+    worker_kwargs = dict(
+        args=args,
+        config=config,
+        asana_settings=asana_settings,
+        openai_service=openai_service,
+    )
+
+    def _collect(done: set[Future]) -> None:
+        nonlocal processed
+        for future in done:
+            result = future.result()
+            for record in result if isinstance(result, list) else [result]:
+                report.append(record)
+                processed += 1
+                status = record["status"]
+                counts[status] = counts.get(status, 0) + 1
+                suffix = f" ({record['error']})" if record.get("error") else ""
+                print(f"INFO: [{processed}] {record['item_id']}: {status}{suffix}")
+
+    def _flush_group() -> None:
+        nonlocal group, group_chars
+        if group:
+            in_flight.add(executor.submit(_process_group, group, **worker_kwargs))
+            group, group_chars = [], 0
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch")
+    try:
+        for item in iter_emails(args.source):
+            previous = previous_records.get(item.item_id)
+            if _is_finished(previous, args.dry_run):
+                counts["already done"] = counts.get("already done", 0) + 1
+                continue
+            if args.limit and submitted >= args.limit:
+                break
+            # Bound the number of queued items so large mailboxes stream
+            # through instead of being materialised up front.
+            while len(in_flight) >= concurrency * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                _collect(done)
+            submitted += 1
+            if args.pack > 1:
+                group.append((item, previous))
+                group_chars += len(item.body)
+                if len(group) >= args.pack or group_chars >= functions.gpt.BATCH_SUMMARY_CHAR_BUDGET:
+                    _flush_group()
+                continue
+            in_flight.add(executor.submit(_process_item, item, previous, **worker_kwargs))
+        _flush_group()
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            _collect(done)
+    except KeyboardInterrupt:
+        print("WARN: Interrupted; finishing in-flight items. Re-run to resume.")
+        executor.shutdown(wait=True, cancel_futures=True)
+        _collect({future for future in in_flight if future.done() and not future.cancelled()})
+        return 130
+    finally:
+        executor.shutdown(wait=True)
+
+    summary = ", ".join(f"{status}: {count}" for status, count in sorted(counts.items()))
+    print(f"INFO: Batch complete ({summary or 'nothing to do'}). Report: {args.report}")
+    if args.timings:
+        print("INFO: Timing stats:\n" + functions.metrics.METRICS.format_summary())
+    return 1 if counts.get("failed") else 0
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Summarise a folder or mbox of job emails and create Asana tasks.",
+    )
+    parser.add_argument("source", help="Directory of .eml/.msg/.txt files, or an mbox file.")
+    parser.add_argument(
+        "--config",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json"),
+        help="Path to config.json.",
+    )
+    parser.add_argument("--report", default=DEFAULT_REPORT_NAME, help="JSONL report and resume file.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Parallel emails in flight.")
+    parser.add_argument("--model", help="OpenAI model (defaults to default_model from config).")
+    parser.add_argument("--no-tasks", dest="tasks", action="store_false", help="Do not request a task list.")
+    parser.add_argument("--fixes", action="store_true", help="Ask for possible fixes in the summary.")
+    parser.add_argument("--assignee", help="Assignee name from asana_assignees.")
+    parser.add_argument("--priority", help="Priority label from asana_priority_options.")
+    parser.add_argument("--due-on", help="Due date for created tasks (YYYY-MM-DD).")
+    parser.add_argument(
+        "--pack",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Summarise up to N emails per OpenAI request (JSON mode); 1 disables packing.",
+    )
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many emails.")
+    parser.add_argument("--dry-run", action="store_true", help="Summarise only; do not create Asana tasks.")
+    parser.add_argument("--timings", action="store_true", help="Print p50/p95 timings per operation at the end.")
+    parser.add_argument("--metrics-log", help="Also export every timing span to this JSONL file.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = _parse_args(argv)
+    if args.metrics_log:
+        functions.metrics.METRICS.configure_export(args.metrics_log)
+    try:
+        exit_code = run_batch(args)
+    except (OSError, ValueError) as exc:
+        print(f"ERR: {exc}", file=sys.stderr)
+        exit_code = 1
+    if args.metrics_log:
+        functions.metrics.METRICS.configure_export(None)  # Flush queued spans.
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
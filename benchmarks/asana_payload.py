@@ -0,0 +1,162 @@
+"""Measure Asana task payload build throughput.
+
+Compares the old per-click path, which deep-copied and re-validated the
+settings for every task, with :meth:`AsanaSettings.build_task_data`.
+
+Run from the project root::
+
+    python -m benchmarks.asana_payload --iterations 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import time
+from typing import Callable, Optional
+
+from functions.asana_settings import AsanaSettings
+
+SAMPLE_CONFIG = {
+    "asana_project_id": "1200000000000001",
+    "asana_workspace": "example.com",
+    "asana_assignees": [
+        {"name": f"User {index}", "email": f"user{index}@{{workspace}}"}
+        for index in range(10)
+    ],
+    "asana_default_assignee": "User 0",
+    "asana_priority_field_id": "1200000000000100",
+    "asana_priority_options": {
+        "None": None,
+        "Low": "1200000000000101",
+        "Medium": "1200000000000102",
+        "High": "1200000000000103",
+    },
+    "asana_default_priority": "None",
+    "asana_custom_fields": {"1200000000000200": "1200000000000201"},
+    "asana_task_defaults": {
+        "projects": [{"gid": "1200000000000002"}],
+        "followers": ["user0@example.com", "user1@example.com"],
+        "custom_fields": {"1200000000000300": "default"},
+    },
+}
+
+
+def _legacy_settings(config: dict) -> dict:
+    settings = AsanaSettings.from_config(config)
+    return {
+        "assignees": dict(settings.assignees),
+        "priority_field_id": settings.priority_field_id,
+        "priority_options": dict(settings.priority_options),
+        "custom_fields": config["asana_custom_fields"],
+        "task_defaults": config["asana_task_defaults"],
+    }
+
+
+def _legacy_build(asana_settings: dict, asana_project_id, assignee_name: str, priority: str) -> dict:
+    """The payload assembly previously run inside every button click."""
+
+    assignee = ""
+    lookup = asana_settings.get("assignees", {})
+    if isinstance(lookup, dict) and isinstance(assignee_name, str):
+        assignee = lookup.get(assignee_name.casefold(), "")
+
+    priority_mapping = {}
+    priority_field_id = None
+    custom_fields = {}
+    candidate = asana_settings.get("priority_options", {})
+    if isinstance(candidate, dict):
+        priority_mapping = candidate
+    field_candidate = asana_settings.get("priority_field_id")
+    if isinstance(field_candidate, str) and field_candidate:
+        priority_field_id = field_candidate
+    if priority_field_id and priority in priority_mapping:
+        custom_fields[priority_field_id] = priority_mapping[priority]
+
+    data: dict = {}
+    defaults = asana_settings.get("task_defaults", {})
+    if isinstance(defaults, dict):
+        data.update(copy.deepcopy(defaults))
+
+    normalized_projects: list[str] = []
+
+    def add_project_id(value) -> None:
+        if isinstance(value, str):
+            project_id = value.strip()
+            if project_id and project_id not in normalized_projects:
+                normalized_projects.append(project_id)
+        elif isinstance(value, dict):
+            gid = value.get("gid")
+            if isinstance(gid, str):
+                add_project_id(gid)
+
+    projects_value = data.get("projects")
+    if isinstance(projects_value, (list, tuple, set)):
+        for value in projects_value:
+            add_project_id(value)
+    else:
+        add_project_id(projects_value)
+    add_project_id(asana_project_id)
+    if normalized_projects:
+        data["projects"] = normalized_projects
+
+    data["name"] = "Task"
+    data["due_on"] = "2025-01-01"
+    data["notes"] = "Email: \nSummary"
+    merged = {}
+    existing = data.get("custom_fields", {})
+    if isinstance(existing, dict):
+        merged.update(existing)
+    merged.update(custom_fields)
+    additional = asana_settings.get("custom_fields", {})
+    if isinstance(additional, dict):
+        merged.update(additional)
+    if merged:
+        data["custom_fields"] = merged
+    if assignee:
+        data["assignee"] = assignee
+    return data
+
+
+def _time_it(label: str, iterations: int, build: Callable[[], dict]) -> float:
+    build()  # Warm up.
+    started = time.perf_counter()
+    for _ in range(iterations):
+        build()
+    elapsed = time.perf_counter() - started
+    rate = iterations / elapsed if elapsed else float("inf")
+    print(f"{label:<28} {rate:12,.0f} payloads/s  {elapsed * 1e6 / iterations:8.2f} us/payload")
+    return rate
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args(argv)
+    iterations = max(1, args.iterations)
+
+    legacy_settings = _legacy_settings(SAMPLE_CONFIG)
+    settings = AsanaSettings.from_config(SAMPLE_CONFIG)
+
+    legacy_rate = _time_it(
+        "legacy per-click build",
+        iterations,
+        lambda: _legacy_build(legacy_settings, SAMPLE_CONFIG["asana_project_id"], "User 3", "High"),
+    )
+    settings_rate = _time_it(
+        "AsanaSettings.build_task_data",
+        iterations,
+        lambda: settings.build_task_data(
+            name="Task",
+            notes="Email: \nSummary",
+            due_on="2025-01-01",
+            assignee=settings.resolve_assignee("User 3"),
+            priority="High",
+        ),
+    )
+    _time_it("AsanaSettings.from_config", max(1, iterations // 10), lambda: AsanaSettings.from_config(SAMPLE_CONFIG))
+    print(f"speed-up: {settings_rate / legacy_rate:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
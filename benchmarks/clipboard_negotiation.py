@@ -0,0 +1,97 @@
+"""Compare clipboard round-trips for the legacy probe loop and the negotiator.
+
+Run from the project root::
+
+    python -m benchmarks.clipboard_negotiation --latency 0.02 --pastes 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Optional
+
+from functions.clipboard import (
+    PREFERRED_HTML_TARGETS,
+    ClipboardNegotiator,
+    FakeClipboardBackend,
+)
+
+_SCENARIOS = {
+    "browser-html": {
+        "TARGETS": "",
+        "TIMESTAMP": "",
+        "SAVE_TARGETS": "",
+        "MULTIPLE": "",
+        "text/_moz_htmlcontext": "",
+        "text/html": "<p>Hello <b>world</b></p>",
+        "UTF8_STRING": "Hello world",
+        "STRING": "Hello world",
+    },
+    "office-cf-html": {
+        "TARGETS": "",
+        "application/x-qt-image": "",
+        "HTML Format": "Version:0.9\r\nStartFragment:0\r\n\r\n<p>Hi</p>",
+        "text/plain": "Hi",
+    },
+    "plain-text-only": {
+        "TARGETS": "",
+        "TIMESTAMP": "",
+        "UTF8_STRING": "just text",
+        "STRING": "just text",
+        "text/plain": "just text",
+        "text/plain;charset=utf-8": "just text",
+    },
+}
+
+
+def _legacy_fetch(backend: FakeClipboardBackend) -> Optional[str]:
+    """Replicate the pre-negotiation probe loop over every advertised target."""
+
+    targets = backend.targets()
+    ordered = [target for target in PREFERRED_HTML_TARGETS if target in targets]
+    ordered.extend(target for target in targets if target not in ordered)
+    for target in ordered or ("text/html", "HTML Format"):
+        data = backend.get(target)
+        if data:
+            return data
+    return None
+
+
+def _run(name: str, payloads: dict[str, str], latency: float, pastes: int) -> None:
+    legacy_backend = FakeClipboardBackend(payloads, latency=latency)
+    started = time.perf_counter()
+    for _ in range(pastes):
+        _legacy_fetch(legacy_backend)
+    legacy_elapsed = time.perf_counter() - started
+
+    negotiated_backend = FakeClipboardBackend(payloads, latency=latency)
+    negotiator = ClipboardNegotiator(negotiated_backend)
+    started = time.perf_counter()
+    for _ in range(pastes):
+        negotiator.fetch_html()
+    negotiated_elapsed = time.perf_counter() - started
+
+    def _round_trips(backend: FakeClipboardBackend) -> int:
+        return sum(1 for operation, _ in backend.calls if operation != "owner")
+
+    print(
+        f"{name:<18} legacy: {_round_trips(legacy_backend):>4} round-trips "
+        f"{legacy_elapsed * 1000 / pastes:8.2f} ms/paste | "
+        f"negotiated: {_round_trips(negotiated_backend):>4} round-trips "
+        f"{negotiated_elapsed * 1000 / pastes:8.2f} ms/paste"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.01, help="Seconds per selection round-trip.")
+    parser.add_argument("--pastes", type=int, default=20, help="Pastes per scenario.")
+    args = parser.parse_args(argv)
+
+    for name, payloads in _SCENARIOS.items():
+        _run(name, payloads, args.latency, max(1, args.pastes))
+
+
+if __name__ == "__main__":
+    main()
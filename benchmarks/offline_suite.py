@@ -0,0 +1,392 @@
+"""Offline benchmark suite for the request, storage and rendering hot paths.
+
+OpenAI and Asana calls go to the local stand-ins in
+:mod:`benchmarks.stand_ins`, the history database lives in a temporary
+directory and attachments are generated on the fly, so no API keys or
+network access are needed.  Every case reports throughput and p50/p95
+latency; ``--output`` saves the numbers and ``--baseline`` compares a run
+with a saved one and exits non-zero on regressions.
+
+Run from the project root::
+
+    python -m benchmarks.offline_suite --iterations 50 --output bench.json
+    python -m benchmarks.offline_suite --baseline bench.json --rate-limit-rate 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from vendor_setup import ensure_vendor_path
+
+ensure_vendor_path()
+
+import markdown
+
+import functions.asana_api
+import functions.database
+from benchmarks.stand_ins import (
+    SAMPLE_SUMMARY,
+    StandInServer,
+    add_options_arguments,
+    options_from_args,
+)
+from functions.asana_settings import AsanaSettings
+from functions.files import extract_text_from_file
+from functions.html_sanitizer import sanitize_html_fragment
+from functions.metrics import _percentile
+
+SAMPLE_EMAIL = (
+    "Hi team,\n\nThe printer in the front office keeps dropping off the network "
+    "every morning and two laptops lose the S: drive mapping after a restart.\n"
+    "Could someone take a look this week?\n\nThanks,\nAlex\n"
+) * 4
+
+ASANA_CONFIG = {
+    "asana_project_id": "1200000000000001",
+    "asana_workspace": "example.com",
+    "asana_assignees": [{"name": "Bench", "email": "bench@{workspace}"}],
+    "asana_priority_field_id": "1200000000000100",
+    "asana_priority_options": {"None": None, "High": "1200000000000103"},
+}
+
+
+class CaseResult:
+    """Latencies and errors collected for one benchmark case."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.durations: list[float] = []
+        self.errors = 0
+        self.wall = 0.0
+        self.skipped = ""
+
+    def as_dict(self) -> dict:
+        durations = sorted(self.durations)
+        ops = len(durations) + self.errors
+        return {
+            "case": self.name,
+            "ops": ops,
+            "errors": self.errors,
+            "ops_per_s": ops / self.wall if self.wall else 0.0,
+            "p50_ms": _percentile(durations, 0.50) * 1000,
+            "p95_ms": _percentile(durations, 0.95) * 1000,
+            "max_ms": (durations[-1] if durations else 0.0) * 1000,
+            "skipped": self.skipped,
+        }
+
+
+def _run_case(
+    name: str,
+    operation: Callable[[int], object],
+    iterations: int,
+    concurrency: int = 1,
+) -> CaseResult:
+    result = CaseResult(name)
+    lock = threading.Lock()
+
+    def _one(index: int) -> None:
+        started = time.perf_counter()
+        try:
+            operation(index)
+        except Exception as exc:
+            with lock:
+                result.errors += 1
+                if result.errors == 1:
+                    print(f"WARN: {name} failed: {exc}")
+            return
+        duration = time.perf_counter() - started
+        with lock:
+            result.durations.append(duration)
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        for index in range(iterations):
+            _one(index)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+            list(pool.map(_one, range(iterations)))
+    result.wall = time.perf_counter() - started
+    return result
+
+
+def _skipped(name: str, reason: str) -> CaseResult:
+    result = CaseResult(name)
+    result.skipped = reason
+    return result
+
+
+def _write_minimal_pdf(path: str, text: str) -> None:
+    """Write a single-page PDF containing *text* with a Helvetica font."""
+
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    lines = " T* ".join(f"({line})Tj" for line in escaped.splitlines() or [""])
+    stream = f"BT /F1 10 Tf 14 TL 40 800 Td {lines} ET".encode("latin-1", "replace")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842]"
+        b" /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_at = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref_at,
+    )
+    with open(path, "wb") as handle:
+        handle.write(output)
+
+
+def _attachment_cases(workdir: str, iterations: int) -> list[CaseResult]:
+    results = []
+    text_path = os.path.join(workdir, "notes.txt")
+    with open(text_path, "w", encoding="utf-8") as handle:
+        handle.write(SAMPLE_EMAIL * 20)
+    results.append(
+        _run_case("files.extract_text[txt]", lambda _i: extract_text_from_file(text_path), iterations)
+    )
+
+    try:
+        from docx import Document
+    except ImportError:
+        results.append(_skipped("files.extract_text[docx]", "python-docx not installed"))
+    else:
+        docx_path = os.path.join(workdir, "notes.docx")
+        document = Document()
+        for paragraph in (SAMPLE_EMAIL * 20).split("\n"):
+            document.add_paragraph(paragraph)
+        document.save(docx_path)
+        results.append(
+            _run_case("files.extract_text[docx]", lambda _i: extract_text_from_file(docx_path), iterations)
+        )
+
+    try:
+        import PyPDF2  # noqa: F401 - only checking availability
+    except ImportError:
+        results.append(_skipped("files.extract_text[pdf]", "PyPDF2 not installed"))
+    else:
+        pdf_path = os.path.join(workdir, "notes.pdf")
+        _write_minimal_pdf(pdf_path, SAMPLE_EMAIL)
+        results.append(
+            _run_case("files.extract_text[pdf]", lambda _i: extract_text_from_file(pdf_path), iterations)
+        )
+    return results
+
+
+def _render_cases(iterations: int) -> list[CaseResult]:
+    summary_html = markdown.markdown(SAMPLE_SUMMARY)
+    results = [
+        _run_case("render.markdown", lambda _i: markdown.markdown(SAMPLE_SUMMARY), iterations),
+        _run_case("render.sanitize_html", lambda _i: sanitize_html_fragment(summary_html), iterations),
+    ]
+    try:
+        import tkinter as tk
+
+        from tkhtmlview import HTMLScrolledText
+
+        root = tk.Tk()
+    except Exception as exc:  # No display (CI, SSH sessions).
+        results.append(_skipped("render.set_html", f"Tk unavailable: {exc}"))
+        return results
+    try:
+        root.withdraw()
+        widget = HTMLScrolledText(root)
+
+        def _render(_index: int) -> None:
+            widget.set_html(summary_html)
+            widget.update_idletasks()
+
+        results.append(_run_case("render.set_html", _render, iterations))
+    finally:
+        root.destroy()
+    return results
+
+
+def _history_cases(workdir: str, iterations: int) -> list[CaseResult]:
+    functions.database.DB_PATH = os.path.join(workdir, "history.db")
+    functions.database.init_history_db()
+    return [
+        _run_case(
+            "history.save",
+            lambda i: functions.database.save_to_history("summarize", "bench", SAMPLE_EMAIL, SAMPLE_SUMMARY),
+            iterations,
+        ),
+        _run_case("history.fetch_recent", lambda _i: functions.database.fetch_recent_history(), iterations),
+        _run_case(
+            "history.fetch_texts",
+            lambda i: functions.database.fetch_history_texts(i % iterations + 1),
+            iterations,
+        ),
+    ]
+
+
+def _index_cases(workdir: str, iterations: int, rows: int, dim: int) -> list[CaseResult]:
+    import functions.history_index
+
+    name = f"history_index.search[{rows // 1000}k]"
+    if not functions.history_index.numpy_available():
+        return [_skipped(name, "NumPy not installed")]
+    import numpy as np
+
+    # Random unit vectors written straight to the index files; embedding this
+    # many rows through the stand-in would only measure the stand-in.
+    index = functions.history_index.HistoryIndex(os.path.join(workdir, "history_index"))
+    generator = np.random.default_rng(0)
+    with index._lock:
+        index._reset("bench:random", dim)
+        for start in range(0, rows, 10_000):
+            count = min(10_000, rows - start)
+            vectors = generator.standard_normal((count, dim), dtype=np.float32)
+            index._append(vectors, range(start + 1, start + count + 1), start + count)
+    queries = generator.standard_normal((iterations, dim), dtype=np.float32)
+    return [
+        _run_case(name, lambda i: index.search(queries[i], functions.history_index.DEFAULT_TOP_K), iterations),
+    ]
+
+
+def _api_cases(server: StandInServer, iterations: int, concurrency: int) -> list[CaseResult]:
+    from services.openai_service import OpenAIService
+
+    openai_service = OpenAIService("sk-offline-benchmark", base_url=server.openai_base_url)
+    settings = AsanaSettings.from_config(ASANA_CONFIG)
+    task_request = functions.asana_api.create_asana_task_request(
+        functions.asana_api.AsanaTaskInputs(
+            summary_markdown=SAMPLE_SUMMARY,
+            original_email=SAMPLE_EMAIL,
+            task_name="Benchmark task",
+            assignee_name="Bench",
+            priority="High",
+        ),
+        settings,
+    )
+    return [
+        _run_case(
+            "openai.generate_response",
+            lambda _i: openai_service.generate_response("gpt-5", SAMPLE_EMAIL),
+            iterations,
+            concurrency,
+        ),
+        _run_case(
+            "asana.perform_task_creation",
+            lambda _i: functions.asana_api.perform_asana_task_creation(
+                "offline-benchmark", task_request, host=server.asana_host
+            ),
+            iterations,
+            concurrency,
+        ),
+    ]
+
+
+def _print_results(rows: list[dict], baseline: dict[str, dict]) -> None:
+    header = f"{'case':<30} {'ops':>6} {'err':>4} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"
+    if baseline:
+        header += f" {'p50 vs base':>12}"
+    print(header)
+    for row in rows:
+        if row["skipped"]:
+            print(f"{row['case']:<30} skipped: {row['skipped']}")
+            continue
+        line = (
+            f"{row['case']:<30} {row['ops']:>6} {row['errors']:>4} {row['ops_per_s']:>10.1f}"
+            f" {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['max_ms']:>9.2f}"
+        )
+        previous = baseline.get(row["case"])
+        if previous and previous.get("p50_ms"):
+            change = row["p50_ms"] / previous["p50_ms"] - 1.0
+            line += f" {change:>+11.0%}"
+            row["p50_change"] = change
+        print(line)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50, help="Operations per case.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel OpenAI/Asana requests.")
+    parser.add_argument(
+        "--only",
+        choices=("api", "history", "files", "render", "index"),
+        action="append",
+        help="Run only these groups (repeatable).",
+    )
+    parser.add_argument(
+        "--index-rows", type=int, default=100_000, help="History rows in the similar-jobs index case."
+    )
+    parser.add_argument(
+        "--index-dim", type=int, default=512, help="Embedding dimensions in the similar-jobs index case."
+    )
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare with a JSON file written by --output.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed p50 slow-down versus the baseline before failing (0.25 = 25%%).",
+    )
+    add_options_arguments(parser)
+    args = parser.parse_args(argv)
+    iterations = max(1, args.iterations)
+    groups = set(args.only or ("api", "history", "files", "render", "index"))
+
+    baseline: dict[str, dict] = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            baseline = {row["case"]: row for row in json.load(handle).get("results", [])}
+
+    results: list[CaseResult] = []
+    with tempfile.TemporaryDirectory(prefix="asana-gpt-bench-") as workdir:
+        if "api" in groups:
+            with StandInServer(options_from_args(args)) as server:
+                results.extend(_api_cases(server, iterations, max(1, args.concurrency)))
+                print(f"INFO: Stand-in requests: {server.state.requests}")
+                print(
+                    f"INFO: Injected failures: {server.state.errors} errors,"
+                    f" {server.state.rate_limited} rate limited"
+                )
+        if "history" in groups:
+            results.extend(_history_cases(workdir, iterations))
+        if "files" in groups:
+            results.extend(_attachment_cases(workdir, iterations))
+        if "render" in groups:
+            results.extend(_render_cases(iterations))
+        if "index" in groups:
+            results.extend(_index_cases(workdir, iterations, max(1, args.index_rows), max(1, args.index_dim)))
+
+    rows = [result.as_dict() for result in results]
+    _print_results(rows, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"options": vars(args), "results": rows}, handle, indent=2)
+        print(f"INFO: Results written to {args.output}")
+
+    regressions = [
+        row["case"]
+        for row in rows
+        if row.get("p50_change") is not None and row["p50_change"] > args.tolerance
+    ]
+    if regressions:
+        print(f"WARN: p50 regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,677 @@
+"""Local HTTP stand-ins for the OpenAI and Asana APIs used by the benchmarks.
+
+The server answers the handful of endpoints the app calls:
+
+* ``POST /v1/chat/completions`` – a canned summary with numbered tasks (in
+  JSON mode, one entry per ``<<<EMAIL n>>>`` block of a packed prompt; with a
+  ``job_summary`` JSON schema, the same summary as structured fields, and
+  with ``job_summaries`` one such entry per email).
+* ``POST /v1/embeddings`` – hashed bag-of-words vectors, so texts sharing
+  words come out similar.
+* ``POST /v1/files``, ``GET /v1/files/<id>/content``, ``POST /v1/batches``
+  and ``GET /v1/batches/<id>`` – the Batch API; a batch completes
+  ``batch_seconds`` after it is created, with failed requests (at
+  ``error_rate``) in its error file.
+* ``POST /api/1.0/tasks`` – creates a task (or sub-task) and returns its gid.
+* ``GET /api/1.0/tasks?project=…`` – lists a project's tasks with
+  ``modified_since`` filtering and ``offset`` pagination.
+* ``GET /api/1.0/projects/<gid>[/custom_field_settings]`` and
+  ``GET /api/1.0/workspaces/<gid>/users`` – a fixed priority field and users.
+* ``POST /api/1.0/tasks/<gid>/stories`` – adds a comment story.
+* ``POST /api/1.0/batch`` – runs up to ten of the above actions at once.
+
+Latency, jitter, server errors and ``429`` rate limiting are configurable so
+retry and back-off paths can be measured as well as the happy path.  Run it
+standalone to point the app at it via ``openai_base_url`` and
+``asana_api_base_url``::
+
+    python -m benchmarks.stand_ins --port 8765 --latency 0.2 --rate-limit-rate 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import array
+import base64
+import email.parser
+import email.policy
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs
+
+SAMPLE_SUMMARY = """**Summary**
+The customer reports that the office printer drops off the network every
+morning and the shared drive mapping fails on two laptops.
+
+**Tasks**
+1. Check the printer's DHCP lease and assign a reservation
+2. Re-map the shared drive on both laptops
+3. Confirm with the customer that printing works after a restart
+"""
+
+_STORIES_PATH_RE = re.compile(r"^/api/1\.0/tasks/(?P<gid>[^/]+)/stories$")
+_PROJECT_PATH_RE = re.compile(
+    r"^/api/1\.0/projects/(?P<gid>[^/]+)(?P<rest>/custom_field_settings)?$"
+)
+_MAX_PAGE_SIZE = 100
+_EMBEDDING_DIMENSIONS = 256
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_EMAIL_MARKER_RE = re.compile(r"^<<<EMAIL (\d+)>>>$", re.MULTILINE)
+_FILE_CONTENT_PATH_RE = re.compile(r"^/v1/files/(?P<id>[^/]+)/content$")
+_BATCH_PATH_RE = re.compile(r"^/v1/batches/(?P<id>[^/]+)$")
+
+# Fixed workspace metadata served to the metadata cache.
+WORKSPACE_GID = "1100000000000001"
+PRIORITY_FIELD = {
+    "gid": "1100000000000010",
+    "resource_type": "custom_field",
+    "name": "Priority",
+    "resource_subtype": "enum",
+    "enum_options": [
+        {"gid": "1100000000000011", "name": "Low", "enabled": True},
+        {"gid": "1100000000000012", "name": "Medium", "enabled": True},
+        {"gid": "1100000000000013", "name": "High", "enabled": True},
+        {"gid": "1100000000000014", "name": "Retired", "enabled": False},
+    ],
+}
+USERS = (
+    {"gid": "1100000000000021", "name": "Joe", "email": "joe@example.com"},
+    {"gid": "1100000000000022", "name": "Biden", "email": "biden@example.com"},
+)
+
+
+@dataclass
+class StandInOptions:
+    """Failure and latency behaviour shared by every endpoint."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 0.05
+    batch_seconds: float = 0.2
+    seed: Optional[int] = None
+
+
+class StandInState:
+    """Counters and fake Asana objects kept by a running stand-in server."""
+
+    def __init__(self, options: StandInOptions) -> None:
+        self.options = options
+        self._random = random.Random(options.seed)
+        self._lock = threading.Lock()
+        self._gids = itertools.count(1_200_000_000_000_000)
+        self.requests: dict[str, int] = {}
+        self.errors = 0
+        self.rate_limited = 0
+        self.tasks: dict[str, dict] = {}
+        self.stories: dict[str, list[str]] = {}
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+
+    def next_gid(self) -> str:
+        with self._lock:
+            return str(next(self._gids))
+
+    def roll(self) -> tuple[float, Optional[int]]:
+        """Return the delay and, if this request should fail, its status."""
+
+        with self._lock:
+            delay = self.options.latency
+            if self.options.jitter:
+                delay += self._random.uniform(0.0, self.options.jitter)
+            draw = self._random.random()
+            if draw < self.options.rate_limit_rate:
+                self.rate_limited += 1
+                return delay, 429
+            if draw < self.options.rate_limit_rate + self.options.error_rate:
+                self.errors += 1
+                return delay, 500
+        return delay, None
+
+    def count(self, route: str) -> None:
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def create_task(self, data: dict) -> dict:
+        gid = self.next_gid()
+        task = {
+            "gid": gid,
+            "resource_type": "task",
+            "name": data.get("name", ""),
+            "notes": data.get("notes", ""),
+            "parent": data.get("parent"),
+            "projects": [str(project) for project in data.get("projects") or []],
+            "completed": False,
+            "due_on": data.get("due_on"),
+            "modified_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        }
+        with self._lock:
+            self.tasks[gid] = task
+        return task
+
+    def list_tasks(self, project: str, modified_since: Optional[str]) -> list[dict]:
+        since = _parse_time(modified_since) if modified_since else None
+        with self._lock:
+            tasks = [task for task in self.tasks.values() if project in task["projects"]]
+        if since is not None:
+            tasks = [task for task in tasks if _parse_time(task["modified_at"]) >= since]
+        return tasks
+
+    def create_file(self, content: bytes, filename: str, purpose: str) -> dict:
+        file_id = f"file-standin-{self.next_gid()}"
+        with self._lock:
+            self.files[file_id] = content
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+
+    def create_batch(self, payload: dict) -> Optional[dict]:
+        if payload.get("input_file_id") not in self.files:
+            return None
+        batch = {
+            "id": f"batch_standin_{self.next_gid()}",
+            "object": "batch",
+            "endpoint": payload.get("endpoint", ""),
+            "input_file_id": payload["input_file_id"],
+            "completion_window": payload.get("completion_window", "24h"),
+            "status": "in_progress",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "metadata": payload.get("metadata"),
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "_due": time.monotonic() + self.options.batch_seconds,
+        }
+        with self._lock:
+            self.batches[batch["id"]] = batch
+        return batch
+
+    def get_batch(self, batch_id: str) -> Optional[dict]:
+        """Return the batch, running its requests once it is due."""
+
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            if batch is None or batch["status"] != "in_progress" or time.monotonic() < batch["_due"]:
+                return batch
+            batch["status"] = "finalizing"
+            lines = self.files[batch["input_file_id"]].decode("utf-8").splitlines()
+        outputs, errors = [], []
+        for line in lines:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            custom_id = request.get("custom_id")
+            with self._lock:
+                failed = self._random.random() < self.options.error_rate
+            if failed:
+                body = {"error": {"message": "Internal server error (stand-in).", "type": "server_error"}}
+                errors.append({"id": self.next_gid(), "custom_id": custom_id,
+                               "response": {"status_code": 500, "body": body}, "error": None})
+            else:
+                outputs.append({"id": self.next_gid(), "custom_id": custom_id,
+                                "response": {"status_code": 200, "body": _chat_completion(request.get("body") or {})},
+                                "error": None})
+        output_file = self.create_file(
+            "".join(json.dumps(entry) + "\n" for entry in outputs).encode("utf-8"), "output.jsonl", "batch_output"
+        )
+        error_file = None
+        if errors:
+            error_file = self.create_file(
+                "".join(json.dumps(entry) + "\n" for entry in errors).encode("utf-8"), "errors.jsonl", "batch_output"
+            )
+        with self._lock:
+            batch.update(
+                status="completed",
+                completed_at=int(time.time()),
+                output_file_id=output_file["id"],
+                error_file_id=error_file["id"] if error_file else None,
+                request_counts={"total": len(outputs) + len(errors), "completed": len(outputs),
+                                "failed": len(errors)},
+            )
+        return batch
+
+    def create_story(self, task_gid: str, data: dict) -> Optional[dict]:
+        with self._lock:
+            if task_gid not in self.tasks:
+                return None
+            self.stories.setdefault(task_gid, []).append(data.get("text", ""))
+        return {"gid": self.next_gid(), "resource_type": "story", "text": data.get("text", "")}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "StandIn/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self) -> StandInState:
+        return self.server.state  # type: ignore[attr-defined]
+
+    def log_message(self, format, *args) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+        return payload if isinstance(payload, dict) else {}
+
+    def _read_multipart(self) -> dict[str, tuple[bytes, str]]:
+        """Return ``{field: (content, filename)}`` of a multipart form body."""
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        header = f"Content-Type: {self.headers.get('Content-Type', '')}\r\n\r\n".encode("latin-1")
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(header + body)
+        fields = {}
+        if message.is_multipart():
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                if name:
+                    fields[name] = (part.get_payload(decode=True) or b"", part.get_filename() or "")
+        return fields
+
+    def _send_failure(self, status: int, is_openai: bool) -> None:
+        headers = {}
+        if status == 429:
+            retry_after = self.state.options.retry_after
+            headers = {
+                "Retry-After": f"{max(retry_after, 0.0):g}",
+                "retry-after-ms": str(int(retry_after * 1000)),
+            }
+            message = "Rate limit exceeded (stand-in)."
+        else:
+            message = "Internal server error (stand-in)."
+        if is_openai:
+            payload = {"error": {"message": message, "type": "server_error", "code": status}}
+        else:
+            payload = {"errors": [{"message": message}]}
+        self._send_json(status, payload, headers)
+
+    def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+        path, _, query = self.path.partition("?")
+        self.state.count(f"GET {path}")
+        delay, failure = self.state.roll()
+        if delay > 0:
+            time.sleep(delay)
+        if failure is not None:
+            self._send_failure(failure, path.startswith("/v1/"))
+            return
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        match = _FILE_CONTENT_PATH_RE.match(path)
+        if match:
+            content = self.state.files.get(match.group("id"))
+            if content is None:
+                self._send_json(404, {"error": {"message": "No such file", "type": "invalid_request_error"}})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+        match = _BATCH_PATH_RE.match(path)
+        if match:
+            batch = self.state.get_batch(match.group("id"))
+            if batch is None:
+                self._send_json(404, {"error": {"message": "No such batch", "type": "invalid_request_error"}})
+            else:
+                self._send_json(200, _public(batch))
+            return
+        if path == "/api/1.0/tasks":
+            project = params.get("project")
+            if not project:
+                self._send_json(400, {"errors": [{"message": "project: Missing input"}]})
+                return
+            try:
+                items = self.state.list_tasks(project, params.get("modified_since"))
+            except ValueError as exc:
+                self._send_json(400, {"errors": [{"message": str(exc)}]})
+                return
+            self._send_page(items, params, path)
+            return
+        match = _PROJECT_PATH_RE.match(path)
+        if match:
+            project = {
+                "gid": match.group("gid"),
+                "resource_type": "project",
+                "workspace": {"gid": WORKSPACE_GID, "resource_type": "workspace"},
+            }
+            if match.group("rest") is None:
+                self._send_json(200, {"data": project})
+            else:
+                self._send_page(
+                    [{"gid": self.state.next_gid(), "custom_field": PRIORITY_FIELD}], params, path
+                )
+            return
+        if path == f"/api/1.0/workspaces/{WORKSPACE_GID}/users":
+            self._send_page(list(USERS), params, path)
+            return
+        self._send_json(404, {"errors": [{"message": f"No route for {path}"}]})
+
+    def _send_page(self, items: list, params: dict, path: str) -> None:
+        try:
+            limit = min(max(int(params.get("limit", _MAX_PAGE_SIZE)), 1), _MAX_PAGE_SIZE)
+            offset = int(params.get("offset", 0))
+        except ValueError as exc:
+            self._send_json(400, {"errors": [{"message": str(exc)}]})
+            return
+        next_page = None
+        if offset + limit < len(items):
+            next_offset = offset + limit
+            next_page = {"offset": str(next_offset), "path": f"{path[len('/api/1.0'):]}?offset={next_offset}"}
+        self._send_json(200, {"data": items[offset:offset + limit], "next_page": next_page})
+
+    def do_POST(self) -> None:  # noqa: N802 - stdlib naming
+        path = self.path.split("?", 1)[0]
+        if path == "/v1/files":
+            upload = self._read_multipart()
+            payload = {}
+        else:
+            payload = self._read_json()
+        is_openai = path.startswith("/v1/")
+        self.state.count(path if not _STORIES_PATH_RE.match(path) else "/api/1.0/tasks/{gid}/stories")
+
+        delay, failure = self.state.roll()
+        if delay > 0:
+            time.sleep(delay)
+        if failure is not None:
+            self._send_failure(failure, is_openai)
+            return
+
+        if path == "/v1/chat/completions":
+            self._send_json(200, _chat_completion(payload))
+            return
+        if path == "/v1/embeddings":
+            self._send_json(200, _embeddings(payload))
+            return
+        if path == "/v1/files":
+            content, filename = upload.get("file", (b"", "upload.jsonl"))
+            purpose = upload.get("purpose", (b"", ""))[0].decode("utf-8")
+            self._send_json(200, self.state.create_file(content, filename, purpose))
+            return
+        if path == "/v1/batches":
+            batch = self.state.create_batch(payload)
+            if batch is None:
+                self._send_json(400, {"error": {"message": "input_file_id: No such file",
+                                                "type": "invalid_request_error"}})
+            else:
+                self._send_json(200, _public(batch))
+            return
+        if path == "/api/1.0/tasks":
+            self._send_json(201, {"data": self.state.create_task(payload.get("data") or {})})
+            return
+        match = _STORIES_PATH_RE.match(path)
+        if match:
+            story = self.state.create_story(match.group("gid"), payload.get("data") or {})
+            if story is None:
+                self._send_json(404, {"errors": [{"message": "task: Unknown object"}]})
+            else:
+                self._send_json(201, {"data": story})
+            return
+        if path == "/api/1.0/batch":
+            self._send_json(200, {"data": self._run_batch(payload.get("data") or {})})
+            return
+        self._send_json(404, {"errors": [{"message": f"No route for {path}"}]})
+
+    def _run_batch(self, data: dict) -> list[dict]:
+        results = []
+        for action in (data.get("actions") or [])[:10]:
+            relative = action.get("relative_path", "")
+            body = action.get("data") or {}
+            if action.get("method", "").lower() == "post" and relative == "/tasks":
+                results.append({"status_code": 201, "body": {"data": self.state.create_task(body)}})
+                continue
+            match = _STORIES_PATH_RE.match(f"/api/1.0{relative}")
+            if action.get("method", "").lower() == "post" and match:
+                story = self.state.create_story(match.group("gid"), body)
+                if story is not None:
+                    results.append({"status_code": 201, "body": {"data": story}})
+                    continue
+            results.append(
+                {"status_code": 404, "body": {"errors": [{"message": f"No route for {relative}"}]}}
+            )
+        return results
+
+
+def _public(batch: dict) -> dict:
+    return {key: value for key, value in batch.items() if not key.startswith("_")}
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _json_reply(prompt: str) -> str:
+    """Answer a packed batch prompt with one canned entry per email."""
+
+    numbers = [int(number) for number in _EMAIL_MARKER_RE.findall(prompt)]
+    summary, _, tasks = SAMPLE_SUMMARY.partition("**Tasks**")
+    entries = [
+        {
+            "id": number,
+            "summary": summary.strip(),
+            "tasks": [line.split(". ", 1)[1] for line in tasks.strip().splitlines()],
+        }
+        for number in numbers
+    ]
+    return json.dumps({"emails": entries})
+
+
+def _embedding(text: str, dimensions: int) -> list[float]:
+    vector = [0.0] * dimensions
+    for word in _WORD_RE.findall(text.lower()):
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % dimensions
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    return vector
+
+
+def _embeddings(payload: dict) -> dict:
+    inputs = payload.get("input") or []
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    dimensions = payload.get("dimensions") or _EMBEDDING_DIMENSIONS
+    data = []
+    for index, text in enumerate(inputs):
+        vector = _embedding(str(text), dimensions)
+        if payload.get("encoding_format") == "base64":
+            embedding = base64.b64encode(array.array("f", vector).tobytes()).decode("ascii")
+        else:
+            embedding = vector
+        data.append({"object": "embedding", "index": index, "embedding": embedding})
+    tokens = sum(len(str(text)) for text in inputs) // 4
+    return {
+        "object": "list",
+        "data": data,
+        "model": payload.get("model", "stand-in"),
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+
+
+def _structured_summary() -> dict:
+    summary, _, tasks = SAMPLE_SUMMARY.partition("**Tasks**")
+    names = [line.split(". ", 1)[1] for line in tasks.strip().splitlines()]
+    entries = [{"name": name, "assignee": "", "due_on": "", "subtasks": []} for name in names]
+    entries[0]["subtasks"] = [
+        {"name": "Look up the printer's MAC address", "assignee": "Joe", "due_on": "", "subtasks": []}
+    ]
+    return {
+        "summary": summary.replace("**Summary**", "").strip(),
+        "tasks": entries,
+        "fixes": ["Give the printer a static DHCP reservation."],
+        "priority": "medium",
+    }
+
+
+def _structured_reply() -> str:
+    """Answer a ``job_summary`` JSON schema request."""
+
+    return json.dumps(_structured_summary())
+
+
+def _packed_structured_reply(prompt: str) -> str:
+    """Answer a ``job_summaries`` request with one structured entry per email."""
+
+    numbers = [int(number) for number in _EMAIL_MARKER_RE.findall(prompt)]
+    return json.dumps({"emails": [{"id": number, **_structured_summary()} for number in numbers]})
+
+
+def _chat_completion(payload: dict) -> dict:
+    messages = payload.get("messages") or []
+    prompt_chars = sum(len(str(message.get("content", ""))) for message in messages)
+    content = SAMPLE_SUMMARY
+    response_format = payload.get("response_format") or {}
+    if response_format.get("type") == "json_object":
+        content = _json_reply(str(messages[-1].get("content", "")) if messages else "")
+    elif (response_format.get("json_schema") or {}).get("name") == "job_summary":
+        content = _structured_reply()
+    elif (response_format.get("json_schema") or {}).get("name") == "job_summaries":
+        content = _packed_structured_reply(str(messages[-1].get("content", "")) if messages else "")
+    return {
+        "id": f"chatcmpl-standin-{time.monotonic_ns()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "stand-in"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (prompt_chars + len(content)) // 4,
+        },
+    }
+
+
+class StandInServer:
+    """Threaded stand-in server; use as a context manager or start/stop it."""
+
+    def __init__(
+        self,
+        options: Optional[StandInOptions] = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.state = StandInState(options or StandInOptions())
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.state = self.state  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    @property
+    def asana_host(self) -> str:
+        return f"{self.url}/api/1.0"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="stand-in-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def add_options_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the shared ``StandInOptions`` command line flags."""
+
+    parser.add_argument("--latency", type=float, default=0.02, help="Base response delay in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Extra random delay up to this many seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument("--retry-after", type=float, default=0.05, help="Retry-After sent with 429 responses.")
+    parser.add_argument(
+        "--batch-seconds", type=float, default=0.2, help="Seconds before a submitted batch completes."
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for latency and failures.")
+
+
+def options_from_args(args: argparse.Namespace) -> StandInOptions:
+    return StandInOptions(
+        latency=max(0.0, args.latency),
+        jitter=max(0.0, args.jitter),
+        error_rate=min(1.0, max(0.0, args.error_rate)),
+        rate_limit_rate=min(1.0, max(0.0, args.rate_limit_rate)),
+        retry_after=max(0.0, args.retry_after),
+        batch_seconds=max(0.0, args.batch_seconds),
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_options_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = StandInServer(options_from_args(args), host=args.host, port=args.port)
+    print(f"INFO: OpenAI stand-in at {server.openai_base_url}")
+    print(f"INFO: Asana stand-in at {server.asana_host}")
+    try:
+        server.start()
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"INFO: Requests served: {server.state.requests}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,10 @@ from vendor_setup import ensure_vendor_path
 
 ensure_vendor_path()
 
-import asana
 import openai
 from asana.rest import ApiException
+
+import functions.asana_metadata
 
 # Load Config
 print("INFO: Loading Config File")
@@ -29,20 +30,15 @@ print(f"INFO: Set Asana Workspace as: {asana_workspace}")
 print(f"INFO: Today's Date: {datetime.date.today().isoformat()}")
 
 # DEBUG TASKS
-configuration = asana.Configuration()
-configuration.access_token = asana_token  # Assigns API key for Asana
-api_client = asana.ApiClient(configuration) # Opens an Asana API client
-
-custom_field_settings_api_instance = asana.CustomFieldSettingsApi(api_client)
-opts = {
-    'limit': 50, # int | Results per page. The number of objects to return per page. The value must be between 1 and 100.
-}
-
+# Prints the gids the app resolves automatically (see functions.asana_metadata),
+# in case they need to be pinned in config.json.
 try:
-    api_response = custom_field_settings_api_instance.get_custom_field_settings_for_project(asana_project_id, opts)
-    for data in api_response:
-        pprint(data)
+    metadata = functions.asana_metadata.fetch_metadata(
+        asana_token, asana_project_id, host=config.get("asana_api_base_url") or None
+    )
 except ApiException as e:
-    print("Exception when calling CustomFieldSettingsApi->get_custom_field_settings_for_project: %s\n" % e)
+    print("Exception when fetching Asana metadata: %s\n" % e)
+else:
+    pprint(metadata.to_dict())
 
 
@@ -0,0 +1,345 @@
+"""``config.json`` loaded once into an immutable, validated snapshot.
+
+:func:`load_config` parses and checks the file against :data:`CONFIG_SCHEMA`
+and derives everything the windows need (Asana settings, model menu,
+feature settings) in one place.  :class:`ConfigWatcher` polls the file's
+modification time and swaps in a new snapshot when it changes; a broken
+edit is reported and the previous snapshot stays in use.  Readers take
+``watcher.current`` once per operation, so they never see half of an old
+config and half of a new one.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from functions.asana_settings import DEFAULT_METADATA_TTL_HOURS, DEFAULT_SYNC_INTERVAL_MINUTES, AsanaSettings
+from functions.jobs import DEFAULT_MAX_PENDING
+from functions.metrics import DEFAULT_EXPORT_BACKUPS, DEFAULT_EXPORT_MAX_BYTES
+from functions.retention_settings import RetentionPolicy
+from functions.similar_jobs_settings import SimilarJobsSettings
+from functions.speculative_settings import SpeculativeSettings
+
+DEFAULT_CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "config.json"))
+DEFAULT_POLL_MS = 2000
+FALLBACK_MODELS = ("o4-mini", "gpt-4", "gpt-4.1", "gpt-5", "gpt-5.4")
+
+REQUIRED_CONFIG_KEYS = (
+    "openai_api_key",
+    "asana_token",
+    "asana_project_id",
+    "asana_workspace",
+)
+# Enough for the OpenAI-only command line tools such as invoice_batch.py.
+OPENAI_CONFIG_KEYS = ("openai_api_key",)
+DEFAULT_METRICS_LOG_PATH = "metrics.jsonl"
+
+_NUMBER = (int, float)
+# Expected JSON types per key.  Unknown keys are allowed, and a known key of
+# the wrong type is reported and then ignored, so the feature falls back to
+# its default instead of failing at startup.
+CONFIG_SCHEMA: dict[str, tuple[type, ...]] = {
+    "openai_api_key": (str,),
+    "openai_base_url": (str,),
+    "asana_token": (str,),
+    "asana_project_id": (str, list),
+    "asana_workspace": (str,),
+    "asana_api_base_url": (str,),
+    "default_model": (str,),
+    "model_choices": (list,),
+    "structured_summaries": (bool,),
+    "speculative_summaries": (bool, dict),
+    "similar_jobs": (bool, dict),
+    "asana_assignees": (list,),
+    "asana_default_assignee": (str,),
+    "asana_priority_field_id": (str,),
+    "asana_priority_field_name": (str,),
+    "asana_priority_options": (dict,),
+    "asana_default_priority": (str,),
+    "asana_custom_fields": (dict,),
+    "asana_task_defaults": (dict,),
+    "asana_review_subtasks": (bool,),
+    "asana_metadata_ttl_hours": _NUMBER,
+    "asana_mirror_sync_minutes": _NUMBER,
+    "asana_duplicate_threshold": _NUMBER,
+    "invoice_bulk_concurrency": (int,),
+    "html_paste_preview_threshold": (int,),
+    "job_worker_limits": (dict,),
+    "job_queue_limit": (int,),
+    "metrics_log_path": (str,),
+    "metrics_log_max_bytes": (int,),
+    "metrics_log_backups": (int,),
+    "profiling": (bool,),
+    "profile_dir": (str,),
+    "profile_dump_threshold_ms": _NUMBER,
+    "ui_stall_threshold_ms": (int,),
+    "show_history_save_warning": (bool,),
+    "history_retention": (dict,),
+}
+
+# Smallest accepted value of numeric keys; a smaller one is reported and the
+# default is used.  0 turns the watchdog and the mirror sync off.
+CONFIG_MINIMUMS: dict[str, float] = {
+    "asana_metadata_ttl_hours": 0,
+    "asana_mirror_sync_minutes": 0,
+    "invoice_bulk_concurrency": 1,
+    "html_paste_preview_threshold": 0,
+    "job_queue_limit": 1,
+    "metrics_log_max_bytes": 1,
+    "metrics_log_backups": 0,
+    "ui_stall_threshold_ms": 0,
+}
+
+# Keys read once while the app starts; changing them needs a restart.
+RESTART_KEYS = (
+    "openai_api_key",
+    "openai_base_url",
+    "asana_token",
+    "asana_project_id",
+    "asana_workspace",
+    "asana_api_base_url",
+    "asana_mirror_sync_minutes",
+    "asana_metadata_ttl_hours",
+    "job_worker_limits",
+    "job_queue_limit",
+    "metrics_log_path",
+    "metrics_log_max_bytes",
+    "metrics_log_backups",
+    "profiling",
+    "profile_dir",
+    "profile_dump_threshold_ms",
+    "ui_stall_threshold_ms",
+    "html_paste_preview_threshold",
+    "structured_summaries",
+    "speculative_summaries",
+    "similar_jobs",
+    "history_retention",
+)
+
+
+class ConfigError(ValueError):
+    """``config.json`` is unreadable or misses required keys."""
+
+
+def validate_config(
+    config: dict, required: tuple[str, ...] = REQUIRED_CONFIG_KEYS
+) -> tuple[list[str], list[str]]:
+    """Return ``(missing required keys, wrongly typed or out of range keys)``."""
+
+    missing = []
+    for key in required:
+        value = config.get(key)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            missing.append(key)
+    mistyped = []
+    for key, types in CONFIG_SCHEMA.items():
+        value = config.get(key)
+        if value is None or key in missing:
+            continue
+        # bool is an int subclass; only accept it where bool is expected.
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            mistyped.append(key)
+        elif key in CONFIG_MINIMUMS and value < CONFIG_MINIMUMS[key]:
+            mistyped.append(key)
+    return missing, mistyped
+
+
+def _describe(key: str) -> str:
+    expected = " or ".join(t.__name__ for t in CONFIG_SCHEMA[key])
+    if key in CONFIG_MINIMUMS:
+        expected += f" of at least {CONFIG_MINIMUMS[key]}"
+    return expected
+
+
+def _job_worker_limits(config: dict) -> dict[str, int]:
+    limits = {}
+    for kind, limit in (config.get("job_worker_limits") or {}).items():
+        if isinstance(limit, int) and not isinstance(limit, bool) and limit > 0:
+            limits[kind] = limit
+        else:
+            print(f"WARN: Ignoring job_worker_limits.{kind}: expected an int of at least 1")
+    return limits
+
+
+def _model_menu(config: dict) -> tuple[tuple[str, ...], str]:
+    raw = config.get("model_choices")
+    choices = [entry for entry in raw if isinstance(entry, str) and entry] if isinstance(raw, list) else []
+    choices = list(dict.fromkeys(choices or FALLBACK_MODELS))
+    default_model = config.get("default_model", choices[0])
+    if default_model not in choices:
+        default_model = choices[0]
+    return tuple(choices), default_model
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """One validated version of ``config.json`` and the lookups derived from it.
+
+    ``values`` is a private deep copy; treat it as read-only.
+    """
+
+    values: dict
+    path: str
+    mtime_ns: int
+    asana: AsanaSettings
+    model_choices: tuple[str, ...]
+    default_model: str
+    structured_summaries: bool
+    review_subtasks: bool
+    show_history_save_warning: bool
+    speculative: SpeculativeSettings
+    similar_jobs: SimilarJobsSettings
+    retention: RetentionPolicy
+    # An empty path turns the metrics export off.
+    metrics_log_path: str
+    metrics_log_max_bytes: int
+    metrics_log_backups: int
+    # 0 turns the UI stall watchdog off.
+    ui_stall_threshold_ms: int
+    job_worker_limits: dict[str, int]
+    job_queue_limit: int
+    html_paste_preview_threshold: int
+    # 0 turns the background Asana mirror sync off.
+    asana_mirror_sync_minutes: float
+    asana_metadata_ttl_hours: float
+    invoice_bulk_concurrency: int
+
+    @classmethod
+    def from_dict(
+        cls,
+        config: dict,
+        *,
+        path: str = "",
+        mtime_ns: int = 0,
+        required: tuple[str, ...] = REQUIRED_CONFIG_KEYS,
+    ) -> "ConfigSnapshot":
+        """Validate *config* and derive the snapshot; raises :class:`ConfigError`.
+
+        *required* lists the keys that must be set; the command line tools
+        that only call OpenAI pass :data:`OPENAI_CONFIG_KEYS`.
+        """
+
+        missing, mistyped = validate_config(config, required)
+        if missing:
+            raise ConfigError(
+                "Missing or empty required config keys: "
+                f"{', '.join(missing)}. "
+                "Please update config.json using config.example.json as a template."
+            )
+        values = copy.deepcopy(config)
+        for key in mistyped:
+            print(f"WARN: Ignoring config key {key}: expected {_describe(key)}")
+            del values[key]
+        model_choices, default_model = _model_menu(values)
+        # Imported here so importing this module does not load the features;
+        # the other settings live in light modules of their own.
+        from functions.invoice_jobs import DEFAULT_BULK_CONCURRENCY
+        from functions.ui import DEFAULT_PASTE_PREVIEW_THRESHOLD
+        from functions.ui_watchdog import DEFAULT_STALL_THRESHOLD_MS
+
+        return cls(
+            values=values,
+            path=path,
+            mtime_ns=mtime_ns,
+            asana=AsanaSettings.from_config(values),
+            model_choices=model_choices,
+            default_model=default_model,
+            structured_summaries=values.get("structured_summaries", True) is not False,
+            review_subtasks=values.get("asana_review_subtasks", True) is not False,
+            show_history_save_warning=bool(values.get("show_history_save_warning", True)),
+            speculative=SpeculativeSettings.from_config(values),
+            similar_jobs=SimilarJobsSettings.from_config(values),
+            retention=RetentionPolicy.from_config(values),
+            metrics_log_path=values.get("metrics_log_path", DEFAULT_METRICS_LOG_PATH),
+            metrics_log_max_bytes=values.get("metrics_log_max_bytes", DEFAULT_EXPORT_MAX_BYTES),
+            metrics_log_backups=values.get("metrics_log_backups", DEFAULT_EXPORT_BACKUPS),
+            ui_stall_threshold_ms=values.get("ui_stall_threshold_ms", DEFAULT_STALL_THRESHOLD_MS),
+            job_worker_limits=_job_worker_limits(values),
+            job_queue_limit=values.get("job_queue_limit", DEFAULT_MAX_PENDING),
+            html_paste_preview_threshold=values.get(
+                "html_paste_preview_threshold", DEFAULT_PASTE_PREVIEW_THRESHOLD
+            ),
+            asana_mirror_sync_minutes=values.get("asana_mirror_sync_minutes", DEFAULT_SYNC_INTERVAL_MINUTES),
+            asana_metadata_ttl_hours=values.get("asana_metadata_ttl_hours", DEFAULT_METADATA_TTL_HOURS),
+            invoice_bulk_concurrency=values.get("invoice_bulk_concurrency", DEFAULT_BULK_CONCURRENCY),
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values.get(key, default)
+
+    def changed_keys(self, other: "ConfigSnapshot") -> list[str]:
+        """Return the top-level keys whose values differ from *other*."""
+
+        keys = set(self.values) | set(other.values)
+        return sorted(key for key in keys if self.values.get(key) != other.values.get(key))
+
+
+def _mtime_ns(path: str) -> int:
+    return os.stat(path).st_mtime_ns
+
+
+def load_config(
+    path: str = DEFAULT_CONFIG_PATH, *, required: tuple[str, ...] = REQUIRED_CONFIG_KEYS
+) -> ConfigSnapshot:
+    """Read, validate and snapshot *path*.
+
+    Raises ``FileNotFoundError`` and ``json.JSONDecodeError`` as ``open`` and
+    ``json.load`` do, and :class:`ConfigError` for missing *required* keys.
+    """
+
+    mtime_ns = _mtime_ns(path)
+    with open(path, "r") as file:
+        config = json.load(file)
+    if not isinstance(config, dict):
+        raise ConfigError("config.json must contain a JSON object.")
+    return ConfigSnapshot.from_dict(config, path=path, mtime_ns=mtime_ns, required=required)
+
+
+class ConfigWatcher:
+    """Poll ``config.json`` for changes and keep the newest valid snapshot.
+
+    :meth:`poll` only calls ``os.stat`` while the file is unchanged, so it is
+    cheap enough to run from the Tk loop every couple of seconds.
+    """
+
+    def __init__(
+        self,
+        snapshot: ConfigSnapshot,
+        on_change: Optional[Callable[[ConfigSnapshot, ConfigSnapshot], None]] = None,
+    ) -> None:
+        self.current = snapshot
+        self.on_change = on_change
+        # (mtime, size) of the last version looked at, valid or not, so a
+        # broken edit is reported once rather than on every poll.
+        self._seen = self._signature()
+
+    def _signature(self) -> Optional[tuple[int, int]]:
+        try:
+            stat = os.stat(self.current.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self) -> Optional[ConfigSnapshot]:
+        """Load the file if it changed; return the new snapshot, if any."""
+
+        if not self.current.path:
+            return None
+        signature = self._signature()
+        if signature is None or signature == self._seen:
+            return None
+        self._seen = signature
+        try:
+            snapshot = load_config(self.current.path)
+        except (OSError, ValueError) as exc:
+            print(f"WARN: Not reloading config.json: {exc}")
+            return None
+        previous, self.current = self.current, snapshot
+        print("INFO: Reloaded config.json")
+        if self.on_change is not None:
+            self.on_change(previous, snapshot)
+        return snapshot
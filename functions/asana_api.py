@@ -1,24 +1,32 @@
 import copy
 import random
-import re
 import sys
 import time
 import tkinter as tk
 import traceback
 from contextlib import suppress
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from tkinter import messagebox, simpledialog
-from typing import Optional
-
-import asana
-from asana.rest import ApiException
+from typing import Mapping, Optional
 
+import functions.asana_mirror
 import functions.ui
+from functions.asana_settings import AsanaSettings
+from functions.metrics import span, timed
+from functions.structured_summary import StructuredSummary
+from functions.task_list import TaskItem, count_items, parse_due_date, split_task_list
 
 ASANA_MAX_ATTEMPTS = 5
 ASANA_BASE_BACKOFF_SECONDS = 0.5
 ASANA_MAX_BACKOFF_SECONDS = 8.0
 
+# Sub-tasks are created through the Batch API, ten actions per request, with
+# a few requests in flight at once.
+ASANA_BATCH_SIZE = 10
+ASANA_BATCH_CONCURRENCY = 3
+_RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
 
 def _compute_backoff(attempt: int) -> float:
     """Return an exponential backoff delay with bounded jitter."""
@@ -34,9 +42,11 @@ def _compute_backoff(attempt: int) -> float:
 def _is_retryable_asana_error(exc: Exception) -> bool:
     """Return True when the Asana exception should be retried."""
 
+    from asana.rest import ApiException
+
     if isinstance(exc, ApiException):
         status = getattr(exc, "status", None)
-        if status in {429, 500, 502, 503, 504}:
+        if status in _RETRYABLE_STATUSES:
             return True
 
     message = str(exc).lower()
@@ -58,7 +68,8 @@ def _run_with_retries(operation_name: str, operation):
 
     for attempt in range(1, ASANA_MAX_ATTEMPTS + 1):
         try:
-            return operation()
+            with span(f"asana.{operation_name.replace(' ', '_')}", attempt=attempt):
+                return operation()
         except Exception as exc:
             last_exc = exc
             is_retryable = _is_retryable_asana_error(exc)
@@ -85,15 +96,92 @@ def _run_with_retries(operation_name: str, operation):
 
     raise RuntimeError(f"Asana {operation_name} failed without an exception.")
 
+def iter_asana_pages(operation_name: str, request, opts: dict):
+    """Yield the ``data`` list of each page of a paginated Asana listing.
+
+    *request* is called with a fresh copy of *opts* (including the ``offset``
+    of the next page) and must return the full payload, e.g.
+    ``lambda page_opts: api.get_tasks(page_opts, full_payload=True)``.  Every
+    page is retried on its own.
+    """
+
+    opts = dict(opts)
+    while True:
+        page = _run_with_retries(operation_name, lambda: request(dict(opts)))
+        yield page.get("data") or []
+        next_page = page.get("next_page")
+        offset = next_page.get("offset") if isinstance(next_page, dict) else None
+        if not offset:
+            return
+        opts["offset"] = offset
+
 @dataclass
 class AsanaTaskRequest:
     """Container for the data required to create an Asana task."""
 
     body: dict
     opts: dict
-    bullet_points: list[str]
+    subtasks: list[TaskItem]
     task_name: str
     original_email: str
+    # Assignee label (casefolded) to Asana value, for sub-task hints.
+    assignees: Mapping[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class SubtaskResult:
+    """Outcome of creating one sub-task."""
+
+    name: str
+    depth: int
+    gid: Optional[str] = None
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.gid is not None
+
+
+@dataclass
+class TaskCreationResult:
+    """The created task and the per-item status of its sub-tasks."""
+
+    task_gid: str
+    subtasks: list[SubtaskResult]
+
+    @property
+    def created(self) -> int:
+        return sum(1 for result in self.subtasks if result.ok)
+
+    @property
+    def failed(self) -> list[SubtaskResult]:
+        return [result for result in self.subtasks if not result.ok]
+
+    def describe(self, task_name: str) -> str:
+        message = (
+            f"Task '{task_name}' created in Asana with {self.created}"
+            f" of {len(self.subtasks)} sub-tasks."
+        )
+        if self.failed:
+            message += "\n\nFailed:\n" + "\n".join(
+                f"• {result.name}: {result.error}" for result in self.failed
+            )
+        return message
+
+
+@dataclass
+class AsanaTaskInputs:
+    """Plain values collected from the UI (or a batch job) for one task."""
+
+    summary_markdown: str
+    original_email: str
+    task_name: str
+    assignee_name: Optional[str] = None
+    priority: Optional[str] = None
+    due_on: str = ""
+    # Set when the summary came back as structured JSON; its task list and
+    # notes are used as they are instead of being parsed from the Markdown.
+    structured: Optional["StructuredSummary"] = None
 
 class _TaskNameDialog:
     """Simple modal dialog to request the Asana task name.
@@ -226,18 +314,76 @@ def _validate_required_task_fields(task_name: Optional[str], asana_project_id) -
 
     return errors
 
-def build_asana_task_request(
+def create_asana_task_request(
+    inputs: AsanaTaskInputs,
+    asana_settings: AsanaSettings,
+) -> AsanaTaskRequest:
+    """Build an :class:`AsanaTaskRequest` from plain values.
+
+    All validation and merging of the configured defaults happened once in
+    :meth:`AsanaSettings.from_config`, so this is a cheap overlay of the
+    per-task fields.  Never touches Tk, so it can run on worker threads and in
+    headless batch jobs.  Raises :class:`ValueError` when the summary or
+    required fields are missing.
+    """
+
+    if inputs.structured is not None:
+        notes_markdown = inputs.structured.notes_markdown()
+        subtasks = copy.deepcopy(inputs.structured.tasks)
+    else:
+        notes_markdown, subtasks = split_task_list(inputs.summary_markdown or "")
+    try:
+        summary_plain = functions.ui.markdown_to_plain_text(notes_markdown)
+    except Exception as exc:  # pragma: no cover - dependency mismatch fallback
+        print(f"ERR: Failed to convert markdown to plain text: {exc}")
+        traceback.print_exc()
+        summary_plain = notes_markdown.strip()
+    if not summary_plain and not subtasks:
+        raise ValueError("There is no summary to send.")
+
+    task_name = inputs.task_name.strip() if isinstance(inputs.task_name, str) else ""
+    validation_errors = _validate_required_task_fields(task_name, asana_settings.project_ids)
+    if validation_errors:
+        raise ValueError("\n".join(validation_errors))
+
+    assignee = asana_settings.resolve_assignee(inputs.assignee_name)
+    if assignee:
+        print(f"INFO: Set Assignee: {assignee}")
+    else:
+        print("INFO: Assignee: None Specified")
+
+    data = asana_settings.build_task_data(
+        name=task_name,
+        notes=f"Email: \n{summary_plain}",
+        due_on=inputs.due_on,
+        assignee=assignee,
+        priority=inputs.priority,
+    )
+
+    return AsanaTaskRequest(
+        body={"data": data},
+        opts={},
+        subtasks=subtasks,
+        task_name=task_name,
+        original_email=inputs.original_email,
+        assignees=asana_settings.assignees,
+    )
+
+
+def collect_asana_task_inputs(
     output_text,
     input_text,
-    asana_project_id,
     assignee_var,
     priority_var,
     cal_var,
-    asana_settings,
     *,
     parent=None,
-) -> Optional[AsanaTaskRequest]:
-    """Gather user input and prepare the payload for creating an Asana task."""
+) -> Optional[AsanaTaskInputs]:
+    """Read the task inputs from the main window widgets on the Tk thread.
+
+    Shows the task name prompt and a warning when there is no summary.
+    Returns ``None`` when the user has nothing to send or cancels.
+    """
 
     parent_widget = parent
     if parent_widget is None:
@@ -253,13 +399,7 @@ def build_asana_task_request(
         traceback.print_exc()
         summary_markdown = ""
 
-    try:
-        summary_plain = functions.ui.markdown_to_plain_text(summary_markdown)
-    except Exception as exc:  # pragma: no cover - dependency mismatch fallback
-        print(f"ERR: Failed to convert markdown to plain text: {exc}")
-        traceback.print_exc()
-        summary_plain = summary_markdown.strip()
-    if not summary_plain:
+    if not summary_markdown.strip():
         messagebox.showwarning(
             "Empty", "There is no summary to send.", parent=parent_widget
         )
@@ -270,33 +410,11 @@ def build_asana_task_request(
     if isinstance(task_name, str):
         task_name = task_name.strip()
     print(f"INFO: Set Task Name: {task_name}")
-
-    validation_errors = _validate_required_task_fields(task_name, asana_project_id)
-    if validation_errors:
-        error_text = "\n".join(validation_errors)
-        messagebox.showerror("Missing Info", error_text, parent=parent_widget)
-        print(f"WARN: {error_text}")
+    if not task_name:
+        messagebox.showerror("Missing Info", "Task name is required.", parent=parent_widget)
+        print("WARN: Task name is required.")
         return None
 
-    assignee = ""
-    assignee_lookup = {}
-    if isinstance(asana_settings, dict):
-        lookup = asana_settings.get("assignees", {})
-        if isinstance(lookup, dict):
-            assignee_lookup = lookup
-    assignee_raw = assignee_var.get()
-    if isinstance(assignee_raw, str):
-        assignee = assignee_lookup.get(assignee_raw.casefold(), "")
-    if assignee:
-        print(f"INFO: Set Assignee: {assignee}")
-    else:
-        assignee = ""
-        print("INFO: Assignee: None Specified")
-
-    # Prepare notes and capture the original email before leaving the UI thread
-    bullet_point_pattern = r"(?:^\d+\.\s+).+"
-    summary_without_tasks = re.sub(bullet_point_pattern, "", summary_plain, flags=re.MULTILINE).strip()
-    notes = f"Email: \n{summary_without_tasks}"
     try:
         original_email = input_text.get("1.0", tk.END).strip()
     except Exception as exc:  # pragma: no cover - unexpected widget shape
@@ -304,63 +422,6 @@ def build_asana_task_request(
         traceback.print_exc()
         original_email = ""
 
-    # Priority and additional custom fields
-    priority_mapping = {}
-    priority_field_id = None
-    custom_fields = {}
-    if isinstance(asana_settings, dict):
-        priority_mapping_candidate = asana_settings.get("priority_options", {})
-        if isinstance(priority_mapping_candidate, dict):
-            priority_mapping = priority_mapping_candidate
-        priority_field_id_candidate = asana_settings.get("priority_field_id")
-        if isinstance(priority_field_id_candidate, str) and priority_field_id_candidate:
-            priority_field_id = priority_field_id_candidate
-    priority_selection = priority_var.get()
-    if priority_field_id and isinstance(priority_selection, str) and priority_selection in priority_mapping:
-        custom_fields[priority_field_id] = priority_mapping[priority_selection]
-
-    body: dict = {"data": {}}
-    task_defaults = {}
-    if isinstance(asana_settings, dict):
-        defaults_candidate = asana_settings.get("task_defaults", {})
-        if isinstance(defaults_candidate, dict):
-            task_defaults = copy.deepcopy(defaults_candidate)
-    body["data"].update(task_defaults)
-    # body["data"].setdefault("projects", asana_project_id)
-
-    projects_value = body["data"].get("projects")
-    normalized_projects: list[str] = []
-
-    def add_project_id(value) -> None:
-        """Collect a project gid from the various shapes Asana accepts."""
-
-        if isinstance(value, str):
-            project_id = value.strip()
-            if project_id and project_id not in normalized_projects:
-                normalized_projects.append(project_id)
-        elif isinstance(value, dict):
-            gid = value.get("gid")
-            if isinstance(gid, str):
-                add_project_id(gid)
-
-    if isinstance(projects_value, (list, tuple, set)):
-        for candidate in projects_value:
-            add_project_id(candidate)
-    else:
-        add_project_id(projects_value)
-
-    if isinstance(asana_project_id, (list, tuple, set)):
-        for candidate in asana_project_id:
-            add_project_id(candidate)
-    else:
-        add_project_id(asana_project_id)
-
-    if normalized_projects:
-        body["data"]["projects"] = normalized_projects
-    elif "projects" in body["data"]:
-        body["data"].pop("projects")
-
-    body["data"]["name"] = task_name
     try:
         due_on = functions.ui.get_date(cal_var)
     except Exception as exc:  # pragma: no cover - unexpected widget state
@@ -368,55 +429,253 @@ def build_asana_task_request(
         traceback.print_exc()
         due_on = ""
 
-    body["data"]["due_on"] = due_on
-    body["data"]["notes"] = notes
-
-    existing_custom_fields = body["data"].get("custom_fields", {})
-    merged_custom_fields = {}
-    if isinstance(existing_custom_fields, dict):
-        merged_custom_fields.update(existing_custom_fields)
-    if isinstance(custom_fields, dict):
-        merged_custom_fields.update(custom_fields)
-    additional_custom_fields = {}
-    if isinstance(asana_settings, dict):
-        additional_candidate = asana_settings.get("custom_fields", {})
-        if isinstance(additional_candidate, dict):
-            additional_custom_fields = additional_candidate
-    if additional_custom_fields:
-        merged_custom_fields.update(additional_custom_fields)
-    if merged_custom_fields:
-        body["data"]["custom_fields"] = merged_custom_fields
-
-    opts: dict = {}
-    if assignee:
-        body["data"]["assignee"] = assignee
+    return AsanaTaskInputs(
+        summary_markdown=summary_markdown,
+        original_email=original_email,
+        task_name=task_name,
+        assignee_name=assignee_var.get(),
+        priority=priority_var.get(),
+        due_on=due_on,
+        structured=functions.ui.get_widget_structured_summary(output_text),
+    )
 
-    bullet_points = re.findall(r"^\d+\.\s+(.+)", summary_plain, re.MULTILINE)
 
-    return AsanaTaskRequest(
-        body=body,
-        opts=opts,
-        bullet_points=[point.strip() for point in bullet_points],
-        task_name=str(task_name),
-        original_email=original_email,
+def _confirm_not_duplicate(
+    task_name: str,
+    asana_settings: AsanaSettings,
+    parent=None,
+) -> bool:
+    """Warn when the local project mirror holds a task with a similar name.
+
+    Only consults the in-memory index, so it never waits for Asana.  Returns
+    ``False`` when the user decides not to create the task.
+    """
+
+    if asana_settings.duplicate_threshold is None:
+        return True
+    matches = functions.asana_mirror.TASK_INDEX.find_similar(
+        task_name, threshold=asana_settings.duplicate_threshold
+    )
+    if not matches:
+        return True
+    lines = []
+    for match in matches:
+        details = [f"{match.score:.0%} similar"]
+        if match.task.due_on:
+            details.append(f"due {match.task.due_on}")
+        if match.task.completed:
+            details.append("completed")
+        lines.append(f"• {match.task.name} ({', '.join(details)})")
+    print(f"WARN: Possible duplicate Asana task for '{task_name}': {matches[0].task.name}")
+    return messagebox.askyesno(
+        "Possible Duplicate",
+        "Similar tasks already exist in the Asana project:\n\n"
+        + "\n".join(lines)
+        + "\n\nCreate the task anyway?",
+        icon="warning",
+        parent=parent,
+    )
+
+
+def build_asana_task_request(
+    output_text,
+    input_text,
+    assignee_var,
+    priority_var,
+    cal_var,
+    asana_settings: AsanaSettings,
+    *,
+    parent=None,
+) -> Optional[AsanaTaskRequest]:
+    """Gather user input and prepare the payload for creating an Asana task.
+
+    Thin Tk adapter over :func:`collect_asana_task_inputs` and
+    :func:`create_asana_task_request` that reports problems in dialogs and
+    asks for confirmation when the task looks like a duplicate.
+    """
+
+    inputs = collect_asana_task_inputs(
+        output_text,
+        input_text,
+        assignee_var,
+        priority_var,
+        cal_var,
+        parent=parent,
     )
+    if inputs is None:
+        return None
+
+    try:
+        task_request = create_asana_task_request(inputs, asana_settings)
+    except ValueError as exc:
+        messagebox.showerror("Missing Info", str(exc), parent=parent)
+        print(f"WARN: {exc}")
+        return None
+
+    if not _confirm_not_duplicate(task_request.task_name, asana_settings, parent):
+        print("INFO: Task creation cancelled as a likely duplicate")
+        return None
+    return task_request
 
 
-def perform_asana_task_creation(asana_token: str, task_request: AsanaTaskRequest) -> int:
+def _resolve_assignee_hint(hint: str, assignees: Mapping[str, str]) -> str:
+    """Map a sub-task ``@name`` hint to an Asana assignee value."""
+
+    if not hint:
+        return ""
+    value = assignees.get(hint.casefold())
+    if value is not None:
+        return value
+    if "@" in hint or hint.isdigit():
+        return hint  # An email address or gid Asana can resolve itself.
+    print(f"WARN: Unknown sub-task assignee '{hint}'; leaving it unassigned")
+    return ""
+
+
+def _subtask_action(item: TaskItem, parent_gid: str, assignees: Mapping[str, str]) -> dict:
+    data = {"name": item.name, "parent": parent_gid}
+    assignee = _resolve_assignee_hint(item.assignee, assignees)
+    if assignee:
+        data["assignee"] = assignee
+    due_on = parse_due_date(item.due_on) if item.due_on else None
+    if due_on:
+        data["due_on"] = due_on
+    return {"method": "post", "relative_path": "/tasks", "data": data}
+
+
+def _action_error(action: dict) -> str:
+    body = action.get("body") if isinstance(action.get("body"), dict) else {}
+    errors = body.get("errors") if isinstance(body.get("errors"), list) else []
+    messages = [error.get("message") for error in errors if isinstance(error, dict) and error.get("message")]
+    return "; ".join(messages) or f"HTTP {action.get('status_code')}"
+
+
+def _create_subtask_level(batch_api, pool, entries: list, assignees: Mapping[str, str]) -> None:
+    """Create one nesting level of sub-tasks through the Batch API.
+
+    *entries* are ``(item, parent_gid, result)`` triples; each ``result`` is
+    filled in.  Actions that fail with a retryable status are sent again, in
+    fresh batches, with the usual backoff.
+    """
+
+    def submit(chunk: list) -> Optional[list]:
+        body = {
+            "data": {
+                "actions": [_subtask_action(item, parent_gid, assignees) for item, parent_gid, _ in chunk]
+            }
+        }
+        try:
+            response = _run_with_retries(
+                "create subtask batch",
+                lambda: batch_api.create_batch_request(body, {}, full_payload=True),
+            )
+        except Exception as exc:
+            for _, _, result in chunk:
+                result.error = str(exc)
+            return None
+        return response.get("data") or []
+
+    remaining = entries
+    for attempt in range(1, ASANA_MAX_ATTEMPTS + 1):
+        chunks = [remaining[start:start + ASANA_BATCH_SIZE] for start in range(0, len(remaining), ASANA_BATCH_SIZE)]
+        retry = []
+        for chunk, actions in zip(chunks, pool.map(submit, chunks)):
+            if actions is None:
+                continue
+            for index, entry in enumerate(chunk):
+                result = entry[2]
+                action = actions[index] if index < len(actions) and isinstance(actions[index], dict) else {}
+                status = action.get("status_code") or 0
+                data = (action.get("body") or {}).get("data") or {}
+                if 200 <= status < 300 and data.get("gid"):
+                    result.gid = data["gid"]
+                    result.error = ""
+                else:
+                    result.error = _action_error(action)
+                    if status in _RETRYABLE_STATUSES:
+                        retry.append(entry)
+        if not retry or attempt >= ASANA_MAX_ATTEMPTS:
+            return
+        sleep_for = _compute_backoff(attempt)
+        print(f"WARN: Retrying {len(retry)} Asana sub-tasks in {sleep_for:.2f}s")
+        time.sleep(sleep_for)
+        remaining = retry
+
+
+def create_subtasks(
+    batch_api,
+    task_gid: str,
+    items: list[TaskItem],
+    assignees: Mapping[str, str],
+    *,
+    pool: Optional[ThreadPoolExecutor] = None,
+) -> list[SubtaskResult]:
+    """Create *items* (and their children) under *task_gid*.
+
+    Each nesting level is one pass of concurrent batch requests, so a list
+    of any length takes a handful of round trips.  Returns a result per item
+    in list order; items under a failed parent are reported as not created.
+    """
+
+    results: dict[int, SubtaskResult] = {}
+    ordered: list[SubtaskResult] = []
+    for root in items:
+        for item, depth in root.walk():
+            results[id(item)] = SubtaskResult(item.name, depth)
+            ordered.append(results[id(item)])
+    if not ordered:
+        return []
+
+    own_pool = pool is None
+    pool = pool or ThreadPoolExecutor(max_workers=ASANA_BATCH_CONCURRENCY)
+    try:
+        level = [(item, task_gid, results[id(item)]) for item in items]
+        while level:
+            _create_subtask_level(batch_api, pool, level, assignees)
+            next_level = []
+            for item, _, result in level:
+                for child in item.children:
+                    if result.ok:
+                        next_level.append((child, result.gid, results[id(child)]))
+                    else:
+                        for descendant, _ in child.walk():
+                            results[id(descendant)].error = "Parent sub-task was not created."
+            level = next_level
+    finally:
+        if own_pool:
+            pool.shutdown()
+    return ordered
+
+
+@timed("asana.perform_task_creation")
+def perform_asana_task_creation(
+    asana_token: str,
+    task_request: AsanaTaskRequest,
+    *,
+    host: Optional[str] = None,
+) -> TaskCreationResult:
     """Execute the API calls required to create an Asana task.
 
-    Returns the number of subtasks that were created.
+    The comment story and the sub-tasks are created concurrently once the
+    task exists.  *host* overrides the API base URL (e.g. a local stand-in
+    server).  Raises when the task or its story cannot be created; sub-task
+    failures are reported per item in the result.
     """
 
+    import asana  # Imported on first use; the SDK is slow to load.
+
     configuration = asana.Configuration()
     configuration.access_token = asana_token
+    if host:
+        configuration.host = host.rstrip("/")
     api_client = asana.ApiClient(configuration)
     tasks_api = asana.TasksApi(api_client)
 
-    task = _run_with_retries(
-        "create task",
-        lambda: tasks_api.create_task(task_request.body, task_request.opts),
-    )
+    with span("asana.step.create_task"):
+        task = _run_with_retries(
+            "create task",
+            lambda: tasks_api.create_task(task_request.body, task_request.opts),
+        )
     task_gid = task.get("gid")
     if not task_gid:
         print("WARN: Asana response did not contain a task GID.")
@@ -424,19 +683,30 @@ def perform_asana_task_creation(asana_token: str, task_request: AsanaTaskRequest
 
     stories_api = asana.StoriesApi(api_client)
     comment_body = {"data": {"text": task_request.original_email}}
-    _run_with_retries(
-        "create task story",
-        lambda: stories_api.create_story_for_task(comment_body, task_gid, task_request.opts),
-    )
 
-    for point in task_request.bullet_points:
-        subtask_body = {"data": {"name": point, "parent": task_gid}}
-        _run_with_retries(
-            "create subtask",
-            lambda subtask_body=subtask_body: tasks_api.create_task(subtask_body, {}),
-        )
+    def create_story() -> None:
+        with span("asana.step.create_story"):
+            _run_with_retries(
+                "create task story",
+                lambda: stories_api.create_story_for_task(comment_body, task_gid, task_request.opts),
+            )
+
+    with ThreadPoolExecutor(max_workers=ASANA_BATCH_CONCURRENCY + 1) as pool:
+        story = pool.submit(create_story)
+        with span("asana.step.create_subtasks", subtasks=count_items(task_request.subtasks)):
+            subtasks = create_subtasks(
+                asana.BatchAPIApi(api_client),
+                task_gid,
+                task_request.subtasks,
+                task_request.assignees,
+                pool=pool,
+            )
+        story.result()
 
-    return len(task_request.bullet_points)
+    result = TaskCreationResult(task_gid, subtasks)
+    for failure in result.failed:
+        print(f"WARN: Asana sub-task '{failure.name}' was not created: {failure.error}")
+    return result
 
 
 def send_to_asana(
@@ -452,11 +722,12 @@ def send_to_asana(
     *,
     parent=None,
 ):
+    from asana.rest import ApiException
+
     print("INFO: Sending to Asana")
     task_request = build_asana_task_request(
         output_text,
         input_text,
-        asana_project_id,
         assignee_var,
         priority_var,
         cal_var,
@@ -467,15 +738,13 @@ def send_to_asana(
         return
 
     try:
-        bullet_count = perform_asana_task_creation(asana_token, task_request)
-        messagebox.showinfo(
-            "Success",
-            f"Task '{task_request.task_name}' created in Asana with {bullet_count} sub-tasks.",
-            parent=parent,
-        )
-        print(
-            f"INFO: Task '{task_request.task_name}' created in Asana with {bullet_count} sub-tasks."
-        )
+        result = perform_asana_task_creation(asana_token, task_request)
+        message = result.describe(task_request.task_name)
+        if result.failed:
+            messagebox.showwarning("Partly Created", message, parent=parent)
+        else:
+            messagebox.showinfo("Success", message, parent=parent)
+        print(f"INFO: {message}")
     except ApiException as exc:
         messagebox.showerror("Asana API Error", str(exc), parent=parent)
         print(f"ERR: Asana API Error: {exc}")
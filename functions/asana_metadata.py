@@ -0,0 +1,285 @@
+"""Cached Asana metadata: project custom fields, enum options and users.
+
+The metadata is fetched in the background, stored as JSON in the ``meta``
+table of ``history.db`` and reused until it is older than the configured TTL
+(Asana's REST API does not send ETags for these listings).  It lets the
+priority and assignee menus list what actually exists in Asana and resolves
+menu labels to gids locally, so creating a task never asks Asana to look up
+an assignee by email.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+import functions.database
+from functions.asana_settings import DEFAULT_METADATA_TTL_HOURS
+from functions.metrics import timed
+
+DEFAULT_PRIORITY_FIELD_NAME = "Priority"
+METADATA_META_PREFIX = "asana_metadata:"
+METADATA_PAGE_SIZE = 100
+_CUSTOM_FIELD_FIELDS = (
+    "custom_field.name,custom_field.resource_subtype,"
+    "custom_field.enum_options.name,custom_field.enum_options.enabled"
+)
+_USER_FIELDS = "name,email"
+
+
+@dataclass(frozen=True)
+class AsanaMetadata:
+    """Custom fields and users of one project, with lookups built once."""
+
+    project_gid: str
+    workspace_gid: str
+    fetched_at: str
+    # ``{"gid", "name", "resource_subtype", "enum_options": [{"gid", "name", "enabled"}]}``
+    custom_fields: tuple[Mapping[str, Any], ...]
+    # ``{"gid", "name", "email"}``
+    users: tuple[Mapping[str, Any], ...]
+    _user_gids: Mapping[str, str] = field(repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "AsanaMetadata":
+        custom_fields = []
+        for entry in payload.get("custom_fields") or []:
+            if not isinstance(entry, dict) or not entry.get("gid"):
+                continue
+            options = tuple(
+                MappingProxyType({
+                    "gid": option["gid"],
+                    "name": option.get("name") or "",
+                    "enabled": option.get("enabled", True) is not False,
+                })
+                for option in entry.get("enum_options") or []
+                if isinstance(option, dict) and option.get("gid")
+            )
+            custom_fields.append(MappingProxyType({
+                "gid": entry["gid"],
+                "name": entry.get("name") or "",
+                "resource_subtype": entry.get("resource_subtype") or "",
+                "enum_options": options,
+            }))
+        users = []
+        user_gids: dict[str, str] = {}
+        for entry in payload.get("users") or []:
+            if not isinstance(entry, dict) or not entry.get("gid"):
+                continue
+            user = MappingProxyType({
+                "gid": entry["gid"],
+                "name": entry.get("name") or "",
+                "email": entry.get("email") or "",
+            })
+            users.append(user)
+            for key in (user["email"], user["name"]):
+                if key:
+                    user_gids.setdefault(key.casefold(), user["gid"])
+        return cls(
+            project_gid=str(payload.get("project_gid") or ""),
+            workspace_gid=str(payload.get("workspace_gid") or ""),
+            fetched_at=str(payload.get("fetched_at") or ""),
+            custom_fields=tuple(custom_fields),
+            users=tuple(users),
+            _user_gids=MappingProxyType(user_gids),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "project_gid": self.project_gid,
+            "workspace_gid": self.workspace_gid,
+            "fetched_at": self.fetched_at,
+            "custom_fields": [
+                {**entry, "enum_options": [dict(option) for option in entry["enum_options"]]}
+                for entry in self.custom_fields
+            ],
+            "users": [dict(user) for user in self.users],
+        }
+
+    def is_fresh(self, ttl_hours: float, now: Optional[datetime] = None) -> bool:
+        try:
+            fetched_at = datetime.fromisoformat(self.fetched_at)
+        except ValueError:
+            return False
+        now = now or datetime.now(timezone.utc)
+        return now - fetched_at < timedelta(hours=ttl_hours)
+
+    def user_gid(self, value: Optional[str]) -> Optional[str]:
+        """Return the gid of the user with this email or name, if known."""
+
+        if not isinstance(value, str) or not value:
+            return None
+        return self._user_gids.get(value.casefold())
+
+    def find_custom_field(
+        self, *, gid: Optional[str] = None, name: Optional[str] = None
+    ) -> Optional[Mapping[str, Any]]:
+        for entry in self.custom_fields:
+            if gid and entry["gid"] == gid:
+                return entry
+        if name:
+            for entry in self.custom_fields:
+                if entry["name"].casefold() == name.casefold():
+                    return entry
+        return None
+
+    def apply_to_config(self, config: dict) -> dict:
+        """Return a copy of *config* with Asana labels resolved against live data.
+
+        * Configured assignees are mapped to user gids by email or name; with
+          no ``asana_assignees`` configured every workspace user is offered.
+        * The priority options become the enabled enum options of the
+          priority field (``asana_priority_field_id``, or the field named
+          ``asana_priority_field_name``).
+
+        The result is fed to :meth:`AsanaSettings.from_config`, so all
+        validation and payload precomputation stays in one place.
+        """
+
+        merged = dict(config)
+        workspace = config.get("asana_workspace") or ""
+
+        configured = config.get("asana_assignees")
+        assignees = []
+        if isinstance(configured, list) and configured:
+            for entry in configured:
+                if not isinstance(entry, dict):
+                    continue
+                entry = dict(entry)
+                if not entry.get("gid"):
+                    raw_value = entry.get("email") or entry.get("value") or ""
+                    if isinstance(raw_value, str):
+                        raw_value = raw_value.replace("{workspace}", workspace)
+                    gid = self.user_gid(raw_value) or self.user_gid(entry.get("name"))
+                    if gid:
+                        entry["gid"] = gid
+                assignees.append(entry)
+        else:
+            # Keep "Unassigned" as the default rather than the first user.
+            assignees = [{"name": "Unassigned", "value": ""}] + [
+                {"name": user["name"], "gid": user["gid"]}
+                for user in sorted(self.users, key=lambda user: user["name"].casefold())
+                if user["name"]
+            ]
+        merged["asana_assignees"] = assignees
+
+        field_gid = config.get("asana_priority_field_id")
+        field_name = config.get("asana_priority_field_name")
+        if not isinstance(field_name, str) or not field_name:
+            field_name = DEFAULT_PRIORITY_FIELD_NAME
+        priority_field = self.find_custom_field(
+            gid=field_gid if isinstance(field_gid, str) else None, name=field_name
+        )
+        if priority_field is not None and priority_field["enum_options"]:
+            options: dict[str, Optional[str]] = {"None": None}
+            for option in priority_field["enum_options"]:
+                if option["enabled"] and option["name"]:
+                    options.setdefault(option["name"], option["gid"])
+            merged["asana_priority_field_id"] = priority_field["gid"]
+            merged["asana_priority_options"] = options
+        return merged
+
+
+def load_cached_metadata(project_gid: str) -> Optional[AsanaMetadata]:
+    raw = functions.database.get_meta(METADATA_META_PREFIX + project_gid)
+    if not raw:
+        return None
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        print(f"WARN: Ignoring unreadable Asana metadata cache for project {project_gid}")
+        return None
+    return AsanaMetadata.from_dict(payload) if isinstance(payload, dict) else None
+
+
+@timed("asana.fetch_metadata")
+def fetch_metadata(
+    asana_token: str,
+    project_gid: str,
+    *,
+    host: Optional[str] = None,
+) -> AsanaMetadata:
+    """Fetch custom field settings and workspace users for *project_gid*."""
+
+    import asana  # Imported on first use; the SDK is slow to load.
+    from functions.asana_api import _run_with_retries, iter_asana_pages
+
+    configuration = asana.Configuration()
+    configuration.access_token = asana_token
+    if host:
+        configuration.host = host.rstrip("/")
+    api_client = asana.ApiClient(configuration)
+
+    projects_api = asana.ProjectsApi(api_client)
+    project = _run_with_retries(
+        "get project",
+        lambda: projects_api.get_project(project_gid, {"opt_fields": "workspace"}),
+    )
+    workspace_gid = ((project or {}).get("workspace") or {}).get("gid") or ""
+
+    settings_api = asana.CustomFieldSettingsApi(api_client)
+    custom_fields = []
+    for page in iter_asana_pages(
+        "list custom field settings",
+        lambda opts: settings_api.get_custom_field_settings_for_project(
+            project_gid, opts, full_payload=True
+        ),
+        {"limit": METADATA_PAGE_SIZE, "opt_fields": _CUSTOM_FIELD_FIELDS},
+    ):
+        custom_fields.extend(
+            setting["custom_field"]
+            for setting in page
+            if isinstance(setting, dict) and isinstance(setting.get("custom_field"), dict)
+        )
+
+    users = []
+    if workspace_gid:
+        users_api = asana.UsersApi(api_client)
+        for page in iter_asana_pages(
+            "list workspace users",
+            lambda opts: users_api.get_users_for_workspace(workspace_gid, opts, full_payload=True),
+            {"limit": METADATA_PAGE_SIZE, "opt_fields": _USER_FIELDS},
+        ):
+            users.extend(page)
+
+    return AsanaMetadata.from_dict({
+        "project_gid": project_gid,
+        "workspace_gid": workspace_gid,
+        "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "custom_fields": custom_fields,
+        "users": users,
+    })
+
+
+def load_metadata(
+    asana_token: str,
+    project_gid: str,
+    *,
+    host: Optional[str] = None,
+    ttl_hours: float = DEFAULT_METADATA_TTL_HOURS,
+    force: bool = False,
+) -> Optional[AsanaMetadata]:
+    """Return cached metadata, refreshing it from Asana once it has expired.
+
+    When Asana cannot be reached the stale cache is returned instead (or
+    ``None`` when nothing was ever fetched), so callers fall back to the
+    values in ``config.json``.
+    """
+
+    cached = load_cached_metadata(project_gid)
+    if cached is not None and not force and cached.is_fresh(ttl_hours):
+        return cached
+    try:
+        metadata = fetch_metadata(asana_token, project_gid, host=host)
+    except Exception as exc:
+        print(f"WARN: Failed to refresh Asana metadata for project {project_gid}: {exc}")
+        return cached
+    functions.database.set_meta(METADATA_META_PREFIX + project_gid, json.dumps(metadata.to_dict()))
+    print(
+        f"INFO: Cached Asana metadata for project {project_gid}:"
+        f" {len(metadata.custom_fields)} custom fields, {len(metadata.users)} users"
+    )
+    return metadata
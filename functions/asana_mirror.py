@@ -0,0 +1,263 @@
+"""Local mirror of the configured Asana project for duplicate detection.
+
+Tasks are copied into the ``asana_tasks`` table of ``history.db`` by an
+incremental sync that only asks Asana for tasks modified since the previous
+run.  An in-memory trigram index over the task names answers "does a task
+like this already exist?" in well under a millisecond, so the check can run
+on the Tk thread before a task is created without touching the network.
+
+Asana's ``modified_since`` filter does not report deleted tasks; they stay in
+the mirror until a full resync (:func:`sync_project` with ``full=True``).
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional
+
+import functions.database
+from functions.asana_settings import DEFAULT_DUPLICATE_THRESHOLD, DEFAULT_SYNC_INTERVAL_MINUTES
+from functions.metrics import timed
+
+# Tasks requested per page; Asana allows at most 100.
+SYNC_PAGE_SIZE = 100
+DUPLICATE_MATCH_LIMIT = 3
+# modified_since is taken from our clock, so overlap runs a little to cover
+# clock skew with Asana; re-fetching a task is harmless.
+SYNC_OVERLAP = timedelta(minutes=2)
+SYNC_META_PREFIX = "asana_mirror_synced_at:"
+_SYNC_FIELDS = "name,notes,completed,due_on,modified_at"
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.casefold()))
+
+
+def _trigrams(text: str) -> frozenset[str]:
+    normalized = _normalize(text)
+    if not normalized:
+        return frozenset()
+    padded = f"  {normalized} "
+    return frozenset(padded[index:index + 3] for index in range(len(padded) - 2))
+
+
+@dataclass(frozen=True)
+class MirroredTask:
+    gid: str
+    name: str
+    completed: bool
+    due_on: Optional[str]
+
+
+@dataclass(frozen=True)
+class SimilarTask:
+    task: MirroredTask
+    score: float
+
+
+class TaskIndex:
+    """Trigram index over the names of mirrored tasks.
+
+    The index is rebuilt off the Tk thread and swapped in as a whole, so
+    lookups never wait for a sync.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tasks: dict[str, tuple[MirroredTask, int]] = {}
+        self._postings: dict[str, tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def rebuild(self, tasks: Iterable[MirroredTask]) -> None:
+        entries: dict[str, tuple[MirroredTask, int]] = {}
+        postings: dict[str, list[str]] = {}
+        for task in tasks:
+            grams = _trigrams(task.name)
+            if not grams:
+                continue
+            entries[task.gid] = (task, len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(task.gid)
+        frozen_postings = {gram: tuple(gids) for gram, gids in postings.items()}
+        with self._lock:
+            self._tasks = entries
+            self._postings = frozen_postings
+
+    def find_similar(
+        self,
+        name: str,
+        *,
+        threshold: float = DEFAULT_DUPLICATE_THRESHOLD,
+        limit: int = DUPLICATE_MATCH_LIMIT,
+    ) -> list[SimilarTask]:
+        """Return up to *limit* tasks whose names resemble *name*, best first.
+
+        Similarity is the Dice coefficient of the two names' trigram sets;
+        open tasks are listed before completed ones.
+        """
+
+        grams = _trigrams(name)
+        if not grams:
+            return []
+        with self._lock:
+            tasks = self._tasks
+            postings = self._postings
+        shared: dict[str, int] = {}
+        for gram in grams:
+            for gid in postings.get(gram, ()):
+                shared[gid] = shared.get(gid, 0) + 1
+        matches = []
+        for gid, count in shared.items():
+            task, size = tasks[gid]
+            score = 2 * count / (len(grams) + size)
+            if score >= threshold:
+                matches.append(SimilarTask(task, score))
+        matches.sort(key=lambda match: (match.task.completed, -match.score))
+        return matches[:limit]
+
+
+TASK_INDEX = TaskIndex()
+
+
+def load_index(index: TaskIndex = TASK_INDEX, project_gids: Optional[Iterable[str]] = None) -> int:
+    """Rebuild *index* from the mirror table; return the number of tasks."""
+
+    conn = functions.database.connect()
+    try:
+        query = "SELECT gid, name, completed, due_on FROM asana_tasks"
+        params: list = []
+        gids = list(project_gids or ())
+        if gids:
+            query += f" WHERE project_gid IN ({','.join('?' * len(gids))})"
+            params = gids
+        tasks = [
+            MirroredTask(gid, name or "", bool(completed), due_on)
+            for gid, name, completed, due_on in conn.execute(query, params)
+        ]
+    finally:
+        conn.close()
+    index.rebuild(tasks)
+    return len(tasks)
+
+
+def _upsert_tasks(conn, project_gid: str, tasks: list[dict]) -> None:
+    conn.executemany(
+        """
+        INSERT INTO asana_tasks (gid, project_gid, name, notes, completed, due_on, modified_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(gid) DO UPDATE SET
+            project_gid=excluded.project_gid,
+            name=excluded.name,
+            notes=excluded.notes,
+            completed=excluded.completed,
+            due_on=excluded.due_on,
+            modified_at=excluded.modified_at
+        """,
+        [
+            (
+                task["gid"],
+                project_gid,
+                task.get("name") or "",
+                task.get("notes") or "",
+                1 if task.get("completed") else 0,
+                task.get("due_on"),
+                task.get("modified_at"),
+            )
+            for task in tasks
+            if isinstance(task, dict) and task.get("gid")
+        ],
+    )
+
+
+@timed("asana.mirror_sync")
+def sync_project(
+    asana_token: str,
+    project_gid: str,
+    *,
+    host: Optional[str] = None,
+    full: bool = False,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> int:
+    """Fetch tasks of *project_gid* changed since the last sync into the mirror.
+
+    Each page is committed as it arrives, but the sync time only advances
+    once every page has been read, so an interrupted sync is simply repeated.
+    Returns the number of tasks fetched.
+    """
+
+    import asana  # Imported on first use; the SDK is slow to load.
+    from functions.asana_api import iter_asana_pages
+
+    configuration = asana.Configuration()
+    configuration.access_token = asana_token
+    if host:
+        configuration.host = host.rstrip("/")
+    tasks_api = asana.TasksApi(asana.ApiClient(configuration))
+
+    meta_key = SYNC_META_PREFIX + project_gid
+    started = datetime.now(timezone.utc)
+    opts = {"project": project_gid, "limit": SYNC_PAGE_SIZE, "opt_fields": _SYNC_FIELDS}
+    last_sync = None if full else functions.database.get_meta(meta_key)
+    if last_sync:
+        opts["modified_since"] = last_sync
+
+    fetched = 0
+    conn = functions.database.connect()
+    try:
+        pages = iter_asana_pages(
+            "list project tasks",
+            lambda page_opts: tasks_api.get_tasks(page_opts, full_payload=True),
+            opts,
+        )
+        for tasks in pages:
+            _upsert_tasks(conn, project_gid, tasks)
+            conn.commit()
+            fetched += len(tasks)
+            if should_stop is not None and should_stop():
+                print(f"INFO: Asana mirror sync stopped after {fetched} tasks")
+                return fetched
+    finally:
+        conn.close()
+
+    functions.database.set_meta(
+        meta_key, (started - SYNC_OVERLAP).isoformat(timespec="seconds").replace("+00:00", "Z")
+    )
+    print(
+        f"INFO: Asana mirror synced {fetched} tasks for project {project_gid}"
+        + (" (full)" if not last_sync else "")
+    )
+    return fetched
+
+
+def sync_and_reload(
+    asana_token: str,
+    project_gids: Iterable[str],
+    *,
+    host: Optional[str] = None,
+    index: TaskIndex = TASK_INDEX,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> None:
+    """Sync every project, then rebuild *index* from the mirror.
+
+    The index is loaded from the local table first so duplicate warnings
+    work straight away, even while Asana is slow or unreachable.
+    """
+
+    project_gids = list(project_gids)
+    if not len(index):
+        load_index(index, project_gids)
+    changed = 0
+    for project_gid in project_gids:
+        try:
+            changed += sync_project(asana_token, project_gid, host=host, should_stop=should_stop)
+        except Exception as exc:
+            print(f"WARN: Asana mirror sync failed for project {project_gid}: {exc}")
+    if changed:
+        load_index(index, project_gids)
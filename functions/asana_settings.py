@@ -0,0 +1,261 @@
+"""Immutable Asana settings derived once from ``config.json``."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+# Default name similarity (0-1) at which the project mirror warns about a
+# likely duplicate task.
+DEFAULT_DUPLICATE_THRESHOLD = 0.6
+# Minutes between background syncs of the project mirror.
+DEFAULT_SYNC_INTERVAL_MINUTES = 15
+# Hours before cached custom fields, enum options and users are refreshed.
+DEFAULT_METADATA_TTL_HOURS = 24.0
+
+
+def _freeze(value: Any) -> Any:
+    """Return a read-only copy of nested JSON-like *value*."""
+
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Return a mutable copy of a value produced by :func:`_freeze`."""
+
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _copier_for(frozen: Any):
+    """Return the cheapest callable that makes a mutable copy of *frozen*."""
+
+    if isinstance(frozen, tuple):
+        if not any(isinstance(item, (tuple, Mapping)) for item in frozen):
+            return list
+    elif isinstance(frozen, Mapping):
+        if not any(isinstance(item, (tuple, Mapping)) for item in frozen.values()):
+            return dict
+    else:
+        return None
+    return _thaw
+
+
+def _collect_project_ids(value, project_ids: list[str]) -> None:
+    """Collect project gids from the various shapes Asana accepts."""
+
+    if isinstance(value, str):
+        project_id = value.strip()
+        if project_id and project_id not in project_ids:
+            project_ids.append(project_id)
+    elif isinstance(value, dict):
+        gid = value.get("gid")
+        if isinstance(gid, str):
+            _collect_project_ids(gid, project_ids)
+    elif isinstance(value, (list, tuple, set)):
+        for candidate in value:
+            _collect_project_ids(candidate, project_ids)
+
+
+@dataclass(frozen=True, slots=True)
+class AsanaSettings:
+    """Validated Asana configuration and a pre-merged task payload template.
+
+    Build it once with :meth:`from_config`; :meth:`build_task_data` then only
+    overlays the handful of per-task fields onto the template.
+    """
+
+    assignees: Mapping[str, str]
+    assignee_choices: tuple[str, ...]
+    default_assignee: str
+    priority_field_id: Optional[str]
+    priority_options: Mapping[str, Any]
+    priority_choices: tuple[str, ...]
+    default_priority: str
+    project_ids: tuple[str, ...]
+    custom_fields: Mapping[str, Any]
+    payload_template: Mapping[str, Any]
+    # Name similarity above which the local project mirror reports a likely
+    # duplicate; ``None`` disables the check.
+    duplicate_threshold: Optional[float]
+    # Fully merged ``custom_fields`` and their copier for each priority label
+    # (``None`` for no priority) so the per-task path never re-applies
+    # precedence rules.
+    _custom_fields_by_priority: Mapping[Optional[str], tuple[Mapping[str, Any], Any]] = field(repr=False)
+    # ``payload_template`` split into scalar entries and (key, value, copier)
+    # triples for nested values, so building a payload needs no recursion.
+    _template_scalars: Mapping[str, Any] = field(repr=False)
+    _template_containers: tuple[tuple[str, Any, Any], ...] = field(repr=False)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "AsanaSettings":
+        """Validate and normalise the Asana keys of *config*."""
+
+        asana_workspace = config.get("asana_workspace") or ""
+
+        assignee_options_raw = config.get("asana_assignees", [])
+        assignee_choices = []
+        assignee_lookup = {}
+        if isinstance(assignee_options_raw, list):
+            for entry in assignee_options_raw:
+                if not isinstance(entry, dict):
+                    continue
+                name = entry.get("name")
+                if not isinstance(name, str) or not name:
+                    continue
+                raw_value = (
+                    entry.get("gid")
+                    or entry.get("email")
+                    or entry.get("value")
+                    or ""
+                )
+                if isinstance(raw_value, str):
+                    value = raw_value.replace("{workspace}", asana_workspace)
+                else:
+                    value = ""
+                assignee_choices.append(name)
+                assignee_lookup[name.casefold()] = value
+        if not assignee_choices:
+            assignee_choices = ["Unassigned"]
+        if not any(choice.casefold() == "unassigned" for choice in assignee_choices):
+            assignee_choices.append("Unassigned")
+        assignee_lookup.setdefault("unassigned", "")
+        assignee_choices = list(dict.fromkeys(assignee_choices))
+        default_assignee = config.get("asana_default_assignee")
+        if not isinstance(default_assignee, str) or default_assignee not in assignee_choices:
+            default_assignee = assignee_choices[0]
+
+        priority_options_raw = config.get("asana_priority_options")
+        priority_mapping = {}
+        if isinstance(priority_options_raw, dict):
+            for label, value in priority_options_raw.items():
+                if isinstance(label, str):
+                    priority_mapping[label] = value
+        priority_field_id = config.get("asana_priority_field_id")
+        if not isinstance(priority_field_id, str) or not priority_field_id.strip():
+            priority_field_id = None
+        default_priority = config.get("asana_default_priority")
+        if priority_mapping:
+            if not isinstance(default_priority, str) or default_priority not in priority_mapping:
+                default_priority = next(iter(priority_mapping))
+            priority_choices = list(priority_mapping.keys())
+        else:
+            if not isinstance(default_priority, str) or not default_priority:
+                default_priority = "None"
+            priority_choices = [default_priority]
+
+        additional_custom_fields = config.get("asana_custom_fields")
+        if not isinstance(additional_custom_fields, dict):
+            additional_custom_fields = {}
+
+        task_defaults_raw = config.get("asana_task_defaults")
+        template = dict(task_defaults_raw) if isinstance(task_defaults_raw, dict) else {}
+
+        project_ids: list[str] = []
+        _collect_project_ids(template.pop("projects", None), project_ids)
+        _collect_project_ids(config.get("asana_project_id"), project_ids)
+        if project_ids:
+            template["projects"] = project_ids
+
+        default_custom_fields = template.pop("custom_fields", None)
+        if not isinstance(default_custom_fields, dict):
+            default_custom_fields = {}
+
+        # Priority sits between the task default fields and the explicitly
+        # configured custom fields, which always win.
+        custom_fields_by_priority = {}
+        for label in [None, *priority_mapping]:
+            merged = dict(default_custom_fields)
+            if label is not None and priority_field_id:
+                merged[priority_field_id] = priority_mapping[label]
+            merged.update(additional_custom_fields)
+            frozen_fields = _freeze(merged)
+            custom_fields_by_priority[label] = (frozen_fields, _copier_for(frozen_fields))
+
+        duplicate_threshold = config.get("asana_duplicate_threshold", DEFAULT_DUPLICATE_THRESHOLD)
+        if (
+            isinstance(duplicate_threshold, bool)
+            or not isinstance(duplicate_threshold, (int, float))
+            or not 0 < duplicate_threshold <= 1
+        ):
+            duplicate_threshold = None
+
+        payload_template = _freeze(template)
+        template_scalars = {}
+        template_containers = []
+        for key, value in payload_template.items():
+            copier = _copier_for(value)
+            if copier is None:
+                template_scalars[key] = value
+            else:
+                template_containers.append((key, value, copier))
+
+        return cls(
+            assignees=MappingProxyType(assignee_lookup),
+            assignee_choices=tuple(assignee_choices),
+            default_assignee=default_assignee,
+            priority_field_id=priority_field_id,
+            priority_options=_freeze(priority_mapping),
+            priority_choices=tuple(priority_choices),
+            default_priority=default_priority,
+            project_ids=tuple(project_ids),
+            custom_fields=_freeze(additional_custom_fields),
+            payload_template=payload_template,
+            duplicate_threshold=float(duplicate_threshold) if duplicate_threshold else None,
+            _custom_fields_by_priority=MappingProxyType(custom_fields_by_priority),
+            _template_scalars=MappingProxyType(template_scalars),
+            _template_containers=tuple(template_containers),
+        )
+
+    def resolve_assignee(self, assignee_name: Optional[str]) -> str:
+        """Return the Asana assignee value for a menu label, or ``""``."""
+
+        if not isinstance(assignee_name, str):
+            return ""
+        return self.assignees.get(assignee_name.casefold(), "")
+
+    def match_priority(self, hint: Optional[str]) -> Optional[str]:
+        """Return the priority label matching a model's priority *hint*, if any."""
+
+        if not isinstance(hint, str) or not hint or hint.casefold() == "none":
+            return None
+        for choice in self.priority_choices:
+            if choice.casefold() == hint.casefold():
+                return choice
+        return None
+
+    def build_task_data(
+        self,
+        *,
+        name: str,
+        notes: str,
+        due_on: str = "",
+        assignee: str = "",
+        priority: Optional[str] = None,
+    ) -> dict:
+        """Return a fresh ``data`` payload with the per-task fields applied."""
+
+        data = dict(self._template_scalars)
+        for key, value, copier in self._template_containers:
+            data[key] = copier(value)
+        data["name"] = name
+        if due_on:
+            data["due_on"] = due_on
+        data["notes"] = notes
+        merged_fields = self._custom_fields_by_priority.get(priority)
+        if merged_fields is None:
+            merged_fields = self._custom_fields_by_priority[None]
+        custom_fields, copier = merged_fields
+        if custom_fields:
+            data["custom_fields"] = copier(custom_fields)
+        if assignee:
+            data["assignee"] = assignee
+        return data
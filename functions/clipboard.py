@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import sys
+import time
 import tkinter as tk
 from typing import Iterable, Optional
 
@@ -26,51 +27,215 @@ def set_clipboard_html(
 def get_clipboard_html(widget: tk.Misc) -> Optional[str]:
     """Return the HTML fragment currently stored on the clipboard, if any."""
 
-    html_data = _get_html_via_tk(widget)
+    html_data = get_clipboard_html_raw(widget)
     if html_data:
-        fragment = _extract_cf_html_fragment(html_data)
-        return fragment or html_data
+        return extract_clipboard_fragment(html_data)
+    return None
+
+
+def get_clipboard_html_raw(widget: tk.Misc, *, exhaustive: bool = False) -> Optional[str]:
+    """Return the raw HTML clipboard payload without extracting the fragment.
+
+    Reading the clipboard must happen on the Tk thread, but fragment
+    extraction is pure string work and can be deferred to a worker via
+    :func:`extract_clipboard_fragment`.  ``exhaustive`` also probes targets
+    that are not known HTML formats.
+    """
+
+    html_data = _get_html_via_tk(widget, exhaustive=exhaustive)
+    if html_data:
+        return html_data
 
     if sys.platform.startswith("win"):
         html_data = _get_html_windows()
         if html_data:
-            fragment = _extract_cf_html_fragment(html_data)
-            return fragment or html_data
+            return html_data
 
     return None
 
 
-def _get_html_via_tk(widget: tk.Misc) -> Optional[str]:
-    targets: Iterable[str]
-    try:
-        tk_targets = widget.tk.call("clipboard", "types")
-    except tk.TclError:
-        tk_targets = ()
-    if tk_targets:
-        targets = widget.tk.splitlist(tk_targets)
-    else:
-        targets = ()
-
-    preferred_order = ["text/html", "HTML Format", "text/_moz_htmlcontext"]
-    seen = set()
-    ordered_targets = []
-    for candidate in preferred_order:
-        if candidate in targets and candidate not in seen:
-            ordered_targets.append(candidate)
-            seen.add(candidate)
-    for candidate in targets:
-        if candidate not in seen:
-            ordered_targets.append(candidate)
-            seen.add(candidate)
-
-    for target in ordered_targets or ("text/html", "HTML Format"):
+def extract_clipboard_fragment(raw_html: str) -> str:
+    """Return the CF_HTML fragment from *raw_html*, or *raw_html* itself."""
+
+    fragment = _extract_cf_html_fragment(raw_html)
+    return fragment or raw_html
+
+
+# HTML targets in order of preference.  Only these are requested unless the
+# caller explicitly asks for the exhaustive fallback over every advertised
+# target.
+PREFERRED_HTML_TARGETS = ("text/html", "HTML Format", "text/_moz_htmlcontext")
+
+
+class TkClipboardBackend:
+    """Clipboard access through Tk's ``clipboard``/``selection`` commands."""
+
+    def __init__(self, widget: tk.Misc) -> None:
+        self._widget = widget
+
+    def owner(self) -> str:
+        """Return a token identifying the current clipboard owner.
+
+        On Windows this is the owning window handle.  Elsewhere Tk only
+        reports owners inside this application, so every external owner
+        shares the empty token and the cache holds a single last-working
+        target for them.  Cached targets are verified on use, so a stale
+        token costs one failed request rather than a wrong result.
+        """
+
+        if sys.platform.startswith("win"):
+            owner = _clipboard_owner_windows()
+            if owner is not None:
+                return owner
         try:
-            data = widget.tk.call("clipboard", "get", "-type", target)
+            return str(
+                self._widget.tk.call("selection", "own", "-selection", "CLIPBOARD")
+            )
         except tk.TclError:
-            continue
-        if data:
-            return str(data)
-    return None
+            return ""
+
+    def targets(self) -> tuple[str, ...]:
+        try:
+            tk_targets = self._widget.tk.call("clipboard", "types")
+        except tk.TclError:
+            return ()
+        if not tk_targets:
+            return ()
+        return tuple(str(target) for target in self._widget.tk.splitlist(tk_targets))
+
+    def get(self, target: str) -> Optional[str]:
+        try:
+            data = self._widget.tk.call("clipboard", "get", "-type", target)
+        except tk.TclError:
+            return None
+        return str(data) if data else None
+
+
+class FakeClipboardBackend:
+    """In-memory clipboard used to exercise negotiation without a display.
+
+    ``latency`` seconds are slept on every ``targets``/``get`` call to model a
+    slow selection round-trip, and each call is recorded in :attr:`calls`.
+    Owner queries are answered locally by Tk, so they are recorded but free.
+    """
+
+    def __init__(
+        self,
+        payloads: Optional[dict[str, str]] = None,
+        *,
+        owner: str = "",
+        latency: float = 0.0,
+    ) -> None:
+        self.payloads: dict[str, str] = dict(payloads or {})
+        self.current_owner = owner
+        self.latency = latency
+        self.calls: list[tuple[str, str]] = []
+
+    def set_contents(self, payloads: dict[str, str], *, owner: str = "") -> None:
+        self.payloads = dict(payloads)
+        self.current_owner = owner
+
+    def _round_trip(self, operation: str, argument: str = "") -> None:
+        self.calls.append((operation, argument))
+        if self.latency:
+            time.sleep(self.latency)
+
+    def owner(self) -> str:
+        self.calls.append(("owner", ""))
+        return self.current_owner
+
+    def targets(self) -> tuple[str, ...]:
+        self._round_trip("targets")
+        return tuple(self.payloads)
+
+    def get(self, target: str) -> Optional[str]:
+        self._round_trip("get", target)
+        return self.payloads.get(target) or None
+
+
+class ClipboardNegotiator:
+    """Fetch HTML from the clipboard with as few round-trips as possible.
+
+    The target that produced HTML is remembered per owner token and tried
+    first on the next paste, skipping the ``types`` query entirely.  How
+    fine-grained that is depends on the backend's ``owner``; see
+    :meth:`TkClipboardBackend.owner`.  Targets
+    outside *preferred_targets* are only probed when ``exhaustive`` is set.
+    """
+
+    def __init__(
+        self,
+        backend,
+        preferred_targets: Iterable[str] = PREFERRED_HTML_TARGETS,
+    ) -> None:
+        self.backend = backend
+        self.preferred_targets = tuple(preferred_targets)
+        self._owner_targets: dict[str, str] = {}
+
+    def forget(self) -> None:
+        """Drop every cached owner/target pairing."""
+
+        self._owner_targets.clear()
+
+    def fetch_html(self, *, exhaustive: bool = False) -> Optional[str]:
+        owner = self.backend.owner()
+        tried: set[str] = set()
+
+        cached_target = self._owner_targets.get(owner)
+        if cached_target:
+            data = self.backend.get(cached_target)
+            if data:
+                return data
+            tried.add(cached_target)
+            self._owner_targets.pop(owner, None)
+
+        advertised = self.backend.targets()
+        if advertised:
+            candidates = [target for target in self.preferred_targets if target in advertised]
+        else:
+            # Some clipboard managers do not answer ``types``; fall back to
+            # asking for the common HTML targets directly.
+            candidates = list(self.preferred_targets[:2])
+        if exhaustive:
+            candidates.extend(target for target in advertised if target not in candidates)
+
+        for target in candidates:
+            if target in tried:
+                continue
+            tried.add(target)
+            data = self.backend.get(target)
+            if data:
+                self._owner_targets[owner] = target
+                return data
+        return None
+
+
+def get_clipboard_negotiator(widget: tk.Misc) -> ClipboardNegotiator:
+    """Return the negotiator cached on *widget*, creating it on first use."""
+
+    negotiator = getattr(widget, "clipboard_negotiator", None)
+    if not isinstance(negotiator, ClipboardNegotiator):
+        negotiator = ClipboardNegotiator(TkClipboardBackend(widget))
+        setattr(widget, "clipboard_negotiator", negotiator)
+    return negotiator
+
+
+def _get_html_via_tk(widget: tk.Misc, *, exhaustive: bool = False) -> Optional[str]:
+    return get_clipboard_negotiator(widget).fetch_html(exhaustive=exhaustive)
+
+
+def _clipboard_owner_windows() -> Optional[str]:  # pragma: no cover - platform specific
+    try:
+        import ctypes
+    except Exception:
+        return None
+    try:
+        get_clipboard_owner = ctypes.windll.user32.GetClipboardOwner
+        get_clipboard_owner.restype = ctypes.c_void_p
+        handle = get_clipboard_owner()
+    except Exception:
+        return None
+    return f"hwnd:{handle or 0}"
 
 
 def _extract_cf_html_fragment(raw_html: str) -> Optional[str]:
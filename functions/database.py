@@ -1,16 +1,113 @@
+import hashlib
 import os
 import sqlite3
+import time
+import zlib
 from datetime import datetime
 import tkinter as tk
 
 import functions.ui
+from functions.metrics import timed
+
+try:  # Optional: better ratio and faster decompression than zlib.
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
 
 # Database Path
 DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "history.db"))
 
+# Texts shorter than this are stored uncompressed; the header overhead of
+# zlib/zstd outweighs any saving.
+BLOB_COMPRESS_MIN_BYTES = 64
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+# Rows rewritten per transaction while moving legacy TEXT columns to blobs.
+MIGRATION_BATCH_SIZE = 500
+# How long writers wait for a lock held by a background job.
+CONNECT_TIMEOUT_SECONDS = 30
+# Saves retried after a "database is locked" error, so a reply is not lost
+# when a long background write outlasts the timeout.
+SAVE_ATTEMPTS = 3
+SAVE_RETRY_DELAY_SECONDS = 1.0
+# Set when a blob migration left space that only a full VACUUM can reclaim.
+VACUUM_PENDING_META_KEY = "vacuum_pending"
+# Rows fetched per request by the history browser.
+HISTORY_PAGE_SIZE = 200
+
+
+def connect():
+    """Open a connection to the history database."""
+    return sqlite3.connect(DB_PATH, timeout=CONNECT_TIMEOUT_SECONDS)
+
+
+# Blob storage -----------------------------------------------------------------
+
+def _compress(raw: bytes) -> tuple[str, bytes]:
+    """Return ``(codec, data)`` for *raw*, falling back to ``raw`` storage."""
+    if len(raw) < BLOB_COMPRESS_MIN_BYTES:
+        return "raw", raw
+    if zstandard is not None:
+        codec, data = "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    else:
+        codec, data = "zlib", zlib.compress(raw, ZLIB_LEVEL)
+    if len(data) >= len(raw):
+        return "raw", raw
+    return codec, data
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "raw":
+        return bytes(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError(
+                "This history entry is zstd-compressed; install the 'zstandard' package to read it."
+            )
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown history blob codec: {codec}")
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest used as the blob key for *text*."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def store_blob(cursor, text) -> str:
+    """Store *text* once and return its hash; identical texts share a row."""
+    text = text or ""
+    digest = content_hash(text)
+    cursor.execute("SELECT 1 FROM blobs WHERE hash=?", (digest,))
+    if cursor.fetchone() is None:
+        raw = text.encode("utf-8")
+        codec, data = _compress(raw)
+        cursor.execute(
+            "INSERT OR IGNORE INTO blobs (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+            (digest, codec, len(raw), sqlite3.Binary(data)),
+        )
+    return digest
+
+
+def load_blob(cursor, digest) -> str:
+    """Return the text stored under *digest* (``""`` when missing)."""
+    if not digest:
+        return ""
+    cursor.execute("SELECT codec, data FROM blobs WHERE hash=?", (digest,))
+    row = cursor.fetchone()
+    if row is None:
+        print(f"WARN: History blob {digest} is missing")
+        return ""
+    return _decompress(row[0], row[1]).decode("utf-8")
+
+
 # History Database
 def init_history_db():
-    with sqlite3.connect(DB_PATH) as conn:
+    with connect() as conn:
+        # Only takes effect on a new file; existing databases are switched
+        # over by vacuum_if_pending after migrate_history_to_blobs.
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
         conn.execute('''
             CREATE TABLE IF NOT EXISTS history (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -18,28 +115,202 @@ def init_history_db():
                 mode TEXT,
                 tone TEXT,
                 input TEXT,
-                output TEXT
+                output TEXT,
+                input_hash TEXT,
+                output_hash TEXT
+            )
+    ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            ) WITHOUT ROWID
+    ''')
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(history)")}
+        for column in ("input_hash", "output_hash"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE history ADD COLUMN {column} TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_input_hash ON history(input_hash)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_output_hash ON history(output_hash)")
+        # Secondary indexes end with the rowid, so these also serve the
+        # (timestamp, id) order of the history browser without a sort.
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history(timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_mode_id ON history(mode, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_mode_timestamp ON history(mode, timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_tone_timestamp ON history(tone, timestamp)")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+    ''')
+        # Local copy of the Asana project (see functions.asana_mirror).
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS asana_tasks (
+                gid TEXT PRIMARY KEY,
+                project_gid TEXT,
+                name TEXT,
+                notes TEXT,
+                completed INTEGER NOT NULL DEFAULT 0,
+                due_on TEXT,
+                modified_at TEXT
             )
     ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_asana_tasks_project ON asana_tasks(project_gid)")
 
+@timed("history.save")
 def save_to_history(mode, tone, email_text, response):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
     cleaned_response = functions.ui.normalize_markdown_spacing(response or "")
-    c.execute('''
-            INSERT INTO history (timestamp, mode, tone, input, output)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (datetime.now().isoformat(), mode, tone, email_text, cleaned_response))
-    conn.commit()
-    conn.close()
+    timestamp = datetime.now().isoformat()
+    for attempt in range(1, SAVE_ATTEMPTS + 1):
+        try:
+            _insert_history(timestamp, mode, tone, email_text, cleaned_response)
+            return
+        except sqlite3.OperationalError as exc:
+            if "locked" not in str(exc) or attempt == SAVE_ATTEMPTS:
+                raise
+            print(f"WARN: History database is busy ({exc}); retrying save")
+            time.sleep(SAVE_RETRY_DELAY_SECONDS)
 
-def load_history(history_list, input_text, output_text):
-    conn = sqlite3.connect(DB_PATH)
+def _insert_history(timestamp, mode, tone, email_text, response):
+    conn = connect()
+    try:
+        c = conn.cursor()
+        input_hash = store_blob(c, email_text)
+        output_hash = store_blob(c, response)
+        c.execute('''
+                INSERT INTO history (timestamp, mode, tone, input_hash, output_hash)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (timestamp, mode, tone, input_hash, output_hash))
+        conn.commit()
+    finally:
+        conn.close()
+
+def fetch_recent_history(limit=10):
+    """Return ``(id, timestamp)`` pairs for the newest history rows."""
+    conn = connect()
     c = conn.cursor()
-    c.execute("SELECT id, timestamp FROM history ORDER BY id DESC LIMIT 10")
+    c.execute("SELECT id, timestamp FROM history ORDER BY id DESC LIMIT ?", (limit,))
     entries = c.fetchall()
     conn.close()
+    return entries
+
+@timed("history.fetch_page")
+def fetch_history_page(
+    *,
+    before=None,
+    after=None,
+    limit=HISTORY_PAGE_SIZE,
+    mode=None,
+    tone=None,
+    since=None,
+    until=None,
+):
+    """Return up to *limit* ``(id, timestamp, mode, tone)`` rows, newest first.
+
+    Pages are keyed on ``(timestamp, id)``: pass the last row's pair of the
+    previous page as *before* for older rows, or the first row's pair as
+    *after* for the newer rows above it.  Every page is an index range scan
+    without a sort, however deep the user scrolls and whatever the filters.
+    *since*/*until* are ISO date or timestamp strings; *until* is exclusive.
+    """
+    conditions = []
+    params = []
+    if before is not None:
+        conditions.append("(timestamp, id) < (?, ?)")
+        params.extend(before)
+    if after is not None:
+        conditions.append("(timestamp, id) > (?, ?)")
+        params.extend(after)
+    if mode:
+        conditions.append("mode = ?")
+        params.append(mode)
+    if tone:
+        conditions.append("tone = ?")
+        params.append(tone)
+    if since:
+        conditions.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        conditions.append("timestamp < ?")
+        params.append(until)
+    # Newer pages are read upwards from *after* and flipped afterwards.
+    direction = "ASC" if after is not None else "DESC"
+    conn = connect()
+    try:
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = conn.execute(
+            f"SELECT id, timestamp, mode, tone FROM history {where}"
+            f" ORDER BY timestamp {direction}, id {direction} LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+    return rows[::-1] if after is not None else rows
+
+def fetch_history_filter_values():
+    """Return the distinct ``(modes, tones)`` present in the history table."""
+    conn = connect()
+    try:
+        modes = [row[0] for row in conn.execute(
+            "SELECT DISTINCT mode FROM history WHERE mode IS NOT NULL ORDER BY mode"
+        )]
+        tones = [row[0] for row in conn.execute(
+            "SELECT DISTINCT tone FROM history WHERE tone IS NOT NULL ORDER BY tone"
+        )]
+        return modes, tones
+    finally:
+        conn.close()
+
+@timed("history.fetch_texts")
+def fetch_history_texts(entry_id):
+    """Return ``(input, output)`` for a history row, or ``None`` if missing.
+
+    Rows written before blob storage keep their text inline until
+    :func:`migrate_history_to_blobs` moves it.
+    """
+    conn = connect()
+    try:
+        c = conn.cursor()
+        c.execute(
+            "SELECT input, output, input_hash, output_hash FROM history WHERE id=?",
+            (entry_id,),
+        )
+        row = c.fetchone()
+        if row is None:
+            return None
+        return resolve_history_texts(c, *row)
+    finally:
+        conn.close()
+
+def resolve_history_texts(cursor, input_text, output_text, input_hash, output_hash):
+    """Return ``(input, output)`` from a row's inline text or blob hashes."""
+    if input_hash:
+        input_text = load_blob(cursor, input_hash)
+    if output_hash:
+        output_text = load_blob(cursor, output_hash)
+    return input_text or "", output_text or ""
+
+def get_meta(key, default=None):
+    """Return a value from the small ``meta`` key/value table."""
+    conn = connect()
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else default
+    finally:
+        conn.close()
 
+def set_meta(key, value):
+    with connect() as conn:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+            (key, value),
+        )
+
+def populate_history_menu(history_list, entries, input_text, output_text):
     history_list.menu.delete(0, "end")
     for entry_id, timestamp in entries:
         history_list.menu.add_command(
@@ -47,13 +318,99 @@ def load_history(history_list, input_text, output_text):
             command=lambda eid=entry_id: load_history_entry(eid, input_text, output_text)
         )
 
+def load_history(history_list, input_text, output_text):
+    entries = fetch_recent_history()
+    populate_history_menu(history_list, entries, input_text, output_text)
+
 def load_history_entry(entry_id, input_text, output_text):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT input, output FROM history WHERE id=?", (entry_id,))
-    row = c.fetchone()
-    conn.close()
+    row = fetch_history_texts(entry_id)
     if row:
         input_text.delete("1.0", tk.END)
         input_text.insert(tk.END, row[0])
         functions.ui.display_markdown(output_text, row[1] or "")
+
+def history_needs_blob_migration():
+    """Return True when rows still keep their text in the legacy columns."""
+    conn = connect()
+    try:
+        row = conn.execute(
+            "SELECT 1 FROM history WHERE input_hash IS NULL LIMIT 1"
+        ).fetchone()
+        return row is not None
+    finally:
+        conn.close()
+
+def migrate_history_to_blobs(batch_size=MIGRATION_BATCH_SIZE, *, should_stop=None):
+    """Move legacy ``input``/``output`` text into deduplicated blobs.
+
+    Rows are rewritten in short transactions so the app can keep saving
+    history meanwhile.  The space freed this way is reclaimed later: by the
+    maintenance job's incremental vacuum when the file already uses
+    incremental auto-vacuum, otherwise by :func:`vacuum_if_pending`.
+    Returns the number of rows migrated.
+    """
+    migrated = 0
+    last_id = 0
+    conn = connect()
+    try:
+        c = conn.cursor()
+        while True:
+            if should_stop is not None and should_stop():
+                print(f"INFO: History blob migration paused after {migrated} rows")
+                return migrated
+            c.execute(
+                '''
+                SELECT id, input, output FROM history
+                WHERE input_hash IS NULL AND id > ?
+                ORDER BY id LIMIT ?
+                ''',
+                (last_id, batch_size),
+            )
+            rows = c.fetchall()
+            if not rows:
+                break
+            for entry_id, input_text, output_text in rows:
+                c.execute(
+                    '''
+                    UPDATE history
+                    SET input_hash=?, output_hash=?, input=NULL, output=NULL
+                    WHERE id=?
+                    ''',
+                    (store_blob(c, input_text), store_blob(c, output_text), entry_id),
+                )
+            conn.commit()
+            migrated += len(rows)
+            last_id = rows[-1][0]
+        if migrated:
+            print(f"INFO: Moved {migrated} history rows into compressed blob storage")
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:  # not INCREMENTAL
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, '1')",
+                    (VACUUM_PENDING_META_KEY,),
+                )
+                conn.commit()
+        return migrated
+    finally:
+        conn.close()
+
+def vacuum_if_pending():
+    """Run the one-off VACUUM a blob migration asked for; return True if it ran.
+
+    VACUUM rewrites the whole file while holding the write lock, which on a
+    large database outlasts :data:`CONNECT_TIMEOUT_SECONDS`.  Only call this
+    while nothing else writes, e.g. after the main window has closed.  It
+    also switches the file to incremental auto-vacuum, so later compaction
+    happens in small steps.
+    """
+    if get_meta(VACUUM_PENDING_META_KEY) != "1":
+        return False
+    conn = connect()
+    try:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        conn.execute("DELETE FROM meta WHERE key=?", (VACUUM_PENDING_META_KEY,))
+        conn.commit()
+    finally:
+        conn.close()
+    print("INFO: Compacted history database")
+    return True
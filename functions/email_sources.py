@@ -0,0 +1,192 @@
+"""Stream job emails from ``.eml``/``.msg``/``.txt`` files and mbox archives."""
+
+from __future__ import annotations
+
+import mailbox
+import os
+from dataclasses import dataclass
+from email import policy
+from email.message import EmailMessage, Message
+from email.parser import BytesParser
+from typing import Iterator, Optional
+
+from functions.html_sanitizer import html_to_preview_text
+
+SUPPORTED_EMAIL_EXTENSIONS = (".eml", ".msg", ".txt")
+MBOX_EXTENSIONS = (".mbox", ".mbx")
+
+
+@dataclass
+class EmailItem:
+    """A single email pulled from a batch source."""
+
+    item_id: str
+    source: str
+    subject: str
+    sender: str
+    body: str
+    message_id: str = ""
+    error: str = ""
+
+
+def _message_body(message: Message) -> str:
+    """Return the best plain-text body for *message*."""
+
+    if isinstance(message, EmailMessage):
+        part = message.get_body(preferencelist=("plain", "html"))
+        if part is not None:
+            content = part.get_content()
+            if part.get_content_subtype() == "html":
+                return html_to_preview_text(content)
+            return str(content).strip()
+
+    # ``mailbox`` yields legacy ``Message`` objects; walk them by hand.
+    html_fallback = ""
+    for part in message.walk():
+        if part.is_multipart():
+            continue
+        payload = part.get_payload(decode=True)
+        if not isinstance(payload, bytes):
+            continue
+        charset = part.get_content_charset() or "utf-8"
+        try:
+            text = payload.decode(charset, errors="replace")
+        except LookupError:
+            text = payload.decode("utf-8", errors="replace")
+        content_type = part.get_content_type()
+        if content_type == "text/plain":
+            return text.strip()
+        if content_type == "text/html" and not html_fallback:
+            html_fallback = html_to_preview_text(text)
+    return html_fallback
+
+
+def _item_from_message(item_id: str, source: str, message: Message) -> EmailItem:
+    return EmailItem(
+        item_id=item_id,
+        source=source,
+        subject=str(message.get("Subject", "") or "").strip(),
+        sender=str(message.get("From", "") or "").strip(),
+        body=_message_body(message),
+        message_id=str(message.get("Message-ID", "") or "").strip(),
+    )
+
+
+def _read_eml(path: str, item_id: str) -> EmailItem:
+    with open(path, "rb") as file:
+        message = BytesParser(policy=policy.default).parse(file)
+    return _item_from_message(item_id, path, message)
+
+
+def _read_msg(path: str, item_id: str) -> EmailItem:
+    try:
+        import extract_msg  # Optional dependency, only needed for Outlook .msg files.
+    except ImportError as exc:
+        raise RuntimeError(
+            "Reading .msg files requires the 'extract-msg' package."
+        ) from exc
+
+    message = extract_msg.Message(path)
+    try:
+        body = message.body or ""
+        if not body.strip() and getattr(message, "htmlBody", None):
+            html_body = message.htmlBody
+            if isinstance(html_body, bytes):
+                html_body = html_body.decode("utf-8", errors="replace")
+            body = html_to_preview_text(html_body)
+        return EmailItem(
+            item_id=item_id,
+            source=path,
+            subject=(message.subject or "").strip(),
+            sender=(message.sender or "").strip(),
+            body=body.strip(),
+            message_id=(getattr(message, "messageId", "") or "").strip(),
+        )
+    finally:
+        message.close()
+
+
+def _read_txt(path: str, item_id: str) -> EmailItem:
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        body = file.read().strip()
+    subject = os.path.splitext(os.path.basename(path))[0]
+    return EmailItem(item_id=item_id, source=path, subject=subject, sender="", body=body)
+
+
+_READERS = {".eml": _read_eml, ".msg": _read_msg, ".txt": _read_txt}
+
+
+def _read_file(reader, path: str, item_id: str) -> EmailItem:
+    """Return *reader*'s item, or an item carrying the error it raised."""
+
+    try:
+        return reader(path, item_id)
+    except Exception as exc:
+        return EmailItem(
+            item_id=item_id,
+            source=path,
+            subject="",
+            sender="",
+            body="",
+            error=str(exc),
+        )
+
+
+def _iter_directory(directory: str) -> Iterator[EmailItem]:
+    for root_dir, dir_names, file_names in os.walk(directory):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            path = os.path.join(root_dir, file_name)
+            ext = os.path.splitext(file_name)[1].lower()
+            item_id = os.path.relpath(path, directory).replace(os.sep, "/")
+            if ext in MBOX_EXTENSIONS:
+                yield from _iter_mbox(path, id_prefix=item_id)
+                continue
+            reader = _READERS.get(ext)
+            if reader is None:
+                continue
+            yield _read_file(reader, path, item_id)
+
+
+def _iter_mbox(path: str, *, id_prefix: Optional[str] = None) -> Iterator[EmailItem]:
+    prefix = id_prefix or os.path.basename(path)
+    box = mailbox.mbox(path, create=False)
+    try:
+        # ``iterkeys`` keeps memory flat; messages are parsed one at a time.
+        for index, key in enumerate(box.iterkeys()):
+            item_id = f"{prefix}#{index}"
+            try:
+                message = box.get_message(key)
+                yield _item_from_message(item_id, path, message)
+            except Exception as exc:
+                yield EmailItem(
+                    item_id=item_id,
+                    source=path,
+                    subject="",
+                    sender="",
+                    body="",
+                    error=str(exc),
+                )
+    finally:
+        box.close()
+
+
+def iter_emails(path: str) -> Iterator[EmailItem]:
+    """Yield :class:`EmailItem` objects from a directory, mbox or single file.
+
+    Items are produced lazily in a stable order so their ``item_id`` values
+    can be used to resume an interrupted batch run.
+    """
+
+    if os.path.isdir(path):
+        yield from _iter_directory(path)
+        return
+
+    ext = os.path.splitext(path)[1].lower()
+    reader = _READERS.get(ext)
+    if reader is not None:
+        yield _read_file(reader, path, os.path.basename(path))
+        return
+
+    # Anything else is treated as an mbox archive.
+    yield from _iter_mbox(path)
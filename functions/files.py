@@ -4,10 +4,10 @@ from __future__ import annotations
 
 import os
 
-import PyPDF2
-from docx import Document
+from functions.metrics import timed
 
 
+@timed("files.extract_text")
 def extract_text_from_file(path: str) -> str:
     """Return plain text content from the supported file ``path``.
 
@@ -21,10 +21,14 @@ def extract_text_from_file(path: str) -> str:
         with open(path, "r", encoding="utf-8") as file:
             return file.read()
     if ext == ".pdf":
+        import PyPDF2  # Imported on first use to keep startup fast.
+
         with open(path, "rb") as file:
             reader = PyPDF2.PdfReader(file)
             return "\n".join(page.extract_text() or "" for page in reader.pages)
     if ext == ".docx":
+        from docx import Document  # Imported on first use to keep startup fast.
+
         document = Document(path)
         return "\n".join(paragraph.text for paragraph in document.paragraphs)
     return ""
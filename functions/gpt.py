@@ -1,5 +1,7 @@
 import datetime
+import json
 import tkinter as tk
+from typing import Sequence
 
 
 # Custom GPT Prompt
@@ -36,6 +38,44 @@ def draft_reply(tone_var,
     )
     call_openai(prompt, output_text)
 
+def build_summary_prompt(email_text: str,
+                         *,
+                         document_text: str = "",
+                         include_tasks: bool = False,
+                         include_fixes: bool = False,
+                         past_jobs: Sequence[str] = ()) -> str:
+    """Return the summarize prompt for *email_text* and the selected options.
+
+    *past_jobs* (summaries of similar earlier jobs) are offered as context
+    for the fix when *include_fixes* is set.
+    """
+
+    prompt = (
+        f"Summarize the following message:\n\n{email_text}\n\n"
+        "Present the summary as Markdown with clear headings and bullet lists when useful.\n"
+        " -Markdown should not use <p>, <div> or headers. Only bold, italics, dot points, and new lines\n"
+    )
+    if document_text:
+        prompt += f"\nAlso summarize the following document:\n\n{document_text}"
+    if include_tasks:
+        prompt += "\n\nAlso generate a numbered list of tasks in reverse order to be done based on the message."
+    if include_fixes:
+        prompt += "\n\nAlso provide a possible fix to the issue mentioned"
+        prompt += past_jobs_context(past_jobs)
+    return prompt
+
+
+def past_jobs_context(past_jobs: Sequence[str]) -> str:
+    """Return the prompt section listing similar past jobs, or ``""``."""
+
+    if not past_jobs:
+        return ""
+    jobs = "\n\n".join(f"<<<PAST JOB {number}>>>\n{job}" for number, job in enumerate(past_jobs, start=1))
+    return (
+        "\n\nThese similar past jobs may show what fixed the issue before;"
+        f" use them only where they apply:\n\n{jobs}"
+    )
+
 def summarize(input_text: str,
               model: str,
               output_text,
@@ -44,7 +84,14 @@ def summarize(input_text: str,
               extract_text_from_file,
               task_checkbox_var,
               fixes_checkbox_var,
-              call_openai):
+              call_openai,
+              call_structured=None):
+    """Build the summary request and hand it to *call_openai*.
+
+    When *call_structured* is given it receives ``(email_text, document_text,
+    include_tasks, include_fixes, output_text)`` instead, to ask for a
+    structured (JSON schema) summary.
+    """
     print(f"INFO: Summarizing Email using {model}")
     email_text = input_text
     if not email_text:
@@ -54,33 +101,24 @@ def summarize(input_text: str,
         document_text = extract_text_from_file(attached_file_path)
         print("INFO: Appending attached document content")
 
-    prompt = (
-        f"Summarize the following message:\n\n{email_text}\n\n"
-        "Present the summary as Markdown with clear headings and bullet lists when useful.\n"
-        " -Markdown should not use <p>, <div> or headers. Only bold, italics, dot points, and new lines\n"
+    include_tasks = bool(task_checkbox_var.get())
+    include_fixes = bool(fixes_checkbox_var.get())
+    if call_structured is not None:
+        call_structured(email_text, document_text, include_tasks, include_fixes, output_text)
+        return
+    prompt = build_summary_prompt(
+        email_text,
+        document_text=document_text,
+        include_tasks=include_tasks,
+        include_fixes=include_fixes,
     )
-    if document_text:
-        prompt += f"\nAlso summarize the following document:\n\n{document_text}"
-    if task_checkbox_var.get():
-        prompt += "\n\nAlso generate a numbered list of tasks in reverse order to be done based on the message."
-    if fixes_checkbox_var.get():
-        prompt += "\n\nAlso provide a possible fix to the issue mentioned"
     call_openai(prompt, output_text)
 
 
-def draft_invoice_note(input_text: str,
-                       job_title: str,
-                       output_text,
-                       model: str,
-                       call_openai):
-    """Generate a GPT prompt tailored for writing invoice notes."""
-
-    print(f"INFO: Drafting an invoice note using {model}")
-    # invoice_text = input_text.get("1.0", tk.END).strip()
-    if not input_text:
-        return
+def build_invoice_note_prompt(input_text: str, job_title: str) -> str:
+    """Return the prompt that turns job notes into an invoice note."""
 
-    prompt = (
+    return (
         "You will be provided with job notes to be invoiced, and your task is to summarize the job as follows:\n"
         " -Single sentence summary of the job.\n"
         " -Dated and dot point list of what was done on the job.\n"
@@ -96,4 +134,131 @@ def draft_invoice_note(input_text: str,
         f"Invoicing Notes: {job_title}\n"
         f"{input_text}"
     )
-    call_openai(prompt, output_text)
+
+
+def draft_invoice_note(input_text: str,
+                       job_title: str,
+                       output_text,
+                       model: str,
+                       call_openai):
+    """Generate a GPT prompt tailored for writing invoice notes."""
+
+    print(f"INFO: Drafting an invoice note using {model}")
+    # invoice_text = input_text.get("1.0", tk.END).strip()
+    if not input_text:
+        return
+
+    call_openai(build_invoice_note_prompt(input_text, job_title), output_text)
+
+
+# Batch summarization -------------------------------------------------------
+# Several short emails are summarised in one request.  Each email is wrapped
+# in numbered delimiters and the model answers with one JSON entry per email,
+# which is split back into individual summaries (and history rows) by
+# functions.structured_summary.summarize_emails.
+
+# Email characters per packed request (roughly 4 characters per token), well
+# inside the context window of the supported models with room for the reply.
+BATCH_SUMMARY_CHAR_BUDGET = 48_000
+BATCH_SUMMARY_MAX_EMAILS = 20
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+
+def pack_emails(emails: Sequence[str],
+                *,
+                max_emails: int = BATCH_SUMMARY_MAX_EMAILS,
+                char_budget: int = BATCH_SUMMARY_CHAR_BUDGET) -> list[list[int]]:
+    """Group email indexes, in order, into requests that fit the budget.
+
+    An email larger than the budget gets a request of its own.
+    """
+
+    groups: list[list[int]] = []
+    current: list[int] = []
+    used = 0
+    for index, email_text in enumerate(emails):
+        size = len(email_text)
+        if current and (len(current) >= max_emails or used + size > char_budget):
+            groups.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += size
+    if current:
+        groups.append(current)
+    return groups
+
+
+def build_batch_summary_prompt(emails: Sequence[str],
+                               *,
+                               include_tasks: bool = False,
+                               include_fixes: bool = False) -> str:
+    """Return one prompt asking for a JSON summary of every email in *emails*."""
+
+    fields = ['"id": <message number>', '"summary": "<Markdown summary>"']
+    rules = [
+        ' -"summary" is Markdown that does not use <p>, <div> or headers. Only bold, italics,'
+        " dot points, and new lines.",
+    ]
+    if include_tasks:
+        fields.append('"tasks": ["<task>", ...]')
+        rules.append(' -"tasks" lists the tasks to be done based on that message, in reverse order.')
+    if include_fixes:
+        fields.append('"fix": "<Markdown>"')
+        rules.append(' -"fix" is a possible fix to the issue mentioned in that message.')
+
+    parts = [
+        f"Summarize each of the following {len(emails)} messages separately. Each message"
+        " starts with a line <<<EMAIL n>>> and ends with <<<END EMAIL n>>>; never mix details"
+        " between messages.\n\n"
+        "Respond with a JSON object only, shaped like:\n"
+        f'{{"emails": [{{{", ".join(fields)}}}]}}\n'
+        "with exactly one entry per message, in the same order.\n"
+        + "\n".join(rules)
+    ]
+    for number, email_text in enumerate(emails, start=1):
+        parts.append(f"<<<EMAIL {number}>>>\n{email_text.strip()}\n<<<END EMAIL {number}>>>")
+    return "\n\n".join(parts)
+
+
+def _batch_entry_markdown(entry: dict) -> str:
+    markdown = str(entry.get("summary") or "").strip()
+    tasks = [str(task).strip() for task in entry.get("tasks") or [] if str(task).strip()]
+    if tasks:
+        markdown += "\n\n**Tasks**\n" + "\n".join(
+            f"{number}. {task}" for number, task in enumerate(tasks, start=1)
+        )
+    fix = str(entry.get("fix") or "").strip()
+    if fix:
+        markdown += f"\n\n**Possible fix**\n{fix}"
+    return markdown.strip()
+
+
+def parse_batch_summary_response(text: str, count: int) -> dict[int, str]:
+    """Return ``{index: markdown}`` for the emails the JSON reply covers.
+
+    Indexes are zero based; entries that are missing, duplicated or empty
+    are left out so the caller can summarise those emails on their own.
+    """
+
+    try:
+        payload = json.loads(text)
+    except (TypeError, ValueError):
+        return {}
+    entries = payload.get("emails") if isinstance(payload, dict) else payload
+    if not isinstance(entries, list):
+        return {}
+    summaries: dict[int, str] = {}
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        number = entry.get("id", position + 1)
+        try:
+            index = int(number) - 1
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= index < count or index in summaries:
+            continue
+        markdown = _batch_entry_markdown(entry)
+        if markdown:
+            summaries[index] = markdown
+    return summaries
@@ -0,0 +1,390 @@
+"""Embedding index over history outputs, for "similar past jobs".
+
+Each indexed history row (summaries and invoice notes) is embedded once,
+with the OpenAI embeddings endpoint or a local ``sentence-transformers``
+model, and appended to compact arrays next to ``history.db``:
+
+* ``vectors.f32`` – unit-length float32 vectors, one row per entry;
+* ``ids.i64`` – the history id of each row;
+* ``manifest.json`` – the embedding model, dimension, row count and the
+  last history id looked at.
+
+OpenAI embeddings are requested shortened to ``dimensions`` (512 by
+default), which keeps 100k rows at about 200 MB and a search at tens of
+milliseconds.  The arrays are memory-mapped for searching, so a large index
+costs page cache rather than process memory.  Rows are only ever appended and the
+manifest is replaced after the arrays are written, so a crash mid-update
+leaves a consistent (if slightly stale) index.  Rows deleted from history
+by retention stay in the index and are skipped when results are shown.
+
+Search is brute-force cosine similarity (a dot product, as the vectors are
+normalised), computed over blocks of rows so memory stays flat however
+large the history grows.  NumPy is optional; without it the feature is
+off.  It is only imported once the index is used, so a disabled feature
+costs nothing at startup.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+import functions.database
+import functions.ui
+from functions.metrics import timed
+from functions.similar_jobs_settings import (
+    DEFAULT_EMBEDDING_DIMENSIONS,
+    DEFAULT_LOCAL_EMBEDDING_MODEL,
+    DEFAULT_OPENAI_EMBEDDING_MODEL,
+    DEFAULT_TOP_K,
+    SimilarJobsSettings,
+)
+
+INDEX_DIR_NAME = "history_index"
+VECTORS_FILE = "vectors.f32"
+IDS_FILE = "ids.i64"
+MANIFEST_FILE = "manifest.json"
+# Modes whose outputs describe a job; drafted replies are left out.
+INDEXED_MODES = ("summarize", "invoice")
+# Texts per embeddings request and history rows read per step.
+EMBED_BATCH_SIZE = 64
+# Well under the 8k token input limit of the OpenAI embedding models.
+MAX_EMBED_CHARS = 8000
+# Rows scored per block while searching.
+SEARCH_BLOCK_ROWS = 16_384
+# How much of each past job is added to the fixes prompt.
+PAST_JOB_PROMPT_CHARS = 1500
+
+
+def numpy_available() -> bool:
+    """``True`` when NumPy is installed; does not import it."""
+
+    return importlib.util.find_spec("numpy") is not None
+
+
+def default_index_dir() -> str:
+    return os.path.join(os.path.dirname(functions.database.DB_PATH), INDEX_DIR_NAME)
+
+
+# Embedders --------------------------------------------------------------------
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI endpoint (or a compatible proxy)."""
+
+    def __init__(
+        self,
+        openai_service,
+        model: str = DEFAULT_OPENAI_EMBEDDING_MODEL,
+        dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS,
+    ) -> None:
+        self._openai_service = openai_service
+        self.model = model
+        self.dimensions = dimensions
+        self.name = f"openai:{model}:{dimensions}" if dimensions else f"openai:{model}"
+
+    def embed(self, texts: Sequence[str]):
+        vectors = self._openai_service.embed(
+            self.model, [text[:MAX_EMBED_CHARS] for text in texts], dimensions=self.dimensions or None
+        )
+        import numpy as np
+
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class LocalEmbedder:
+    """Embeddings from a local ``sentence-transformers`` model."""
+
+    def __init__(self, model: str = DEFAULT_LOCAL_EMBEDDING_MODEL) -> None:
+        from sentence_transformers import SentenceTransformer  # Optional dependency.
+
+        self._model = SentenceTransformer(model)
+        self._lock = threading.Lock()
+        self.model = model
+        self.name = f"local:{model}"
+
+    def embed(self, texts: Sequence[str]):
+        with self._lock:
+            vectors = self._model.encode([text[:MAX_EMBED_CHARS] for text in texts])
+        import numpy as np
+
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def make_embedder(settings: SimilarJobsSettings, openai_service):
+    """Return the embedder *settings* ask for; ``None`` when unavailable.
+
+    Loads the local model, so call it off the Tk thread.
+    """
+
+    if not numpy_available():
+        print("WARN: Similar past jobs need NumPy; the feature is off")
+        return None
+    if settings.backend in ("local", "auto"):
+        try:
+            return LocalEmbedder(settings.local_model)
+        except ImportError:
+            if settings.backend == "local":
+                print("WARN: sentence-transformers is not installed; using OpenAI embeddings")
+        except Exception as exc:
+            print(f"WARN: Failed to load local embedding model {settings.local_model}: {exc}")
+    return OpenAIEmbedder(openai_service, settings.openai_model, settings.dimensions)
+
+
+# Index ------------------------------------------------------------------------
+
+def _normalise(vectors):
+    import numpy as np
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+@dataclass
+class SimilarJob:
+    """A past history row close to the query."""
+
+    history_id: int
+    score: float
+    timestamp: str = ""
+    mode: str = ""
+    output: str = ""
+
+    def label(self) -> str:
+        first_line = next((line.strip(" *-#") for line in self.output.splitlines() if line.strip(" *-#")), "")
+        return f"{self.score:.2f}  {self.timestamp[:10]}  {first_line[:80]}"
+
+
+class HistoryIndex:
+    """Append-only, memory-mapped embedding index of history outputs."""
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory or default_index_dir()
+        self._lock = threading.Lock()
+        # Held for a whole update so two jobs never embed the same rows.
+        self._update_lock = threading.Lock()
+        self._manifest = self._read_manifest()
+        self._vectors = None
+        self._ids = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self._path(MANIFEST_FILE), "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            manifest = {}
+        if not isinstance(manifest, dict):
+            manifest = {}
+        manifest.setdefault("model", "")
+        manifest.setdefault("dim", 0)
+        manifest.setdefault("count", 0)
+        manifest.setdefault("last_id", 0)
+        return manifest
+
+    def _write_manifest(self) -> None:
+        temp_path = self._path(MANIFEST_FILE + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self._manifest, file)
+        os.replace(temp_path, self._path(MANIFEST_FILE))
+
+    def __len__(self) -> int:
+        return self._manifest["count"]
+
+    @property
+    def model(self) -> str:
+        return self._manifest["model"]
+
+    def _reset(self, model: str, dim: int) -> None:
+        print(f"INFO: Starting a new similar-jobs index for {model}")
+        os.makedirs(self.directory, exist_ok=True)
+        # Replace rather than truncate: a search may still map the old files.
+        for name in (VECTORS_FILE, IDS_FILE):
+            open(self._path(name + ".tmp"), "wb").close()
+            os.replace(self._path(name + ".tmp"), self._path(name))
+        self._manifest = {"model": model, "dim": dim, "count": 0, "last_id": self._manifest["last_id"]}
+        self._vectors = self._ids = None
+        self._write_manifest()
+
+    def _append(self, vectors, ids: Sequence[int], last_id: int) -> None:
+        import numpy as np
+
+        count, dim = self._manifest["count"], self._manifest["dim"]
+        # Drop whatever a crashed update wrote past the manifest first.
+        for name, row_bytes, rows in (
+            (VECTORS_FILE, dim * 4, _normalise(vectors).astype(np.float32)),
+            (IDS_FILE, 8, np.asarray(ids, dtype=np.int64)),
+        ):
+            with open(self._path(name), "r+b") as file:
+                file.truncate(count * row_bytes)
+                file.seek(0, os.SEEK_END)
+                file.write(rows.tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+        self._manifest["count"] = count + len(ids)
+        self._manifest["last_id"] = last_id
+        self._write_manifest()
+        self._vectors = self._ids = None
+
+    def _arrays(self):
+        """Return memory-mapped ``(vectors, ids)`` covering the current rows."""
+        import numpy as np
+
+        with self._lock:
+            count, dim = self._manifest["count"], self._manifest["dim"]
+            if count == 0:
+                return None, None
+            if self._vectors is None:
+                self._vectors = np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode="r", shape=(count, dim))
+                self._ids = np.memmap(self._path(IDS_FILE), dtype=np.int64, mode="r", shape=(count,))
+            return self._vectors, self._ids
+
+    @timed("history_index.update")
+    def update(
+        self,
+        embedder,
+        *,
+        batch_size: int = EMBED_BATCH_SIZE,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> int:
+        """Embed history rows added since the last update; return how many.
+
+        Starts over when *embedder* differs from the one the index was built
+        with, since vectors from different models are not comparable.
+        """
+
+        with self._update_lock:
+            return self._update(embedder, batch_size, should_stop)
+
+    def _update(self, embedder, batch_size: int, should_stop: Optional[Callable[[], bool]]) -> int:
+        with self._lock:
+            if self._manifest["model"] not in ("", embedder.name):
+                print(f"INFO: Embedding model changed from {self._manifest['model']}; re-indexing history")
+                self._manifest = {"model": "", "dim": 0, "count": 0, "last_id": 0}
+                self._vectors = self._ids = None
+        added = 0
+        while not (should_stop is not None and should_stop()):
+            placeholders = ", ".join("?" for _mode in INDEXED_MODES)
+            conn = functions.database.connect()
+            try:
+                cursor = conn.cursor()
+                rows = cursor.execute(
+                    f"SELECT id, output, output_hash FROM history"
+                    f" WHERE id > ? AND mode IN ({placeholders}) ORDER BY id LIMIT ?",
+                    (self._manifest["last_id"], *INDEXED_MODES, batch_size),
+                ).fetchall()
+                texts = [
+                    (row_id, functions.database.resolve_history_texts(cursor, None, output, None, output_hash)[1])
+                    for row_id, output, output_hash in rows
+                ]
+            finally:
+                conn.close()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            texts = [(row_id, text) for row_id, text in texts if text.strip()]
+            if texts:
+                vectors = embedder.embed([text for _row_id, text in texts])
+                with self._lock:
+                    if not self._manifest["model"]:
+                        self._reset(embedder.name, int(vectors.shape[1]))
+                    self._append(vectors, [row_id for row_id, _text in texts], last_id)
+                added += len(texts)
+            else:
+                with self._lock:
+                    self._manifest["last_id"] = last_id
+                    if self._manifest["model"]:
+                        self._write_manifest()
+            if len(rows) < batch_size:
+                break
+        if added:
+            print(f"INFO: Indexed {added} history entries for similar-job search ({len(self)} total)")
+        return added
+
+    @timed("history_index.search")
+    def search(self, query, k: int = DEFAULT_TOP_K, *, block_rows: int = SEARCH_BLOCK_ROWS) -> list[tuple[int, float]]:
+        """Return up to *k* ``(history_id, cosine similarity)`` pairs, best first."""
+
+        vectors, ids = self._arrays()
+        if vectors is None or k < 1:
+            return []
+        import numpy as np
+
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(query))
+        if query.shape[0] != vectors.shape[1] or norm == 0:
+            return []
+        query /= norm
+        best_scores = []
+        best_rows = []
+        for start in range(0, vectors.shape[0], block_rows):
+            scores = vectors[start:start + block_rows] @ query
+            take = min(k, scores.shape[0])
+            top = np.argpartition(scores, scores.shape[0] - take)[-take:]
+            best_scores.append(scores[top])
+            best_rows.append(top + start)
+        scores = np.concatenate(best_scores)
+        rows = np.concatenate(best_rows)
+        order = np.argsort(-scores)[:k]
+        return [(int(ids[rows[i]]), float(scores[i])) for i in order]
+
+
+def find_similar(
+    index: HistoryIndex,
+    embedder,
+    text: str,
+    k: int = DEFAULT_TOP_K,
+    *,
+    exclude_output: str = "",
+) -> list[SimilarJob]:
+    """Return the past jobs closest to *text*, skipping rows no longer in history.
+
+    A row whose output is *exclude_output* (the reply being shown, already
+    saved to history) is left out.  Nothing is found while the index was
+    built by another embedder and has not been rebuilt yet.
+    """
+
+    if not text.strip() or index.model not in ("", embedder.name):
+        return []
+    query = embedder.embed([text])[0]
+    excluded = functions.ui.normalize_markdown_spacing(exclude_output).strip() if exclude_output else None
+    jobs = []
+    # Ask for a few spare rows in case some are excluded or deleted.
+    for history_id, score in index.search(query, k + 3):
+        row = _history_row(history_id)
+        if row is None:
+            continue
+        timestamp, mode, output = row
+        if excluded is not None and output.strip() == excluded:
+            continue
+        jobs.append(SimilarJob(history_id, score, timestamp, mode, output))
+        if len(jobs) == k:
+            break
+    return jobs
+
+
+def _history_row(history_id: int) -> Optional[tuple[str, str, str]]:
+    conn = functions.database.connect()
+    try:
+        cursor = conn.cursor()
+        row = cursor.execute(
+            "SELECT timestamp, mode, output, output_hash FROM history WHERE id=?", (history_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        output = functions.database.resolve_history_texts(cursor, None, row[2], None, row[3])[1]
+        return row[0] or "", row[1] or "", output
+    finally:
+        conn.close()
+
+
+def past_jobs_for_prompt(jobs: Sequence[SimilarJob]) -> list[str]:
+    """Return the outputs of *jobs*, trimmed for adding to a prompt."""
+
+    return [job.output.strip()[:PAST_JOB_PROMPT_CHARS] for job in jobs if job.output.strip()]
@@ -0,0 +1,199 @@
+"""Retention, archival and compaction of ``history.db``."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+import functions.database
+from functions.retention_settings import RetentionPolicy
+
+# Free pages returned to the file system per incremental vacuum step.
+INCREMENTAL_VACUUM_PAGES = 2000
+LAST_RUN_META_KEY = "maintenance_last_run"
+
+
+@dataclass
+class MaintenanceResult:
+    archived: int = 0
+    blobs_deleted: int = 0
+    pages_freed: int = 0
+    archive_path: str = ""
+    stopped: bool = False
+
+
+def _expiry_clause(cursor, policy: RetentionPolicy, now: datetime) -> tuple[str, list]:
+    """Build a WHERE clause matching every row the policy no longer keeps.
+
+    Row limits are turned into "id at or below the Nth newest id" bounds up
+    front, so each batch query is a plain indexed range scan.
+    """
+
+    conditions: list[str] = []
+    params: list = []
+    if policy.max_age_days:
+        conditions.append("timestamp < ?")
+        params.append((now - timedelta(days=policy.max_age_days)).isoformat())
+    if policy.max_rows:
+        cursor.execute(
+            "SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?", (policy.max_rows,)
+        )
+        row = cursor.fetchone()
+        if row is not None:
+            conditions.append("id <= ?")
+            params.append(row[0])
+    for mode, limit in policy.per_mode_max_rows.items():
+        cursor.execute(
+            "SELECT id FROM history WHERE mode = ? ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (mode, limit),
+        )
+        row = cursor.fetchone()
+        if row is not None:
+            conditions.append("(mode = ? AND id <= ?)")
+            params.extend((mode, row[0]))
+    return " OR ".join(conditions), params
+
+
+def _delete_orphan_blobs(cursor, hashes: set[str]) -> int:
+    deleted = 0
+    for digest in hashes:
+        cursor.execute(
+            """
+            DELETE FROM blobs WHERE hash = ?
+              AND NOT EXISTS (SELECT 1 FROM history WHERE input_hash = ?)
+              AND NOT EXISTS (SELECT 1 FROM history WHERE output_hash = ?)
+            """,
+            (digest, digest, digest),
+        )
+        deleted += cursor.rowcount
+    return deleted
+
+
+def _archive_and_delete(
+    conn,
+    policy: RetentionPolicy,
+    now: datetime,
+    result: MaintenanceResult,
+    should_stop: Callable[[], bool],
+) -> None:
+    cursor = conn.cursor()
+    where, params = _expiry_clause(cursor, policy, now)
+    if not where:
+        return
+
+    archive = None
+    last_id = 0
+    try:
+        while not should_stop():
+            cursor.execute(
+                f"""
+                SELECT id, timestamp, mode, tone, input, output, input_hash, output_hash
+                FROM history WHERE id > ? AND ({where}) ORDER BY id LIMIT ?
+                """,
+                (last_id, *params, policy.batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            if archive is None:
+                archive_dir = os.path.join(os.path.dirname(functions.database.DB_PATH), policy.archive_dir)
+                os.makedirs(archive_dir, exist_ok=True)
+                result.archive_path = os.path.join(
+                    archive_dir, f"history-{now.strftime('%Y%m%d-%H%M%S')}.jsonl.gz"
+                )
+                archive = gzip.open(result.archive_path, "at", encoding="utf-8")
+
+            hashes: set[str] = set()
+            for entry_id, timestamp, mode, tone, input_text, output_text, input_hash, output_hash in rows:
+                input_text, output_text = functions.database.resolve_history_texts(
+                    cursor, input_text, output_text, input_hash, output_hash
+                )
+                record = {
+                    "id": entry_id,
+                    "timestamp": timestamp,
+                    "mode": mode,
+                    "tone": tone,
+                    "input": input_text,
+                    "output": output_text,
+                }
+                archive.write(json.dumps(record, ensure_ascii=False) + "\n")
+                hashes.update(digest for digest in (input_hash, output_hash) if digest)
+            # The archive must hold the rows before they leave the database.
+            archive.flush()
+
+            ids = [row[0] for row in rows]
+            cursor.execute(
+                f"DELETE FROM history WHERE id IN ({','.join('?' * len(ids))})", ids
+            )
+            result.blobs_deleted += _delete_orphan_blobs(cursor, hashes)
+            conn.commit()
+            result.archived += len(ids)
+            last_id = ids[-1]
+        result.stopped = True
+    finally:
+        if archive is not None:
+            archive.close()
+
+
+def _compact(conn, should_stop: Callable[[], bool], result: MaintenanceResult) -> None:
+    auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if auto_vacuum == 2:  # INCREMENTAL
+        while not should_stop():
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free_pages:
+                break
+            step = min(free_pages, INCREMENTAL_VACUUM_PAGES)
+            # executescript steps the pragma to completion; execute() would
+            # free a single page per call.
+            conn.executescript(f"PRAGMA incremental_vacuum({step});")
+            result.pages_freed += step
+    conn.execute("PRAGMA optimize")
+
+
+def maintenance_due(policy: RetentionPolicy, now: Optional[datetime] = None) -> bool:
+    last_run = functions.database.get_meta(LAST_RUN_META_KEY)
+    if not last_run:
+        return True
+    try:
+        last = datetime.fromisoformat(last_run)
+    except ValueError:
+        return True
+    return (now or datetime.now()) - last >= timedelta(hours=policy.interval_hours)
+
+
+def run_history_maintenance(
+    policy: RetentionPolicy,
+    *,
+    now: Optional[datetime] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> MaintenanceResult:
+    """Archive and delete expired rows, drop unused blobs and compact the file.
+
+    Expired rows are written to a dated ``.jsonl.gz`` file in
+    ``policy.archive_dir`` (relative to ``history.db``; one JSON object per
+    row with the full text) before they are deleted.
+    """
+
+    now = now or datetime.now()
+    should_stop = should_stop or (lambda: False)
+    result = MaintenanceResult()
+    conn = functions.database.connect()
+    try:
+        if policy.prunes:
+            _archive_and_delete(conn, policy, now, result, should_stop)
+        if not result.stopped:
+            _compact(conn, should_stop, result)
+    finally:
+        conn.close()
+    if not result.stopped:
+        functions.database.set_meta(LAST_RUN_META_KEY, now.isoformat())
+    print(
+        f"INFO: History maintenance archived {result.archived} rows,"
+        f" removed {result.blobs_deleted} blobs, freed {result.pages_freed} pages"
+        + (f" (archive: {result.archive_path})" if result.archive_path else "")
+    )
+    return result
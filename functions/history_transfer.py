@@ -0,0 +1,213 @@
+"""Streaming export and import of history rows as JSONL or CSV."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+from dataclasses import dataclass
+from typing import IO, Iterator, Optional
+
+import functions.database
+
+RECORD_FIELDS = ("id", "timestamp", "mode", "tone", "input", "output")
+FORMATS = ("jsonl", "csv")
+# Rows per fetchmany() call on export and per transaction on import.
+TRANSFER_BATCH_SIZE = 500
+# Emails easily exceed the csv module's default 128 KiB field limit.
+_CSV_FIELD_LIMIT = 2**31 - 1
+
+
+def detect_format(path: str) -> str:
+    """Guess ``jsonl`` or ``csv`` from *path*, ignoring a ``.gz`` suffix."""
+
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    return "csv" if name.endswith(".csv") else "jsonl"
+
+
+def _open_text(path: str, mode: str) -> IO[str]:
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+
+
+def iter_history_records(
+    *,
+    mode: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    batch_size: int = TRANSFER_BATCH_SIZE,
+) -> Iterator[dict]:
+    """Yield history rows oldest first with their text resolved.
+
+    Rows are read with ``fetchmany`` so memory use does not depend on the
+    size of the table.
+    """
+
+    conditions = []
+    params: list = []
+    if mode:
+        conditions.append("mode = ?")
+        params.append(mode)
+    if since:
+        conditions.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        conditions.append("timestamp < ?")
+        params.append(until)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    conn = functions.database.connect()
+    try:
+        rows = conn.cursor()
+        blobs = conn.cursor()
+        rows.execute(
+            f"""
+            SELECT id, timestamp, mode, tone, input, output, input_hash, output_hash
+            FROM history {where} ORDER BY id
+            """,
+            params,
+        )
+        while True:
+            batch = rows.fetchmany(batch_size)
+            if not batch:
+                return
+            for entry_id, timestamp, row_mode, tone, input_text, output_text, input_hash, output_hash in batch:
+                input_text, output_text = functions.database.resolve_history_texts(
+                    blobs, input_text, output_text, input_hash, output_hash
+                )
+                yield {
+                    "id": entry_id,
+                    "timestamp": timestamp,
+                    "mode": row_mode,
+                    "tone": tone,
+                    "input": input_text,
+                    "output": output_text,
+                }
+    finally:
+        conn.close()
+
+
+def export_history(
+    path: str,
+    *,
+    fmt: Optional[str] = None,
+    mode: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> int:
+    """Write history rows to *path* (gzip when it ends in ``.gz``); return the count."""
+
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    count = 0
+    with _open_text(path, "w") as handle:
+        writer = None
+        if fmt == "csv":
+            writer = csv.DictWriter(handle, fieldnames=RECORD_FIELDS)
+            writer.writeheader()
+        for record in iter_history_records(mode=mode, since=since, until=until):
+            if writer is not None:
+                writer.writerow(record)
+            else:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def _read_records(handle: io.TextIOBase, fmt: str) -> Iterator[Optional[dict]]:
+    """Yield records from *handle*; ``None`` marks a line that could not be parsed."""
+
+    if fmt == "csv":
+        csv.field_size_limit(_CSV_FIELD_LIMIT)
+        for row in csv.DictReader(handle):
+            yield row
+        return
+    for line in handle:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        yield record if isinstance(record, dict) else None
+
+
+def import_history(
+    path: str,
+    *,
+    fmt: Optional[str] = None,
+    batch_size: int = TRANSFER_BATCH_SIZE,
+) -> ImportResult:
+    """Import an export or archive file, skipping rows that already exist.
+
+    A row is a duplicate when a history entry with the same timestamp, input
+    and output content hashes is already stored, so importing the same file
+    (or overlapping files from several machines) twice is harmless.  Rows are
+    committed in batches of *batch_size*.
+    """
+
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+    result = ImportResult()
+    conn = functions.database.connect()
+    try:
+        cursor = conn.cursor()
+        pending = 0
+        with _open_text(path, "r") as handle:
+            for record in _read_records(handle, fmt):
+                if record is None or not isinstance(record.get("timestamp"), str):
+                    result.invalid += 1
+                    continue
+                input_text = record.get("input") or ""
+                output_text = record.get("output") or ""
+                input_hash = functions.database.content_hash(input_text)
+                output_hash = functions.database.content_hash(output_text)
+                cursor.execute(
+                    """
+                    SELECT 1 FROM history
+                    WHERE input_hash = ? AND output_hash = ? AND timestamp = ?
+                    LIMIT 1
+                    """,
+                    (input_hash, output_hash, record["timestamp"]),
+                )
+                if cursor.fetchone() is not None:
+                    result.duplicates += 1
+                    continue
+                functions.database.store_blob(cursor, input_text)
+                functions.database.store_blob(cursor, output_text)
+                cursor.execute(
+                    """
+                    INSERT INTO history (timestamp, mode, tone, input_hash, output_hash)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (
+                        record["timestamp"],
+                        record.get("mode") or None,
+                        record.get("tone") or None,
+                        input_hash,
+                        output_hash,
+                    ),
+                )
+                result.imported += 1
+                pending += 1
+                if pending >= batch_size:
+                    conn.commit()
+                    pending = 0
+        conn.commit()
+    finally:
+        conn.close()
+    return result
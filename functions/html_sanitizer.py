@@ -0,0 +1,146 @@
+"""Reduce pasted HTML to the subset the Tk HTML widget can render."""
+
+from __future__ import annotations
+
+import html
+import re
+from html.parser import HTMLParser
+from typing import List
+
+# Tags understood by ``tkhtmlview._HTMLRenderer``; everything else is either
+# mapped onto one of these or dropped.
+SUPPORTED_TAGS = frozenset(
+    {
+        "p", "br", "ul", "ol", "li", "strong", "b", "em", "i", "code", "a",
+        "h1", "h2", "h3", "h4", "h5", "h6",
+    }
+)
+
+# Block-level containers that Outlook and browsers use for layout.  They are
+# rewritten as paragraphs so line structure survives the sanitizing pass.
+_BLOCK_TAGS = frozenset(
+    {
+        "div", "tr", "table", "blockquote", "section", "article", "header",
+        "footer", "pre", "center", "address", "dl", "dt", "dd",
+    }
+)
+
+# Containers whose text content must never reach the widget.
+_SKIP_CONTENT_TAGS = frozenset(
+    {"style", "script", "head", "title", "xml", "template", "noscript", "object"}
+)
+
+_SAFE_LINK_SCHEMES = ("http://", "https://", "mailto:")
+
+_SKIP_BLOCK_RE = re.compile(
+    r"<(style|script|head|title|xml)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_BREAK_TAG_RE = re.compile(
+    r"<\s*(?:br|/p|/div|/tr|/li|/h[1-6]|/table|/blockquote)\b[^>]*>", re.IGNORECASE
+)
+_CELL_TAG_RE = re.compile(r"<\s*/t[dh]\b[^>]*>", re.IGNORECASE)
+_TAG_RE = re.compile(r"<[^>]+>")
+_INLINE_SPACE_RE = re.compile(r"[ \t\r\f\v\xa0]+")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+
+class _SubsetSanitizer(HTMLParser):
+    """Stream HTML through a whitelist and emit markup for the Tk renderer."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._parts: List[str] = []
+        self._skip_depth = 0
+        self._open_links = 0
+
+    # -- HTMLParser API --------------------------------------------------
+    def handle_starttag(self, tag: str, attrs: List[tuple[str, str | None]]) -> None:
+        if tag in _SKIP_CONTENT_TAGS:
+            self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+        if tag == "a":
+            href = ""
+            for attr_name, attr_value in attrs:
+                if attr_name.lower() == "href" and attr_value:
+                    href = attr_value.strip()
+                    break
+            if href.lower().startswith(_SAFE_LINK_SCHEMES):
+                self._parts.append(f'<a href="{html.escape(href, quote=True)}">')
+                self._open_links += 1
+            return
+        if tag in SUPPORTED_TAGS:
+            self._parts.append("<br />" if tag == "br" else f"<{tag}>")
+        elif tag in _BLOCK_TAGS:
+            self._parts.append("<p>")
+        elif tag in {"td", "th"}:
+            self._parts.append(" ")
+        elif tag == "hr":
+            self._parts.append("<p></p>")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIP_CONTENT_TAGS:
+            if self._skip_depth:
+                self._skip_depth -= 1
+            return
+        if self._skip_depth:
+            return
+        if tag == "a":
+            if self._open_links:
+                self._open_links -= 1
+                self._parts.append("</a>")
+            return
+        if tag in SUPPORTED_TAGS and tag != "br":
+            self._parts.append(f"</{tag}>")
+        elif tag in _BLOCK_TAGS:
+            self._parts.append("</p>")
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth or not data:
+            return
+        self._parts.append(html.escape(data, quote=False))
+
+    # -- Public API ------------------------------------------------------
+    def get_html(self) -> str:
+        while self._open_links:
+            self._parts.append("</a>")
+            self._open_links -= 1
+        return "".join(self._parts)
+
+
+def sanitize_html_fragment(html_fragment: str) -> str:
+    """Return *html_fragment* reduced to tags the Tk renderer supports.
+
+    Inline styles, classes, images, tracking pixels, conditional comments and
+    ``<style>``/``<script>`` content are removed.  Layout containers become
+    paragraphs so the pasted text keeps its line structure.
+    """
+
+    if not html_fragment:
+        return ""
+    sanitizer = _SubsetSanitizer()
+    sanitizer.feed(html_fragment)
+    sanitizer.close()
+    return sanitizer.get_html()
+
+
+def html_to_preview_text(html_fragment: str) -> str:
+    """Return a quick plain-text approximation of *html_fragment*.
+
+    Uses a handful of regular expressions rather than a full parse so very
+    large pastes can be previewed almost instantly.
+    """
+
+    if not html_fragment:
+        return ""
+    text = _COMMENT_RE.sub("", html_fragment)
+    text = _SKIP_BLOCK_RE.sub("", text)
+    text = _BREAK_TAG_RE.sub("\n", text)
+    text = _CELL_TAG_RE.sub(" ", text)
+    text = _TAG_RE.sub("", text)
+    text = html.unescape(text)
+    text = _INLINE_SPACE_RE.sub(" ", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text)
+    return "\n".join(line.strip() for line in text.split("\n")).strip()
@@ -0,0 +1,320 @@
+"""Read invoice jobs in bulk, draft their notes and write them out.
+
+Jobs come from a CSV file with a job title column (``job``, ``job_title``,
+``title`` or ``name``) and a notes column (``notes``, ``invoice_notes`` or
+``description``), plus an optional ``id``/``job_id`` column; or from a
+folder of ``.txt``/``.md`` files, one job per file, titled after the file
+name.
+
+:func:`draft_invoice_notes` drafts the notes with live requests, a few at a
+time, and records every finished job in a JSONL checkpoint so an
+interrupted run resumes without paying for those jobs again.  For large,
+non-urgent runs the Batch API pipeline in :mod:`functions.openai_batch` is
+cheaper.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterable, Iterator, Optional
+
+import functions.database
+import functions.gpt
+import functions.jobs
+from functions.metrics import timed
+
+INVOICE_FILE_EXTENSIONS = (".txt", ".md")
+DEFAULT_BULK_CONCURRENCY = 4
+# Seconds to wait before retrying a draft refused by a full job queue.
+QUEUE_FULL_RETRY_SECONDS = 0.5
+_TITLE_COLUMNS = ("job", "job_title", "title", "name")
+_NOTES_COLUMNS = ("notes", "invoice_notes", "description")
+_ID_COLUMNS = ("id", "job_id")
+_OUTPUT_COLUMNS = ("job_id", "title", "note", "error")
+
+
+@dataclass
+class InvoiceJob:
+    """One job to draft an invoice note for."""
+
+    job_id: str
+    title: str
+    notes: str
+
+    def digest(self) -> str:
+        """Hash of the title and notes; a changed row is drafted again."""
+
+        return functions.database.content_hash(f"{self.title}\0{self.notes}")
+
+
+@dataclass
+class InvoiceNote:
+    """The drafted note for a job, or why there is none."""
+
+    job_id: str
+    title: str
+    note: str = ""
+    error: str = ""
+
+
+def _pick_column(fieldnames: list[str], candidates: tuple[str, ...]) -> Optional[str]:
+    by_name = {name.strip().casefold(): name for name in fieldnames if name}
+    for candidate in candidates:
+        if candidate in by_name:
+            return by_name[candidate]
+    return None
+
+
+def _iter_csv(path: str) -> Iterator[InvoiceJob]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        reader = csv.DictReader(file)
+        fieldnames = list(reader.fieldnames or [])
+        title_column = _pick_column(fieldnames, _TITLE_COLUMNS)
+        notes_column = _pick_column(fieldnames, _NOTES_COLUMNS)
+        id_column = _pick_column(fieldnames, _ID_COLUMNS)
+        if notes_column is None:
+            raise ValueError(f"{path}: no notes column (expected one of: {', '.join(_NOTES_COLUMNS)})")
+        seen: set[str] = set()
+        for row_number, row in enumerate(reader, start=2):
+            notes = (row.get(notes_column) or "").strip()
+            title = (row.get(title_column) or "").strip() if title_column else ""
+            job_id = (row.get(id_column) or "").strip() if id_column else ""
+            if not job_id or job_id in seen:
+                job_id = f"row-{row_number}"
+            seen.add(job_id)
+            yield InvoiceJob(job_id=job_id, title=title or job_id, notes=notes)
+
+
+def _iter_folder(path: str) -> Iterator[InvoiceJob]:
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.lower().endswith(INVOICE_FILE_EXTENSIONS):
+                continue
+            file_path = os.path.join(root, name)
+            with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+                notes = file.read().strip()
+            relative = os.path.relpath(file_path, path).replace(os.sep, "/")
+            yield InvoiceJob(job_id=relative, title=os.path.splitext(name)[0], notes=notes)
+
+
+def iter_invoice_jobs(path: str) -> Iterator[InvoiceJob]:
+    """Stream the jobs in a CSV file or folder of notes, in order."""
+
+    if os.path.isdir(path):
+        return _iter_folder(path)
+    if path.lower().endswith(".csv"):
+        return _iter_csv(path)
+    raise ValueError(f"{path}: expected a .csv file or a folder of .txt/.md notes")
+
+
+def load_invoice_jobs(path: str) -> list[InvoiceJob]:
+    """Return the jobs in a CSV file or folder of notes, in order."""
+
+    return list(iter_invoice_jobs(path))
+
+
+def invoice_notes_markdown(notes: Iterable[InvoiceNote]) -> str:
+    """Return the notes as one Markdown document, one section per job."""
+
+    sections = []
+    for entry in notes:
+        if entry.note:
+            sections.append(entry.note.strip())
+        else:
+            sections.append(f"**Job name:** {entry.title}\n\n_No invoice note: {entry.error or 'pending'}_")
+    return "\n\n---\n\n".join(sections) + "\n"
+
+
+def write_invoice_notes(path: str, notes: Iterable[InvoiceNote]) -> None:
+    """Write the notes to a CSV file (``.csv``) or a Markdown file.
+
+    The file is written to a temporary name and renamed, so an interrupted
+    run never leaves a half-written file behind.
+    """
+
+    temp_path = f"{path}.tmp"
+    if path.lower().endswith(".csv"):
+        with open(temp_path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=_OUTPUT_COLUMNS)
+            writer.writeheader()
+            for entry in notes:
+                writer.writerow(asdict(entry))
+    else:
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(invoice_notes_markdown(notes))
+    os.replace(temp_path, path)
+
+
+class InvoiceCheckpoint:
+    """Append-only JSONL of drafted notes, keyed by job id and content hash."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> dict[str, dict]:
+        """Return the latest successful record per ``job_id``."""
+
+        records: dict[str, dict] = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted run; ignore it.
+                    continue
+                if isinstance(record, dict) and record.get("note") and isinstance(record.get("job_id"), str):
+                    records[record["job_id"]] = record
+        return records
+
+    def append(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+                file.flush()
+
+
+def _draft_one(openai_service, model: str, job: InvoiceJob, checkpoint: InvoiceCheckpoint) -> InvoiceNote:
+    prompt = functions.gpt.build_invoice_note_prompt(job.notes, job.title)
+    try:
+        note = openai_service.generate_response(model, prompt)
+    except Exception as exc:
+        return InvoiceNote(job.job_id, job.title, error=str(exc))
+    if not note or not note.strip():
+        return InvoiceNote(job.job_id, job.title, error="Empty reply")
+    # Checkpoint first: a crash after this point loses at most a history
+    # row, never pays for the same note twice on the next run.
+    try:
+        checkpoint.append({"job_id": job.job_id, "digest": job.digest(), "title": job.title, "note": note})
+    except OSError as exc:
+        print(f"WARN: Failed to write checkpoint for {job.job_id}: {exc}")
+    try:
+        functions.database.save_to_history("invoice", "bulk", prompt, note)
+    except Exception as exc:
+        print(f"WARN: Failed to save history for {job.job_id}: {exc}")
+    return InvoiceNote(job.job_id, job.title, note=note)
+
+
+@timed("invoice.bulk_draft")
+def draft_invoice_notes(
+    openai_service,
+    model: str,
+    jobs: Iterable[InvoiceJob],
+    *,
+    checkpoint_path: str,
+    concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_progress: Optional[Callable[[int, InvoiceNote], None]] = None,
+    submit: Optional[Callable[[Callable[[], InvoiceNote]], Future]] = None,
+) -> list[InvoiceNote]:
+    """Draft a note per job with at most *concurrency* requests in flight.
+
+    Jobs are read lazily from *jobs*.  A job whose title and notes match a
+    note in the checkpoint reuses that note without a request.  Every new
+    note is written to the checkpoint and saved to history (mode
+    ``invoice``, tone ``bulk``) as soon as it arrives.  *on_progress* is
+    called with the number of finished jobs and the latest note.  When
+    *should_stop* returns ``True`` no further jobs are started and the
+    remaining ones are returned with an error.  Returns the notes in input
+    order.
+
+    Drafts run on a private thread pool unless *submit* is given; the app
+    passes :meth:`functions.jobs.JobExecutor.submit_future` so each draft is
+    an ``openai`` job under the executor's worker limit.  *submit* may
+    raise :class:`functions.jobs.JobQueueFull`; the draft is retried once
+    an earlier one finishes.
+    """
+
+    checkpoint = InvoiceCheckpoint(checkpoint_path)
+    previous = checkpoint.load()
+    if previous:
+        print(f"INFO: Reusing up to {len(previous)} drafted notes from {checkpoint_path}")
+    concurrency = max(1, concurrency)
+    notes: list[Optional[InvoiceNote]] = []
+    finished = 0
+    in_flight: dict[Future, int] = {}
+
+    def _record(index: int, note: InvoiceNote) -> None:
+        nonlocal finished
+        notes[index] = note
+        finished += 1
+        if on_progress is not None:
+            on_progress(finished, note)
+
+    def _collect(done: set[Future]) -> None:
+        for future in done:
+            index = in_flight.pop(future)
+            job = pending_jobs.pop(index)
+            try:
+                note = future.result()
+            except CancelledError:
+                note = InvoiceNote(job.job_id, job.title, error="Stopped")
+            _record(index, note)
+
+    def _submit(job: InvoiceJob) -> Optional[Future]:
+        def draft() -> InvoiceNote:
+            return _draft_one(openai_service, model, job, checkpoint)
+
+        if submit is None:
+            return executor.submit(draft)
+        while True:
+            try:
+                return submit(draft)
+            except functions.jobs.JobQueueFull:
+                if should_stop is not None and should_stop():
+                    return None
+                if in_flight:
+                    done, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+                    _collect(done)
+                else:
+                    time.sleep(QUEUE_FULL_RETRY_SECONDS)
+
+    # Jobs with a draft in flight, by index, for reporting cancelled drafts.
+    pending_jobs: dict[int, InvoiceJob] = {}
+    # Queued drafts count against the executor's pending limit, so only the
+    # private pool gets a backlog beyond the requests in flight.
+    max_in_flight = concurrency if submit is not None else concurrency * 2
+    executor = (
+        ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="invoice") if submit is None else None
+    )
+    try:
+        for job in jobs:
+            index = len(notes)
+            notes.append(None)
+            if should_stop is not None and should_stop():
+                _record(index, InvoiceNote(job.job_id, job.title, error="Stopped"))
+                continue
+            if not job.notes:
+                _record(index, InvoiceNote(job.job_id, job.title, error="No notes"))
+                continue
+            record = previous.get(job.job_id)
+            if record is not None and record.get("digest") == job.digest():
+                _record(index, InvoiceNote(job.job_id, job.title, note=record["note"]))
+                continue
+            # Bound the queued jobs so large inputs stream through.
+            while len(in_flight) >= max_in_flight:
+                done, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+                _collect(done)
+            future = _submit(job)
+            if future is None:
+                _record(index, InvoiceNote(job.job_id, job.title, error="Stopped"))
+                continue
+            pending_jobs[index] = job
+            in_flight[future] = index
+        while in_flight:
+            done, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+            _collect(done)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+    return [note for note in notes if note is not None]
@@ -0,0 +1,296 @@
+"""Bounded background job execution with per-kind worker limits."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+# Default number of concurrent workers for each job kind.  Unknown kinds fall
+# back to the ``general`` limit.
+DEFAULT_JOB_LIMITS = {
+    "openai": 3,
+    "asana": 2,
+    "extraction": 1,
+    "history": 1,
+    # Embedding history for similar-job search; kept apart from "history" so
+    # a long indexing run never holds up loading the history list.
+    "index": 1,
+    "general": 2,
+}
+# Pending jobs allowed per kind before new submissions are refused.
+DEFAULT_MAX_PENDING = 20
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_current = threading.local()
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when a job kind already has too many pending jobs."""
+
+
+class Job:
+    """A unit of background work tracked by :class:`JobExecutor`."""
+
+    def __init__(
+        self,
+        job_id: int,
+        kind: str,
+        message: str,
+        func: Callable[[], None],
+        priority: int,
+        on_finish: Optional[Callable[["Job"], None]],
+    ) -> None:
+        self.id = job_id
+        self.kind = kind
+        self.message = message
+        self.priority = priority
+        self.state = PENDING
+        self.error: Optional[BaseException] = None
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._func = func
+        self._on_finish = on_finish
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """``True`` once cancellation was requested for this job."""
+
+        return self._cancel_event.is_set()
+
+    def elapsed(self) -> float:
+        """Seconds spent running, or waiting when the job has not started."""
+
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        start = self.started_at if self.started_at is not None else self.submitted_at
+        return end - start
+
+
+def current_job() -> Optional[Job]:
+    """Return the job running on this thread, if any.
+
+    Long-running workers can poll ``current_job().cancelled`` to stop early.
+    """
+
+    return getattr(_current, "job", None)
+
+
+class JobExecutor:
+    """Run jobs on a bounded set of worker threads per job kind.
+
+    Jobs of the same kind run in priority order (higher first, then FIFO).
+    Each kind has its own worker limit so a burst of OpenAI requests cannot
+    starve Asana or history work, and a pending limit provides back-pressure.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[dict[str, int]] = None,
+        *,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        on_change: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.limits = dict(DEFAULT_JOB_LIMITS)
+        if limits:
+            for kind, limit in limits.items():
+                if isinstance(kind, str) and isinstance(limit, int) and limit > 0:
+                    self.limits[kind] = limit
+        self.max_pending = max(1, max_pending)
+        self.on_change = on_change
+        self._condition = threading.Condition()
+        self._queues: dict[str, list[tuple[int, int, Job]]] = {}
+        self._running: dict[int, Job] = {}
+        self._workers: dict[str, int] = {}
+        self._idle: dict[str, int] = {}
+        self._ids = itertools.count(1)
+        self._shutdown = False
+
+    def _limit_for(self, kind: str) -> int:
+        return self.limits.get(kind, self.limits["general"])
+
+    def _notify_change(self) -> None:
+        if self.on_change is not None:
+            try:
+                self.on_change()
+            except Exception:  # pragma: no cover - observer failures are not fatal
+                traceback.print_exc()
+
+    def submit(
+        self,
+        kind: str,
+        message: str,
+        func: Callable[[], None],
+        *,
+        priority: int = 0,
+        on_finish: Optional[Callable[[Job], None]] = None,
+    ) -> Job:
+        """Queue *func* and return its :class:`Job`.
+
+        *on_finish* is called exactly once when the job completes, fails or
+        is cancelled: from the worker thread for jobs that started, and from
+        the thread calling :meth:`cancel` or :meth:`shutdown` for jobs
+        dropped while pending.  Raises :class:`JobQueueFull` when
+        *kind* already has ``max_pending`` jobs waiting.
+        """
+
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Job executor has been shut down.")
+            queue = self._queues.setdefault(kind, [])
+            if len(queue) >= self.max_pending:
+                raise JobQueueFull(
+                    f"Too many pending {kind} jobs ({len(queue)}); please wait."
+                )
+            job = Job(next(self._ids), kind, message, func, priority, on_finish)
+            heapq.heappush(queue, (-priority, job.id, job))
+            # Idle workers only leave the idle count once they wake, so
+            # compare them with the whole queue rather than checking for
+            # any idle worker; otherwise a burst is served by one thread.
+            if len(queue) > self._idle.get(kind, 0) and self._workers.get(kind, 0) < self._limit_for(kind):
+                self._workers[kind] = self._workers.get(kind, 0) + 1
+                threading.Thread(
+                    target=self._worker_loop,
+                    args=(kind,),
+                    name=f"job-{kind}-{self._workers[kind]}",
+                    daemon=True,
+                ).start()
+            self._condition.notify_all()
+        self._notify_change()
+        return job
+
+    def submit_future(
+        self,
+        kind: str,
+        message: str,
+        func: Callable[[], object],
+        *,
+        priority: int = 0,
+    ) -> Future:
+        """Queue *func* like :meth:`submit` and return a future for its result.
+
+        Lets a coordinating job fan work out under the per-kind limits and
+        wait on it with :func:`concurrent.futures.wait`.  The future is
+        cancelled when the job is dropped before it starts.
+        """
+
+        future: Future = Future()
+
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func())
+            except BaseException as exc:
+                future.set_exception(exc)
+
+        def finished(_job: Job) -> None:
+            if not future.done():
+                future.cancel()
+
+        self.submit(kind, message, run, priority=priority, on_finish=finished)
+        return future
+
+    def cancel(self, job: Job) -> bool:
+        """Cancel *job*; pending jobs are dropped, running jobs are flagged."""
+
+        finished_pending = False
+        with self._condition:
+            if job.state not in (PENDING, RUNNING):
+                return False
+            job._cancel_event.set()
+            if job.state == PENDING:
+                queue = self._queues.get(job.kind, [])
+                queue[:] = [entry for entry in queue if entry[2] is not job]
+                heapq.heapify(queue)
+                job.state = CANCELLED
+                job.finished_at = time.monotonic()
+                finished_pending = True
+        if finished_pending:
+            self._finish(job)
+        self._notify_change()
+        return True
+
+    def snapshot(self) -> list[Job]:
+        """Return running jobs followed by pending jobs in run order."""
+
+        with self._condition:
+            running = sorted(self._running.values(), key=lambda job: job.id)
+            pending = [
+                entry[2]
+                for queue in self._queues.values()
+                for entry in sorted(queue)
+            ]
+        return running + pending
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs and cancel everything still pending."""
+
+        with self._condition:
+            self._shutdown = True
+            pending = [entry[2] for queue in self._queues.values() for entry in queue]
+            self._queues.clear()
+            for job in self._running.values():
+                job._cancel_event.set()
+            self._condition.notify_all()
+        for job in pending:
+            job._cancel_event.set()
+            job.state = CANCELLED
+            job.finished_at = time.monotonic()
+            self._finish(job)
+
+    def _finish(self, job: Job) -> None:
+        if job._on_finish is not None:
+            try:
+                job._on_finish(job)
+            except Exception:  # pragma: no cover - callback failures are not fatal
+                traceback.print_exc()
+
+    def _worker_loop(self, kind: str) -> None:
+        while True:
+            with self._condition:
+                queue = self._queues.setdefault(kind, [])
+                self._idle[kind] = self._idle.get(kind, 0) + 1
+                while not queue and not self._shutdown:
+                    self._condition.wait()
+                self._idle[kind] -= 1
+                if self._shutdown:
+                    self._workers[kind] -= 1
+                    return
+                _, _, job = heapq.heappop(queue)
+                job.state = RUNNING
+                job.started_at = time.monotonic()
+                self._running[job.id] = job
+            self._notify_change()
+
+            _current.job = job
+            try:
+                job._func()
+            except BaseException as exc:  # pragma: no cover - worker safety net
+                job.error = exc
+                print(f"ERR: {kind} job '{job.message}' failed: {exc}")
+                traceback.print_exc()
+            finally:
+                _current.job = None
+
+            with self._condition:
+                self._running.pop(job.id, None)
+                job.finished_at = time.monotonic()
+                if job.error is not None:
+                    job.state = FAILED
+                elif job.cancelled:
+                    job.state = CANCELLED
+                else:
+                    job.state = DONE
+            self._finish(job)
+            self._notify_change()
@@ -0,0 +1,254 @@
+"""Lightweight timing spans, in-memory latency stats and JSONL export."""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Iterator, Optional
+
+# Latency samples kept per operation for the percentile view.
+DEFAULT_SAMPLE_WINDOW = 500
+DEFAULT_EXPORT_MAX_BYTES = 1_000_000
+DEFAULT_EXPORT_BACKUPS = 3
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class RotatingJsonlWriter:
+    """Append JSON lines to *path* on a daemon thread, rotating by size.
+
+    Records are queued so that timing a hot path never waits on disk I/O.
+    When the file exceeds *max_bytes* it is renamed to ``path.1`` (shifting
+    older files up to ``path.<backups>``) and a new file is started.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_bytes: int = DEFAULT_EXPORT_MAX_BYTES,
+        backups: int = DEFAULT_EXPORT_BACKUPS,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max(1, max_bytes)
+        self.backups = max(0, backups)
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+        self._thread.start()
+
+    def write(self, record: dict) -> None:
+        self._queue.put(record)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Flush queued records and stop the writer thread."""
+
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _rotate(self) -> None:
+        if self.backups == 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            batch = [record]
+            # Drain whatever else is waiting so bursts become one write.
+            while True:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is None:
+                    self._append(batch)
+                    return
+                batch.append(extra)
+            self._append(batch)
+
+    def _append(self, records: list[dict]) -> None:
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            handle = None
+            try:
+                for record in records:
+                    if size >= self.max_bytes:
+                        if handle is not None:
+                            handle.close()
+                            handle = None
+                        self._rotate()
+                        size = 0
+                    if handle is None:
+                        handle = open(self.path, "a", encoding="utf-8")
+                    line = json.dumps(record, default=str) + "\n"
+                    handle.write(line)
+                    size += len(line)
+            finally:
+                if handle is not None:
+                    handle.close()
+        except OSError as exc:
+            print(f"WARN: Could not write metrics to {self.path}: {exc}")
+
+
+class MetricsRegistry:
+    """Thread-safe store of recent span durations per operation name."""
+
+    def __init__(self, sample_window: int = DEFAULT_SAMPLE_WINDOW) -> None:
+        self.sample_window = max(1, sample_window)
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque] = {}
+        self._counts: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+        self._totals: dict[str, float] = {}
+        self._exporter: Optional[RotatingJsonlWriter] = None
+
+    def configure_export(
+        self,
+        path: Optional[str],
+        *,
+        max_bytes: int = DEFAULT_EXPORT_MAX_BYTES,
+        backups: int = DEFAULT_EXPORT_BACKUPS,
+    ) -> None:
+        """Start (or, with ``path=None``, stop) exporting spans to JSONL."""
+
+        previous = self._exporter
+        self._exporter = (
+            RotatingJsonlWriter(path, max_bytes=max_bytes, backups=backups) if path else None
+        )
+        if previous is not None:
+            previous.close()
+
+    def record(
+        self,
+        name: str,
+        duration: float,
+        *,
+        error: Optional[str] = None,
+        attributes: Optional[dict[str, Any]] = None,
+    ) -> None:
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.sample_window)
+            samples.append(duration)
+            self._counts[name] = self._counts.get(name, 0) + 1
+            self._totals[name] = self._totals.get(name, 0.0) + duration
+            if error is not None:
+                self._errors[name] = self._errors.get(name, 0) + 1
+        exporter = self._exporter
+        if exporter is not None:
+            entry = {
+                "ts": datetime.now().isoformat(timespec="milliseconds"),
+                "op": name,
+                "ms": round(duration * 1000, 3),
+                "thread": threading.current_thread().name,
+            }
+            if error is not None:
+                entry["error"] = error
+            if attributes:
+                entry.update(attributes)
+            exporter.write(entry)
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Return per-operation count, errors and p50/p95/max in milliseconds."""
+
+        with self._lock:
+            snapshot = [
+                (name, sorted(samples), self._counts[name], self._errors.get(name, 0), self._totals[name])
+                for name, samples in self._samples.items()
+            ]
+        rows = []
+        for name, durations, count, errors, total in sorted(snapshot):
+            rows.append(
+                {
+                    "operation": name,
+                    "count": count,
+                    "errors": errors,
+                    "p50_ms": _percentile(durations, 0.50) * 1000,
+                    "p95_ms": _percentile(durations, 0.95) * 1000,
+                    "max_ms": (durations[-1] if durations else 0.0) * 1000,
+                    "total_s": total,
+                }
+            )
+        return rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._errors.clear()
+            self._totals.clear()
+
+    def format_summary(self) -> str:
+        lines = [
+            f"{'operation':<32} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"
+        ]
+        for row in self.summary():
+            lines.append(
+                f"{row['operation']:<32} {row['count']:>6} {row['errors']:>6}"
+                f" {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['max_ms']:>9.1f}"
+            )
+        return "\n".join(lines)
+
+
+METRICS = MetricsRegistry()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[dict[str, Any]]:
+    """Time the enclosed block as operation *name*.
+
+    The yielded dict can be updated with extra attributes (e.g. sizes or
+    attempt numbers) that are written alongside the span in the JSONL log.
+    Exceptions are recorded as errors and re-raised.
+    """
+
+    started = time.perf_counter()
+    error = None
+    try:
+        yield attributes
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        METRICS.record(name, time.perf_counter() - started, error=error, attributes=attributes)
+
+
+def timed(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorator form of :func:`span`; defaults to the function's qualified name."""
+
+    def decorator(func: Callable) -> Callable:
+        operation = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(operation):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
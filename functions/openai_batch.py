@@ -0,0 +1,307 @@
+"""Submit prompts through the OpenAI Batch API and collect the replies.
+
+Batch requests cost half as much as live ones and do not count against the
+per-minute rate limits, in exchange for finishing within 24 hours.  The
+pipeline is:
+
+1. :func:`write_request_file` – one ``/v1/chat/completions`` request per
+   line of a JSONL file, keyed by ``custom_id``.
+2. :func:`submit_batch` – upload the file and create the batch.  The prompts
+   are kept in a :class:`BatchJob` manifest in the ``meta`` table of
+   ``history.db`` so the job can be resumed by batch id from any later run.
+3. :func:`wait_for_batch` – poll until the batch reaches a final status.
+4. :func:`collect_batch` – download the output and error files and save
+   each reply to history exactly once.
+
+The client comes from :class:`OpenAIService`, so ``openai_base_url`` points
+the whole pipeline at a proxy or the local stand-in.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Optional
+
+import functions.database
+from functions.metrics import timed
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+# The Batch API accepts at most 50,000 requests per input file.
+MAX_BATCH_REQUESTS = 50_000
+DEFAULT_POLL_SECONDS = 60.0
+FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+BATCH_META_PREFIX = "openai_batch:"
+# Custom ids already saved to history, kept apart from the manifest so
+# marking a reply saved does not rewrite every prompt.
+BATCH_SAVED_META_PREFIX = "openai_batch_saved:"
+# Replies saved between writes of the saved list.  A crash can save at most
+# this many replies to history a second time on the next collect.
+SAVED_FLUSH_EVERY = 200
+
+
+@dataclass
+class BatchJob:
+    """Manifest of a submitted batch: what was asked and what is saved."""
+
+    batch_id: str
+    model: str
+    history_mode: str
+    history_tone: str
+    created_at: str
+    # custom_id -> {"prompt": ..., plus caller fields such as "title"}
+    requests: dict[str, dict]
+    # Caller data, e.g. where the invoice notes are written.
+    extra: dict = field(default_factory=dict)
+    saved: set[str] = field(default_factory=set)
+
+    def to_dict(self) -> dict:
+        return {
+            "batch_id": self.batch_id,
+            "model": self.model,
+            "history_mode": self.history_mode,
+            "history_tone": self.history_tone,
+            "created_at": self.created_at,
+            "requests": self.requests,
+            "extra": self.extra,
+        }
+
+    def save(self) -> None:
+        functions.database.set_meta(BATCH_META_PREFIX + self.batch_id, json.dumps(self.to_dict()))
+
+    def mark_saved(self, custom_id: str) -> None:
+        """Record *custom_id* as saved; call :meth:`flush_saved` to persist."""
+
+        self.saved.add(custom_id)
+
+    def flush_saved(self) -> None:
+        functions.database.set_meta(
+            BATCH_SAVED_META_PREFIX + self.batch_id, json.dumps(sorted(self.saved))
+        )
+
+
+@dataclass
+class BatchResult:
+    """The reply to one request of a batch, or why there is none."""
+
+    custom_id: str
+    content: str = ""
+    error: str = ""
+
+
+def load_batch_job(batch_id: str) -> Optional[BatchJob]:
+    raw = functions.database.get_meta(BATCH_META_PREFIX + batch_id)
+    if not raw:
+        return None
+    payload = json.loads(raw)
+    saved_raw = functions.database.get_meta(BATCH_SAVED_META_PREFIX + batch_id)
+    return BatchJob(
+        batch_id=payload["batch_id"],
+        model=payload.get("model") or "",
+        history_mode=payload.get("history_mode") or "",
+        history_tone=payload.get("history_tone") or "batch",
+        created_at=payload.get("created_at") or "",
+        requests=dict(payload.get("requests") or {}),
+        extra=dict(payload.get("extra") or {}),
+        saved=set(json.loads(saved_raw)) if saved_raw else set(),
+    )
+
+
+def list_batch_jobs() -> list[str]:
+    """Return the ids of every batch with a stored manifest, oldest first."""
+
+    conn = functions.database.connect()
+    try:
+        rows = conn.execute(
+            "SELECT key, value FROM meta WHERE key LIKE ?", (BATCH_META_PREFIX + "%",)
+        ).fetchall()
+    finally:
+        conn.close()
+    created = []
+    for key, value in rows:
+        try:
+            created.append((json.loads(value).get("created_at") or "", key[len(BATCH_META_PREFIX):]))
+        except ValueError:
+            continue
+    return [batch_id for _created_at, batch_id in sorted(created)]
+
+
+def write_request_file(path: str, model: str, prompts: Iterable[tuple[str, str]]) -> int:
+    """Write ``(custom_id, prompt)`` pairs as Batch API requests; return the count.
+
+    Raises :class:`ValueError` as soon as the requests pass
+    :data:`MAX_BATCH_REQUESTS` (before writing anything when *prompts* has a
+    length) and removes the partial file.
+    """
+
+    if hasattr(prompts, "__len__") and len(prompts) > MAX_BATCH_REQUESTS:
+        raise ValueError(f"{len(prompts)} requests exceed the Batch API limit of {MAX_BATCH_REQUESTS}")
+    count = 0
+    try:
+        with open(path, "w", encoding="utf-8") as file:
+            for custom_id, prompt in prompts:
+                if count >= MAX_BATCH_REQUESTS:
+                    raise ValueError(
+                        f"More than {MAX_BATCH_REQUESTS} requests exceed the Batch API limit"
+                    )
+                request = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": {"model": model, "messages": [{"role": "user", "content": prompt}]},
+                }
+                file.write(json.dumps(request, ensure_ascii=False) + "\n")
+                count += 1
+    except ValueError:
+        os.remove(path)
+        raise
+    return count
+
+
+@timed("openai.batch_submit")
+def submit_batch(
+    openai_service,
+    request_path: str,
+    *,
+    model: str,
+    requests: dict[str, dict],
+    history_mode: str,
+    history_tone: str = "batch",
+    extra: Optional[dict] = None,
+    description: str = "",
+) -> BatchJob:
+    """Upload *request_path*, create the batch and store its manifest."""
+
+    client = openai_service.client
+    with open(request_path, "rb") as file:
+        uploaded = client.files.create(file=file, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=BATCH_COMPLETION_WINDOW,
+        metadata={"description": description} if description else None,
+    )
+    job = BatchJob(
+        batch_id=batch.id,
+        model=model,
+        history_mode=history_mode,
+        history_tone=history_tone,
+        created_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        requests=requests,
+        extra=dict(extra or {}),
+    )
+    job.save()
+    print(f"INFO: Submitted OpenAI batch {batch.id} with {len(requests)} requests")
+    return job
+
+
+def wait_for_batch(
+    openai_service,
+    batch_id: str,
+    *,
+    poll_seconds: float = DEFAULT_POLL_SECONDS,
+    should_stop: Optional[Callable[[], bool]] = None,
+):
+    """Poll *batch_id* until it reaches a final status and return it.
+
+    Returns the last seen batch early when *should_stop* says so; the batch
+    keeps running on OpenAI's side and can be collected later.
+    """
+
+    client = openai_service.client
+    last_status = None
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        if batch.status != last_status:
+            progress = f" ({counts.completed + counts.failed}/{counts.total})" if counts else ""
+            print(f"INFO: OpenAI batch {batch_id} is {batch.status}{progress}")
+            last_status = batch.status
+        if batch.status in FINAL_STATUSES:
+            return batch
+        if should_stop is not None and should_stop():
+            return batch
+        time.sleep(max(poll_seconds, 0.0))
+
+
+def _reply_text(line: dict) -> BatchResult:
+    custom_id = str(line.get("custom_id") or "")
+    error = line.get("error")
+    if error:
+        message = error.get("message") if isinstance(error, dict) else str(error)
+        return BatchResult(custom_id, error=message or "Request failed")
+    response = line.get("response") or {}
+    body = response.get("body") or {}
+    if response.get("status_code") != 200:
+        message = (body.get("error") or {}).get("message") if isinstance(body, dict) else None
+        return BatchResult(custom_id, error=message or f"HTTP {response.get('status_code')}")
+    try:
+        content = body["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return BatchResult(custom_id, error="Reply had no message content")
+    return BatchResult(custom_id, content=content or "")
+
+
+def read_batch_results(openai_service, batch) -> dict[str, BatchResult]:
+    """Return the result per ``custom_id`` from the batch's output and error files."""
+
+    client = openai_service.client
+    results: dict[str, BatchResult] = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for raw_line in client.files.content(file_id).text.splitlines():
+            if not raw_line.strip():
+                continue
+            try:
+                result = _reply_text(json.loads(raw_line))
+            except ValueError:
+                print(f"WARN: Skipping unreadable line in batch file {file_id}")
+                continue
+            if result.custom_id:
+                results[result.custom_id] = result
+    return results
+
+
+@timed("openai.batch_collect")
+def collect_batch(openai_service, job: BatchJob, batch=None) -> dict[str, BatchResult]:
+    """Download the results of *job* and save new replies to history.
+
+    Requests without a result (the batch expired, was cancelled or is still
+    running) are reported with an error.  Replies saved by an earlier run are
+    not saved again; the saved list is written every
+    :data:`SAVED_FLUSH_EVERY` replies and once more at the end.
+    """
+
+    if batch is None:
+        batch = openai_service.client.batches.retrieve(job.batch_id)
+    results = read_batch_results(openai_service, batch)
+    unflushed = 0
+    try:
+        for custom_id, request in job.requests.items():
+            result = results.get(custom_id)
+            if result is None:
+                results[custom_id] = BatchResult(custom_id, error=f"No result (batch {batch.status})")
+                continue
+            if result.error or custom_id in job.saved:
+                continue
+            try:
+                functions.database.save_to_history(
+                    job.history_mode, job.history_tone, request.get("prompt", ""), result.content
+                )
+            except Exception as exc:
+                print(f"WARN: Failed to save history for {custom_id}: {exc}")
+                continue
+            job.mark_saved(custom_id)
+            unflushed += 1
+            if unflushed >= SAVED_FLUSH_EVERY:
+                job.flush_saved()
+                unflushed = 0
+    finally:
+        if unflushed:
+            job.flush_saved()
+    return results
@@ -0,0 +1,244 @@
+"""Opt-in cProfile/tracemalloc profiling of jobs and Tk callbacks.
+
+Nothing in this module runs unless :func:`install_profiler` is called, which
+``main.py`` only does when ``ASANA_GPT_PROFILE=1`` is set or ``"profiling"``
+is enabled in ``config.json``.  Callers check :data:`ACTIVE_PROFILER` before
+wrapping anything, so a normal run pays for a single ``is None`` test.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+PROFILE_ENV_VAR = "ASANA_GPT_PROFILE"
+PROFILE_DIR_ENV_VAR = "ASANA_GPT_PROFILE_DIR"
+# Actions faster than this only update the summary; slower ones also get a
+# ``.prof`` dump and an allocation report.
+DEFAULT_DUMP_THRESHOLD_MS = 50.0
+DEFAULT_TRACEMALLOC_FRAMES = 10
+SUMMARY_FILE_NAME = "summary.txt"
+
+ACTIVE_PROFILER: Optional["ActionProfiler"] = None
+
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def app_directory() -> str:
+    """Directory next to the executable (frozen) or the project root."""
+
+    if getattr(sys, "frozen", False):
+        # PyInstaller unpacks modules into a temporary directory that is
+        # removed on exit, so write next to the executable instead.
+        return os.path.dirname(os.path.abspath(sys.executable))
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def profiling_requested(config: dict) -> bool:
+    value = os.environ.get(PROFILE_ENV_VAR, "").strip().lower()
+    if value:
+        return value not in {"0", "false", "no", "off"}
+    return bool(config.get("profiling", False))
+
+
+def _callback_label(func: Callable) -> str:
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", None)
+    if name is None:
+        name = type(func).__name__
+    return f"tk:{name}"
+
+
+class ActionProfiler:
+    """Profile named actions and keep per-label timing totals.
+
+    Each action runs under its own :class:`cProfile.Profile`.  Only one
+    profiler can be active per thread (and, from Python 3.12, per process), so
+    nested or concurrent actions that cannot get a profiler are still timed
+    but not dumped.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        dump_threshold_ms: float = DEFAULT_DUMP_THRESHOLD_MS,
+        tracemalloc_frames: int = DEFAULT_TRACEMALLOC_FRAMES,
+    ) -> None:
+        import tracemalloc
+
+        session = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.directory = os.path.join(directory, session)
+        os.makedirs(self.directory, exist_ok=True)
+        self.dump_threshold = max(0.0, dump_threshold_ms) / 1000
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._stats: dict[str, list] = {}  # label -> [count, total, max, peak bytes]
+        self._slowest: list[tuple[float, str, str]] = []
+        self._local = threading.local()
+        if tracemalloc_frames > 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(tracemalloc_frames)
+
+    @contextmanager
+    def action(self, label: str) -> Iterator[None]:
+        """Profile the enclosed block as one occurrence of *label*."""
+
+        import cProfile
+        import tracemalloc
+
+        profile = None
+        if not getattr(self._local, "busy", False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:  # Another profiler is active (Python 3.12+).
+                profile = None
+        if profile is not None:
+            self._local.busy = True
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # Peak tracking is process-wide, so concurrent actions inflate
+            # each other's numbers; good enough to spot the heavy ones.
+            memory_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            if profile is not None:
+                profile.disable()
+                self._local.busy = False
+            peak_growth = tracemalloc.get_traced_memory()[1] - memory_before if tracing else 0
+            self._finish(label, duration, max(0, peak_growth), profile)
+
+    def wrap(self, label: str, func: Callable) -> Callable:
+        """Return *func* wrapped so each call is profiled as *label*."""
+
+        def _profiled(*args, **kwargs):
+            with self.action(label):
+                return func(*args, **kwargs)
+
+        return _profiled
+
+    def _finish(self, label: str, duration: float, peak_growth: int, profile) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(label, [0, 0.0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] = max(entry[2], duration)
+            entry[3] = max(entry[3], peak_growth)
+            dump = profile is not None and duration >= self.dump_threshold
+            if dump:
+                self._sequence += 1
+                stem = f"{self._sequence:04d}-{_UNSAFE_FILENAME_RE.sub('_', label)[:80]}"
+        if not dump:
+            return
+
+        prof_path = os.path.join(self.directory, f"{stem}.prof")
+        try:
+            profile.dump_stats(prof_path)
+            self._write_allocations(
+                os.path.join(self.directory, f"{stem}.alloc.txt"), label, peak_growth
+            )
+        except OSError as exc:
+            print(f"WARN: Could not write profile for {label}: {exc}")
+            return
+        with self._lock:
+            self._slowest.append((duration, label, os.path.basename(prof_path)))
+            self._slowest.sort(reverse=True)
+            del self._slowest[50:]
+        print(f"INFO: Profiled {label} ({duration * 1000:.0f} ms) -> {prof_path}")
+        self.write_summary()
+
+    @staticmethod
+    def _write_allocations(path: str, label: str, peak_growth: int) -> None:
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            return
+        top_sites = tracemalloc.take_snapshot().statistics("lineno")[:20]
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(f"{label}: traced memory peaked {peak_growth / 1024:.0f} KiB above its start\n")
+            handle.write("Largest live allocation sites after the action:\n")
+            for stat in top_sites:
+                handle.write(f"{stat}\n")
+
+    def write_summary(self) -> str:
+        """Write ``summary.txt`` (slowest dumps and per-label totals) and return its path."""
+
+        with self._lock:
+            slowest = list(self._slowest)
+            totals = sorted(self._stats.items(), key=lambda item: item[1][1], reverse=True)
+        lines = ["Slowest profiled actions", ""]
+        for duration, label, file_name in slowest:
+            lines.append(f"{duration * 1000:10.1f} ms  {label}  ({file_name})")
+        lines += ["", "Totals per action", ""]
+        lines.append(f"{'total ms':>10} {'count':>7} {'max ms':>10} {'peak KiB':>9}  action")
+        for label, (count, total, longest, peak_growth) in totals:
+            lines.append(
+                f"{total * 1000:10.1f} {int(count):7d} {longest * 1000:10.1f}"
+                f" {peak_growth / 1024:9.0f}  {label}"
+            )
+        path = os.path.join(self.directory, SUMMARY_FILE_NAME)
+        try:
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+        except OSError as exc:
+            print(f"WARN: Could not write profiling summary: {exc}")
+        return path
+
+
+def _install_tk_hook(profiler: ActionProfiler) -> None:
+    """Profile every Tk callback by swapping in a profiling ``CallWrapper``.
+
+    Must run before the first widget is created; callbacks registered earlier
+    keep the stock wrapper.
+    """
+
+    import tkinter
+
+    base = tkinter.CallWrapper
+
+    class ProfilingCallWrapper(base):
+        def __init__(self, func, subst, widget):
+            super().__init__(func, subst, widget)
+            self._profile_label = _callback_label(func)
+
+        def __call__(self, *args):
+            with profiler.action(self._profile_label):
+                return super().__call__(*args)
+
+    tkinter.CallWrapper = ProfilingCallWrapper
+
+
+def install_profiler(
+    directory: Optional[str] = None,
+    *,
+    dump_threshold_ms: float = DEFAULT_DUMP_THRESHOLD_MS,
+    tracemalloc_frames: int = DEFAULT_TRACEMALLOC_FRAMES,
+    hook_tk: bool = True,
+) -> ActionProfiler:
+    """Enable profiling for the rest of the process and return the profiler."""
+
+    global ACTIVE_PROFILER
+    if ACTIVE_PROFILER is not None:
+        return ACTIVE_PROFILER
+    directory = directory or os.environ.get(PROFILE_DIR_ENV_VAR) or os.path.join(app_directory(), "profiles")
+    profiler = ActionProfiler(
+        directory,
+        dump_threshold_ms=dump_threshold_ms,
+        tracemalloc_frames=tracemalloc_frames,
+    )
+    if hook_tk:
+        _install_tk_hook(profiler)
+    ACTIVE_PROFILER = profiler
+    atexit.register(profiler.write_summary)
+    print(f"INFO: Profiling enabled; writing profiles to {profiler.directory}")
+    return profiler
@@ -0,0 +1,68 @@
+"""The history retention policy, derived once from ``config.json``.
+
+Kept apart from :mod:`functions.history_maintenance` so reading the config
+does not load the database code.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+DEFAULT_MAINTENANCE_INTERVAL_HOURS = 24.0
+# Rows archived and deleted per transaction; small batches keep the write
+# lock short so saving a new response never waits long.
+DEFAULT_DELETE_BATCH_SIZE = 200
+# Relative archive folders are resolved next to ``history.db``.
+DEFAULT_ARCHIVE_DIR = "history_archive"
+
+
+def _positive_int(value) -> Optional[int]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        return None
+    return int(value)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How much history to keep; ``None`` limits are not applied."""
+
+    max_age_days: Optional[int] = None
+    max_rows: Optional[int] = None
+    per_mode_max_rows: Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+    archive_dir: str = DEFAULT_ARCHIVE_DIR
+    interval_hours: float = DEFAULT_MAINTENANCE_INTERVAL_HOURS
+    batch_size: int = DEFAULT_DELETE_BATCH_SIZE
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RetentionPolicy":
+        """Read the ``history_retention`` block of *config*."""
+
+        raw = config.get("history_retention")
+        if not isinstance(raw, dict):
+            raw = {}
+        per_mode = {}
+        if isinstance(raw.get("per_mode_max_rows"), dict):
+            for mode, limit in raw["per_mode_max_rows"].items():
+                limit = _positive_int(limit)
+                if isinstance(mode, str) and limit is not None:
+                    per_mode[mode] = limit
+        archive_dir = raw.get("archive_dir")
+        if not isinstance(archive_dir, str) or not archive_dir:
+            archive_dir = DEFAULT_ARCHIVE_DIR
+        interval = raw.get("interval_hours")
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+            interval = DEFAULT_MAINTENANCE_INTERVAL_HOURS
+        return cls(
+            max_age_days=_positive_int(raw.get("max_age_days")),
+            max_rows=_positive_int(raw.get("max_rows")),
+            per_mode_max_rows=MappingProxyType(per_mode),
+            archive_dir=archive_dir,
+            interval_hours=float(interval),
+            batch_size=_positive_int(raw.get("batch_size")) or DEFAULT_DELETE_BATCH_SIZE,
+        )
+
+    @property
+    def prunes(self) -> bool:
+        return bool(self.max_age_days or self.max_rows or self.per_mode_max_rows)
@@ -0,0 +1,61 @@
+"""Settings for "similar past jobs", derived once from ``config.json``.
+
+Kept apart from :mod:`functions.history_index` so reading the config does
+not load the index or NumPy.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+DEFAULT_OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+DEFAULT_LOCAL_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# text-embedding-3 models can return shortened vectors; 512 keeps most of
+# the quality at a third of the size of the full 1536.
+DEFAULT_EMBEDDING_DIMENSIONS = 512
+DEFAULT_TOP_K = 5
+MAX_TOP_K = 20
+
+
+@dataclass(frozen=True)
+class SimilarJobsSettings:
+    """The ``similar_jobs`` block of ``config.json``."""
+
+    enabled: bool = False
+    # "openai", "local", or "auto" (local when sentence-transformers is installed).
+    backend: str = "auto"
+    openai_model: str = DEFAULT_OPENAI_EMBEDDING_MODEL
+    # OpenAI only; 0 asks for the model's full size.
+    dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS
+    local_model: str = DEFAULT_LOCAL_EMBEDDING_MODEL
+    top_k: int = DEFAULT_TOP_K
+    # Add the closest past jobs to the prompt when fixes are requested.
+    feed_fixes: bool = False
+
+    @classmethod
+    def from_config(cls, config: dict) -> "SimilarJobsSettings":
+        raw = config.get("similar_jobs")
+        if isinstance(raw, bool):
+            return cls(enabled=raw)
+        if not isinstance(raw, dict):
+            return cls()
+        backend = raw.get("backend")
+        if backend not in ("openai", "local", "auto"):
+            backend = "auto"
+        top_k = raw.get("top_k")
+        if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+            top_k = DEFAULT_TOP_K
+        dimensions = raw.get("dimensions", DEFAULT_EMBEDDING_DIMENSIONS)
+        if isinstance(dimensions, bool) or not isinstance(dimensions, int) or dimensions < 0:
+            dimensions = DEFAULT_EMBEDDING_DIMENSIONS
+        openai_model = raw.get("openai_model")
+        local_model = raw.get("local_model")
+        return cls(
+            enabled=raw.get("enabled", False) is True,
+            backend=backend,
+            openai_model=openai_model if isinstance(openai_model, str) and openai_model else DEFAULT_OPENAI_EMBEDDING_MODEL,
+            dimensions=dimensions,
+            local_model=local_model if isinstance(local_model, str) and local_model else DEFAULT_LOCAL_EMBEDDING_MODEL,
+            top_k=min(top_k, MAX_TOP_K),
+            feed_fixes=raw.get("feed_fixes", False) is True,
+        )
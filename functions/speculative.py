@@ -0,0 +1,246 @@
+"""Speculative summaries: start summarising a pasted email before the click.
+
+Once the input box has stopped changing for ``settle_ms``, the summary the
+**Summarise** button would request (same model and checkboxes) is requested
+in the background and cached under the hash of its prompt.  Clicking
+Summarise with the same options then shows the cached reply at once, or
+waits for the request already in flight instead of sending another.
+
+Changing the options drops a queued speculative request.  A request that is
+already on the wire cannot be recalled, so its reply is kept in the cache in
+case the options are switched back.  Speculation stops for the day once
+``max_requests_per_day`` or the estimated ``max_tokens_per_day`` is spent.
+The estimate counts the prompt actually sent, and the counters are written
+to the ``meta`` table before each request goes out, so neither a failed
+request nor a restart resets them.
+Nothing is written to history until a cached reply is actually shown.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import functions.database
+import functions.gpt
+import functions.jobs
+import functions.structured_summary
+from functions.speculative_settings import SpeculativeSettings
+from functions.structured_summary import SummaryReply
+
+# Shorter input is probably still being typed.
+MIN_INPUT_CHARS = 40
+CACHE_SIZE = 4
+SPEND_META_KEY = "speculative_spend"
+# Rough characters per token for the spend estimate.
+CHARS_PER_TOKEN = 4
+
+
+class SpeculativeEntry:
+    """A speculative request and, once it finishes, its reply."""
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.reply: Optional[SummaryReply] = None
+        self.error: str = ""
+        self.job: Optional[functions.jobs.Job] = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def finish(self, reply: Optional[SummaryReply] = None, error: str = "") -> None:
+        self.reply = reply
+        self.error = error
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class SpeculativeSummaries:
+    """Cache of speculative summaries keyed by model and prompt hash.
+
+    All methods except the job body are called on the Tk thread.
+    """
+
+    def __init__(
+        self,
+        settings: SpeculativeSettings,
+        openai_service,
+        job_executor: functions.jobs.JobExecutor,
+        *,
+        structured: bool = True,
+    ) -> None:
+        self.settings = settings
+        self._openai_service = openai_service
+        self._job_executor = job_executor
+        self._structured = structured
+        self._entries: OrderedDict[str, SpeculativeEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._spend = self._load_spend()
+        self.hits = 0
+
+    # Spend caps --------------------------------------------------------------
+    @staticmethod
+    def _today() -> str:
+        return datetime.date.today().isoformat()
+
+    def _load_spend(self) -> dict:
+        try:
+            spend = json.loads(functions.database.get_meta(SPEND_META_KEY) or "{}")
+        except ValueError:
+            spend = {}
+        if not isinstance(spend, dict) or spend.get("date") != self._today():
+            spend = {"date": self._today(), "requests": 0, "tokens": 0}
+        return spend
+
+    def _reserve(self, prompt_chars: int) -> bool:
+        """Count a request against today's caps; ``False`` when over budget."""
+
+        with self._lock:
+            if self._spend.get("date") != self._today():
+                self._spend = {"date": self._today(), "requests": 0, "tokens": 0}
+            tokens = prompt_chars // CHARS_PER_TOKEN
+            if (
+                self._spend["requests"] + 1 > self.settings.max_requests_per_day
+                or self._spend["tokens"] + tokens > self.settings.max_tokens_per_day
+            ):
+                return False
+            self._spend["requests"] += 1
+            self._spend["tokens"] += tokens
+            return True
+
+    def _refund(self, prompt_chars: int) -> None:
+        """Give back the reservation of a request that was never sent."""
+
+        with self._lock:
+            self._spend["requests"] = max(0, self._spend["requests"] - 1)
+            self._spend["tokens"] = max(0, self._spend["tokens"] - prompt_chars // CHARS_PER_TOKEN)
+
+    def _save_spend(self) -> None:
+        with self._lock:
+            snapshot = json.dumps(self._spend)
+        try:
+            functions.database.set_meta(SPEND_META_KEY, snapshot)
+        except Exception as exc:
+            print(f"WARN: Failed to record speculative spend: {exc}")
+
+    def _record_reply(self, reply_chars: int) -> None:
+        with self._lock:
+            self._spend["tokens"] += reply_chars // CHARS_PER_TOKEN
+        self._save_spend()
+
+    # Cache -------------------------------------------------------------------
+    def _prompt_for(self, email_text: str, include_tasks: bool, include_fixes: bool) -> str:
+        """Return the first prompt a summary of *email_text* sends."""
+
+        if self._structured:
+            return functions.structured_summary.build_structured_summary_prompt(
+                email_text, include_tasks=include_tasks, include_fixes=include_fixes
+            )
+        return functions.gpt.build_summary_prompt(
+            email_text, include_tasks=include_tasks, include_fixes=include_fixes
+        )
+
+    def _key_for_prompt(self, model: str, prompt: str) -> str:
+        return functions.database.content_hash(f"{model}\0{int(self._structured)}\0{prompt}")
+
+    def key_for(self, model: str, email_text: str, include_tasks: bool, include_fixes: bool) -> str:
+        """Return the cache key: the hash of the model and the first prompt sent."""
+
+        return self._key_for_prompt(model, self._prompt_for(email_text, include_tasks, include_fixes))
+
+    def take(self, key: str) -> Optional[SpeculativeEntry]:
+        """Remove and return the entry for *key*, finished or already running.
+
+        A request still queued is cancelled instead; the caller sends its own
+        request at normal priority.
+        """
+
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        if entry.job is not None and entry.job.state == functions.jobs.PENDING:
+            self._job_executor.cancel(entry.job)
+            return None
+        if entry.done and entry.reply is None:
+            return None
+        self.hits += 1
+        return entry
+
+    def cancel_pending(self) -> None:
+        """Drop speculative requests that have not been sent yet."""
+
+        for entry in list(self._entries.values()):
+            if entry.job is not None and entry.job.state == functions.jobs.PENDING:
+                self._job_executor.cancel(entry.job)
+
+    def speculate(self, model: str, email_text: str, include_tasks: bool, include_fixes: bool) -> bool:
+        """Start summarising *email_text* unless it is cached or over budget."""
+
+        if not self.settings.enabled:
+            return False
+        if not MIN_INPUT_CHARS <= len(email_text) <= self.settings.max_input_chars:
+            return False
+        prompt = self._prompt_for(email_text, include_tasks, include_fixes)
+        key = self._key_for_prompt(model, prompt)
+        existing = self._entries.get(key)
+        if existing is not None and not (existing.done and existing.reply is None):
+            self._entries.move_to_end(key)
+            return False
+        if not self._reserve(len(prompt)):
+            print("INFO: Speculative summary skipped; today's spend cap is reached")
+            return False
+
+        entry = SpeculativeEntry(key)
+
+        def worker() -> None:
+            job = functions.jobs.current_job()
+            if job is not None and job.cancelled:
+                self._refund(len(prompt))
+                entry.finish(error="Cancelled")
+                return
+            # Persist the reservation first: a request that fails or a
+            # restart before the reply must still count against the caps.
+            self._save_spend()
+            try:
+                reply = functions.structured_summary.generate_summary(
+                    self._openai_service,
+                    model,
+                    email_text,
+                    include_tasks=include_tasks,
+                    include_fixes=include_fixes,
+                    structured=self._structured,
+                )
+            except Exception as exc:
+                print(f"WARN: Speculative summary failed: {exc}")
+                entry.finish(error=str(exc))
+                return
+            self._record_reply(len(reply.markdown))
+            entry.finish(reply)
+
+        def on_finish(job: functions.jobs.Job) -> None:
+            # A job cancelled while queued never runs *worker*.
+            if job.state == functions.jobs.CANCELLED and not entry.done:
+                self._refund(len(prompt))
+                entry.finish(error="Cancelled")
+
+        try:
+            entry.job = self._job_executor.submit(
+                "openai", "Pre-summarising pasted email", worker, priority=-1, on_finish=on_finish
+            )
+        except functions.jobs.JobQueueFull:
+            self._refund(len(prompt))
+            return False
+        self._entries[key] = entry
+        while len(self._entries) > CACHE_SIZE:
+            _old_key, old_entry = self._entries.popitem(last=False)
+            if old_entry.job is not None and old_entry.job.state == functions.jobs.PENDING:
+                self._job_executor.cancel(old_entry.job)
+        print("INFO: Started a speculative summary")
+        return True
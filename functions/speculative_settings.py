@@ -0,0 +1,46 @@
+"""Settings for speculative summaries, derived once from ``config.json``.
+
+Kept apart from :mod:`functions.speculative` so reading the config does not
+load the OpenAI and history code.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+DEFAULT_SETTLE_MS = 1500
+DEFAULT_MAX_REQUESTS_PER_DAY = 50
+DEFAULT_MAX_TOKENS_PER_DAY = 200_000
+DEFAULT_MAX_INPUT_CHARS = 20_000
+
+
+def _positive_int(value, default: int) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        return default
+    return value
+
+
+@dataclass(frozen=True)
+class SpeculativeSettings:
+    """The ``speculative_summaries`` block of ``config.json``."""
+
+    enabled: bool = False
+    settle_ms: int = DEFAULT_SETTLE_MS
+    max_requests_per_day: int = DEFAULT_MAX_REQUESTS_PER_DAY
+    max_tokens_per_day: int = DEFAULT_MAX_TOKENS_PER_DAY
+    max_input_chars: int = DEFAULT_MAX_INPUT_CHARS
+
+    @classmethod
+    def from_config(cls, config: dict) -> "SpeculativeSettings":
+        raw = config.get("speculative_summaries")
+        if isinstance(raw, bool):
+            return cls(enabled=raw)
+        if not isinstance(raw, dict):
+            return cls()
+        return cls(
+            enabled=raw.get("enabled", False) is True,
+            settle_ms=_positive_int(raw.get("settle_ms"), DEFAULT_SETTLE_MS),
+            max_requests_per_day=_positive_int(raw.get("max_requests_per_day"), DEFAULT_MAX_REQUESTS_PER_DAY),
+            max_tokens_per_day=_positive_int(raw.get("max_tokens_per_day"), DEFAULT_MAX_TOKENS_PER_DAY),
+            max_input_chars=_positive_int(raw.get("max_input_chars"), DEFAULT_MAX_INPUT_CHARS),
+        )
@@ -0,0 +1,76 @@
+"""Startup phase timing and background pre-imports of heavy dependencies."""
+
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+# SDKs and parsers that are imported lazily on first use.  Warming them up in
+# the background after the first frame keeps the first click snappy without
+# delaying the window.
+BACKGROUND_PRELOAD_MODULES = ("openai", "asana", "PyPDF2", "docx")
+
+
+class StartupTimer:
+    """Record named startup phases against a single monotonic start time."""
+
+    def __init__(self, started_at: Optional[float] = None) -> None:
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self._phases: list[tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def record(self, name: str, duration: float) -> None:
+        with self._lock:
+            self._phases.append((name, duration))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as phase *name*."""
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def report(self, heading: str = "Startup timing") -> str:
+        """Return (and print) a breakdown of the recorded phases."""
+
+        with self._lock:
+            phases = list(self._phases)
+        lines = [f"INFO: {heading} ({self.elapsed() * 1000:.0f} ms since launch):"]
+        for name, duration in phases:
+            lines.append(f"INFO:   {name:<32} {duration * 1000:8.1f} ms")
+        text = "\n".join(lines)
+        print(text)
+        return text
+
+
+def preload_modules(
+    module_names: Iterable[str] = BACKGROUND_PRELOAD_MODULES,
+    timer: Optional[StartupTimer] = None,
+) -> threading.Thread:
+    """Import *module_names* on a daemon thread and record each import time."""
+
+    def _worker() -> None:
+        for module_name in module_names:
+            started = time.perf_counter()
+            try:
+                importlib.import_module(module_name)
+            except Exception as exc:  # pragma: no cover - optional dependency
+                print(f"WARN: Background import of {module_name} failed: {exc}")
+                continue
+            if timer is not None:
+                timer.record(f"background import {module_name}", time.perf_counter() - started)
+        if timer is not None:
+            timer.report("Startup timing incl. background imports")
+
+    thread = threading.Thread(target=_worker, name="preload-imports", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,441 @@
+"""Summaries returned as JSON (structured outputs) instead of free Markdown.
+
+The model fills a strict JSON schema with the summary, a nested task list,
+possible fixes and a priority hint.  The Markdown shown in the output box is
+rendered locally from that structure, and the Asana task is built from the
+structure directly, so the task list never has to be recovered from
+whatever formatting the model chose.
+
+Models or endpoints without JSON schema support fall back to the plain
+Markdown prompt; the task list is then parsed from the Markdown as before.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Sequence
+
+import functions.database
+import functions.gpt
+from functions.task_list import TaskItem, parse_due_date, tasks_to_markdown
+
+SUMMARY_SCHEMA_NAME = "job_summary"
+PACKED_SUMMARY_SCHEMA_NAME = "job_summaries"
+PRIORITY_HINTS = ("none", "low", "medium", "high", "urgent")
+# Sub-task levels the schema allows; Asana itself nests deeper, but summaries
+# never need to.
+MAX_TASK_DEPTH = 3
+
+
+def _task_schema(depth: int) -> dict:
+    properties = {
+        "name": {"type": "string"},
+        "assignee": {"type": "string"},
+        "due_on": {"type": "string"},
+    }
+    if depth > 1:
+        properties["subtasks"] = {"type": "array", "items": _task_schema(depth - 1)}
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "tasks": {"type": "array", "items": _task_schema(MAX_TASK_DEPTH)},
+        "fixes": {"type": "array", "items": {"type": "string"}},
+        "priority": {"type": "string", "enum": list(PRIORITY_HINTS)},
+    },
+    "required": ["summary", "tasks", "fixes", "priority"],
+    "additionalProperties": False,
+}
+
+# Several emails per request: one ``job_summary`` entry per email, numbered.
+PACKED_SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "emails": {
+            "type": "array",
+            "items": {
+                **SUMMARY_SCHEMA,
+                "properties": {"id": {"type": "integer"}, **SUMMARY_SCHEMA["properties"]},
+                "required": ["id", *SUMMARY_SCHEMA["required"]],
+            },
+        },
+    },
+    "required": ["emails"],
+    "additionalProperties": False,
+}
+
+# Models that rejected ``json_schema`` this session; they go straight to the
+# Markdown prompt instead of failing a request every time.
+_UNSUPPORTED_MODELS: set[str] = set()
+_UNSUPPORTED_LOCK = threading.Lock()
+
+
+def _task_from_payload(entry) -> Optional[TaskItem]:
+    if not isinstance(entry, dict):
+        return None
+    name = " ".join(str(entry.get("name") or "").split())
+    if not name:
+        return None
+    due_on = parse_due_date(str(entry.get("due_on") or "")) or ""
+    children = [
+        child
+        for child in (_task_from_payload(item) for item in entry.get("subtasks") or [])
+        if child is not None
+    ]
+    return TaskItem(name, str(entry.get("assignee") or "").strip(), due_on, children)
+
+
+@dataclass
+class StructuredSummary:
+    """A summary as returned by the ``job_summary`` schema."""
+
+    summary: str
+    tasks: list[TaskItem] = field(default_factory=list)
+    fixes: list[str] = field(default_factory=list)
+    # One of PRIORITY_HINTS other than "none", or "".
+    priority: str = ""
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "StructuredSummary":
+        tasks = [task for task in map(_task_from_payload, payload.get("tasks") or []) if task is not None]
+        fixes = [str(fix).strip() for fix in payload.get("fixes") or [] if str(fix).strip()]
+        priority = str(payload.get("priority") or "").strip().casefold()
+        return cls(
+            summary=str(payload.get("summary") or "").strip(),
+            tasks=tasks,
+            fixes=fixes,
+            priority=priority if priority in PRIORITY_HINTS and priority != "none" else "",
+        )
+
+    def to_payload(self) -> dict:
+        def task_payload(item: TaskItem) -> dict:
+            return {
+                "name": item.name,
+                "assignee": item.assignee,
+                "due_on": item.due_on,
+                "subtasks": [task_payload(child) for child in item.children],
+            }
+
+        return {
+            "summary": self.summary,
+            "tasks": [task_payload(task) for task in self.tasks],
+            "fixes": list(self.fixes),
+            "priority": self.priority or "none",
+        }
+
+    def _fixes_markdown(self) -> str:
+        if len(self.fixes) == 1:
+            return f"**Possible fix**\n{self.fixes[0]}"
+        if self.fixes:
+            return "**Possible fixes**\n" + "\n".join(f"- {fix}" for fix in self.fixes)
+        return ""
+
+    def notes_markdown(self) -> str:
+        """Return the summary and fixes, without the task list."""
+
+        return "\n\n".join(part for part in (self.summary, self._fixes_markdown()) if part)
+
+    def to_markdown(self) -> str:
+        """Render the whole summary as the Markdown shown in the output box."""
+
+        tasks = f"**Tasks**\n{tasks_to_markdown(self.tasks)}" if self.tasks else ""
+        return "\n\n".join(part for part in (self.summary, tasks, self._fixes_markdown()) if part)
+
+
+@dataclass
+class SummaryReply:
+    """What :func:`generate_summary` asked and got back."""
+
+    prompt: str
+    markdown: str
+    structured: Optional[StructuredSummary] = None
+
+
+def build_structured_summary_prompt(email_text: str,
+                                    *,
+                                    document_text: str = "",
+                                    include_tasks: bool = False,
+                                    include_fixes: bool = False,
+                                    past_jobs: Sequence[str] = ()) -> str:
+    """Return the summarize prompt for a reply in the ``job_summary`` schema."""
+
+    prompt = f"Summarize the following message:\n\n{email_text}\n\n"
+    if document_text:
+        prompt += f"Also summarize the following document:\n\n{document_text}\n\n"
+    prompt += "Fill in the reply fields as follows:\n" + _field_rules(include_tasks, include_fixes)
+    if include_fixes:
+        prompt += functions.gpt.past_jobs_context(past_jobs)
+    return prompt
+
+
+def _field_rules(include_tasks: bool, include_fixes: bool) -> str:
+    rules = (
+        ' -"summary": the summary as Markdown. Only bold, italics, dot points, and new lines;'
+        " no headers, <p> or <div>.\n"
+    )
+    if include_tasks:
+        rules += (
+            ' -"tasks": the tasks to be done based on the message, in reverse order. Put the steps'
+            ' of a task in its "subtasks". Set "assignee" to the person named for a task and'
+            ' "due_on" to a date given for it as YYYY-MM-DD, otherwise "".\n'
+        )
+    else:
+        rules += ' -"tasks": an empty list.\n'
+    if include_fixes:
+        rules += ' -"fixes": possible fixes to the issue mentioned, as Markdown.\n'
+    else:
+        rules += ' -"fixes": an empty list.\n'
+    return rules + ' -"priority": how urgent the message is; "none" when it does not say.'
+
+
+def _schema_unsupported(exc: Exception) -> bool:
+    """Return whether *exc* is the API rejecting the ``json_schema`` format."""
+
+    message = str(exc)
+    return getattr(exc, "status_code", None) == 400 and (
+        "response_format" in message or "json_schema" in message
+    )
+
+
+def generate_summary(openai_service,
+                     model: str,
+                     email_text: str,
+                     *,
+                     document_text: str = "",
+                     include_tasks: bool = False,
+                     include_fixes: bool = False,
+                     past_jobs: Sequence[str] = (),
+                     structured: bool = True) -> SummaryReply:
+    """Summarise *email_text*, as structured JSON when the model supports it.
+
+    Falls back to the Markdown prompt when the model rejects the schema or
+    returns an unusable reply; other errors (network, rate limits) propagate.
+    """
+
+    if structured and model not in _UNSUPPORTED_MODELS:
+        prompt = build_structured_summary_prompt(
+            email_text,
+            document_text=document_text,
+            include_tasks=include_tasks,
+            include_fixes=include_fixes,
+            past_jobs=past_jobs,
+        )
+        try:
+            payload = openai_service.generate_structured(
+                model, prompt, SUMMARY_SCHEMA, name=SUMMARY_SCHEMA_NAME
+            )
+        except ValueError as exc:
+            print(f"WARN: Structured summary unusable, using the Markdown prompt: {exc}")
+        except Exception as exc:
+            if not _schema_unsupported(exc):
+                raise
+            print(f"WARN: {model} does not accept JSON schema replies; using the Markdown prompt")
+            with _UNSUPPORTED_LOCK:
+                _UNSUPPORTED_MODELS.add(model)
+        else:
+            summary = StructuredSummary.from_payload(payload)
+            if summary.summary or summary.tasks:
+                return SummaryReply(prompt, summary.to_markdown(), summary)
+            print("WARN: Structured summary was empty; using the Markdown prompt")
+
+    prompt = functions.gpt.build_summary_prompt(
+        email_text,
+        document_text=document_text,
+        include_tasks=include_tasks,
+        include_fixes=include_fixes,
+        past_jobs=past_jobs,
+    )
+    return SummaryReply(prompt, openai_service.generate_response(model, prompt))
+
+
+# Several emails per request ----------------------------------------------------
+
+@dataclass
+class BatchSummary:
+    """Summary of one email from :func:`summarize_emails`.
+
+    ``prompt`` is the email's own summarize prompt, even when it was
+    answered as part of a pack, so history never holds the other emails.
+    """
+
+    prompt: str = ""
+    summary: str = ""
+    structured: Optional[StructuredSummary] = None
+    error: str = ""
+    packed: bool = False
+
+
+def build_packed_summary_prompt(emails: Sequence[str],
+                                *,
+                                include_tasks: bool = False,
+                                include_fixes: bool = False) -> str:
+    """Return one prompt asking for a ``job_summaries`` entry per email."""
+
+    parts = [
+        f"Summarize each of the following {len(emails)} messages separately. Each message"
+        " starts with a line <<<EMAIL n>>> and ends with <<<END EMAIL n>>>; never mix details"
+        " between messages.\n\n"
+        'Reply with exactly one entry in "emails" per message, in the same order, with "id"'
+        " set to the message number. Fill in each entry as follows:\n"
+        + _field_rules(include_tasks, include_fixes)
+    ]
+    for number, email_text in enumerate(emails, start=1):
+        parts.append(f"<<<EMAIL {number}>>>\n{email_text.strip()}\n<<<END EMAIL {number}>>>")
+    return "\n\n".join(parts)
+
+
+def parse_packed_summaries(payload: dict, count: int) -> dict[int, StructuredSummary]:
+    """Return ``{index: summary}`` for the emails a packed reply covers.
+
+    Indexes are zero based; missing, duplicated and empty entries are left
+    out so the caller can summarise those emails on their own.
+    """
+
+    entries = payload.get("emails") if isinstance(payload, dict) else None
+    if not isinstance(entries, list):
+        return {}
+    summaries: dict[int, StructuredSummary] = {}
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get("id", position + 1)) - 1
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= index < count or index in summaries:
+            continue
+        summary = StructuredSummary.from_payload(entry)
+        if summary.summary or summary.tasks:
+            summaries[index] = summary
+    return summaries
+
+
+def _summarize_pack(openai_service,
+                    model: str,
+                    emails: Sequence[str],
+                    *,
+                    include_tasks: bool,
+                    include_fixes: bool,
+                    structured: bool) -> tuple[dict[int, str], dict[int, StructuredSummary]]:
+    """Send one packed request; return ``(markdown, structured)`` by index."""
+
+    if structured and model not in _UNSUPPORTED_MODELS:
+        prompt = build_packed_summary_prompt(emails, include_tasks=include_tasks, include_fixes=include_fixes)
+        try:
+            payload = openai_service.generate_structured(
+                model, prompt, PACKED_SUMMARY_SCHEMA, name=PACKED_SUMMARY_SCHEMA_NAME
+            )
+        except ValueError as exc:
+            print(f"WARN: Packed structured summary unusable: {exc}")
+            return {}, {}
+        except Exception as exc:
+            if not _schema_unsupported(exc):
+                raise
+            print(f"WARN: {model} does not accept JSON schema replies; using the Markdown prompt")
+            with _UNSUPPORTED_LOCK:
+                _UNSUPPORTED_MODELS.add(model)
+        else:
+            summaries = parse_packed_summaries(payload, len(emails))
+            return {index: summary.to_markdown() for index, summary in summaries.items()}, summaries
+
+    prompt = functions.gpt.build_batch_summary_prompt(
+        emails, include_tasks=include_tasks, include_fixes=include_fixes
+    )
+    reply = openai_service.generate_response(
+        model, prompt, response_format=functions.gpt.JSON_RESPONSE_FORMAT
+    )
+    return functions.gpt.parse_batch_summary_response(reply, len(emails)), {}
+
+
+def summarize_emails(openai_service,
+                     model: str,
+                     emails: Sequence[str],
+                     *,
+                     include_tasks: bool = False,
+                     include_fixes: bool = False,
+                     structured: bool = True,
+                     max_emails: int = functions.gpt.BATCH_SUMMARY_MAX_EMAILS,
+                     char_budget: int = functions.gpt.BATCH_SUMMARY_CHAR_BUDGET,
+                     history_tone: str | None = "batch",
+                     should_stop: Optional[Callable[[], bool]] = None) -> list[BatchSummary]:
+    """Summarise *emails* with as few requests as possible.
+
+    Emails are packed into one request per group (structured JSON when the
+    model supports it, JSON mode otherwise); any email the reply does not
+    cover, or a pack whose request fails, is summarised on its own with
+    :func:`generate_summary`.  Each summary is saved as its own
+    ``summarize`` history row as its group finishes, unless *history_tone*
+    is ``None``.  Returns one :class:`BatchSummary` per email, in order;
+    emails not reached before *should_stop* returns true are marked
+    cancelled.
+    """
+
+    results = [BatchSummary() for _email in emails]
+    groups = functions.gpt.pack_emails(emails, max_emails=max_emails, char_budget=char_budget)
+    for number, group in enumerate(groups):
+        if should_stop is not None and should_stop():
+            for index in (index for later in groups[number:] for index in later):
+                results[index].error = "Cancelled"
+            break
+        markdown, structured_replies = {}, {}
+        if len(group) > 1:
+            try:
+                markdown, structured_replies = _summarize_pack(
+                    openai_service,
+                    model,
+                    [emails[index] for index in group],
+                    include_tasks=include_tasks,
+                    include_fixes=include_fixes,
+                    structured=structured,
+                )
+            except Exception as exc:
+                print(f"WARN: Packed summary of {len(group)} emails failed: {exc}")
+            if len(markdown) < len(group):
+                print(
+                    f"WARN: Packed reply covered {len(markdown)} of {len(group)} emails;"
+                    " summarising the rest one by one"
+                )
+        for position, index in enumerate(group):
+            result = results[index]
+            if position in markdown:
+                result.prompt = build_structured_summary_prompt(
+                    emails[index], include_tasks=include_tasks, include_fixes=include_fixes
+                )
+                result.summary = markdown[position]
+                result.structured = structured_replies.get(position)
+                result.packed = True
+                continue
+            try:
+                reply = generate_summary(
+                    openai_service,
+                    model,
+                    emails[index],
+                    include_tasks=include_tasks,
+                    include_fixes=include_fixes,
+                    structured=structured,
+                )
+            except Exception as exc:
+                result.error = str(exc)
+                continue
+            result.prompt, result.summary, result.structured = reply.prompt, reply.markdown, reply.structured
+
+        if history_tone is None:
+            continue
+        for index in group:
+            result = results[index]
+            if not result.summary:
+                continue
+            try:
+                functions.database.save_to_history("summarize", history_tone, result.prompt, result.summary)
+            except Exception as exc:
+                print(f"WARN: Failed to save batch summary to history: {exc}")
+    return results
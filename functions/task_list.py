@@ -0,0 +1,183 @@
+"""Parse the task list of a summary into editable, nested task items.
+
+Summaries end with a list of jobs to do.  Items may be numbered (``1.`` or
+``1)``) or bulleted (``-``, ``*``, ``+``, ``•``); indentation nests them.  An
+item can carry hints that are lifted out of its name:
+
+* ``@Joe`` or ``(assignee: Joe Bloggs)`` – assignee label or email.
+* ``(due 2024-05-31)``, ``due: 31/05/2024`` or ``by 2024-05-31`` – due date;
+  slashed dates are read day first.
+
+When the summary has a "Tasks" heading (``**Tasks**``, ``## Tasks``,
+``Next steps:`` …) every list item under it is a task.  Without one, only
+numbered items and the items nested under them are, as before.
+"""
+
+from __future__ import annotations
+
+import datetime
+import re
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+TAB_WIDTH = 4
+
+_ITEM_RE = re.compile(
+    r"^(?P<indent>[ \t]*)(?:(?P<number>\d+)[.)]|(?P<bullet>[-*+•]))[ \t]+"
+    r"(?:\[[ xX]\][ \t]+)?(?P<text>\S.*?)\s*$"
+)
+_HEADING_RE = re.compile(
+    r"^\s*(?:#{1,6}\s*)?(?:\*\*|__)?\s*"
+    r"(?:(?:sub-?)?tasks?|action items?|next steps?|to-?dos?)"
+    r"\s*:?\s*(?:\*\*|__)?\s*:?\s*$",
+    re.IGNORECASE,
+)
+# Any other heading or bold-only line ends a "Tasks" section.
+_SECTION_RE = re.compile(r"^\s*(?:#{1,6}\s+\S|(?:\*\*|__)[^*_]+(?:\*\*|__)\s*:?\s*$)")
+_DATE = r"\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}/\d{4}"
+_DUE_RE = re.compile(
+    rf"\(\s*(?:due|by)\s*:?\s*(?P<paren>{_DATE})\s*\)|\b(?:due|by)\s*:?\s*(?P<bare>{_DATE})\b",
+    re.IGNORECASE,
+)
+_ASSIGNEE_RE = re.compile(
+    r"\(\s*(?:assignee|assigned to|owner)\s*:?\s*(?P<paren>[^)]+?)\s*\)"
+    r"|(?<![\w.])@(?P<bare>[\w.+-]+(?:@[\w-]+(?:\.[\w-]+)+)?)",
+    re.IGNORECASE,
+)
+_INLINE_MARKUP_RE = re.compile(r"(\*\*|__|`)")
+
+
+@dataclass
+class TaskItem:
+    """One task list entry; ``children`` become sub-tasks of this item."""
+
+    name: str
+    assignee: str = ""
+    due_on: str = ""
+    children: list["TaskItem"] = field(default_factory=list)
+
+    def walk(self, depth: int = 0) -> Iterator[tuple["TaskItem", int]]:
+        """Yield this item and its descendants with their depth, depth first."""
+
+        yield self, depth
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+
+def parse_due_date(value: str) -> Optional[str]:
+    """Return *value* (ISO or day-first ``d/m/Y``) as an ISO date, or ``None``."""
+
+    value = value.strip()
+    try:
+        if "/" in value:
+            return datetime.datetime.strptime(value, "%d/%m/%Y").date().isoformat()
+        year, month, day = (int(part) for part in value.split("-"))
+        return datetime.date(year, month, day).isoformat()
+    except ValueError:
+        return None
+
+
+def _indent_width(indent: str) -> int:
+    return len(indent.expandtabs(TAB_WIDTH))
+
+
+def parse_item_text(text: str) -> TaskItem:
+    """Build a :class:`TaskItem` from one line of text, lifting out hints."""
+
+    due_on = ""
+    match = _DUE_RE.search(text)
+    if match:
+        parsed = parse_due_date(match.group("paren") or match.group("bare"))
+        if parsed:
+            due_on = parsed
+            text = text[:match.start()] + text[match.end():]
+    assignee = ""
+    match = _ASSIGNEE_RE.search(text)
+    if match:
+        assignee = (match.group("paren") or match.group("bare")).strip()
+        text = text[:match.start()] + text[match.end():]
+    name = " ".join(_INLINE_MARKUP_RE.sub("", text).split()).strip(" -–—,;:")
+    return TaskItem(name=name, assignee=assignee, due_on=due_on)
+
+
+def split_task_list(markdown: str) -> tuple[str, list[TaskItem]]:
+    """Return ``(remaining_markdown, items)`` for a summary.
+
+    Lines that became tasks are removed from the returned markdown so the
+    task notes do not repeat them.
+    """
+
+    lines = markdown.splitlines()
+    has_heading = any(_HEADING_RE.match(line) for line in lines)
+    in_section = False
+    remaining: list[str] = []
+    roots: list[TaskItem] = []
+    # (indent, item) of the open items the next line may nest under.
+    stack: list[tuple[int, TaskItem]] = []
+
+    for line in lines:
+        if has_heading:
+            if _HEADING_RE.match(line):
+                in_section = True
+                stack.clear()
+                continue
+            if in_section and (_SECTION_RE.match(line) or (line.strip() and not line[:1].isspace()
+                                                           and not _ITEM_RE.match(line))):
+                in_section = False
+                stack.clear()
+
+        match = _ITEM_RE.match(line)
+        if match is None:
+            if line.strip():
+                stack.clear()
+            if not (has_heading and in_section and not line.strip()):
+                remaining.append(line)
+            continue
+
+        indent = _indent_width(match.group("indent"))
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        if has_heading:
+            is_task = in_section
+        else:
+            is_task = bool(stack) or match.group("number") is not None
+        if not is_task:
+            remaining.append(line)
+            continue
+
+        item = parse_item_text(match.group("text"))
+        if not item.name:
+            continue
+        if stack:
+            stack[-1][1].children.append(item)
+        else:
+            roots.append(item)
+        stack.append((indent, item))
+
+    return "\n".join(remaining).strip(), roots
+
+
+def format_item_text(item: TaskItem) -> str:
+    """Return *item* as one line of text that :func:`parse_item_text` reads back."""
+
+    text = item.name
+    if item.assignee:
+        text += f" (assignee: {item.assignee})"
+    if item.due_on:
+        text += f" (due {item.due_on})"
+    return text
+
+
+def tasks_to_markdown(items: list[TaskItem]) -> str:
+    """Render *items* as a numbered list with nested bullets for sub-items."""
+
+    lines = []
+    for number, root in enumerate(items, start=1):
+        for item, depth in root.walk():
+            marker = f"{number}." if depth == 0 else "-"
+            lines.append(f"{' ' * (TAB_WIDTH * depth)}{marker} {format_item_text(item)}")
+    return "\n".join(lines)
+
+
+def count_items(items: list[TaskItem]) -> int:
+    return sum(1 for item in items for _ in item.walk())
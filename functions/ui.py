@@ -1,22 +1,29 @@
 from __future__ import annotations
 
 import sys
+import threading
 import tkinter as tk
 from tkinter import messagebox
 
 from typing import Any, Callable
 
-from docx import Document
-
-import PyPDF2
-
 from vendor_setup import ensure_vendor_path
 
 ensure_vendor_path()
 
 import markdown
 
-from functions.clipboard import get_clipboard_html, set_clipboard_html
+from functions.clipboard import (
+    extract_clipboard_fragment,
+    get_clipboard_html_raw,
+    set_clipboard_html,
+)
+from functions.html_sanitizer import html_to_preview_text, sanitize_html_fragment
+from functions.metrics import span
+
+# Pasted HTML larger than this many characters shows a plain-text preview
+# while the sanitized render is prepared on a worker thread.
+DEFAULT_PASTE_PREVIEW_THRESHOLD = 100_000
 
 
 CF_HTML_HEADER_TEMPLATE = (
@@ -144,7 +151,8 @@ def copy_output(tk_root, output_text, *, show_alert: bool = True) -> bool:
     markdown_text = get_widget_markdown(output_text)
     html_text = getattr(output_text, "rendered_html", None)
     if not html_text:
-        html_text = markdown.markdown(markdown_text)
+        with span("render.markdown", chars=len(markdown_text)):
+            html_text = markdown.markdown(markdown_text)
 
     cf_html = _build_cf_html(html_text)
 
@@ -182,25 +190,73 @@ def _bind_sequence(widget: tk.Misc, sequence: str, callback: Callable[[tk.Event]
         widget.bind(sequence, callback)
 
 
-def enable_html_clipboard_paste(widget: tk.Text) -> None:
-    """Allow ``widget`` to render HTML fragments when pasted from the clipboard."""
+def _replace_widget_text(widget: tk.Text, text: str) -> None:
+    try:
+        widget.config(state=tk.NORMAL)
+    except tk.TclError:  # pragma: no cover - defensive fallback
+        pass
+    widget.delete("1.0", tk.END)
+    widget.insert(tk.INSERT, text)
 
-    def _handle_paste(event: tk.Event) -> str | None:
-        html_fragment = get_clipboard_html(widget)
-        if not html_fragment:
-            return None
+
+def enable_html_clipboard_paste(
+    widget: tk.Text,
+    *,
+    preview_threshold: int = DEFAULT_PASTE_PREVIEW_THRESHOLD,
+) -> None:
+    """Allow ``widget`` to render HTML fragments when pasted from the clipboard.
+
+    Only the clipboard read happens inside the key binding.  Fragment
+    extraction and sanitizing run on a worker thread and the cleaned markup is
+    rendered back on the Tk thread.  Payloads larger than *preview_threshold*
+    characters show a plain-text preview while the full render is prepared.
+    """
+
+    paste_generation = [0]
+
+    def _render(generation: int, html_fragment: str, cleaned_html: str) -> None:
+        if generation != paste_generation[0]:
+            return  # A newer paste superseded this one.
 
         if hasattr(widget, "set_html"):
             try:
-                widget.set_html(html_fragment)
+                with span("render.set_html", chars=len(cleaned_html)):
+                    widget.set_html(cleaned_html)
             except Exception:  # pragma: no cover - defensive fallback
-                widget.delete("1.0", tk.END)
-                widget.insert(tk.INSERT, html_fragment)
+                _replace_widget_text(widget, html_to_preview_text(html_fragment))
         else:  # pragma: no cover - compatibility fallback
-            widget.delete("1.0", tk.END)
-            widget.insert(tk.INSERT, html_fragment)
+            _replace_widget_text(widget, html_fragment)
 
         setattr(widget, "raw_html", html_fragment)
+
+    def _show_preview(generation: int, preview_text: str) -> None:
+        if generation != paste_generation[0]:
+            return
+        _replace_widget_text(widget, preview_text)
+
+    def _prepare(generation: int, raw_html: str) -> None:
+        try:
+            html_fragment = extract_clipboard_fragment(raw_html)
+            if len(html_fragment) > preview_threshold:
+                preview_text = html_to_preview_text(html_fragment)
+                widget.after(0, lambda: _show_preview(generation, preview_text))
+            cleaned_html = sanitize_html_fragment(html_fragment)
+        except Exception as exc:  # pragma: no cover - defensive fallback
+            print(f"ERR: Failed to prepare pasted HTML: {exc}")
+            return
+        widget.after(0, lambda: _render(generation, html_fragment, cleaned_html))
+
+    def _handle_paste(event: tk.Event) -> str | None:
+        raw_html = get_clipboard_html_raw(widget)
+        if not raw_html:
+            return None
+
+        paste_generation[0] += 1
+        threading.Thread(
+            target=_prepare,
+            args=(paste_generation[0], raw_html),
+            daemon=True,
+        ).start()
         return "break"
 
     _bind_sequence(widget, "<<Paste>>", _handle_paste)
@@ -245,10 +301,12 @@ def display_markdown(output_widget: Any, markdown_text: str) -> None:
 
     cleaned_markdown = normalize_markdown_spacing(markdown_text)
     setattr(output_widget, "raw_markdown", cleaned_markdown)
-    html_text = markdown.markdown(cleaned_markdown)
+    with span("render.markdown", chars=len(cleaned_markdown)):
+        html_text = markdown.markdown(cleaned_markdown)
     setattr(output_widget, "rendered_html", html_text)
     if hasattr(output_widget, "set_html"):
-        output_widget.set_html(html_text)
+        with span("render.set_html", chars=len(html_text)):
+            output_widget.set_html(html_text)
     else:  # pragma: no cover - compatibility fallback
         try:
             output_widget.config(state=tk.NORMAL)
@@ -258,6 +316,24 @@ def display_markdown(output_widget: Any, markdown_text: str) -> None:
             pass
 
 
+def attach_structured_summary(output_widget: Any, structured: Any) -> None:
+    """Remember the structured summary behind the Markdown now displayed."""
+
+    setattr(output_widget, "structured_summary", (getattr(output_widget, "raw_markdown", None), structured))
+
+
+def get_widget_structured_summary(output_widget: Any) -> Any:
+    """Return the attached structured summary while its Markdown is still shown."""
+
+    attached = getattr(output_widget, "structured_summary", None)
+    if not attached:
+        return None
+    markdown_text, structured = attached
+    if markdown_text is None or markdown_text != getattr(output_widget, "raw_markdown", None):
+        return None
+    return structured
+
+
 def markdown_to_plain_text(markdown_text: str) -> str:
     """Convert Markdown to plain text for clipboard and API payloads."""
 
@@ -0,0 +1,143 @@
+"""Detect Tk main-loop stalls and log the callback that caused them."""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+import tkinter as tk
+import traceback
+from typing import Callable, Optional
+
+from functions.metrics import METRICS
+
+DEFAULT_TICK_INTERVAL_MS = 100
+DEFAULT_STALL_THRESHOLD_MS = 300
+
+_STOCK_CALL_WRAPPER = tk.CallWrapper
+
+
+def _describe_frame(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def find_tk_callback(frame) -> tuple[str, list[str]]:
+    """Return the Tk callback running in *frame*'s stack and the formatted stack.
+
+    The callback is the frame directly inside the innermost
+    ``tkinter.CallWrapper.__call__``; when the stack has no such frame the
+    innermost frame is reported instead.
+    """
+
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()  # Outermost first.
+
+    callback_frame = None
+    for index, candidate in enumerate(frames[:-1]):
+        if candidate.f_code.co_name == "__call__" and isinstance(
+            candidate.f_locals.get("self"), _STOCK_CALL_WRAPPER
+        ):
+            callback_frame = frames[index + 1]
+    if callback_frame is not None:
+        description = _describe_frame(callback_frame)
+    elif frames:
+        description = f"<outside Tk callback> {_describe_frame(frames[-1])}"
+    else:
+        description = "<unknown>"
+    stack = traceback.format_list(traceback.extract_stack(frames[-1])) if frames else []
+    return description, stack
+
+
+class UiWatchdog:
+    """Measure event-loop latency with ``after`` ticks and report stalls.
+
+    The Tk thread only records a timestamp per tick.  A daemon thread checks
+    how long ago the last tick ran; once that exceeds the threshold it grabs
+    the Tk thread's stack with :func:`sys._current_frames`, so the report
+    shows what was blocking rather than what ran afterwards.
+    """
+
+    def __init__(
+        self,
+        root: tk.Misc,
+        *,
+        interval_ms: int = DEFAULT_TICK_INTERVAL_MS,
+        stall_threshold_ms: int = DEFAULT_STALL_THRESHOLD_MS,
+        on_stall: Optional[Callable[[float, str, list[str]], None]] = None,
+    ) -> None:
+        self.root = root
+        self.interval = max(10, interval_ms) / 1000
+        self.threshold = max(self.interval * 2, stall_threshold_ms / 1000)
+        self.on_stall = on_stall
+        self.max_latency = 0.0
+        self.stall_count = 0
+        self._last_tick = time.monotonic()
+        self._tk_thread_id: Optional[int] = None
+        self._pending: Optional[tuple[str, list[str]]] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._after_id: Optional[str] = None
+
+    def start(self) -> "UiWatchdog":
+        """Start ticking; must be called from the Tk thread."""
+
+        self._tk_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._after_id = self.root.after(int(self.interval * 1000), self._tick)
+        threading.Thread(target=self._watch, name="ui-watchdog", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            latency = now - self._last_tick - self.interval
+            self._last_tick = now
+            pending, self._pending = self._pending, None
+        self.max_latency = max(self.max_latency, latency)
+        if pending is not None:
+            self._report(latency, *pending)
+        if not self._stop.is_set():
+            self._after_id = self.root.after(int(self.interval * 1000), self._tick)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval / 2):
+            with self._lock:
+                waited = time.monotonic() - self._last_tick
+                already_captured = self._pending is not None
+            if waited < self.threshold or already_captured:
+                continue
+            frame = sys._current_frames().get(self._tk_thread_id)
+            if frame is None:
+                continue
+            callback, stack = find_tk_callback(frame)
+            del frame
+            with self._lock:
+                # The tick may have run while the stack was being captured.
+                if time.monotonic() - self._last_tick >= self.threshold:
+                    self._pending = (callback, stack)
+
+    def _report(self, stalled_for: float, callback: str, stack: list[str]) -> None:
+        self.stall_count += 1
+        print(f"WARN: UI stalled for {stalled_for * 1000:.0f} ms in {callback}")
+        print("WARN: Tk thread stack when the stall was detected:\n" + "".join(stack).rstrip())
+        METRICS.record(
+            "ui.stall",
+            stalled_for,
+            attributes={"callback": callback, "stack": "".join(stack)},
+        )
+        if self.on_stall is not None:
+            self.on_stall(stalled_for, callback, stack)
@@ -0,0 +1,249 @@
+import datetime
+import threading
+import tkinter as tk
+from collections import deque
+from tkinter import messagebox, ttk
+from typing import Callable
+
+import functions.database
+import functions.jobs
+
+ALL_FILTER = "All"
+# Fetch the next page once the visible part of the list reaches this
+# fraction of the rows loaded so far (or 1 - this, scrolling back up).
+LOAD_MORE_AT = 0.9
+# Pages kept in the list; the page furthest from the view is dropped when
+# another is loaded, so the tree stays small however far the user scrolls.
+MAX_LOADED_PAGES = 5
+
+
+def _parse_date(value: str) -> str | None:
+    """Return *value* as an ISO date, ``None`` when blank; raises on bad input."""
+
+    value = value.strip()
+    if not value:
+        return None
+    return datetime.date.fromisoformat(value).isoformat()
+
+
+class HistoryWindow(tk.Toplevel):
+    """Browse the whole history table one keyset page at a time.
+
+    Only the first page is queried when the window opens; further pages are
+    fetched on a background job as the list is scrolled near either end, and
+    at most :data:`MAX_LOADED_PAGES` pages are kept in the tree, so the
+    window stays responsive however large ``history.db`` is.
+    """
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        on_open: Callable[[int], None],
+        *,
+        submit: Callable[[str, Callable[[], None]], object] | None = None,
+    ) -> None:
+        super().__init__(master)
+        self.title("History")
+        self.geometry("760x480")
+        self.on_open = on_open
+        self._submit = submit
+        self._generation = 0
+        self._loading = False
+        self._has_older = True
+        self._has_newer = False
+        # (timestamp, id) keys of the loaded pages, newest page first.
+        self._pages: deque[list[tuple[str, int]]] = deque()
+        # Rows dropped above the first loaded page.
+        self._offset = 0
+        self._filters: dict = {}
+
+        filter_frame = ttk.Frame(self, style="App.TFrame", padding=(8, 8, 8, 0))
+        filter_frame.pack(fill="x")
+        self.mode_var = tk.StringVar(value=ALL_FILTER)
+        self.tone_var = tk.StringVar(value=ALL_FILTER)
+        self.since_var = tk.StringVar()
+        self.until_var = tk.StringVar()
+
+        ttk.Label(filter_frame, text="Mode:").pack(side="left")
+        self.mode_box = ttk.Combobox(
+            filter_frame, textvariable=self.mode_var, values=[ALL_FILTER], width=12, state="readonly"
+        )
+        self.mode_box.pack(side="left", padx=(2, 8))
+        ttk.Label(filter_frame, text="Tone:").pack(side="left")
+        self.tone_box = ttk.Combobox(
+            filter_frame, textvariable=self.tone_var, values=[ALL_FILTER], width=14, state="readonly"
+        )
+        self.tone_box.pack(side="left", padx=(2, 8))
+        ttk.Label(filter_frame, text="From:").pack(side="left")
+        ttk.Entry(filter_frame, textvariable=self.since_var, width=11).pack(side="left", padx=(2, 8))
+        ttk.Label(filter_frame, text="To:").pack(side="left")
+        ttk.Entry(filter_frame, textvariable=self.until_var, width=11).pack(side="left", padx=(2, 8))
+        ttk.Button(filter_frame, text="Apply", command=self.apply_filters).pack(side="left")
+        self.mode_box.bind("<<ComboboxSelected>>", lambda _event: self.apply_filters())
+        self.tone_box.bind("<<ComboboxSelected>>", lambda _event: self.apply_filters())
+
+        list_frame = ttk.Frame(self, style="App.TFrame", padding=8)
+        list_frame.pack(fill="both", expand=True)
+        columns = ("id", "timestamp", "mode", "tone")
+        self.tree = ttk.Treeview(list_frame, columns=columns, show="headings", selectmode="browse")
+        for column, heading, width in (
+            ("id", "#", 70),
+            ("timestamp", "Date", 200),
+            ("mode", "Mode", 120),
+            ("tone", "Tone", 160),
+        ):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, stretch=column == "timestamp")
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=lambda first, last: self._on_scroll(scrollbar, first, last))
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.bind("<Double-1>", lambda _event: self.open_selected())
+        self.tree.bind("<Return>", lambda _event: self.open_selected())
+
+        bottom = ttk.Frame(self, style="App.TFrame", padding=(8, 0, 8, 8))
+        bottom.pack(fill="x")
+        self.status_label = ttk.Label(bottom, text="", style="Muted.TLabel")
+        self.status_label.pack(side="left")
+        ttk.Button(bottom, text="Open", command=self.open_selected).pack(side="right")
+
+        self._run(self._load_filter_values)
+        self.apply_filters()
+
+    # Background work -------------------------------------------------------
+    def _run(self, func: Callable[[], None]) -> None:
+        if self._submit is not None:
+            try:
+                self._submit("Loading history…", func)
+                return
+            except functions.jobs.JobQueueFull as exc:
+                print(f"WARN: {exc}")
+        threading.Thread(target=func, daemon=True).start()
+
+    def _deliver(self, callback: Callable[[], None]) -> None:
+        try:
+            self.after(0, callback)
+        except (RuntimeError, tk.TclError):
+            pass  # Window closed while the query ran.
+
+    def _load_filter_values(self) -> None:
+        modes, tones = functions.database.fetch_history_filter_values()
+
+        def apply() -> None:
+            if self.winfo_exists():
+                self.mode_box.configure(values=[ALL_FILTER, *modes])
+                self.tone_box.configure(values=[ALL_FILTER, *tones])
+
+        self._deliver(apply)
+
+    # Paging ----------------------------------------------------------------
+    def apply_filters(self) -> None:
+        try:
+            since = _parse_date(self.since_var.get())
+            until = _parse_date(self.until_var.get())
+        except ValueError:
+            messagebox.showerror("History", "Dates must look like 2024-01-31.", parent=self)
+            return
+        if until is not None:
+            # Include the whole "To" day.
+            until = (datetime.date.fromisoformat(until) + datetime.timedelta(days=1)).isoformat()
+        mode = self.mode_var.get()
+        tone = self.tone_var.get()
+        self._filters = {
+            "mode": None if mode == ALL_FILTER else mode,
+            "tone": None if tone == ALL_FILTER else tone,
+            "since": since,
+            "until": until,
+        }
+        self._generation += 1
+        self._pages.clear()
+        self._offset = 0
+        self._has_older = True
+        self._has_newer = False
+        self._loading = False
+        self.tree.delete(*self.tree.get_children())
+        self.load_more()
+
+    def load_more(self, *, newer: bool = False) -> None:
+        if self._loading or not (self._has_newer if newer else self._has_older):
+            return
+        self._loading = True
+        generation = self._generation
+        if not self._pages:
+            bounds = {}
+        elif newer:
+            bounds = {"after": self._pages[0][0]}
+        else:
+            bounds = {"before": self._pages[-1][-1]}
+        filters = dict(self._filters)
+        self.status_label.config(text="Loading…")
+
+        def worker() -> None:
+            try:
+                rows = functions.database.fetch_history_page(**bounds, **filters)
+            except Exception as exc:  # pragma: no cover - database errors are shown
+                print(f"ERR: Failed to load history page: {exc}")
+                rows = None
+            self._deliver(lambda: self._add_page(generation, rows, newer))
+
+        self._run(worker)
+
+    def _add_page(self, generation: int, rows: list | None, newer: bool) -> None:
+        if generation != self._generation or not self.winfo_exists():
+            return  # Filters changed while this page was loading.
+        self._loading = False
+        if rows is None:
+            self.status_label.config(text="Failed to load history.")
+            return
+        full_page = len(rows) >= functions.database.HISTORY_PAGE_SIZE
+        anchor = self.tree.identify_row(1) if self.tree.get_children() else ""
+        if rows:
+            keys = [(timestamp, entry_id) for entry_id, timestamp, _mode, _tone in rows]
+            for position, (entry_id, timestamp, mode, tone) in enumerate(rows):
+                self.tree.insert(
+                    "",
+                    position if newer else "end",
+                    iid=str(entry_id),
+                    values=(entry_id, timestamp, mode or "", tone or ""),
+                )
+            if newer:
+                self._pages.appendleft(keys)
+                self._offset = max(0, self._offset - len(keys))
+            else:
+                self._pages.append(keys)
+        if newer:
+            self._has_newer = full_page and self._offset > 0
+        else:
+            self._has_older = full_page
+        if len(self._pages) > MAX_LOADED_PAGES:
+            dropped = self._pages.pop() if newer else self._pages.popleft()
+            self.tree.delete(*(str(entry_id) for _timestamp, entry_id in dropped))
+            if newer:
+                self._has_older = True
+            else:
+                self._offset += len(dropped)
+                self._has_newer = True
+        if anchor and self.tree.exists(anchor):
+            # Keep the row at the top of the view in place as rows are
+            # added or removed above it.
+            self.tree.yview_moveto(self.tree.index(anchor) / max(1, len(self.tree.get_children())))
+        count = len(self.tree.get_children())
+        suffix = "+" if self._has_older else ""
+        first = self._offset + 1 if count else 0
+        self.status_label.config(text=f"Entries {first}–{self._offset + count}{suffix}")
+
+    def _on_scroll(self, scrollbar: ttk.Scrollbar, first: str, last: str) -> None:
+        scrollbar.set(first, last)
+        # An unmapped tree reports everything as visible; wait for layout so
+        # opening the window does not page through the whole table.
+        if not self.tree.winfo_ismapped():
+            return
+        if float(last) >= LOAD_MORE_AT:
+            self.load_more()
+        elif float(first) <= 1 - LOAD_MORE_AT and self._has_newer:
+            self.load_more(newer=True)
+
+    def open_selected(self) -> None:
+        selection = self.tree.selection()
+        if selection:
+            self.on_open(int(selection[0]))
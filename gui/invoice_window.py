@@ -1,30 +1,37 @@
+import os
 import threading
 import tkinter as tk
-from tkinter import messagebox, scrolledtext, ttk
+from tkinter import filedialog, messagebox, scrolledtext, ttk
 
 from vendor_setup import ensure_vendor_path
 
 ensure_vendor_path()
 
-from openai import OpenAIError
 from tkhtmlview import HTMLScrolledText
 
+import functions.app_config
 import functions.database
 import functions.gpt
+import functions.invoice_jobs
+import functions.jobs
 import functions.ui
 from functions.files import extract_text_from_file
 from gui.theme import apply_hyprland_theme
 
 
 def create_invoice_window(
-    root, openai_service, config, show_main_callback, loading_manager=None
+    root,
+    openai_service,
+    config: functions.app_config.ConfigSnapshot,
+    show_main_callback,
+    loading_manager=None,
 ):
     """Build the invoice notes assistant window."""
 
     invoice_window = tk.Toplevel(root)
     apply_hyprland_theme(invoice_window)
     window_title = "Invoice Notes Assistant"
-    workspace = config.get("asana_workspace") if isinstance(config, dict) else None
+    workspace = config.get("asana_workspace")
     if workspace:
         window_title = f"{window_title} – {workspace}"
     invoice_window.title(window_title)
@@ -117,6 +124,17 @@ def create_invoice_window(
     )
     model_list.grid(row=1, column=0, padx=5)
 
+    def refresh_models(choices: list[str]) -> None:
+        """Rebuild the model menu after ``config.json`` changes."""
+        if not choices:
+            return
+        selected = model_list_var.get()
+        if selected not in choices:
+            selected = choices[0]
+        model_list.set_menu(selected, *choices)
+
+    invoice_window.refresh_models = refresh_models
+
     # note_style_var = tk.StringVar(value="Concise")
     # note_style_label = tk.Label(button_frame_right_bottom, text="Invoice Note Style:")
     # note_style_label.grid(row=0, column=0, padx=5)
@@ -152,6 +170,8 @@ def create_invoice_window(
 
     def call_openai(prompt: str, output_widget: HTMLScrolledText) -> None:
         def worker() -> None:
+            from openai import OpenAIError
+
             try:
                 reply = openai_service.generate_response(model_list_var.get(), prompt)
             except OpenAIError as exc:
@@ -161,10 +181,15 @@ def create_invoice_window(
                 root.after(0, lambda: messagebox.showerror("Error", str(exc)))
                 return
 
+            job = functions.jobs.current_job()
+            if job is not None and job.cancelled:
+                print("INFO: Discarding response for cancelled job")
+                return
+
             root.after(0, lambda: functions.ui.display_markdown(output_widget, reply))
 
         if callable(run_with_loading):
-            run_with_loading("Generating response…", worker)
+            run_with_loading("Generating response…", worker, kind="openai")
         else:  # pragma: no cover - fallback for unexpected embedding contexts
             threading.Thread(target=worker, daemon=True).start()
 
@@ -182,6 +207,102 @@ def create_invoice_window(
     )
     create_notes_button.grid(row=0, column=0, padx=5)
 
+    bulk_concurrency = config.invoice_bulk_concurrency
+
+    def draft_bulk_notes(from_folder: bool) -> None:
+        if from_folder:
+            source = filedialog.askdirectory(title="Select a folder of job notes", parent=invoice_window)
+        else:
+            source = filedialog.askopenfilename(
+                title="Select a CSV of job titles and notes",
+                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+                parent=invoice_window,
+            )
+        if not source:
+            return
+        output_path = filedialog.asksaveasfilename(
+            title="Save invoice notes as",
+            defaultextension=".md",
+            filetypes=[("Markdown", "*.md"), ("CSV files", "*.csv")],
+            initialfile="invoice_notes.md",
+            parent=invoice_window,
+        )
+        if not output_path:
+            return
+        model = model_list_var.get()
+        job_executor = getattr(root, "job_executor", None)
+        # Each draft is its own openai job so the executor's worker limit
+        # applies; without an executor the drafts use a private pool.
+        submit_draft = (
+            (lambda draft: job_executor.submit_future("openai", "Drafting invoice note", draft))
+            if job_executor is not None
+            else None
+        )
+
+        def worker() -> None:
+            job = functions.jobs.current_job()
+            try:
+                notes = functions.invoice_jobs.draft_invoice_notes(
+                    openai_service,
+                    model,
+                    functions.invoice_jobs.iter_invoice_jobs(source),
+                    checkpoint_path=output_path + ".progress.jsonl",
+                    concurrency=bulk_concurrency,
+                    should_stop=(lambda: job.cancelled) if job is not None else None,
+                    submit=submit_draft,
+                    on_progress=lambda finished, note: print(
+                        f"INFO: Bulk invoice note {finished}: {note.job_id}"
+                        + (f" failed ({note.error})" if note.error else "")
+                    ),
+                )
+                functions.invoice_jobs.write_invoice_notes(output_path, notes)
+            except (OSError, ValueError) as exc:
+                print(f"ERR: Bulk invoice notes failed: {exc}")
+                root.after(
+                    0, lambda: messagebox.showerror("Bulk Invoice Notes", str(exc), parent=invoice_window)
+                )
+                return
+            failed = [note for note in notes if not note.note]
+            message = f"Wrote {len(notes) - len(failed)} of {len(notes)} invoice notes to {output_path}."
+            if failed:
+                message += " Run it again to retry the rest; finished notes are not drafted twice."
+            print(f"INFO: {message}")
+
+            def on_done() -> None:
+                functions.ui.display_markdown(output_text, functions.invoice_jobs.invoice_notes_markdown(notes))
+                if failed:
+                    messagebox.showwarning("Bulk Invoice Notes", message, parent=invoice_window)
+                else:
+                    messagebox.showinfo("Bulk Invoice Notes", message, parent=invoice_window)
+
+            root.after(0, on_done)
+
+        label = os.path.basename(source.rstrip("/\\")) or source
+        if callable(run_with_loading):
+            # The coordinator waits on the drafts, so it must not hold an
+            # openai worker itself.
+            run_with_loading(
+                f"Drafting invoice notes for {label}…",
+                worker,
+                kind="openai" if submit_draft is None else "general",
+            )
+        else:  # pragma: no cover - fallback for unexpected embedding contexts
+            threading.Thread(target=worker, daemon=True).start()
+
+    bulk_csv_button = ttk.Button(
+        button_frame_left_top,
+        text="Bulk from CSV…",
+        command=lambda: draft_bulk_notes(from_folder=False),
+    )
+    bulk_csv_button.grid(row=0, column=1, padx=5)
+
+    bulk_folder_button = ttk.Button(
+        button_frame_left_top,
+        text="Bulk from Folder…",
+        command=lambda: draft_bulk_notes(from_folder=True),
+    )
+    bulk_folder_button.grid(row=0, column=2, padx=5)
+
     # prompt_button = tk.Button(
     #     prompt_button_frame,
     #     text="Run Custom Prompt",
@@ -0,0 +1,119 @@
+import tkinter as tk
+from tkinter import ttk
+
+from functions.jobs import PENDING, RUNNING, JobExecutor
+
+REFRESH_INTERVAL_MS = 500
+
+
+class JobQueuePanel(ttk.Frame):
+    """Collapsible list of running and pending background jobs.
+
+    The tree is only refreshed while the panel is visible, so a hidden panel
+    costs nothing beyond the job count shown on the optional toggle button.
+    """
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        executor: JobExecutor,
+        *,
+        toggle_button: ttk.Button | None = None,
+        **kwargs,
+    ) -> None:
+        kwargs.setdefault("style", "Card.TFrame")
+        kwargs.setdefault("padding", 6)
+        super().__init__(master, **kwargs)
+        self.executor = executor
+        self.toggle_button = toggle_button
+        self._jobs_by_item: dict[str, object] = {}
+        self._sync_scheduled = False
+        self._tick_id: str | None = None
+        self.visible = False
+
+        columns = ("kind", "state", "elapsed", "message")
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=4)
+        for column, heading, width in (
+            ("kind", "Kind", 80),
+            ("state", "State", 80),
+            ("elapsed", "Elapsed", 70),
+            ("message", "Job", 360),
+        ):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, stretch=column == "message")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        cancel_button = ttk.Button(self, text="Cancel Job", command=self.cancel_selected)
+        cancel_button.pack(side="right", padx=(6, 0))
+
+    def toggle(self, **pack_options) -> None:
+        if self.visible:
+            self.pack_forget()
+            self.visible = False
+            if self._tick_id is not None:
+                self.after_cancel(self._tick_id)
+                self._tick_id = None
+            return
+        self.pack(**pack_options)
+        self.visible = True
+        self._tick()
+
+    def cancel_selected(self) -> None:
+        for item in self.tree.selection():
+            job = self._jobs_by_item.get(item)
+            if job is not None:
+                print(f"INFO: Cancelling job: {job.message}")
+                self.executor.cancel(job)
+        self.refresh()
+
+    def jobs_changed(self) -> None:
+        """Executor change hook; safe to call from worker threads.
+
+        Repeated calls before the Tk thread catches up coalesce into a single
+        update of the toggle button label and, when visible, the job list.
+        """
+
+        if self._sync_scheduled:
+            return
+        self._sync_scheduled = True
+        self.after(0, self._sync)
+
+    def _sync(self) -> None:
+        self._sync_scheduled = False
+        jobs = self.refresh()
+        if self.toggle_button is not None:
+            if jobs is None:
+                jobs = [
+                    job for job in self.executor.snapshot() if job.state in (RUNNING, PENDING)
+                ]
+            label = f"Jobs ({len(jobs)})" if jobs else "Jobs"
+            self.toggle_button.config(text=label)
+
+    def _tick(self) -> None:
+        # Keep elapsed times ticking while the panel is open.
+        self.refresh()
+        self._tick_id = self.after(REFRESH_INTERVAL_MS, self._tick)
+
+    def refresh(self) -> list | None:
+        """Redraw the job list and return the listed jobs (``None`` if hidden)."""
+
+        if not self.visible:
+            return None
+        jobs = [job for job in self.executor.snapshot() if job.state in (RUNNING, PENDING)]
+        selected = {
+            getattr(self._jobs_by_item.get(item), "id", None)
+            for item in self.tree.selection()
+        }
+        self.tree.delete(*self.tree.get_children())
+        self._jobs_by_item.clear()
+        for job in jobs:
+            state = "cancelling" if job.cancelled else job.state
+            item = self.tree.insert(
+                "",
+                "end",
+                values=(job.kind, state, f"{job.elapsed():.1f}s", job.message),
+            )
+            self._jobs_by_item[item] = job
+            if job.id in selected:
+                self.tree.selection_add(item)
+        return jobs
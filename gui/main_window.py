@@ -1,5 +1,8 @@
 import datetime
+import os
+import sqlite3
 import threading
+import time
 import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import filedialog, messagebox, ttk
@@ -9,17 +12,31 @@ from vendor_setup import ensure_vendor_path
 
 ensure_vendor_path()
 
-from openai import OpenAIError
-from asana.rest import ApiException
 from tkcalendar import DateEntry
 from tkhtmlview import HTMLScrolledText
 
+import functions.app_config
 import functions.asana_api
+import functions.asana_metadata
+import functions.asana_mirror
 import functions.database
 import functions.gpt
+import functions.history_index
+import functions.history_maintenance
+import functions.jobs
+import functions.metrics
+import functions.profiling
+import functions.speculative
+import functions.structured_summary
 import functions.ui
+import functions.ui_watchdog
+from functions.asana_settings import AsanaSettings
 from functions.files import extract_text_from_file
-from gui.invoice_window import create_invoice_window
+from functions.startup import StartupTimer, preload_modules
+from gui.history_window import HistoryWindow
+from gui.job_queue_panel import JobQueuePanel
+from gui.stats_window import StatsWindow
+from gui.task_list_dialog import TaskListDialog
 from gui.theme import apply_hyprland_theme
 
 # GUI ----------------------------------------------------------------
@@ -35,100 +52,90 @@ def _save_history_and_display(
         display_markdown: Callable[[HTMLScrolledText, str], None],
         log: Callable[[str], None] = print,
         show_warning: Callable[[str, str], None] | None = None,
+        run_in_background: Callable[[Callable[[], None]], None] | None = None,
 ) -> None:
-    """Persist response history and always render output to the UI."""
-    try:
-        save_to_history(mode, tone, prompt, reply)
-    except Exception as exc:
-        timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
-        log(
-            "ERROR: Failed to save history "
-            f"(mode={mode}, timestamp={timestamp}): {exc}"
-        )
-        if show_warning is not None:
-            show_warning(
-                "History Save Warning",
-                "Response was generated, but saving local history failed.",
-            )
+    """Render output to the UI at once, then persist response history.
+
+    With *run_in_background* the save runs off the Tk thread, so a busy
+    database never freezes the window; *show_warning* is then called from
+    that thread.
+    """
     display_markdown(output_widget, reply)
 
-def create_main_window(openai_service, config: dict) -> None:
-    """Build and run the main Tkinter UI."""
-    asana_token = config["asana_token"]
-    asana_project_id = config["asana_project_id"]
-    asana_workspace = config["asana_workspace"]
-
-    # Build configurable Asana metadata -------------------------------------
-    assignee_options_raw = config.get("asana_assignees", [])
-    assignee_choices = []
-    assignee_lookup = {}
-    if isinstance(assignee_options_raw, list):
-        for entry in assignee_options_raw:
-            if not isinstance(entry, dict):
-                continue
-            name = entry.get("name")
-            if not isinstance(name, str) or not name:
-                continue
-            raw_value = (
-                entry.get("gid")
-                or entry.get("email")
-                or entry.get("value")
-                or ""
+    def save() -> None:
+        try:
+            save_to_history(mode, tone, prompt, reply)
+        except Exception as exc:
+            timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            log(
+                "ERROR: Failed to save history "
+                f"(mode={mode}, timestamp={timestamp}): {exc}"
             )
-            if isinstance(raw_value, str):
-                value = raw_value.replace("{workspace}", asana_workspace)
-            else:
-                value = ""
-            assignee_choices.append(name)
-            assignee_lookup[name.casefold()] = value
-    if not assignee_choices:
-        assignee_choices = ["Unassigned"]
-    if not any(choice.casefold() == "unassigned" for choice in assignee_choices):
-        assignee_choices.append("Unassigned")
-    assignee_lookup.setdefault("unassigned", "")
-    assignee_choices = list(dict.fromkeys(assignee_choices))
-    default_assignee = config.get("asana_default_assignee")
-    if not isinstance(default_assignee, str) or default_assignee not in assignee_choices:
-        default_assignee = assignee_choices[0]
-
-    priority_options_raw = config.get("asana_priority_options")
-    priority_mapping = {}
-    if isinstance(priority_options_raw, dict):
-        for label, value in priority_options_raw.items():
-            if isinstance(label, str):
-                priority_mapping[label] = value
-    priority_field_id = config.get("asana_priority_field_id")
-    if not isinstance(priority_field_id, str) or not priority_field_id.strip():
-        priority_field_id = None
-    default_priority = config.get("asana_default_priority")
-    if priority_mapping:
-        if not isinstance(default_priority, str) or default_priority not in priority_mapping:
-            default_priority = next(iter(priority_mapping))
-        priority_choices = list(priority_mapping.keys())
+            if show_warning is not None:
+                show_warning(
+                    "History Save Warning",
+                    "Response was generated, but saving local history failed.",
+                )
+
+    if run_in_background is None:
+        save()
     else:
-        if not isinstance(default_priority, str) or not default_priority:
-            default_priority = "None"
-        priority_choices = [default_priority]
-
-    additional_custom_fields = config.get("asana_custom_fields")
-    if not isinstance(additional_custom_fields, dict):
-        additional_custom_fields = {}
-
-    task_defaults = config.get("asana_task_defaults")
-    if not isinstance(task_defaults, dict):
-        task_defaults = {}
-
-    asana_settings = {
-        "assignees": assignee_lookup,
-        "priority_field_id": priority_field_id,
-        "priority_options": priority_mapping,
-        "custom_fields": additional_custom_fields,
-        "task_defaults": task_defaults,
-    }
+        run_in_background(save)
+
+def create_main_window(
+        openai_service,
+        config: functions.app_config.ConfigSnapshot | dict,
+        *,
+        startup_timer: StartupTimer | None = None,
+) -> None:
+    """Build and run the main Tkinter UI.
+
+    The invoice window is only built the first time it is shown, and the
+    slow SDK imports are warmed up on a background thread once the first
+    frame has painted.  When *config* came from ``config.json`` the file is
+    watched and the model and Asana menus follow edits without a restart.
+    """
+    if startup_timer is None:
+        startup_timer = StartupTimer()
+    build_started = time.perf_counter()
+    if not isinstance(config, functions.app_config.ConfigSnapshot):
+        config = functions.app_config.ConfigSnapshot.from_dict(config)
+    config_watcher = functions.app_config.ConfigWatcher(config)
+    asana_token = config.get("asana_token")
+    asana_project_id = config.get("asana_project_id")
+    asana_workspace = config.get("asana_workspace")
+    asana_api_host = config.get("asana_api_base_url") or None
+    review_subtasks = config.review_subtasks
+    structured_summaries = config.structured_summaries
+    similar_jobs_settings = config.similar_jobs
+
+    # Configurable Asana metadata, derived when the config was loaded ---------
+    asana_settings = config.asana
+    # Live workspace data, re-applied when config.json is reloaded.
+    asana_metadata = None
+    assignee_choices = asana_settings.assignee_choices
+    default_assignee = asana_settings.default_assignee
+    priority_choices = asana_settings.priority_choices
+    default_priority = asana_settings.default_priority
 
     print("INFO: Initialising History Database")
     functions.database.init_history_db()
 
+    # Span timings are exported next to the history database unless disabled
+    # with an empty ``metrics_log_path``.
+    metrics_log_path = config.metrics_log_path
+    if metrics_log_path:
+        if not os.path.isabs(metrics_log_path):
+            metrics_log_path = os.path.join(
+                os.path.dirname(functions.database.DB_PATH), metrics_log_path
+            )
+        functions.metrics.METRICS.configure_export(
+            metrics_log_path,
+            max_bytes=config.metrics_log_max_bytes,
+            backups=config.metrics_log_backups,
+        )
+        print(f"INFO: Exporting timing metrics to {metrics_log_path}")
+
     print("INFO: OpenAI API Key Loaded")
     print("INFO: Asana API Key Loaded")
     print(f"INFO: Set Asana Project ID as: {asana_project_id}")
@@ -141,20 +148,13 @@ def create_main_window(openai_service, config: dict) -> None:
     root.geometry("900x980")
     apply_hyprland_theme(root)
 
-    fallback_models = ["o4-mini", "gpt-4", "gpt-4.1", "gpt-5", "gpt-5.4"]
-    model_choices_raw = config.get("model_choices")
-    model_choices = (
-        [entry for entry in model_choices_raw if isinstance(entry, str) and entry]
-        if isinstance(model_choices_raw, list)
-        else []
-    )
-    if not model_choices:
-        model_choices = fallback_models.copy()
-    model_choices = list(dict.fromkeys(model_choices))
+    if config.ui_stall_threshold_ms > 0:
+        root.ui_watchdog = functions.ui_watchdog.UiWatchdog(
+            root, stall_threshold_ms=config.ui_stall_threshold_ms
+        ).start()
 
-    default_model = config.get("default_model", model_choices[0])
-    if default_model not in model_choices:
-        default_model = model_choices[0]
+    model_choices = list(config.model_choices)
+    default_model = config.default_model
 
     # Shared model selection across windows
     model_list_var = tk.StringVar(value=default_model)
@@ -242,24 +242,92 @@ def create_main_window(openai_service, config: dict) -> None:
     def stop_loading() -> None:
         loading_manager.stop()
 
-    def run_with_loading(message: str, worker: Callable[[], None]) -> None:
-        start_loading(message)
+    # Background jobs ----------------------------------------------------------
+    job_executor = functions.jobs.JobExecutor(
+        config.job_worker_limits,
+        max_pending=config.job_queue_limit,
+    )
 
-        def _runner() -> None:
-            try:
-                worker()
-            finally:
-                root.after(0, stop_loading)
+    jobs_button = ttk.Button(status_frame, text="Jobs")
+    jobs_button.pack(side="right")
+    job_queue_panel = JobQueuePanel(root, job_executor, toggle_button=jobs_button)
+    jobs_button.config(
+        command=lambda: job_queue_panel.toggle(
+            fill="x", padx=10, pady=(0, 5), after=status_frame
+        )
+    )
+    job_executor.on_change = job_queue_panel.jobs_changed
 
-        threading.Thread(target=_runner, daemon=True).start()
+    stats_window = None
+
+    def show_stats_window() -> None:
+        nonlocal stats_window
+        if stats_window is not None and stats_window.winfo_exists():
+            stats_window.deiconify()
+            stats_window.lift()
+            return
+        stats_window = StatsWindow(root)
+
+    stats_button = ttk.Button(status_frame, text="Stats", command=show_stats_window)
+    stats_button.pack(side="right", padx=(0, 5))
+
+    def run_with_loading(
+            message: str,
+            worker: Callable[[], None],
+            *,
+            kind: str = "general",
+            priority: int = 0,
+    ) -> functions.jobs.Job | None:
+        """Queue *worker* on the job executor while showing the loading bar."""
+        profiler = functions.profiling.ACTIVE_PROFILER
+        if profiler is not None:
+            worker = profiler.wrap(f"job:{kind}:{message}", worker)
+        start_loading(message)
+        try:
+            return job_executor.submit(
+                kind,
+                message,
+                worker,
+                priority=priority,
+                on_finish=lambda _job: root.after(0, stop_loading),
+            )
+        except functions.jobs.JobQueueFull as exc:
+            stop_loading()
+            print(f"WARN: {exc}")
+            messagebox.showwarning("Busy", str(exc), parent=root)
+            return None
 
     root.run_with_loading = run_with_loading
     root.loading_manager = loading_manager
+    root.job_executor = job_executor
+
+    def save_history_in_background(save: Callable[[], None]) -> None:
+        """Run a history save as a ``history`` job, never on the Tk thread."""
+
+        def on_finish(job: functions.jobs.Job) -> None:
+            # Dropped while queued (the window closed): save it now rather
+            # than lose the reply.
+            if job.started_at is None:
+                save()
+
+        try:
+            job_executor.submit("history", "Saving to history", save, priority=1, on_finish=on_finish)
+        except functions.jobs.JobQueueFull as exc:
+            print(f"WARN: {exc}")
+            threading.Thread(target=save, daemon=True).start()
+
+    def history_save_warning() -> Callable[[str, str], None] | None:
+        if not show_history_save_warning:
+            return None
+
+        def warn(title: str, message: str) -> None:
+            try:
+                root.after(0, lambda: messagebox.showwarning(title, message, parent=root))
+            except (RuntimeError, tk.TclError):
+                pass  # The window closed before the save finished.
+
+        return warn
 
-    invoice_window = create_invoice_window(
-        root, openai_service, config, show_main, loading_manager
-    )
-    invoice_window.withdraw()
 
     # Tkinter Font
     scrolled_font = tk.font.nametofont("TkDefaultFont").copy()
@@ -271,7 +339,9 @@ def create_main_window(openai_service, config: dict) -> None:
 
     input_text = HTMLScrolledText(root, height=10, font=scrolled_font)
     input_text.pack(fill="both", padx=6, pady=5, expand=True)
-    functions.ui.enable_html_clipboard_paste(input_text)
+    functions.ui.enable_html_clipboard_paste(
+        input_text, preview_threshold=config.html_paste_preview_threshold
+    )
 
     output_label = ttk.Label(root, text="ChatGPT Output:", style="Header.TLabel")
     output_text = HTMLScrolledText(root, height=10, font=scrolled_font)
@@ -289,10 +359,35 @@ def create_main_window(openai_service, config: dict) -> None:
     refresh_button = tk.Button(
         history_frame,
         text="↻",
-        command=lambda: functions.database.load_history(history_list, input_text, output_text),
+        command=lambda: refresh_history(),
     )
     refresh_button.pack(side="left", padx=5)
 
+    history_window = None
+
+    def show_history_window() -> None:
+        nonlocal history_window
+        if history_window is not None and history_window.winfo_exists():
+            history_window.deiconify()
+            history_window.lift()
+            return
+        history_window = HistoryWindow(
+            root,
+            lambda entry_id: functions.database.load_history_entry(
+                entry_id, input_text, output_text
+            ),
+            submit=lambda message, func: job_executor.submit(
+                "general", message, func, priority=1
+            ),
+        )
+
+    browse_history_button = tk.Button(
+        history_frame,
+        text="Browse…",
+        command=show_history_window,
+    )
+    browse_history_button.pack(side="left")
+
     # Button Frames
     button_frame_main = ttk.Frame(root, style="App.TFrame")
     button_frame_main.pack()
@@ -335,11 +430,13 @@ def create_main_window(openai_service, config: dict) -> None:
         "Long": "two paragraph",
     }
 
-    show_history_save_warning = bool(config.get("show_history_save_warning", True))
+    show_history_save_warning = config.show_history_save_warning
 
     # OpenAI function
     def call_openai(prompt: str, output_widget: HTMLScrolledText, mode: str) -> None:
         def worker() -> None:
+            from openai import OpenAIError
+
             try:
                 reply = openai_service.generate_response(model_list_var.get(), prompt)
             except OpenAIError as exc:
@@ -349,15 +446,13 @@ def create_main_window(openai_service, config: dict) -> None:
                 root.after(0, lambda: messagebox.showerror("Error", str(exc)))
                 return
 
+            job = functions.jobs.current_job()
+            if job is not None and job.cancelled:
+                print("INFO: Discarding response for cancelled job")
+                return
+
             def on_success() -> None:
                 print("INFO: Saving to local history")
-                warning_cb = None
-                if show_history_save_warning:
-                    warning_cb = lambda title, message: messagebox.showwarning(
-                        title,
-                        message,
-                        parent=root,
-                    )
                 _save_history_and_display(
                     mode,
                     tone_var.get(),
@@ -366,12 +461,323 @@ def create_main_window(openai_service, config: dict) -> None:
                     output_widget,
                     save_to_history=functions.database.save_to_history,
                     display_markdown=functions.ui.display_markdown,
-                    show_warning=warning_cb,
+                    show_warning=history_save_warning(),
+                    run_in_background=save_history_in_background,
                 )
 
             root.after(0, on_success)
 
-        run_with_loading("Generating response…", worker)
+        run_with_loading("Generating response…", worker, kind="openai")
+
+    def call_openai_structured(
+        email_text: str,
+        document_text: str,
+        include_tasks: bool,
+        include_fixes: bool,
+        output_widget: HTMLScrolledText,
+    ) -> None:
+        model = model_list_var.get()
+
+        def worker() -> None:
+            from openai import OpenAIError
+
+            past_jobs = similar_past_jobs(email_text) if include_fixes else []
+            try:
+                reply = functions.structured_summary.generate_summary(
+                    openai_service,
+                    model,
+                    email_text,
+                    document_text=document_text,
+                    include_tasks=include_tasks,
+                    include_fixes=include_fixes,
+                    past_jobs=past_jobs,
+                    structured=structured_summaries,
+                )
+            except OpenAIError as exc:
+                root.after(0, lambda: messagebox.showerror("OpenAI Error", str(exc)))
+                return
+            except Exception as exc:  # pragma: no cover - defensive programming
+                root.after(0, lambda: messagebox.showerror("Error", str(exc)))
+                return
+
+            job = functions.jobs.current_job()
+            if job is not None and job.cancelled:
+                print("INFO: Discarding response for cancelled job")
+                return
+
+            root.after(0, lambda: show_summary_reply(reply, output_widget))
+
+        run_with_loading("Generating response…", worker, kind="openai")
+
+    def show_summary_reply(
+        reply: functions.structured_summary.SummaryReply,
+        output_widget: HTMLScrolledText,
+    ) -> None:
+        print("INFO: Saving to local history")
+        _save_history_and_display(
+            "summarize",
+            tone_var.get(),
+            reply.prompt,
+            reply.markdown,
+            output_widget,
+            save_to_history=functions.database.save_to_history,
+            display_markdown=functions.ui.display_markdown,
+            show_warning=history_save_warning(),
+            run_in_background=save_history_in_background,
+        )
+        show_similar_jobs(reply.markdown)
+        if reply.structured is None:
+            return
+        functions.ui.attach_structured_summary(output_widget, reply.structured)
+        # Only replace a priority the user has not picked themselves.
+        hinted = asana_settings.match_priority(reply.structured.priority)
+        if hinted and priority_var.get() == asana_settings.default_priority:
+            print(f"INFO: Priority set to {hinted} from the summary")
+            priority_var.set(hinted)
+
+    # Similar past jobs -------------------------------------------------------
+    history_index = None
+    if similar_jobs_settings.enabled:
+        if functions.history_index.numpy_available():
+            history_index = functions.history_index.HistoryIndex()
+        else:
+            print("WARN: Similar past jobs need NumPy; the feature is off")
+    similar_embedder = None
+    similar_embedder_lock = threading.Lock()
+
+    def get_similar_embedder():
+        """Create the embedder on first use (off the Tk thread; it may load a model)."""
+        nonlocal similar_embedder
+        with similar_embedder_lock:
+            if similar_embedder is None:
+                similar_embedder = functions.history_index.make_embedder(
+                    similar_jobs_settings, openai_service
+                )
+            return similar_embedder
+
+    def update_history_index() -> None:
+        job = functions.jobs.current_job()
+        history_index.update(
+            get_similar_embedder(),
+            should_stop=lambda: job is not None and job.cancelled,
+        )
+
+    history_index_job: functions.jobs.Job | None = None
+
+    def schedule_history_index_update() -> None:
+        """Queue an index update unless one is already waiting to run."""
+        nonlocal history_index_job
+        if history_index is None:
+            return
+        if history_index_job is not None and history_index_job.state == functions.jobs.PENDING:
+            return
+        try:
+            history_index_job = job_executor.submit(
+                "index", "Indexing history for similar jobs", update_history_index, priority=-1
+            )
+        except functions.jobs.JobQueueFull as exc:
+            print(f"WARN: Skipping history indexing: {exc}")
+
+    def feeds_past_jobs(include_fixes: bool) -> bool:
+        return history_index is not None and similar_jobs_settings.feed_fixes and include_fixes
+
+    def similar_past_jobs(email_text: str) -> list[str]:
+        """Return similar past jobs for the fixes prompt; runs on a worker thread.
+
+        Only searches the index as it stands; new rows are added by the
+        background ``index`` job, so a summary never waits on embedding.
+        """
+        if not feeds_past_jobs(True):
+            return []
+        try:
+            embedder = get_similar_embedder()
+            jobs = functions.history_index.find_similar(
+                history_index, embedder, email_text, similar_jobs_settings.top_k
+            )
+        except Exception as exc:
+            print(f"WARN: Could not look up similar past jobs: {exc}")
+            return []
+        if jobs:
+            print(f"INFO: Adding {len(jobs)} similar past jobs to the prompt")
+        return functions.history_index.past_jobs_for_prompt(jobs)
+
+    similar_job_ids: list[int] = []
+
+    def fill_similar_jobs(jobs: list) -> None:
+        similar_jobs_list.delete(0, tk.END)
+        similar_job_ids[:] = [job.history_id for job in jobs]
+        for job in jobs:
+            similar_jobs_list.insert(tk.END, job.label())
+        if not jobs:
+            similar_jobs_list.insert(tk.END, "No similar past jobs yet")
+
+    def show_similar_jobs(summary_markdown: str) -> None:
+        if history_index is None:
+            return
+
+        def worker() -> None:
+            try:
+                embedder = get_similar_embedder()
+                jobs = functions.history_index.find_similar(
+                    history_index,
+                    embedder,
+                    summary_markdown,
+                    similar_jobs_settings.top_k,
+                    exclude_output=summary_markdown,
+                )
+            except Exception as exc:
+                print(f"WARN: Could not look up similar past jobs: {exc}")
+                return
+            root.after(0, lambda: fill_similar_jobs(jobs))
+
+        try:
+            job_executor.submit("openai", "Finding similar past jobs", worker, priority=-1)
+        except functions.jobs.JobQueueFull as exc:
+            print(f"WARN: Skipping similar past jobs: {exc}")
+        # Index the summary just saved for the next search.
+        schedule_history_index_update()
+
+    def open_similar_job(_event=None) -> None:
+        selection = similar_jobs_list.curselection()
+        if selection and selection[0] < len(similar_job_ids):
+            functions.database.load_history_entry(
+                similar_job_ids[selection[0]], input_text, output_text
+            )
+
+    # Speculative summaries ---------------------------------------------------
+    speculative = functions.speculative.SpeculativeSummaries(
+        config.speculative,
+        openai_service,
+        job_executor,
+        structured=structured_summaries,
+    )
+    speculate_after_id = None
+
+    def speculative_key(email_text: str) -> str:
+        return speculative.key_for(
+            model_list_var.get(),
+            email_text,
+            bool(task_checkbox_var.get()),
+            bool(fixes_checkbox_var.get()),
+        )
+
+    def speculate_now() -> None:
+        nonlocal speculate_after_id
+        speculate_after_id = None
+        # Summaries with an attachment read the file first, and past jobs are
+        # looked up at send time; not worth guessing either.
+        if attached_file_checkbox_var.get() and attached_file_path:
+            return
+        if feeds_past_jobs(bool(fixes_checkbox_var.get())):
+            return
+        speculative.speculate(
+            model_list_var.get(),
+            input_text.get("1.0", tk.END).strip(),
+            bool(task_checkbox_var.get()),
+            bool(fixes_checkbox_var.get()),
+        )
+
+    def schedule_speculation(*_args) -> None:
+        nonlocal speculate_after_id
+        if speculate_after_id is not None:
+            root.after_cancel(speculate_after_id)
+        speculate_after_id = root.after(speculative.settings.settle_ms, speculate_now)
+
+    def on_input_modified(_event=None) -> None:
+        input_text.edit_modified(False)
+        schedule_speculation()
+
+    def on_summary_options_changed(*_args) -> None:
+        speculative.cancel_pending()
+        schedule_speculation()
+
+    def show_speculative_summary(entry: functions.speculative.SpeculativeEntry) -> bool:
+        """Show a speculative reply, waiting for it if still in flight."""
+        if entry.done:
+            print("INFO: Using the speculative summary")
+            show_summary_reply(entry.reply, output_text)
+            return True
+
+        def worker() -> None:
+            entry.wait()
+            job = functions.jobs.current_job()
+            if job is not None and job.cancelled:
+                print("INFO: Discarding response for cancelled job")
+                return
+            if entry.reply is None:
+                print(f"ERR: Speculative summary failed: {entry.error}")
+                root.after(
+                    0, lambda: messagebox.showerror("OpenAI Error", entry.error, parent=root)
+                )
+                return
+            print("INFO: Using the speculative summary")
+            root.after(0, lambda: show_summary_reply(entry.reply, output_text))
+
+        # The request is already on the wire, so only wait; "general" keeps the
+        # OpenAI slots free.
+        return run_with_loading("Generating response…", worker, kind="general") is not None
+
+    def refresh_history() -> None:
+        def worker() -> None:
+            entries = functions.database.fetch_recent_history()
+            root.after(
+                0,
+                lambda: functions.database.populate_history_menu(
+                    history_list, entries, input_text, output_text
+                ),
+            )
+
+        run_with_loading("Loading history…", worker, kind="history")
+
+    def summarize() -> None:
+        email_text = input_text.get("1.0", tk.END).strip()
+        model = model_list_var.get()
+
+        if (
+            email_text
+            and not (attached_file_checkbox_var.get() and attached_file_path)
+            and not feeds_past_jobs(bool(fixes_checkbox_var.get()))
+        ):
+            entry = speculative.take(speculative_key(email_text))
+            if entry is not None and show_speculative_summary(entry):
+                return
+
+        def send(document_extractor) -> None:
+            functions.gpt.summarize(
+                email_text,
+                model,
+                output_text,
+                attached_file_checkbox_var,
+                attached_file_path,
+                document_extractor,
+                task_checkbox_var,
+                fixes_checkbox_var,
+                lambda p, o: call_openai(p, o, "summarize"),
+                call_structured=call_openai_structured,
+            )
+
+        if not (email_text and attached_file_checkbox_var.get() and attached_file_path):
+            send(extract_text_from_file)
+            return
+
+        # Read the attachment off the Tk thread, then build the prompt.
+        path = attached_file_path
+
+        def worker() -> None:
+            try:
+                document_text = extract_text_from_file(path)
+            except Exception as exc:
+                print(f"ERR: Failed to read attachment {path}: {exc}")
+                root.after(
+                    0,
+                    lambda: messagebox.showerror(
+                        "Attachment Error", str(exc), parent=root
+                    ),
+                )
+                return
+            root.after(0, lambda: send(lambda _path: document_text))
+
+        run_with_loading("Reading attachment…", worker, kind="extraction")
 
     attached_file_path = None
 
@@ -392,7 +798,19 @@ def create_main_window(openai_service, config: dict) -> None:
             print(f"INFO: Attached file: {file_path}")
 
     def show_invoice_window() -> None:
+        nonlocal invoice_window
         print("INFO: Switching to Invoice Window")
+        if invoice_window is None:
+            from gui.invoice_window import create_invoice_window
+
+            build_started_at = time.perf_counter()
+            invoice_window = create_invoice_window(
+                root, openai_service, config_watcher.current, show_main, loading_manager
+            )
+            print(
+                "INFO: Built invoice window in "
+                f"{(time.perf_counter() - build_started_at) * 1000:.0f} ms"
+            )
         root.withdraw()
         invoice_window.deiconify()
         invoice_window.lift()
@@ -402,17 +820,7 @@ def create_main_window(openai_service, config: dict) -> None:
         button_frame_left_top,
         text="Summarise",
         style="Primary.TButton",
-        command=lambda: functions.gpt.summarize(
-            input_text.get("1.0", tk.END).strip(),
-            model_list_var.get(),
-            output_text,
-            attached_file_checkbox_var,
-            attached_file_path,
-            extract_text_from_file,
-            task_checkbox_var,
-            fixes_checkbox_var,
-            lambda p, o: call_openai(p, o, "summarize"),
-        ),
+        command=summarize,
     )
     summarize_button.grid(row=0, column=0, padx=5)
 
@@ -453,7 +861,6 @@ def create_main_window(openai_service, config: dict) -> None:
             task_request = functions.asana_api.build_asana_task_request(
                 output_text,
                 input_text,
-                asana_project_id,
                 assignee_var,
                 priority_var,
                 cal_var,
@@ -470,11 +877,24 @@ def create_main_window(openai_service, config: dict) -> None:
             return
         if not task_request:
             return
+        if review_subtasks:
+            subtasks = TaskListDialog(
+                root,
+                task_request.subtasks,
+                task_name=task_request.task_name,
+                assignee_choices=asana_settings.assignee_choices,
+            ).show()
+            if subtasks is None:
+                print("INFO: Asana task cancelled from the sub-task review")
+                return
+            task_request.subtasks = subtasks
 
         def worker() -> None:
+            from asana.rest import ApiException
+
             try:
-                bullet_count = functions.asana_api.perform_asana_task_creation(
-                    asana_token, task_request
+                result = functions.asana_api.perform_asana_task_creation(
+                    asana_token, task_request, host=asana_api_host
                 )
             except ApiException as exc:
                 print(f"ERR: Asana API Error: {exc}")
@@ -492,18 +912,16 @@ def create_main_window(openai_service, config: dict) -> None:
                 )
             else:
                 def on_success() -> None:
-                    messagebox.showinfo(
-                        "Success",
-                        f"Task '{task_request.task_name}' created in Asana with {bullet_count} sub-tasks.",
-                        parent=root,
-                    )
-                    print(
-                        f"INFO: Task '{task_request.task_name}' created in Asana with {bullet_count} sub-tasks."
-                    )
+                    message = result.describe(task_request.task_name)
+                    if result.failed:
+                        messagebox.showwarning("Partly Created", message, parent=root)
+                    else:
+                        messagebox.showinfo("Success", message, parent=root)
+                    print(f"INFO: {message}")
 
                 root.after(0, on_success)
 
-        run_with_loading("Creating Asana task…", worker)
+        run_with_loading("Creating Asana task…", worker, kind="asana")
 
     asana_button = ttk.Button(
         button_frame_left_bottom,
@@ -513,6 +931,64 @@ def create_main_window(openai_service, config: dict) -> None:
     )
     asana_button.grid(row=1, column=1, padx=5)
 
+    # Inbox triage: summarise several emails with as few requests as possible.
+    def summarize_several() -> None:
+        paths = filedialog.askopenfilenames(
+            title="Select emails to summarise",
+            filetypes=[
+                ("Emails", "*.eml *.msg *.txt *.mbox *.mbx"),
+                ("All files", "*.*"),
+            ],
+        )
+        if not paths:
+            return
+        model = model_list_var.get()
+        include_tasks = bool(task_checkbox_var.get())
+        include_fixes = bool(fixes_checkbox_var.get())
+
+        def worker() -> None:
+            from functions.email_sources import iter_emails
+
+            items = []
+            for path in paths:
+                for item in iter_emails(path):
+                    if item.error:
+                        print(f"WARN: Skipping {item.item_id}: {item.error}")
+                    elif item.body.strip():
+                        items.append(item)
+            if not items:
+                root.after(0, lambda: messagebox.showinfo("Summarise Several", "No email text found.", parent=root))
+                return
+            job = functions.jobs.current_job()
+            results = functions.structured_summary.summarize_emails(
+                openai_service,
+                model,
+                [item.body for item in items],
+                include_tasks=include_tasks,
+                include_fixes=include_fixes,
+                structured=structured_summaries,
+                should_stop=lambda: job is not None and job.cancelled,
+            )
+            if job is not None and job.cancelled:
+                print("INFO: Discarding summaries for cancelled job")
+                return
+            markdown = "\n\n".join(
+                f"**{item.subject or item.item_id}**\n\n"
+                + (result.summary or f"*Not summarised: {result.error}*")
+                for item, result in zip(items, results)
+            )
+            print(f"INFO: Summarised {sum(1 for result in results if result.summary)} of {len(items)} emails")
+            root.after(0, lambda: functions.ui.display_markdown(output_text, markdown))
+
+        run_with_loading(f"Summarising {len(paths)} file(s)…", worker, kind="openai")
+
+    summarize_several_button = ttk.Button(
+        button_frame_left_bottom,
+        text="Summarise Several…",
+        command=summarize_several,
+    )
+    summarize_several_button.grid(row=1, column=2, padx=5)
+
     invoice_button = ttk.Button(
         button_frame_right_bottom,
         text="Switch to Invoicing Notes",
@@ -577,6 +1053,16 @@ def create_main_window(openai_service, config: dict) -> None:
     )
     attached_file_checkbox.grid(row=3, column=0, padx=5)
 
+    if speculative.settings.enabled:
+        input_text.bind("<<Modified>>", on_input_modified, add=True)
+        for summary_option_var in (
+            model_list_var,
+            task_checkbox_var,
+            fixes_checkbox_var,
+            attached_file_checkbox_var,
+        ):
+            summary_option_var.trace_add("write", on_summary_options_changed)
+
     assignee_frame = ttk.Frame(options_frame, style="Card.TFrame", padding=10)
     assignee_frame.grid(row=0, column=3, padx=5)
 
@@ -661,4 +1147,165 @@ def create_main_window(openai_service, config: dict) -> None:
 
     output_text.pack(fill="both", padx=6, pady=5, expand=True)
 
+    similar_jobs_frame = ttk.LabelFrame(root, text="Similar past jobs (double-click to open)")
+    similar_jobs_list = tk.Listbox(
+        similar_jobs_frame, height=similar_jobs_settings.top_k, font=scrolled_font
+    )
+    similar_jobs_list.pack(fill="x", padx=5, pady=5)
+    similar_jobs_list.bind("<Double-1>", open_similar_job)
+    similar_jobs_list.bind("<Return>", open_similar_job)
+    if history_index is not None:
+        similar_jobs_frame.pack(fill="x", padx=6, pady=(0, 5))
+
+    startup_timer.record("build main window", time.perf_counter() - build_started)
+
+    def migrate_history_storage() -> None:
+        if not functions.database.history_needs_blob_migration():
+            return
+        job = functions.jobs.current_job()
+        functions.database.migrate_history_to_blobs(
+            should_stop=lambda: job is not None and job.cancelled
+        )
+
+    retention_policy = config.retention
+
+    def maintain_history() -> None:
+        if not functions.history_maintenance.maintenance_due(retention_policy):
+            return
+        job = functions.jobs.current_job()
+        functions.history_maintenance.run_history_maintenance(
+            retention_policy,
+            should_stop=lambda: job is not None and job.cancelled,
+        )
+
+    def schedule_history_maintenance() -> None:
+        try:
+            job_executor.submit("history", "History maintenance", maintain_history, priority=-1)
+        except functions.jobs.JobQueueFull as exc:
+            print(f"WARN: Skipping history maintenance: {exc}")
+        # Re-check hourly; the job itself returns early until it is due.
+        root.after(60 * 60 * 1000, schedule_history_maintenance)
+
+    mirror_interval = config.asana_mirror_sync_minutes
+
+    def sync_asana_mirror() -> None:
+        job = functions.jobs.current_job()
+        functions.asana_mirror.sync_and_reload(
+            asana_token,
+            asana_settings.project_ids,
+            host=asana_api_host,
+            should_stop=lambda: job is not None and job.cancelled,
+        )
+
+    def schedule_asana_mirror_sync() -> None:
+        # A kind of its own, so a slow sync never holds up task creation.
+        try:
+            job_executor.submit("sync", "Syncing Asana project", sync_asana_mirror, priority=-1)
+        except functions.jobs.JobQueueFull as exc:
+            print(f"WARN: Skipping Asana mirror sync: {exc}")
+        root.after(int(mirror_interval * 60 * 1000), schedule_asana_mirror_sync)
+
+    metadata_ttl = config.asana_metadata_ttl_hours
+
+    def refresh_option_menu(variable, menu, choices, default) -> None:
+        current = variable.get()
+        selected = current if current in choices else default
+        menu.set_menu(selected, *([selected] + [choice for choice in choices if choice != selected]))
+
+    def refresh_asana_menus() -> None:
+        refresh_option_menu(
+            assignee_var, assignee_menu, asana_settings.assignee_choices, asana_settings.default_assignee
+        )
+        refresh_option_menu(
+            priority_var, priority_menu, asana_settings.priority_choices, asana_settings.default_priority
+        )
+
+    def apply_asana_metadata(metadata) -> None:
+        nonlocal asana_settings, asana_metadata
+        try:
+            asana_settings = AsanaSettings.from_config(
+                metadata.apply_to_config(config_watcher.current.values)
+            )
+        except Exception as exc:  # pragma: no cover - keep the config-based menus
+            print(f"ERR: Failed to apply Asana metadata: {exc}")
+            return
+        asana_metadata = metadata
+        refresh_asana_menus()
+        print("INFO: Asana menus updated from workspace data")
+
+    def apply_config(
+        previous: functions.app_config.ConfigSnapshot,
+        snapshot: functions.app_config.ConfigSnapshot,
+    ) -> None:
+        nonlocal asana_settings, review_subtasks, show_history_save_warning
+        review_subtasks = snapshot.review_subtasks
+        show_history_save_warning = snapshot.show_history_save_warning
+        if asana_metadata is not None:
+            apply_asana_metadata(asana_metadata)
+        else:
+            asana_settings = snapshot.asana
+            refresh_asana_menus()
+        model_choices = list(snapshot.model_choices)
+        root.shared_model_choices = model_choices
+        selected_model = model_list_var.get()
+        if selected_model not in model_choices:
+            selected_model = snapshot.default_model
+        model_list.set_menu(selected_model, *model_choices)
+        if invoice_window is not None:
+            invoice_window.refresh_models(model_choices)
+        restart_keys = [
+            key for key in snapshot.changed_keys(previous)
+            if key in functions.app_config.RESTART_KEYS
+        ]
+        if restart_keys:
+            print(f"WARN: Restart to apply config changes to: {', '.join(restart_keys)}")
+
+    config_watcher.on_change = apply_config
+
+    def poll_config() -> None:
+        config_watcher.poll()
+        root.after(functions.app_config.DEFAULT_POLL_MS, poll_config)
+
+    def refresh_asana_metadata() -> None:
+        metadata = functions.asana_metadata.load_metadata(
+            asana_token,
+            asana_settings.project_ids[0],
+            host=asana_api_host,
+            ttl_hours=metadata_ttl,
+        )
+        if metadata is not None:
+            root.after(0, lambda: apply_asana_metadata(metadata))
+
+    def on_first_paint() -> None:
+        startup_timer.record("first paint (since launch)", startup_timer.elapsed())
+        startup_timer.report()
+        preload_modules(timer=startup_timer)
+        job_executor.submit(
+            "history", "Compressing history storage", migrate_history_storage, priority=-1
+        )
+        schedule_history_maintenance()
+        schedule_history_index_update()
+        if asana_settings.project_ids:
+            job_executor.submit(
+                "sync", "Loading Asana fields and users", refresh_asana_metadata, priority=0
+            )
+        if mirror_interval > 0 and asana_settings.project_ids:
+            schedule_asana_mirror_sync()
+        if config.path:
+            root.after(functions.app_config.DEFAULT_POLL_MS, poll_config)
+
+    # The idle callback queued from the first loop iteration runs after the
+    # initial geometry and drawing work.
+    root.after(0, lambda: root.after_idle(on_first_paint))
     root.mainloop()
+
+    # The window is closed: stop queued work and flush the last timing spans,
+    # which the exporter's daemon thread would otherwise drop.
+    job_executor.shutdown()
+    functions.metrics.METRICS.configure_export(None)
+    # Nothing saves history any more, so the one-off VACUUM after a blob
+    # migration cannot make a save wait on the lock.
+    try:
+        functions.database.vacuum_if_pending()
+    except sqlite3.Error as exc:
+        print(f"WARN: Could not compact history database: {exc}")
@@ -0,0 +1,81 @@
+import tkinter as tk
+from tkinter import ttk
+
+from functions.metrics import METRICS, MetricsRegistry
+
+REFRESH_INTERVAL_MS = 1000
+
+
+class StatsWindow(tk.Toplevel):
+    """Live table of span timings (p50/p95/max) per instrumented operation."""
+
+    def __init__(self, master: tk.Misc, registry: MetricsRegistry = METRICS) -> None:
+        super().__init__(master)
+        self.title("Timing Stats")
+        self.geometry("720x360")
+        self.registry = registry
+        self._tick_id: str | None = None
+
+        frame = ttk.Frame(self, style="App.TFrame", padding=8)
+        frame.pack(fill="both", expand=True)
+
+        columns = ("count", "errors", "p50", "p95", "max", "total")
+        self.tree = ttk.Treeview(frame, columns=columns, show="tree headings")
+        self.tree.heading("#0", text="Operation")
+        self.tree.column("#0", width=240, stretch=True)
+        for column, heading, width in (
+            ("count", "Count", 60),
+            ("errors", "Errors", 60),
+            ("p50", "p50 ms", 80),
+            ("p95", "p95 ms", 80),
+            ("max", "Max ms", 80),
+            ("total", "Total s", 80),
+        ):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor="e", stretch=False)
+        self.tree.pack(fill="both", expand=True)
+
+        button_frame = ttk.Frame(frame, style="App.TFrame")
+        button_frame.pack(fill="x", pady=(6, 0))
+        ttk.Button(button_frame, text="Reset", command=self.reset).pack(side="right")
+        ttk.Button(button_frame, text="Print", command=self.print_summary).pack(
+            side="right", padx=(0, 6)
+        )
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self._tick()
+
+    def _tick(self) -> None:
+        self.refresh()
+        self._tick_id = self.after(REFRESH_INTERVAL_MS, self._tick)
+
+    def refresh(self) -> None:
+        self.tree.delete(*self.tree.get_children())
+        for row in self.registry.summary():
+            self.tree.insert(
+                "",
+                "end",
+                text=row["operation"],
+                values=(
+                    row["count"],
+                    row["errors"],
+                    f"{row['p50_ms']:.1f}",
+                    f"{row['p95_ms']:.1f}",
+                    f"{row['max_ms']:.1f}",
+                    f"{row['total_s']:.2f}",
+                ),
+            )
+
+    def reset(self) -> None:
+        print("INFO: Resetting timing stats")
+        self.registry.reset()
+        self.refresh()
+
+    def print_summary(self) -> None:
+        print("INFO: Timing stats:\n" + self.registry.format_summary())
+
+    def close(self) -> None:
+        if self._tick_id is not None:
+            self.after_cancel(self._tick_id)
+            self._tick_id = None
+        self.destroy()
@@ -0,0 +1,213 @@
+import tkinter as tk
+from contextlib import suppress
+from tkinter import messagebox, ttk
+from typing import Sequence
+
+from functions.task_list import TaskItem, count_items, parse_due_date
+
+
+class TaskListDialog(tk.Toplevel):
+    """Modal editor for the sub-tasks parsed from a summary.
+
+    Items can be renamed, given an assignee or due date, added (top level or
+    nested under the selection), removed and reordered.  :meth:`show`
+    returns the edited list, or ``None`` when the user cancels.
+    """
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        items: Sequence[TaskItem],
+        *,
+        task_name: str = "",
+        assignee_choices: Sequence[str] = (),
+    ) -> None:
+        super().__init__(master)
+        self.title(f"Sub-tasks for '{task_name}'" if task_name else "Sub-tasks")
+        self.geometry("720x460")
+        with suppress(tk.TclError):
+            self.transient(master)
+        self.result: list[TaskItem] | None = None
+        self._items: dict[str, TaskItem] = {}
+        self._loading_selection = False
+
+        frame = ttk.Frame(self, style="App.TFrame", padding=8)
+        frame.pack(fill="both", expand=True)
+
+        self.tree = ttk.Treeview(frame, columns=("assignee", "due"), show="tree headings", selectmode="browse")
+        self.tree.heading("#0", text="Sub-task")
+        self.tree.column("#0", width=420, stretch=True)
+        self.tree.heading("assignee", text="Assignee")
+        self.tree.column("assignee", width=140, stretch=False)
+        self.tree.heading("due", text="Due")
+        self.tree.column("due", width=100, stretch=False)
+        self.tree.pack(fill="both", expand=True)
+        self.tree.bind("<<TreeviewSelect>>", lambda _event: self._load_selection())
+
+        editor = ttk.Frame(frame, style="App.TFrame")
+        editor.pack(fill="x", pady=(6, 0))
+        self.name_var = tk.StringVar()
+        self.assignee_var = tk.StringVar()
+        self.due_var = tk.StringVar()
+        ttk.Label(editor, text="Name:").pack(side="left")
+        self.name_entry = ttk.Entry(editor, textvariable=self.name_var)
+        self.name_entry.pack(side="left", fill="x", expand=True, padx=(2, 8))
+        ttk.Label(editor, text="Assignee:").pack(side="left")
+        ttk.Combobox(
+            editor,
+            textvariable=self.assignee_var,
+            values=["", *(choice for choice in assignee_choices if choice.casefold() != "unassigned")],
+            width=16,
+        ).pack(side="left", padx=(2, 8))
+        ttk.Label(editor, text="Due:").pack(side="left")
+        ttk.Entry(editor, textvariable=self.due_var, width=11).pack(side="left", padx=(2, 0))
+        for variable in (self.name_var, self.assignee_var, self.due_var):
+            variable.trace_add("write", lambda *_args: self._store_selection())
+
+        buttons = ttk.Frame(frame, style="App.TFrame")
+        buttons.pack(fill="x", pady=(6, 0))
+        ttk.Button(buttons, text="Add", command=lambda: self.add_item(nested=False)).pack(side="left")
+        ttk.Button(buttons, text="Add Sub-item", command=lambda: self.add_item(nested=True)).pack(
+            side="left", padx=(6, 0)
+        )
+        ttk.Button(buttons, text="Remove", command=self.remove_selected).pack(side="left", padx=(6, 0))
+        ttk.Button(buttons, text="Up", command=lambda: self.move_selected(-1)).pack(side="left", padx=(6, 0))
+        ttk.Button(buttons, text="Down", command=lambda: self.move_selected(1)).pack(side="left", padx=(6, 0))
+        ttk.Button(buttons, text="Cancel", command=self.cancel).pack(side="right")
+        ttk.Button(buttons, text="Create Task", style="Primary.TButton", command=self.accept).pack(
+            side="right", padx=(0, 6)
+        )
+        self.count_label = ttk.Label(buttons, text="", style="Muted.TLabel")
+        self.count_label.pack(side="right", padx=(0, 12))
+
+        for item in items:
+            self._insert("", item)
+        self._update_count()
+        first = self.tree.get_children()
+        if first:
+            self.tree.selection_set(first[0])
+
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.bind("<Escape>", lambda _event: self.cancel())
+        with suppress(tk.TclError):
+            self.grab_set()
+
+    # Tree <-> items ----------------------------------------------------------
+    def _insert(self, parent: str, item: TaskItem, index: str | int = "end") -> str:
+        copy = TaskItem(item.name, item.assignee, item.due_on)
+        iid = self.tree.insert(parent, index, text=copy.name, values=(copy.assignee, copy.due_on), open=True)
+        self._items[iid] = copy
+        for child in item.children:
+            self._insert(iid, child)
+        return iid
+
+    def _collect(self, parent: str = "") -> list[TaskItem]:
+        collected = []
+        for iid in self.tree.get_children(parent):
+            source = self._items[iid]
+            collected.append(
+                TaskItem(source.name.strip(), source.assignee.strip(), source.due_on.strip(), self._collect(iid))
+            )
+        return collected
+
+    def _selected(self) -> str | None:
+        selection = self.tree.selection()
+        return selection[0] if selection else None
+
+    def _load_selection(self) -> None:
+        iid = self._selected()
+        item = self._items.get(iid) if iid else None
+        self._loading_selection = True
+        try:
+            self.name_var.set(item.name if item else "")
+            self.assignee_var.set(item.assignee if item else "")
+            self.due_var.set(item.due_on if item else "")
+        finally:
+            self._loading_selection = False
+
+    def _store_selection(self) -> None:
+        if self._loading_selection:
+            return
+        iid = self._selected()
+        if iid is None:
+            return
+        item = self._items[iid]
+        item.name = self.name_var.get()
+        item.assignee = self.assignee_var.get()
+        item.due_on = self.due_var.get()
+        self.tree.item(iid, text=item.name, values=(item.assignee, item.due_on))
+
+    def _update_count(self) -> None:
+        self.count_label.config(text=f"{count_items(self._collect())} sub-tasks")
+
+    # Actions ---------------------------------------------------------------
+    def add_item(self, *, nested: bool) -> None:
+        selected = self._selected()
+        if nested and selected:
+            parent, index = selected, "end"
+        elif selected:
+            parent = self.tree.parent(selected)
+            index = self.tree.index(selected) + 1
+        else:
+            parent, index = "", "end"
+        iid = self._insert(parent, TaskItem("New sub-task"), index)
+        self.tree.see(iid)
+        self.tree.selection_set(iid)
+        self.name_entry.focus_set()
+        self.name_entry.select_range(0, "end")
+        self._update_count()
+
+    def remove_selected(self) -> None:
+        iid = self._selected()
+        if iid is None:
+            return
+        following = self.tree.next(iid) or self.tree.prev(iid) or self.tree.parent(iid)
+        for descendant in self._descendants(iid):
+            self._items.pop(descendant, None)
+        self.tree.delete(iid)
+        if following:
+            self.tree.selection_set(following)
+        else:
+            self._load_selection()
+        self._update_count()
+
+    def _descendants(self, iid: str) -> list[str]:
+        found = [iid]
+        for child in self.tree.get_children(iid):
+            found.extend(self._descendants(child))
+        return found
+
+    def move_selected(self, offset: int) -> None:
+        iid = self._selected()
+        if iid is None:
+            return
+        parent = self.tree.parent(iid)
+        index = self.tree.index(iid) + offset
+        if 0 <= index < len(self.tree.get_children(parent)):
+            self.tree.move(iid, parent, index)
+            self.tree.see(iid)
+
+    def accept(self) -> None:
+        items = self._collect()
+        for root in items:
+            for item, _depth in root.walk():
+                if not item.name:
+                    messagebox.showerror("Sub-tasks", "Every sub-task needs a name.", parent=self)
+                    return
+                if item.due_on and parse_due_date(item.due_on) is None:
+                    messagebox.showerror(
+                        "Sub-tasks",
+                        f"'{item.due_on}' is not a date (use 2024-01-31 or 31/01/2024).",
+                        parent=self,
+                    )
+                    return
+        self.result = items
+        self.destroy()
+
+    def cancel(self) -> None:
+        self.result = None
+        self.destroy()
+
+    def show(self) -> list[TaskItem] | None:
+        self.wait_window(self)
+        return self.result
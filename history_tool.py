@@ -0,0 +1,84 @@
+"""Export, import and maintain ``history.db`` from the command line.
+
+Examples::
+
+    python history_tool.py export history.jsonl.gz
+    python history_tool.py export summaries.csv --mode summarize --since 2024-01-01
+    python history_tool.py import laptop.jsonl.gz desktop.csv history_archive/*.jsonl.gz
+
+Files ending in ``.gz`` are gzip-compressed; ``.csv`` selects CSV, anything
+else JSON Lines.  Retention archives written by the maintenance job can be
+imported directly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import Optional
+
+from vendor_setup import ensure_vendor_path
+
+ensure_vendor_path()
+
+import functions.database
+import functions.history_transfer
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export or import history.db entries.")
+    parser.add_argument(
+        "--db",
+        default=functions.database.DB_PATH,
+        help="History database to use (default: history.db next to the app).",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write history rows to a JSONL or CSV file.")
+    export_parser.add_argument("path", help="Output file (.jsonl, .csv, optionally .gz).")
+    export_parser.add_argument("--format", choices=functions.history_transfer.FORMATS)
+    export_parser.add_argument("--mode", help="Only export this mode (e.g. summarize).")
+    export_parser.add_argument("--since", help="Only rows on or after this date (YYYY-MM-DD).")
+    export_parser.add_argument("--until", help="Only rows before this date (YYYY-MM-DD).")
+
+    import_parser = commands.add_parser("import", help="Add rows from export or archive files.")
+    import_parser.add_argument("paths", nargs="+", help="Files written by export or the archive job.")
+    import_parser.add_argument("--format", choices=functions.history_transfer.FORMATS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = _parse_args(argv)
+    functions.database.DB_PATH = os.path.abspath(args.db)
+    functions.database.init_history_db()
+
+    try:
+        if args.command == "export":
+            count = functions.history_transfer.export_history(
+                args.path,
+                fmt=args.format,
+                mode=args.mode,
+                since=args.since,
+                until=args.until,
+            )
+            print(f"INFO: Exported {count} history rows to {args.path}")
+            return 0
+
+        exit_code = 0
+        for path in args.paths:
+            result = functions.history_transfer.import_history(path, fmt=args.format)
+            print(
+                f"INFO: {path}: imported {result.imported},"
+                f" skipped {result.duplicates} duplicates, {result.invalid} invalid"
+            )
+            if result.invalid:
+                exit_code = 1
+        return exit_code
+    except (OSError, ValueError) as exc:
+        print(f"ERR: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
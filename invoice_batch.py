@@ -0,0 +1,261 @@
+"""Draft invoice notes for many jobs at once.
+
+Examples::
+
+    python invoice_batch.py run month_end.csv --output invoices.csv --concurrency 4
+    python invoice_batch.py submit month_end.csv --output invoices.md
+    python invoice_batch.py status
+    python invoice_batch.py resume batch_abc123
+
+``run`` drafts the notes straight away with a few live requests in flight.
+Finished jobs are checkpointed, so re-running the same command after an
+interruption only pays for the jobs that are left.
+
+``submit`` uses the cheaper OpenAI Batch API instead: it writes the
+requests to a JSONL file, uploads it and waits for the batch (up to 24
+hours, usually much less).  Stop waiting with Ctrl+C at any time;
+``resume <batch id>`` picks the job up again, from this or any later
+session, and writes the notes once the batch is done.  Every note is saved
+to history with mode ``invoice``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import Optional
+
+from vendor_setup import ensure_vendor_path
+
+ensure_vendor_path()
+
+import functions.app_config
+import functions.database
+import functions.gpt
+import functions.openai_batch
+from functions.invoice_jobs import (
+    InvoiceNote,
+    draft_invoice_notes,
+    iter_invoice_jobs,
+    load_invoice_jobs,
+    write_invoice_notes,
+)
+from services.openai_service import OpenAIService
+
+DEFAULT_OUTPUT_NAME = "invoice_notes.md"
+
+
+def _load_config(config_path: str) -> functions.app_config.ConfigSnapshot:
+    # Only OpenAI is used here, so the Asana keys may be left out.
+    return functions.app_config.load_config(
+        config_path, required=functions.app_config.OPENAI_CONFIG_KEYS
+    )
+
+
+def _openai_service(args: argparse.Namespace, config: functions.app_config.ConfigSnapshot) -> OpenAIService:
+    base_url = args.base_url or config.get("openai_base_url") or None
+    return OpenAIService(config.get("openai_api_key"), base_url=base_url)
+
+
+def _write_notes(job: functions.openai_batch.BatchJob, results: dict) -> int:
+    """Write the invoice notes of *job*; return the number of failed jobs."""
+
+    notes = []
+    failed = 0
+    for custom_id, request in job.requests.items():
+        result = results.get(custom_id)
+        note = InvoiceNote(job_id=custom_id, title=request.get("title") or custom_id)
+        if result is not None and not result.error:
+            note.note = result.content
+        else:
+            note.error = result.error if result is not None else "No result"
+            failed += 1
+            print(f"WARN: {custom_id}: {note.error}")
+        notes.append(note)
+    output_path = job.extra.get("output") or DEFAULT_OUTPUT_NAME
+    write_invoice_notes(output_path, notes)
+    print(f"INFO: Wrote {len(notes) - failed} of {len(notes)} invoice notes to {output_path}")
+    return failed
+
+
+def _finish(args: argparse.Namespace, service: OpenAIService, job) -> int:
+    if args.no_wait:
+        batch = service.client.batches.retrieve(job.batch_id)
+        print(f"INFO: OpenAI batch {job.batch_id} is {batch.status}")
+        if batch.status not in functions.openai_batch.FINAL_STATUSES:
+            return 0
+    else:
+        try:
+            batch = functions.openai_batch.wait_for_batch(
+                service, job.batch_id, poll_seconds=args.poll_seconds
+            )
+        except KeyboardInterrupt:
+            print(
+                f"WARN: Stopped waiting; the batch keeps running."
+                f" Collect it with: python invoice_batch.py resume {job.batch_id}"
+            )
+            return 130
+    results = functions.openai_batch.collect_batch(service, job, batch)
+    return 1 if _write_notes(job, results) else 0
+
+
+def _run(args: argparse.Namespace, config: functions.app_config.ConfigSnapshot) -> int:
+    model = args.model or config.get("default_model") or "gpt-5"
+    output_path = os.path.abspath(args.output)
+    checkpoint_path = args.checkpoint or output_path + ".progress.jsonl"
+
+    def on_progress(finished: int, note: InvoiceNote) -> None:
+        status = "done" if note.note else f"failed ({note.error})"
+        print(f"INFO: [{finished}] {note.job_id}: {status}")
+
+    try:
+        notes = draft_invoice_notes(
+            _openai_service(args, config),
+            model,
+            iter_invoice_jobs(args.source),
+            checkpoint_path=checkpoint_path,
+            concurrency=args.concurrency or config.invoice_bulk_concurrency,
+            on_progress=on_progress,
+        )
+    except KeyboardInterrupt:
+        print("WARN: Interrupted. Re-run the same command to resume.")
+        return 130
+    write_invoice_notes(output_path, notes)
+    failed = sum(1 for note in notes if not note.note)
+    print(f"INFO: Wrote {len(notes) - failed} of {len(notes)} invoice notes to {output_path}")
+    return 1 if failed else 0
+
+
+def _submit(args: argparse.Namespace, config: functions.app_config.ConfigSnapshot) -> int:
+    jobs = load_invoice_jobs(args.source)
+    requests: dict[str, dict] = {}
+    for job in jobs:
+        if not job.notes:
+            print(f"WARN: {job.job_id}: no notes; skipped")
+            continue
+        requests[job.job_id] = {
+            "title": job.title,
+            "prompt": functions.gpt.build_invoice_note_prompt(job.notes, job.title),
+        }
+    if not requests:
+        print(f"INFO: No jobs with notes in {args.source}")
+        return 0
+
+    model = args.model or config.get("default_model") or "gpt-5"
+    output_path = os.path.abspath(args.output)
+    request_path = args.requests or os.path.splitext(output_path)[0] + ".requests.jsonl"
+    functions.openai_batch.write_request_file(
+        request_path, model, ((custom_id, request["prompt"]) for custom_id, request in requests.items())
+    )
+    service = _openai_service(args, config)
+    job = functions.openai_batch.submit_batch(
+        service,
+        request_path,
+        model=model,
+        requests=requests,
+        history_mode="invoice",
+        extra={"output": output_path, "source": os.path.abspath(args.source)},
+        description=f"Invoice notes: {os.path.basename(os.path.abspath(args.source))}",
+    )
+    print(f"INFO: Resume later with: python invoice_batch.py resume {job.batch_id}")
+    return _finish(args, service, job)
+
+
+def _resume(args: argparse.Namespace, config: functions.app_config.ConfigSnapshot) -> int:
+    job = functions.openai_batch.load_batch_job(args.batch_id)
+    if job is None:
+        raise ValueError(f"No stored invoice batch with id {args.batch_id}")
+    if args.output:
+        job.extra["output"] = os.path.abspath(args.output)
+    return _finish(args, _openai_service(args, config), job)
+
+
+def _status(args: argparse.Namespace, config: functions.app_config.ConfigSnapshot) -> int:
+    batch_ids = [args.batch_id] if args.batch_id else functions.openai_batch.list_batch_jobs()
+    if not batch_ids:
+        print("INFO: No stored batches")
+        return 0
+    service = _openai_service(args, config)
+    for batch_id in batch_ids:
+        job = functions.openai_batch.load_batch_job(batch_id)
+        if job is None:
+            print(f"WARN: No stored batch with id {batch_id}")
+            continue
+        batch = service.client.batches.retrieve(batch_id)
+        print(
+            f"{batch_id}  {batch.status:<11} {len(job.saved)}/{len(job.requests)} saved"
+            f"  created {job.created_at}  -> {job.extra.get('output', '')}"
+        )
+    return 0
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Draft invoice notes in bulk.")
+    parser.add_argument(
+        "--config",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json"),
+        help="Path to config.json.",
+    )
+    parser.add_argument("--base-url", help="OpenAI API base URL (defaults to openai_base_url from config).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_wait_arguments(command_parser: argparse.ArgumentParser) -> None:
+        command_parser.add_argument(
+            "--poll-seconds",
+            type=float,
+            default=functions.openai_batch.DEFAULT_POLL_SECONDS,
+            help="Seconds between status checks while waiting.",
+        )
+        command_parser.add_argument(
+            "--no-wait", action="store_true", help="Do not wait; only collect a batch that is already done."
+        )
+
+    run_parser = commands.add_parser("run", help="Draft the notes now with live requests.")
+    run_parser.add_argument("source", help="CSV with job/notes columns, or a folder of .txt/.md notes.")
+    run_parser.add_argument(
+        "--output", default=DEFAULT_OUTPUT_NAME, help="Output file; .csv for CSV, anything else Markdown."
+    )
+    run_parser.add_argument("--checkpoint", help="Resume file (default: <output>.progress.jsonl).")
+    run_parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Requests in flight at once (defaults to invoice_bulk_concurrency from config).",
+    )
+    run_parser.add_argument("--model", help="OpenAI model (defaults to default_model from config).")
+
+    submit_parser = commands.add_parser("submit", help="Submit a CSV file or folder of job notes.")
+    submit_parser.add_argument("source", help="CSV with job/notes columns, or a folder of .txt/.md notes.")
+    submit_parser.add_argument(
+        "--output", default=DEFAULT_OUTPUT_NAME, help="Output file; .csv for CSV, anything else Markdown."
+    )
+    submit_parser.add_argument("--requests", help="Where to write the JSONL request file.")
+    submit_parser.add_argument("--model", help="OpenAI model (defaults to default_model from config).")
+    add_wait_arguments(submit_parser)
+
+    resume_parser = commands.add_parser("resume", help="Wait for and collect a submitted batch.")
+    resume_parser.add_argument("batch_id")
+    resume_parser.add_argument("--output", help="Write the notes here instead of the submitted path.")
+    add_wait_arguments(resume_parser)
+
+    status_parser = commands.add_parser("status", help="Show stored batches and their status.")
+    status_parser.add_argument("batch_id", nargs="?")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = _parse_args(argv)
+    from openai import OpenAIError
+
+    try:
+        config = _load_config(args.config)
+        functions.database.init_history_db()
+        handler = {"run": _run, "submit": _submit, "resume": _resume, "status": _status}[args.command]
+        return handler(args, config)
+    except (OSError, ValueError, OpenAIError) as exc:
+        print(f"ERR: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
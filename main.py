@@ -1,5 +1,8 @@
+import time
+
+_LAUNCHED_AT = time.perf_counter()
+
 import json
-import os
 import sys
 
 try:
@@ -11,15 +14,17 @@ from vendor_setup import ensure_vendor_path
 
 ensure_vendor_path()
 
-from gui.main_window import create_main_window
-from services.openai_service import OpenAIService
+from functions.startup import StartupTimer
+
+_startup_timer = StartupTimer(_LAUNCHED_AT)
 
-REQUIRED_CONFIG_KEYS = [
-    "openai_api_key",
-    "asana_token",
-    "asana_project_id",
-    "asana_workspace",
-]
+with _startup_timer.phase("import config"):
+    import functions.app_config
+    import functions.profiling
+with _startup_timer.phase("import gui.main_window"):
+    from gui.main_window import create_main_window
+with _startup_timer.phase("import OpenAIService"):
+    from services.openai_service import OpenAIService
 
 def _show_config_error(message: str) -> None:
     if messagebox is not None:
@@ -32,21 +37,10 @@ def _show_config_error(message: str) -> None:
 
     print(f"Configuration Error: {message}", file=sys.stderr)
 
-def validate_config(config: dict) -> list[str]:
-    invalid_keys = []
-
-    for key in REQUIRED_CONFIG_KEYS:
-        value = config.get(key)
-        if value is None or (isinstance(value, str) and not value.strip()):
-            invalid_keys.append(key)
-
-    return invalid_keys
-
 def main() -> None:
-    config_path = os.path.join(os.path.dirname(__file__), "config.json")
     try:
-        with open(config_path, "r") as f:
-            config = json.load(f)
+        with _startup_timer.phase("load config"):
+            config = functions.app_config.load_config()
     except FileNotFoundError:
         _show_config_error(
             "Configuration file not found. Please create config.json from"
@@ -56,18 +50,23 @@ def main() -> None:
     except json.JSONDecodeError as exc:
         _show_config_error(f"Configuration file is malformed: {exc}")
         sys.exit(1)
+    except functions.app_config.ConfigError as exc:
+        _show_config_error(str(exc))
+        sys.exit(1)
 
-    invalid_keys = validate_config(config)
-    if invalid_keys:
-        _show_config_error(
-            "Missing or empty required config keys: "
-            f"{', '.join(invalid_keys)}. "
-            "Please update config.json using config.example.json as a template."
+    if functions.profiling.profiling_requested(config):
+        threshold = config.get("profile_dump_threshold_ms")
+        functions.profiling.install_profiler(
+            config.get("profile_dir") or None,
+            dump_threshold_ms=threshold
+            if isinstance(threshold, (int, float))
+            else functions.profiling.DEFAULT_DUMP_THRESHOLD_MS,
         )
-        sys.exit(1)
 
-    openai_service = OpenAIService(config["openai_api_key"])
-    create_main_window(openai_service, config)
+    openai_service = OpenAIService(
+        config.get("openai_api_key"), base_url=config.get("openai_base_url") or None
+    )
+    create_main_window(openai_service, config, startup_timer=_startup_timer)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,10 @@
-import openai
-from openai import OpenAIError
+import json
 import random
+import threading
 import time
 
+from functions.metrics import span, timed
+
 
 OPENAI_MAX_ATTEMPTS = 5
 OPENAI_BASE_BACKOFF_SECONDS = 0.5
@@ -10,10 +12,30 @@ OPENAI_MAX_BACKOFF_SECONDS = 8.0
 
 
 class OpenAIService:
-    """Thin wrapper around OpenAI chat completions."""
+    """Thin wrapper around OpenAI chat completions.
+
+    The ``openai`` SDK is slow to import, so the client is created on first
+    use instead of at startup.
+    """
+
+    def __init__(self, api_key: str, *, base_url: str | None = None):
+        self._api_key = api_key
+        # Points the client at a compatible endpoint (proxy or local stand-in).
+        self._base_url = base_url or None
+        self._client = None
+        self._client_lock = threading.Lock()
 
-    def __init__(self, api_key: str):
-        self.client = openai.OpenAI(api_key=api_key)
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import openai
+
+                    self._client = openai.OpenAI(
+                        api_key=self._api_key, base_url=self._base_url
+                    )
+        return self._client
 
     @staticmethod
     def _is_retryable_error(exc: Exception) -> bool:
@@ -42,42 +64,115 @@ class OpenAIService:
         jitter = random.uniform(0.0, min(1.0, exponential_delay / 2))
         return min(OPENAI_MAX_BACKOFF_SECONDS, exponential_delay + jitter)
 
-    def generate_response(self, model_list_var: str, prompt: str) -> str:
-        """Return the assistant's reply for the given prompt."""
-        last_exc: Exception | None = None
+    @timed("openai.generate_response")
+    def generate_response(
+        self,
+        model_list_var: str,
+        prompt: str,
+        *,
+        response_format: dict | None = None,
+    ) -> str:
+        """Return the assistant's reply for the given prompt.
 
-        for attempt in range(1, OPENAI_MAX_ATTEMPTS + 1):
-            try:
-                response = self.client.chat.completions.create(
+        *response_format* is passed through to the API, e.g.
+        ``{"type": "json_object"}`` to get a JSON reply.
+        """
+        extra = {"response_format": response_format} if response_format else {}
+
+        def create(attempt: int):
+            with span("openai.chat_completion", model=model_list_var, attempt=attempt):
+                return self.client.chat.completions.create(
                     model=model_list_var,
                     messages=[{"role": "user", "content": prompt}],
+                    **extra,
                 )
-                return response.choices[0].message.content
+
+        response = self._with_retries("completion", create)
+        return response.choices[0].message.content
+
+    def _with_retries(self, what: str, call):
+        """Return ``call(attempt)``, retrying transient OpenAI errors with backoff."""
+        from openai import OpenAIError
+
+        last_exc: Exception | None = None
+
+        for attempt in range(1, OPENAI_MAX_ATTEMPTS + 1):
+            try:
+                return call(attempt)
             except OpenAIError as exc:
                 last_exc = exc
                 is_retryable = self._is_retryable_error(exc)
                 if not is_retryable or attempt >= OPENAI_MAX_ATTEMPTS:
                     print(
-                        "ERR: OpenAI completion failed"
+                        f"ERR: OpenAI {what} failed"
                         f" (attempt {attempt}/{OPENAI_MAX_ATTEMPTS}, retryable={is_retryable}): {exc}"
                     )
                     raise
 
                 sleep_for = self._compute_backoff(attempt)
                 print(
-                    "WARN: OpenAI completion retrying"
+                    f"WARN: OpenAI {what} retrying"
                     f" (attempt {attempt}/{OPENAI_MAX_ATTEMPTS}) in {sleep_for:.2f}s: {exc}"
                 )
                 time.sleep(sleep_for)
 
         if last_exc is not None:
             print(
-                "ERR: OpenAI completion failed after maximum retry attempts"
+                f"ERR: OpenAI {what} failed after maximum retry attempts"
                 f" ({OPENAI_MAX_ATTEMPTS})."
             )
             raise last_exc
 
-        raise RuntimeError("OpenAI completion failed without an exception.")
+        raise RuntimeError(f"OpenAI {what} failed without an exception.")
+
+    @timed("openai.generate_structured")
+    def generate_structured(
+        self,
+        model_list_var: str,
+        prompt: str,
+        schema: dict,
+        *,
+        name: str,
+    ) -> dict:
+        """Return the reply as an object that follows the JSON *schema*.
+
+        Uses strict structured outputs, so the reply needs no reformatting
+        round trips.  Raises ``ValueError`` when the model refuses or the
+        reply is not a JSON object.
+        """
+
+        reply = self.generate_response(
+            model_list_var,
+            prompt,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": name, "strict": True, "schema": schema},
+            },
+        )
+        if not reply:
+            raise ValueError("The model returned no structured reply.")
+        try:
+            payload = json.loads(reply)
+        except ValueError as exc:
+            raise ValueError(f"The structured reply is not valid JSON: {exc}") from exc
+        if not isinstance(payload, dict):
+            raise ValueError("The structured reply is not a JSON object.")
+        return payload
+
+    @timed("openai.embed")
+    def embed(self, model: str, texts: list[str], *, dimensions: int | None = None) -> list[list[float]]:
+        """Return one embedding vector per text, in order.
+
+        *dimensions* asks models that support it for shortened vectors.
+        """
+        extra = {"dimensions": dimensions} if dimensions else {}
+
+        def create(attempt: int):
+            with span("openai.embeddings", model=model, attempt=attempt, inputs=len(texts)):
+                return self.client.embeddings.create(model=model, input=texts, **extra)
+
+        response = self._with_retries("embedding", create)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
 
     # def generate_response_invoice(self, model_list_var, prompt: str) -> str:
     #     response = self.client.responses.create(
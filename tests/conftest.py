@@ -0,0 +1,41 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from vendor_setup import ensure_vendor_path  # noqa: E402
+
+ensure_vendor_path()
+
+import pytest  # noqa: E402
+
+import functions.database  # noqa: E402
+
+
+@pytest.fixture
+def history_db(tmp_path, monkeypatch):
+    """Point ``functions.database`` at an empty ``history.db`` in *tmp_path*."""
+
+    monkeypatch.setattr(functions.database, "DB_PATH", str(tmp_path / "history.db"))
+    functions.database.init_history_db()
+    return functions.database.DB_PATH
+
+
+def add_history(timestamp, mode="summarize", tone="neutral", input_text="in", output_text="out"):
+    """Insert one blob-backed history row and return its id."""
+
+    with functions.database.connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO history (timestamp, mode, tone, input_hash, output_hash) VALUES (?, ?, ?, ?, ?)",
+            (
+                timestamp,
+                mode,
+                tone,
+                functions.database.store_blob(cursor, input_text),
+                functions.database.store_blob(cursor, output_text),
+            ),
+        )
+        return cursor.lastrowid
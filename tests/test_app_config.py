@@ -0,0 +1,128 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from functions.app_config import ConfigError, ConfigSnapshot, ConfigWatcher, load_config, validate_config
+from functions.asana_settings import DEFAULT_SYNC_INTERVAL_MINUTES
+from functions.jobs import DEFAULT_MAX_PENDING
+from functions.metrics import DEFAULT_EXPORT_BACKUPS
+from functions.ui import DEFAULT_PASTE_PREVIEW_THRESHOLD
+
+from conftest import ROOT
+
+REQUIRED = {
+    "openai_api_key": "sk-test",
+    "asana_token": "token",
+    "asana_project_id": "123",
+    "asana_workspace": "ws",
+}
+
+
+def _write(path, config):
+    path.write_text(json.dumps(config))
+    return str(path)
+
+
+def test_missing_required_keys_raise():
+    with pytest.raises(ConfigError, match="asana_token"):
+        ConfigSnapshot.from_dict({**REQUIRED, "asana_token": "  "})
+
+
+def test_mistyped_keys_are_dropped_with_defaults():
+    config = {**REQUIRED, "structured_summaries": "no", "job_queue_limit": True, "model_choices": ["a", "b"]}
+    assert validate_config(config) == ([], ["structured_summaries", "job_queue_limit"])
+
+    snapshot = ConfigSnapshot.from_dict(config)
+    assert "structured_summaries" not in snapshot.values
+    assert snapshot.structured_summaries is True
+    assert snapshot.model_choices == ("a", "b")
+    assert snapshot.default_model == "a"
+
+
+def test_snapshot_is_a_copy():
+    config = {**REQUIRED, "model_choices": ["a"]}
+    snapshot = ConfigSnapshot.from_dict(config)
+    config["model_choices"].append("b")
+    assert snapshot.get("model_choices") == ["a"]
+
+
+def test_changed_keys():
+    old = ConfigSnapshot.from_dict(REQUIRED)
+    new = ConfigSnapshot.from_dict({**REQUIRED, "default_model": "gpt-5", "asana_token": "other"})
+    assert new.changed_keys(old) == ["asana_token", "default_model"]
+
+
+def test_watcher_reloads_and_keeps_old_snapshot_on_broken_edit(tmp_path):
+    path = _write(tmp_path / "config.json", REQUIRED)
+    changes = []
+    watcher = ConfigWatcher(load_config(path), on_change=lambda old, new: changes.append(new))
+    assert watcher.poll() is None
+
+    _write(tmp_path / "config.json", {**REQUIRED, "default_model": "gpt-5"})
+    os.utime(path, ns=(1, 10**18))
+    assert watcher.poll().default_model == "gpt-5"
+    assert len(changes) == 1
+
+    (tmp_path / "config.json").write_text("{ broken")
+    os.utime(path, ns=(1, 2 * 10**18))
+    assert watcher.poll() is None
+    assert watcher.current.default_model == "gpt-5"
+
+    _write(tmp_path / "config.json", {"openai_api_key": "sk"})
+    os.utime(path, ns=(1, 3 * 10**18))
+    assert watcher.poll() is None
+    assert len(changes) == 1
+
+
+def test_numeric_settings_are_range_checked_with_defaults(capsys):
+    config = {
+        **REQUIRED,
+        "asana_mirror_sync_minutes": -5,
+        "asana_metadata_ttl_hours": 0.5,
+        "job_queue_limit": 0,
+        "job_worker_limits": {"openai": 4, "asana": 0, "history": "2"},
+        "invoice_bulk_concurrency": 6,
+        "ui_stall_threshold_ms": 0,
+        "metrics_log_backups": -1,
+    }
+    assert validate_config(config)[1] == ["asana_mirror_sync_minutes", "job_queue_limit", "metrics_log_backups"]
+
+    snapshot = ConfigSnapshot.from_dict(config)
+    assert snapshot.asana_mirror_sync_minutes == DEFAULT_SYNC_INTERVAL_MINUTES
+    assert snapshot.asana_metadata_ttl_hours == 0.5
+    assert snapshot.job_queue_limit == DEFAULT_MAX_PENDING
+    assert snapshot.job_worker_limits == {"openai": 4}
+    assert snapshot.invoice_bulk_concurrency == 6
+    assert snapshot.ui_stall_threshold_ms == 0
+    assert snapshot.metrics_log_backups == DEFAULT_EXPORT_BACKUPS
+    assert snapshot.html_paste_preview_threshold == DEFAULT_PASTE_PREVIEW_THRESHOLD
+    output = capsys.readouterr().out
+    assert "asana_mirror_sync_minutes: expected int or float of at least 0" in output
+    assert "job_worker_limits.history" in output
+
+
+def test_openai_only_loader_skips_the_asana_keys(tmp_path):
+    import invoice_batch
+
+    path = _write(tmp_path / "config.json", {"openai_api_key": "sk-test", "invoice_bulk_concurrency": 2})
+    with pytest.raises(ConfigError, match="asana_token"):
+        load_config(path)
+    snapshot = invoice_batch._load_config(path)
+    assert snapshot.get("openai_api_key") == "sk-test"
+    assert snapshot.invoice_bulk_concurrency == 2
+
+    _write(tmp_path / "config.json", {"openai_api_key": " "})
+    with pytest.raises(ConfigError, match="openai_api_key"):
+        invoice_batch._load_config(path)
+
+
+def test_importing_app_config_does_not_load_the_features():
+    code = (
+        "import sys, functions.app_config;"
+        "loaded = {'tkinter', 'sqlite3', 'functions.database', 'functions.ui'} & set(sys.modules);"
+        "assert not loaded, loaded"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
@@ -0,0 +1,78 @@
+from functions.clipboard import ClipboardNegotiator, FakeClipboardBackend, extract_clipboard_fragment
+
+
+def _operations(backend):
+    return [call for call in backend.calls if call[0] != "owner"]
+
+
+def test_first_fetch_queries_targets_then_preferred_html():
+    backend = FakeClipboardBackend({"UTF8_STRING": "plain", "text/html": "<b>x</b>"})
+    negotiator = ClipboardNegotiator(backend)
+
+    assert negotiator.fetch_html() == "<b>x</b>"
+    assert _operations(backend) == [("targets", ""), ("get", "text/html")]
+
+
+def test_cached_target_skips_types_query():
+    backend = FakeClipboardBackend({"HTML Format": "<i>a</i>"})
+    negotiator = ClipboardNegotiator(backend)
+    negotiator.fetch_html()
+    backend.calls.clear()
+
+    backend.set_contents({"HTML Format": "<i>b</i>"})
+    assert negotiator.fetch_html() == "<i>b</i>"
+    assert _operations(backend) == [("get", "HTML Format")]
+
+
+def test_cache_is_kept_per_owner():
+    backend = FakeClipboardBackend({"text/html": "<p>1</p>"}, owner="browser")
+    negotiator = ClipboardNegotiator(backend)
+    negotiator.fetch_html()
+    backend.set_contents({"HTML Format": "<p>2</p>"}, owner="office")
+    negotiator.fetch_html()
+    backend.calls.clear()
+
+    backend.set_contents({"text/html": "<p>3</p>"}, owner="browser")
+    assert negotiator.fetch_html() == "<p>3</p>"
+    assert _operations(backend) == [("get", "text/html")]
+
+
+def test_stale_cached_target_falls_back_to_negotiation():
+    backend = FakeClipboardBackend({"text/html": "<p>1</p>"})
+    negotiator = ClipboardNegotiator(backend)
+    negotiator.fetch_html()
+    backend.calls.clear()
+
+    backend.set_contents({"UTF8_STRING": "plain", "HTML Format": "<p>2</p>"})
+    assert negotiator.fetch_html() == "<p>2</p>"
+    assert _operations(backend) == [("get", "text/html"), ("targets", ""), ("get", "HTML Format")]
+
+
+def test_unlisted_targets_only_probed_when_exhaustive():
+    backend = FakeClipboardBackend({"application/x-custom-html": "<p>x</p>"})
+    negotiator = ClipboardNegotiator(backend)
+
+    assert negotiator.fetch_html() is None
+    assert negotiator.fetch_html(exhaustive=True) == "<p>x</p>"
+
+
+def test_missing_types_answer_tries_common_targets():
+    class NoTypesBackend(FakeClipboardBackend):
+        def targets(self):
+            self._round_trip("targets")
+            return ()
+
+    backend = NoTypesBackend({"HTML Format": "<p>x</p>"})
+    assert ClipboardNegotiator(backend).fetch_html() == "<p>x</p>"
+
+
+def test_extract_fragment_from_markers_and_offsets():
+    marked = "Version:0.9\r\n<html><!--StartFragment--><b>hi</b><!--EndFragment--></html>"
+    assert extract_clipboard_fragment(marked) == "<b>hi</b>"
+
+    body = "<b>yo</b>"
+    header = "Version:0.9\r\nStartFragment:{start:010d}\r\nEndFragment:{end:010d}\r\n\r\n"
+    probe = header.format(start=0, end=0)
+    raw = header.format(start=len(probe), end=len(probe) + len(body)) + body
+    assert extract_clipboard_fragment(raw) == body
+    assert extract_clipboard_fragment("<p>plain</p>") == "<p>plain</p>"
@@ -0,0 +1,15 @@
+import functions.email_sources as email_sources
+
+
+def test_unreadable_single_file_becomes_an_error_item(tmp_path, monkeypatch):
+    def broken_reader(path, item_id):
+        raise RuntimeError("Reading .msg files requires the 'extract-msg' package.")
+
+    monkeypatch.setitem(email_sources._READERS, ".msg", broken_reader)
+    path = tmp_path / "mail.msg"
+    path.write_bytes(b"not outlook")
+
+    [item] = list(email_sources.iter_emails(str(path)))
+
+    assert item.item_id == "mail.msg"
+    assert "extract-msg" in item.error
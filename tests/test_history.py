@@ -0,0 +1,189 @@
+import gzip
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+import functions.database
+from functions.history_maintenance import RetentionPolicy, _expiry_clause, run_history_maintenance
+from functions.history_transfer import export_history, import_history, iter_history_records
+
+from conftest import add_history
+
+
+def _page_ids(**filters):
+    return [row[0] for row in functions.database.fetch_history_page(**filters)]
+
+
+def _key(row):
+    return row[1], row[0]
+
+
+def test_fetch_history_page_pages_by_timestamp_and_id(history_db):
+    ids = [add_history(f"2024-01-{day:02d}T10:00:00") for day in range(1, 9)]
+    # Imported rows can be older than rows saved before them.
+    ids.insert(0, add_history("2023-12-31T10:00:00"))
+    ids.insert(4, add_history("2024-01-03T10:00:00"))
+
+    pages = [functions.database.fetch_history_page(limit=4)]
+    while pages[-1]:
+        pages.append(functions.database.fetch_history_page(limit=4, before=_key(pages[-1][-1])))
+    newest_first = [row[0] for page in pages for row in page]
+    assert newest_first == ids[::-1]
+
+    # Paging back up from the third page returns the second one.
+    assert functions.database.fetch_history_page(limit=4, after=_key(pages[2][0])) == pages[1]
+
+
+def test_fetch_history_page_uses_indexes_without_sorting(history_db, monkeypatch):
+    statements = []
+    connect = functions.database.connect
+
+    def traced_connect():
+        conn = connect()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(functions.database, "connect", traced_connect)
+    cases = [
+        {},
+        {"since": "2024-01-01", "until": "2024-02-01"},
+        {"mode": "invoice", "since": "2024-01-01"},
+        {"tone": "formal", "before": ("2024-01-05", 10)},
+        {"mode": "invoice", "after": ("2024-01-05", 10)},
+    ]
+    with connect() as conn:
+        for filters in cases:
+            functions.database.fetch_history_page(**filters)
+            plan = " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statements[-1]}"))
+            assert "TEMP B-TREE" not in plan, (filters, plan)
+
+
+def test_fetch_history_page_filters(history_db):
+    add_history("2024-01-01T09:00:00", mode="summarize", tone="friendly")
+    wanted = add_history("2024-01-02T09:00:00", mode="invoice", tone="formal")
+    add_history("2024-01-03T09:00:00", mode="invoice", tone="friendly")
+
+    assert _page_ids(mode="invoice", tone="formal") == [wanted]
+    assert len(_page_ids(since="2024-01-02", until="2024-01-03")) == 1
+    assert functions.database.fetch_history_filter_values() == (["invoice", "summarize"], ["formal", "friendly"])
+
+
+def test_blobs_are_shared_and_texts_resolved(history_db):
+    first = add_history("2024-01-01T09:00:00", input_text="same email " * 20, output_text="a")
+    second = add_history("2024-01-02T09:00:00", input_text="same email " * 20, output_text="b")
+
+    with functions.database.connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 3
+    assert functions.database.fetch_history_texts(first) == ("same email " * 20, "a")
+    assert functions.database.fetch_history_texts(second)[1] == "b"
+
+
+def test_legacy_rows_migrate_to_blobs(history_db):
+    with functions.database.connect() as conn:
+        conn.executemany(
+            "INSERT INTO history (timestamp, mode, tone, input, output) VALUES (?, 'summarize', '', ?, ?)",
+            [(f"2024-01-0{n}", f"input {n}" * 30, f"output {n}") for n in range(1, 4)],
+        )
+    assert functions.database.history_needs_blob_migration()
+
+    assert functions.database.migrate_history_to_blobs(batch_size=2) == 3
+    assert not functions.database.history_needs_blob_migration()
+    assert functions.database.fetch_history_texts(2) == ("input 2" * 30, "output 2")
+
+
+def test_migration_defers_vacuum_for_legacy_files(history_db):
+    with functions.database.connect() as conn:
+        conn.execute("PRAGMA auto_vacuum = NONE")
+        conn.execute("VACUUM")
+        conn.execute("INSERT INTO history (timestamp, input, output) VALUES ('2024-01-01', ?, 'o')", ("x" * 5000,))
+    functions.database.migrate_history_to_blobs()
+
+    assert functions.database.get_meta(functions.database.VACUUM_PENDING_META_KEY) == "1"
+    assert functions.database.vacuum_if_pending()
+    assert not functions.database.vacuum_if_pending()
+    with functions.database.connect() as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_save_retries_while_the_database_is_locked(history_db, monkeypatch):
+    monkeypatch.setattr(functions.database, "CONNECT_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(functions.database, "SAVE_RETRY_DELAY_SECONDS", 0.2)
+    blocker = sqlite3.connect(history_db, check_same_thread=False, isolation_level=None)
+    blocker.execute("BEGIN EXCLUSIVE")
+    timer = threading.Timer(0.1, blocker.rollback)
+    timer.start()
+    try:
+        functions.database.save_to_history("summarize", "", "email", "reply")
+    finally:
+        timer.join()
+        blocker.close()
+    assert functions.database.fetch_history_texts(_page_ids()[0]) == ("email", "reply")
+
+
+def test_export_import_round_trip_and_dedupe(history_db, tmp_path, monkeypatch):
+    add_history("2024-01-01T09:00:00", mode="summarize", tone="formal", input_text="é-mail, \"quoted\"\nline", output_text="x")
+    add_history("2024-01-02T09:00:00", mode="invoice", tone="", input_text="two", output_text="y")
+    exported = list(iter_history_records())
+
+    for name in ("history.jsonl", "history.csv.gz"):
+        path = str(tmp_path / name)
+        assert export_history(path) == 2
+        monkeypatch.setattr(functions.database, "DB_PATH", str(tmp_path / f"{name}.db"))
+        functions.database.init_history_db()
+
+        result = import_history(path)
+        assert (result.imported, result.duplicates, result.invalid) == (2, 0, 0)
+        imported = list(iter_history_records())
+        for record, original in zip(imported, exported):
+            assert {key: record[key] for key in ("timestamp", "input", "output")} == {
+                key: original[key] for key in ("timestamp", "input", "output")
+            }
+        assert import_history(path).duplicates == 2
+        assert len(list(iter_history_records())) == 2
+
+
+def test_import_counts_invalid_lines(history_db, tmp_path):
+    path = tmp_path / "broken.jsonl"
+    path.write_text('{"timestamp": "2024-01-01", "input": "a", "output": "b"}\nnot json\n[1]\n{"input": "x"}\n')
+
+    result = import_history(str(path))
+    assert (result.imported, result.invalid) == (1, 3)
+
+
+def test_retention_policy_from_config():
+    policy = RetentionPolicy.from_config(
+        {"history_retention": {"max_age_days": 30, "max_rows": 0, "per_mode_max_rows": {"invoice": 5, "x": -1}, "interval_hours": True}}
+    )
+    assert policy.max_age_days == 30
+    assert policy.max_rows is None
+    assert dict(policy.per_mode_max_rows) == {"invoice": 5}
+    assert policy.interval_hours == 24.0
+    assert policy.prunes
+    assert not RetentionPolicy.from_config({}).prunes
+
+
+def test_expiry_clause_combines_age_and_row_limits(history_db):
+    ids = [add_history(f"2024-01-{day:02d}T09:00:00", mode="invoice" if day % 2 else "summarize") for day in range(1, 11)]
+    policy = RetentionPolicy(max_age_days=7, max_rows=8, per_mode_max_rows={"invoice": 2})
+
+    with functions.database.connect() as conn:
+        where, params = _expiry_clause(conn.cursor(), policy, datetime(2024, 1, 10, 12))
+        expired = [row[0] for row in conn.execute(f"SELECT id FROM history WHERE {where} ORDER BY id", params)]
+
+    # Older than Jan 3, beyond the newest 8 rows, or beyond the newest 2 invoices (days 9 and 7).
+    assert expired == [ids[0], ids[1], ids[2], ids[4]]
+    assert _expiry_clause(None, RetentionPolicy(), datetime.now()) == ("", [])
+
+
+def test_maintenance_archives_then_deletes(history_db, tmp_path):
+    for day in range(1, 6):
+        add_history(f"2024-01-{day:02d}T09:00:00", output_text=f"out {day}")
+    policy = RetentionPolicy(max_rows=2, archive_dir=str(tmp_path / "archive"), batch_size=2)
+
+    result = run_history_maintenance(policy, now=datetime(2024, 2, 1))
+
+    assert result.archived == 3
+    with gzip.open(result.archive_path, "rt", encoding="utf-8") as archive:
+        assert [json.loads(line)["output"] for line in archive] == ["out 1", "out 2", "out 3"]
+    assert _page_ids() == [5, 4]
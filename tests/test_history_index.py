@@ -0,0 +1,95 @@
+import subprocess
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from functions.history_index import HistoryIndex, find_similar
+
+from conftest import ROOT, add_history
+
+
+class HashEmbedder:
+    """Deterministic bag-of-words vectors, so similar texts score higher."""
+
+    name = "test:hash:64"
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, sum(word.encode()) % 64] += 1.0
+        return vectors
+
+
+def test_search_matches_brute_force_across_blocks(tmp_path):
+    index = HistoryIndex(str(tmp_path / "index"))
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((1000, 32)).astype(np.float32)
+    index._reset("test", 32)
+    index._append(vectors, list(range(1, 1001)), 1000)
+
+    query = rng.standard_normal(32).astype(np.float32)
+    results = index.search(query, 5, block_rows=97)
+
+    normalised = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalised @ (query / np.linalg.norm(query))))[:5] + 1
+    assert [history_id for history_id, _score in results] == expected.tolist()
+    assert results[0][1] >= results[-1][1]
+    assert index.search(np.zeros(32), 5) == []
+    assert index.search(query[:8], 5) == []
+
+
+def test_update_is_incremental_and_reloads(history_db, tmp_path):
+    add_history("2024-01-01", mode="summarize", output_text="replace kitchen tap washer")
+    add_history("2024-01-02", mode="reply", output_text="thanks for your email")
+    add_history("2024-01-03", mode="invoice", output_text="paint bedroom walls white")
+    embedder = HashEmbedder()
+    index = HistoryIndex(str(tmp_path / "index"))
+
+    assert index.update(embedder) == 2
+    assert index.update(embedder) == 0
+    add_history("2024-01-04", mode="summarize", output_text="kitchen tap leaking again")
+    assert index.update(embedder) == 1
+
+    reopened = HistoryIndex(str(tmp_path / "index"))
+    assert len(reopened) == 3
+    jobs = find_similar(reopened, embedder, "leaking kitchen tap", k=2, exclude_output="kitchen tap leaking again")
+    assert [job.output for job in jobs] == ["replace kitchen tap washer", "paint bedroom walls white"]
+
+
+def test_model_change_rebuilds_the_index(history_db, tmp_path):
+    add_history("2024-01-01", output_text="one")
+    index = HistoryIndex(str(tmp_path / "index"))
+    index.update(HashEmbedder())
+
+    other = HashEmbedder()
+    other.name = "test:other"
+    assert index.update(other) == 1
+    assert index.model == "test:other"
+    assert len(index) == 1
+
+
+def test_find_similar_ignores_an_index_built_by_another_embedder(history_db, tmp_path):
+    add_history("2024-01-01", output_text="replace kitchen tap washer")
+    index = HistoryIndex(str(tmp_path / "index"))
+    index.update(HashEmbedder())
+
+    other = HashEmbedder()
+    other.name = "test:other"
+    assert find_similar(index, other, "kitchen tap") == []
+    assert len(index) == 1  # Searching never re-indexes.
+
+
+def test_numpy_is_only_imported_when_the_index_is_used():
+    code = (
+        "import sys, functions.app_config, functions.history_index as h;"
+        "assert h.numpy_available();"
+        "assert 'numpy' not in sys.modules, 'numpy imported at startup'"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT)
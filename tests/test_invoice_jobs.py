@@ -0,0 +1,79 @@
+import json
+import threading
+import time
+
+import functions.database
+import functions.invoice_jobs as invoice_jobs
+from functions.invoice_jobs import InvoiceCheckpoint, InvoiceJob, draft_invoice_notes
+from functions.jobs import JobExecutor
+
+
+class FakeService:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate_response(self, model, prompt):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return f"note for {prompt.rsplit(chr(10), 1)[-1]}"
+
+
+def _jobs(count):
+    return [InvoiceJob(f"job-{number}", f"Job {number}", f"notes {number}") for number in range(count)]
+
+
+def test_drafts_run_as_executor_jobs_under_the_kind_limit(history_db, tmp_path):
+    executor = JobExecutor({"openai": 2}, max_pending=2)
+    service = FakeService(delay=0.05)
+
+    notes = draft_invoice_notes(
+        service,
+        "gpt-test",
+        _jobs(8),
+        checkpoint_path=str(tmp_path / "progress.jsonl"),
+        concurrency=6,
+        submit=lambda draft: executor.submit_future("openai", "draft", draft),
+    )
+    executor.shutdown()
+
+    assert [note.job_id for note in notes] == [f"job-{number}" for number in range(8)]
+    assert all(note.note for note in notes)
+    assert service.peak <= 2
+
+
+def test_checkpoint_is_written_before_history(history_db, tmp_path, monkeypatch):
+    checkpoint_path = tmp_path / "progress.jsonl"
+
+    def broken_save(*_args):
+        assert len(InvoiceCheckpoint(str(checkpoint_path)).load()) >= 1
+        raise RuntimeError("history unavailable")
+
+    monkeypatch.setattr(functions.database, "save_to_history", broken_save)
+    notes = draft_invoice_notes(
+        FakeService(), "gpt-test", _jobs(2), checkpoint_path=str(checkpoint_path), concurrency=1
+    )
+
+    assert all(note.note for note in notes)
+    records = [json.loads(line) for line in checkpoint_path.read_text(encoding="utf-8").splitlines()]
+    assert [record["job_id"] for record in records] == ["job-0", "job-1"]
+
+
+def test_checkpoint_write_errors_do_not_lose_the_note(history_db, tmp_path, monkeypatch):
+    def broken_append(self, record):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(invoice_jobs.InvoiceCheckpoint, "append", broken_append)
+    notes = draft_invoice_notes(
+        FakeService(), "gpt-test", _jobs(3), checkpoint_path=str(tmp_path / "progress.jsonl")
+    )
+
+    assert [bool(note.note) for note in notes] == [True, True, True]
+    with functions.database.connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == 3
@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+
+from functions.jobs import CANCELLED, DONE, FAILED, JobExecutor, JobQueueFull, current_job
+
+
+def _wait(jobs, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while any(job.finished_at is None for job in jobs):
+        assert time.monotonic() < deadline, "jobs did not finish"
+        time.sleep(0.005)
+
+
+def test_burst_runs_concurrently_up_to_the_kind_limit():
+    executor = JobExecutor({"openai": 3})
+    warm = executor.submit("openai", "warm", lambda: None)
+    _wait([warm])
+    time.sleep(0.05)  # Let the warm worker go back to idle.
+
+    jobs = [executor.submit("openai", f"job {n}", lambda: time.sleep(0.3)) for n in range(3)]
+    _wait(jobs)
+
+    starts = sorted(job.started_at for job in jobs)
+    assert starts[-1] - starts[0] < 0.15
+    assert executor._workers["openai"] == 3
+    executor.shutdown()
+
+
+def test_limit_caps_concurrency():
+    executor = JobExecutor({"asana": 2})
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+
+    jobs = [executor.submit("asana", "work", work) for _ in range(6)]
+    _wait(jobs)
+    assert max(peak) == 2
+    assert executor._workers["asana"] == 2
+    executor.shutdown()
+
+
+def test_priority_order_within_a_kind():
+    executor = JobExecutor({"history": 1})
+    gate = threading.Event()
+    order = []
+    blocker = executor.submit("history", "blocker", gate.wait)
+    jobs = [
+        executor.submit("history", "low", lambda: order.append("low"), priority=-1),
+        executor.submit("history", "first", lambda: order.append("first")),
+        executor.submit("history", "high", lambda: order.append("high"), priority=5),
+        executor.submit("history", "second", lambda: order.append("second")),
+    ]
+    gate.set()
+    _wait([blocker, *jobs])
+    assert order == ["high", "first", "second", "low"]
+    executor.shutdown()
+
+
+def test_pending_limit_raises_queue_full():
+    executor = JobExecutor({"history": 1}, max_pending=2)
+    gate = threading.Event()
+    executor.submit("history", "blocker", gate.wait)
+    time.sleep(0.05)
+    executor.submit("history", "a", lambda: None)
+    executor.submit("history", "b", lambda: None)
+    with pytest.raises(JobQueueFull):
+        executor.submit("history", "c", lambda: None)
+    gate.set()
+    executor.shutdown()
+
+
+def test_cancel_pending_and_running_jobs():
+    executor = JobExecutor({"history": 1})
+    finished = []
+    started = threading.Event()
+
+    def long_running():
+        started.set()
+        while not current_job().cancelled:
+            time.sleep(0.005)
+
+    running = executor.submit("history", "running", long_running, on_finish=finished.append)
+    pending = executor.submit("history", "pending", lambda: None, on_finish=finished.append)
+    started.wait(2)
+
+    assert executor.cancel(pending)
+    assert pending.state == CANCELLED
+    assert executor.cancel(running)
+    _wait([running])
+    assert running.state == CANCELLED
+    assert finished == [pending, running]
+    assert not executor.cancel(running)
+    executor.shutdown()
+
+
+def test_failures_are_recorded_and_on_finish_runs_once():
+    executor = JobExecutor()
+    calls = []
+
+    def boom():
+        raise ValueError("boom")
+
+    failed = executor.submit("general", "boom", boom, on_finish=calls.append)
+    ok = executor.submit("general", "ok", lambda: None, on_finish=calls.append)
+    _wait([failed, ok])
+    time.sleep(0.02)
+    assert failed.state == FAILED and isinstance(failed.error, ValueError)
+    assert ok.state == DONE
+    assert sorted(job.id for job in calls) == [failed.id, ok.id]
+    executor.shutdown()
+
+
+def test_shutdown_cancels_pending_and_refuses_new_jobs():
+    executor = JobExecutor({"history": 1})
+    gate = threading.Event()
+    executor.submit("history", "blocker", gate.wait)
+    pending = executor.submit("history", "pending", lambda: None)
+    time.sleep(0.05)
+    executor.shutdown()
+    gate.set()
+    assert pending.state == CANCELLED
+    with pytest.raises(RuntimeError):
+        executor.submit("history", "late", lambda: None)
+
+
+def test_submit_future_returns_result_and_is_cancelled_when_dropped():
+    executor = JobExecutor({"openai": 1})
+    release = threading.Event()
+    blocker = executor.submit_future("openai", "blocker", lambda: release.wait(5) and "done")
+    pending = executor.submit_future("openai", "pending", lambda: "never")
+    failing = executor.submit_future("general", "failing", lambda: 1 / 0)
+
+    with pytest.raises(ZeroDivisionError):
+        failing.result(timeout=5)
+    executor.shutdown()
+    release.set()
+    assert blocker.result(timeout=5) == "done"
+    assert pending.cancelled()
@@ -0,0 +1,27 @@
+from gui.main_window import _save_history_and_display
+
+
+def test_reply_is_shown_before_the_background_save():
+    events = []
+    queued = []
+
+    def failing_save(*_args):
+        events.append("save")
+        raise RuntimeError("database is locked")
+
+    _save_history_and_display(
+        "summarize",
+        "neutral",
+        "prompt",
+        "reply",
+        None,
+        save_to_history=failing_save,
+        display_markdown=lambda _widget, text: events.append(f"display {text}"),
+        log=lambda message: events.append("log"),
+        show_warning=lambda title, _message: events.append(title),
+        run_in_background=queued.append,
+    )
+    assert events == ["display reply"]
+
+    queued.pop()()
+    assert events == ["display reply", "save", "log", "History Save Warning"]
@@ -0,0 +1,28 @@
+import json
+
+from functions.metrics import MetricsRegistry, RotatingJsonlWriter
+
+
+def test_configure_export_none_flushes_queued_spans(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    registry = MetricsRegistry()
+    registry.configure_export(str(path))
+    for n in range(200):
+        registry.record("op", 0.001 * n)
+    registry.configure_export(None)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 200
+    assert json.loads(lines[-1])["op"] == "op"
+
+
+def test_writer_rotates_by_size(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    writer = RotatingJsonlWriter(str(path), max_bytes=200, backups=2)
+    for n in range(50):
+        writer.write({"n": n, "pad": "x" * 20})
+    writer.close()
+
+    assert path.exists()
+    assert (tmp_path / "metrics.jsonl.1").exists()
+    assert not (tmp_path / "metrics.jsonl.3").exists()
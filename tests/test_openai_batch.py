@@ -0,0 +1,89 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import functions.database
+import functions.openai_batch as openai_batch
+
+
+class FakeBatchService:
+    """Serves one completed batch whose output file answers every request."""
+
+    def __init__(self, custom_ids):
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "response": {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": {"content": f"reply {custom_id}"}}]},
+                },
+            })
+            for custom_id in custom_ids
+        ]
+        self.client = SimpleNamespace(
+            files=SimpleNamespace(content=lambda _file_id: SimpleNamespace(text="\n".join(lines)))
+        )
+        self.batch = SimpleNamespace(status="completed", output_file_id="out", error_file_id=None)
+
+
+def _job(count):
+    requests = {f"job-{number}": {"prompt": f"prompt {number}"} for number in range(count)}
+    return openai_batch.BatchJob(
+        batch_id="batch_1",
+        model="gpt-test",
+        history_mode="invoice",
+        history_tone="batch",
+        created_at="2024-01-01T00:00:00+00:00",
+        requests=requests,
+    )
+
+
+def test_collect_batch_writes_saved_list_in_chunks(history_db, monkeypatch):
+    monkeypatch.setattr(openai_batch, "SAVED_FLUSH_EVERY", 4)
+    writes = []
+    set_meta = functions.database.set_meta
+
+    def counting_set_meta(key, value):
+        writes.append(key)
+        set_meta(key, value)
+
+    monkeypatch.setattr(functions.database, "set_meta", counting_set_meta)
+    job = _job(10)
+    service = FakeBatchService(job.requests)
+
+    results = openai_batch.collect_batch(service, job, service.batch)
+
+    assert all(not result.error for result in results.values())
+    # Two full chunks and the remainder, not one write per reply.
+    assert writes == [openai_batch.BATCH_SAVED_META_PREFIX + "batch_1"] * 3
+    job.save()
+    assert openai_batch.load_batch_job("batch_1").saved == set(job.requests)
+
+    # A second collect saves nothing again.
+    openai_batch.collect_batch(service, openai_batch.load_batch_job("batch_1"), service.batch)
+    with functions.database.connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == 10
+
+
+def test_write_request_file_checks_limit_before_writing(tmp_path, monkeypatch):
+    monkeypatch.setattr(openai_batch, "MAX_BATCH_REQUESTS", 3)
+    path = tmp_path / "requests.jsonl"
+    written = []
+
+    def prompts():
+        for number in range(5):
+            written.append(number)
+            yield f"job-{number}", "prompt"
+
+    with pytest.raises(ValueError):
+        openai_batch.write_request_file(str(path), "gpt-test", [("a", "p")] * 4)
+    assert not path.exists()
+
+    with pytest.raises(ValueError):
+        openai_batch.write_request_file(str(path), "gpt-test", prompts())
+    assert written == [0, 1, 2, 3]
+    assert not path.exists()
+
+    assert openai_batch.write_request_file(str(path), "gpt-test", [("a", "p")] * 3) == 3
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3
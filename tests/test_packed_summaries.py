@@ -0,0 +1,110 @@
+import argparse
+import json
+import re
+
+import functions.app_config
+import functions.database
+import functions.structured_summary as structured_summary
+from functions.email_sources import EmailItem
+
+_EMAIL_RE = re.compile(r"^<<<EMAIL (\d+)>>>$", re.MULTILINE)
+
+
+class SchemaRejected(Exception):
+    status_code = 400
+
+
+class FakeOpenAI:
+    """Answers packed and single prompts; *skip* ids are left out of packed replies."""
+
+    def __init__(self, *, schema=True, skip=()):
+        self.schema = schema
+        self.skip = set(skip)
+        self.calls = []
+
+    def _entry(self, number):
+        return {"id": number, "summary": f"Summary {number}", "tasks": [], "fixes": [], "priority": "high"}
+
+    def generate_structured(self, model, prompt, schema, *, name):
+        self.calls.append(name)
+        if not self.schema:
+            raise SchemaRejected("response_format json_schema is not supported")
+        if name == structured_summary.PACKED_SUMMARY_SCHEMA_NAME:
+            numbers = [int(n) for n in _EMAIL_RE.findall(prompt) if int(n) not in self.skip]
+            return {"emails": [self._entry(number) for number in numbers]}
+        return {**self._entry(0), "summary": "Single summary"}
+
+    def generate_response(self, model, prompt, response_format=None):
+        self.calls.append("json" if response_format else "markdown")
+        if response_format:
+            numbers = [int(n) for n in _EMAIL_RE.findall(prompt) if int(n) not in self.skip]
+            return json.dumps({"emails": [{"id": n, "summary": f"Markdown {n}"} for n in numbers]})
+        return "Markdown single"
+
+
+def _history_rows():
+    with functions.database.connect() as conn:
+        ids = [row[0] for row in conn.execute("SELECT id FROM history ORDER BY id")]
+    return [functions.database.fetch_history_texts(entry_id) for entry_id in ids]
+
+
+def test_packed_structured_summaries_keep_structure_and_own_prompt(history_db):
+    service = FakeOpenAI()
+    results = structured_summary.summarize_emails(service, "m", ["first email", "second email", "third email"])
+
+    assert service.calls == [structured_summary.PACKED_SUMMARY_SCHEMA_NAME]
+    assert [result.summary for result in results] == ["Summary 1", "Summary 2", "Summary 3"]
+    assert all(result.packed and result.structured.priority == "high" for result in results)
+    rows = _history_rows()
+    assert len(rows) == 3
+    assert all("<<<EMAIL" not in prompt for prompt, _output in rows)
+    assert rows[1][0] == structured_summary.build_structured_summary_prompt("second email")
+    assert "first email" not in rows[1][0]
+    assert rows[1][1] == "Summary 2"
+
+
+def test_missed_emails_are_summarised_on_their_own(history_db):
+    service = FakeOpenAI(skip={2})
+    results = structured_summary.summarize_emails(service, "m", ["a", "b", "c"])
+
+    assert [result.packed for result in results] == [True, False, True]
+    assert results[1].summary.startswith("Single summary")
+    assert "<<<EMAIL" not in results[1].prompt
+    assert "<<<EMAIL" not in _history_rows()[1][0]
+
+
+def test_models_without_schema_support_use_json_mode(history_db):
+    service = FakeOpenAI(schema=False)
+    results = structured_summary.summarize_emails(service, "no-schema-model", ["a", "b"], history_tone=None)
+
+    assert [result.summary for result in results] == ["Markdown 1", "Markdown 2"]
+    assert all(result.structured is None for result in results)
+    assert _history_rows() == []
+
+
+def test_should_stop_cancels_remaining_groups(history_db):
+    service = FakeOpenAI()
+    results = structured_summary.summarize_emails(
+        service, "m", ["a", "b", "c", "d"], max_emails=2, should_stop=lambda: len(service.calls) >= 1
+    )
+    assert [result.error for result in results] == ["", "", "Cancelled", "Cancelled"]
+
+
+def test_batch_group_failure_marks_each_item_failed(history_db, monkeypatch):
+    import batch
+
+    def boom(*_args, **_kwargs):
+        raise RuntimeError("prompt build failed")
+
+    monkeypatch.setattr(structured_summary, "summarize_emails", boom)
+    config = functions.app_config.ConfigSnapshot.from_dict(
+        {"openai_api_key": "k", "asana_token": "t", "asana_project_id": "1", "asana_workspace": "w"}
+    )
+    items = [(EmailItem(f"id{n}", "src", f"Subject {n}", "", f"body {n}"), None) for n in range(2)]
+    args = argparse.Namespace(model="m", tasks=True, fixes=False, dry_run=True, assignee="", priority="", due_on="")
+
+    records = batch._process_group(
+        items, args=args, config=config, asana_settings=config.asana, openai_service=FakeOpenAI()
+    )
+    assert [(record["status"], record["error"]) for record in records] == [("failed", "prompt build failed")] * 2
+
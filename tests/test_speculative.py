@@ -0,0 +1,61 @@
+import json
+import threading
+
+import pytest
+
+import functions.database
+import functions.structured_summary
+from functions.jobs import JobExecutor
+from functions.speculative import CHARS_PER_TOKEN, SPEND_META_KEY, SpeculativeSettings, SpeculativeSummaries
+from functions.structured_summary import SummaryReply
+
+EMAIL = "The boiler at 12 High Street stopped working overnight. " * 3
+
+
+def _stored_spend():
+    return json.loads(functions.database.get_meta(SPEND_META_KEY))
+
+
+@pytest.mark.parametrize("structured", [True, False])
+def test_spend_is_reserved_on_the_prompt_and_saved_before_the_request(history_db, monkeypatch, structured):
+    executor = JobExecutor()
+    speculative = SpeculativeSummaries(SpeculativeSettings(enabled=True), None, executor, structured=structured)
+    prompt_chars = len(speculative._prompt_for(EMAIL, True, True))
+    seen_at_request = []
+    released = threading.Event()
+
+    def failing_summary(*_args, **_kwargs):
+        seen_at_request.append(_stored_spend())
+        released.set()
+        raise RuntimeError("network down")
+
+    monkeypatch.setattr(functions.structured_summary, "generate_summary", failing_summary)
+    assert speculative.speculate("gpt-test", EMAIL, True, True)
+    assert released.wait(5)
+    key = speculative.key_for("gpt-test", EMAIL, True, True)
+    assert speculative._entries[key].wait(5)
+    executor.shutdown()
+
+    assert prompt_chars > len(EMAIL)
+    expected = {"requests": 1, "tokens": prompt_chars // CHARS_PER_TOKEN}
+    assert {name: seen_at_request[0][name] for name in expected} == expected
+    # The failed request keeps its reservation, in memory and on disk.
+    assert {name: _stored_spend()[name] for name in expected} == expected
+
+
+def test_reply_tokens_are_added_to_the_saved_spend(history_db, monkeypatch):
+    executor = JobExecutor()
+    speculative = SpeculativeSummaries(SpeculativeSettings(enabled=True), None, executor, structured=False)
+    prompt_chars = len(speculative._prompt_for(EMAIL, False, False))
+    monkeypatch.setattr(
+        functions.structured_summary,
+        "generate_summary",
+        lambda *_args, **_kwargs: SummaryReply(markdown="x" * 400, prompt="", structured=None),
+    )
+
+    assert speculative.speculate("gpt-test", EMAIL, False, False)
+    entry = speculative._entries[speculative.key_for("gpt-test", EMAIL, False, False)]
+    assert entry.wait(5) and entry.reply is not None
+    executor.shutdown()
+
+    assert _stored_spend()["tokens"] == prompt_chars // CHARS_PER_TOKEN + 400 // CHARS_PER_TOKEN
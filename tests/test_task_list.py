@@ -0,0 +1,58 @@
+from functions.task_list import (
+    TaskItem,
+    count_items,
+    parse_due_date,
+    parse_item_text,
+    split_task_list,
+    tasks_to_markdown,
+)
+
+
+def test_numbered_items_without_heading():
+    summary = "Customer wants a quote.\n\n1. Measure the room\n2. Order paint\n- not a task\n"
+    remaining, items = split_task_list(summary)
+
+    assert [item.name for item in items] == ["Measure the room", "Order paint"]
+    assert remaining == "Customer wants a quote.\n\n- not a task"
+
+
+def test_bullets_under_nested_numbers_become_children():
+    summary = "1. Kitchen\n    - Fix tap\n    - Replace seal\n2. Bathroom"
+    _, items = split_task_list(summary)
+
+    assert [item.name for item in items] == ["Kitchen", "Bathroom"]
+    assert [child.name for child in items[0].children] == ["Fix tap", "Replace seal"]
+    assert count_items(items) == 4
+
+
+def test_tasks_heading_takes_every_list_item_until_next_section():
+    summary = (
+        "**Summary**\n- Leaking roof\n\n"
+        "**Tasks**\n- Inspect roof @joe\n  - Buy tiles (due 2024-05-31)\n"
+        "**Notes**\n- Call before visiting"
+    )
+    remaining, items = split_task_list(summary)
+
+    assert [item.name for item in items] == ["Inspect roof"]
+    assert items[0].assignee == "joe"
+    assert items[0].children[0].name == "Buy tiles"
+    assert items[0].children[0].due_on == "2024-05-31"
+    assert "- Leaking roof" in remaining and "- Call before visiting" in remaining
+    assert "Inspect roof" not in remaining
+
+
+def test_item_hints_are_lifted_out():
+    item = parse_item_text("**Quote** the job (assignee: Jane Doe) due: 31/05/2024")
+    assert item == TaskItem(name="Quote the job", assignee="Jane Doe", due_on="2024-05-31")
+    assert parse_item_text("Email @jane@example.com").assignee == "jane@example.com"
+
+
+def test_invalid_due_dates_are_left_in_the_name():
+    assert parse_due_date("2024-02-30") is None
+    assert parse_item_text("Pay (due 2024-02-30)").due_on == ""
+
+
+def test_markdown_round_trip():
+    _, items = split_task_list("1. Kitchen @joe\n    - Fix tap (due 2024-05-31)\n2. Bathroom")
+    _, again = split_task_list(tasks_to_markdown(items))
+    assert again == items